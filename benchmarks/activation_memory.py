@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : mémoire des activations avec et sans planificateur mémoire (BaseModel.memory_planner).
+
+Le planificateur libère chaque sortie sauvegardée après son dernier consommateur et réutilise
+les buffers de Concat et C2f d'une inférence à l'autre. Pour chaque mode, mesure sur quelques
+inférences :
+    - le nombre d'allocations, les octets alloués et le pic d'activations (profileur PyTorch)
+    - le pic d'allocations Python (tracemalloc)
+    - le pic CUDA (torch.cuda.max_memory_allocated) si --device cuda
+Les sorties des deux modes doivent être identiques.
+
+Usage:
+    python benchmarks/activation_memory.py --model yolov8n-face.pt --imgsz 640
+    python benchmarks/activation_memory.py --model yolov8n.yaml --nc 1   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suite import load_model  # noqa: E402
+
+
+def memory_events(prof):
+    """Allocations (nombre, octets) et pic d'activations à partir des événements mémoire du profileur."""
+    events = sorted((e for e in prof.events() if e.cpu_memory_usage or e.cuda_memory_usage),
+                    key=lambda e: e.time_range.start)
+    n, total, current, peak = 0, 0, 0, 0
+    for e in events:
+        b = e.cpu_memory_usage + e.cuda_memory_usage
+        if b > 0:
+            n, total = n + 1, total + b
+        current += b
+        peak = max(peak, current)
+    return n, total, peak
+
+
+@torch.inference_mode()
+def run(model, im, n):
+    """Mesures pour un mode, après deux inférences de préchauffage (remplissage du pool)."""
+    for _ in range(2):
+        y = model(im)[0]
+    with profile(activities=[ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if im.is_cuda else []),
+                 profile_memory=True) as prof:
+        for _ in range(n):
+            model(im)
+    allocs, total, peak = memory_events(prof)
+
+    tracemalloc.start()
+    model(im)
+    py_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if im.is_cuda:
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        model(im)
+    if im.is_cuda:
+        torch.cuda.synchronize()
+    dt = (time.perf_counter() - t0) / n * 1E3
+    cuda_peak = torch.cuda.max_memory_allocated() if im.is_cuda else 0
+    return y, dict(allocs=allocs / n, mb=total / n / 1E6, peak=peak / 1E6, py=py_peak / 1E3, cuda=cuda_peak / 1E6,
+                   ms=dt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire des activations avec et sans planificateur")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--nc', type=int, default=1, help="Nombre de classes (configuration .yaml)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--device', type=str, default='cpu', help="cpu ou cuda")
+    parser.add_argument('--n', type=int, default=5, help="Nombre d'inférences mesurées")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = load_model(args.model, args.nc).to(args.device)
+    im = torch.rand(1, 3, args.imgsz, args.imgsz, device=args.device)
+
+    results = {}
+    for name, enabled in (('sans planificateur', False), ('avec planificateur', True)):
+        model.memory_planner = enabled
+        results[name] = run(model, im, args.n)
+    del model.memory_planner  # valeur de classe
+
+    print(f"{'mode':<20} | {'allocs':>7} | {'alloué':>9} | {'pic':>9} | {'python':>9} | {'cuda':>9} | {'temps':>8}")
+    for name, (_, r) in results.items():
+        print(f"{name:<20} | {r['allocs']:7.0f} | {r['mb']:6.1f} MB | {r['peak']:6.1f} MB | {r['py']:6.1f} kB | "
+              f"{r['cuda']:6.1f} MB | {r['ms']:5.1f} ms")
+    (y0, _), (y1, _) = results.values()
+    parity = torch.allclose(y0, y1)
+    print(f"parité des sorties : {'OK' if parity else 'ÉCHEC'}")
+    sys.exit(0 if parity else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : prédiction par lots multi-processus (yolo predict processes=N).
+
+Génère des vidéos synthétiques, puis lance BasePredictor.predict_batch avec 1, 2, 4... processus
+et mesure le débit total et l'accélération par rapport à un processus. Les détections (.npz) doivent
+être identiques quel que soit le nombre de processus. Vérifie aussi la reprise : après suppression
+d'un fichier de détections, une nouvelle exécution ne traite que ce fichier.
+
+Usage:
+    python benchmarks/batch_predict.py --model yolov8n-face.pt --videos 8 --frames 150 --processes 1 2 4
+
+Chaque processus charge son propre modèle : il faut des poids (.pt), une configuration .yaml
+donnerait des poids aléatoires différents par processus.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.v8.detect.predict import DetectionPredictor  # noqa: E402
+
+
+def make_videos(folder, n, frames, h=720, w=960):
+    """n vidéos de rectangles en mouvement sur fond bruité."""
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        writer = cv2.VideoWriter(str(folder / f'vol{i:02d}.mp4'), cv2.VideoWriter_fourcc(*'mp4v'), 30, (w, h))
+        bg = cv2.resize(rng.integers(0, 255, (h // 16, w // 16, 3), dtype=np.uint8), (w, h))
+        for t in range(frames):
+            im = bg.copy()
+            x = (40 + 5 * t + 60 * i) % (w - 200)
+            cv2.rectangle(im, (x, 200), (x + 160, 400), (200, 180, 160), -1)
+            writer.write(im)
+        writer.release()
+
+
+def run(model, source, project, processes, imgsz):
+    """Une exécution de predict_batch, temps total en s."""
+    predictor = DetectionPredictor(overrides={'model': model, 'source': source, 'imgsz': imgsz, 'project': project,
+                                              'name': 'batch', 'processes': processes, 'mode': 'predict'})
+    t0 = time.perf_counter()
+    predictor.predict_batch()
+    return time.perf_counter() - t0, predictor.save_dir / 'detections'
+
+
+def load(out):
+    """Détections de chaque fichier .npz, par chemin relatif."""
+    return {f.relative_to(out).as_posix(): dict(np.load(f)) for f in sorted(out.rglob('*.npz'))}
+
+
+def same(a, b):
+    """Mêmes fichiers et mêmes colonnes de détections."""
+    return a.keys() == b.keys() and all(
+        all(np.allclose(a[k][c], b[k][c], atol=1E-3) for c in a[k]) for k in a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prédiction par lots multi-processus")
+    parser.add_argument('--model', type=str, default='yolov8n.pt', help="Poids (.pt)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--videos', type=int, default=8, help="Nombre de vidéos")
+    parser.add_argument('--frames', type=int, default=150, help="Frames par vidéo")
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4], help="Nombres de processus")
+    args = parser.parse_args()
+
+    ok, ref, t1 = True, None, None
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / 'vols'
+        folder.mkdir()
+        make_videos(folder, args.videos, args.frames)
+        source = str(folder / '*.mp4')
+        n = args.videos * args.frames
+        print(f"{args.videos} vidéos x {args.frames} frames, {os.cpu_count()} cœurs\n")
+        print(f"{'processus':>9} | {'total':>8} | {'frames/s':>8} | {'accélération':>12} | parité")
+        for p in args.processes:
+            t, out = run(args.model, source, str(Path(tmp) / f'p{p}'), p, args.imgsz)
+            det = load(out)
+            ref, t1 = ref or det, t1 or t
+            parity = same(det, ref) and len(det) == args.videos
+            ok &= parity
+            print(f"{p:>9} | {t:6.1f} s | {n / t:8.1f} | {t1 / t:11.2f}x | {'OK' if parity else 'ÉCHEC'}")
+
+        # Reprise : seul le fichier supprimé est recalculé
+        removed = out / f'vol{args.videos - 1:02d}.mp4.npz'
+        removed.unlink()
+        mtimes = {f: f.stat().st_mtime_ns for f in out.rglob('*.npz')}
+        run(args.model, source, str(out.parent.parent), args.processes[-1], args.imgsz)
+        resumed = removed.exists() and all(f.stat().st_mtime_ns == m for f, m in mtimes.items())
+        ok &= resumed and same(load(out), ref)
+        print(f"\nreprise après interruption : {'OK' if resumed else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et impact sur la précision : modes CPU fp32, channels_last et bf16 d'AutoBackend.
+
+Pour chaque mode, mesure la latence du modèle sur une entrée aléatoire et l'écart de ses sorties
+avec le mode fp32 de référence. channels_last doit donner les mêmes sorties que fp32 ; bf16 s'en
+écarte, son impact est mesuré avec le validateur (mAP50-95 sur --data) et ne doit pas dépasser
+--max-drop. bf16 n'est testé que si le CPU a les instructions AVX512-BF16 ou AMX.
+
+Usage:
+    python benchmarks/cpu_precision.py --model yolov8n-face.pt --data widerface.yaml --imgsz 640
+    python benchmarks/cpu_precision.py --model yolov8n.yaml --nc 1   # poids aléatoires, sans validation
+"""
+
+import argparse
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.nn.autobackend import AutoBackend  # noqa: E402
+from ultralytics.yolo.utils.torch_utils import cpu_supports_bf16  # noqa: E402
+from suite import latency, load_model  # noqa: E402
+
+MODES = {'fp32': {}, 'channels_last': {'channels_last': True}, 'bf16': {'bf16': True},
+         'bf16 + channels_last': {'bf16': True, 'channels_last': True}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modes CPU fp32, channels_last et bf16")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--nc', type=int, default=1, help="Nombre de classes (configuration .yaml)")
+    parser.add_argument('--data', type=str, default='', help="Jeu de validation (.yaml) pour mesurer la mAP")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--n', type=int, default=50, help="Nombre d'inférences mesurées")
+    parser.add_argument('--max-drop', type=float, default=0.01, help="Perte de mAP50-95 tolérée en bf16")
+    args = parser.parse_args()
+
+    bf16 = cpu_supports_bf16()
+    modes = {k: v for k, v in MODES.items() if bf16 or not v.get('bf16')}
+    print(f"torch {torch.__version__}, {torch.get_num_threads()} threads, "
+          f"oneDNN {'oui' if torch.backends.mkldnn.is_available() else 'non'}, bf16 natif {'oui' if bf16 else 'non'}\n")
+
+    torch.manual_seed(0)
+    model = load_model(args.model, args.nc, fuse=False)
+    im = torch.rand(1, 3, args.imgsz, args.imgsz)
+    ok, ref = True, None
+    print(f"{'mode':<22} | {'p50':>9} | {'p99':>9} | {'écart max':>9} | {'mAP50-95':>8}")
+    for name, kwargs in modes.items():
+        backend = AutoBackend(model, device=torch.device('cpu'), **kwargs).eval()
+        with torch.inference_mode():
+            p50, p99, y = latency(lambda: backend(im)[0], args.n)
+        ref = y if ref is None else ref
+        err = (y.float() - ref).abs().max().item()
+        if not kwargs.get('bf16'):
+            ok &= err <= 1E-3  # channels_last ne change que la disposition mémoire
+
+        m = ''
+        if args.data:
+            metrics = YOLO(args.model).val(data=args.data, imgsz=args.imgsz, device='cpu', plots=False, **kwargs)
+            m = metrics['metrics/mAP50-95(B)']
+            if name == 'fp32':
+                m_ref = m
+            elif kwargs.get('bf16'):
+                ok &= m_ref - m <= args.max_drop
+            m = f'{m:.4f}'
+        print(f"{name:<22} | {p50:6.2f} ms | {p99:6.2f} ms | {err:9.2e} | {m:>8}")
+
+    print(f"\nprécision : {'OK' if ok else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
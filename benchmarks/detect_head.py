@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification de parité : décodage « confiance d'abord » de la tête Detect.
+
+Compare la tête standard (DFL et décodage des boîtes sur toutes les ancres) au mode
+head_topk (DFL uniquement sur les ancres au-dessus du seuil) : temps de la tête seule et
+sorties de non_max_suppression, qui doivent être identiques.
+
+Usage:
+    python benchmarks/detect_head.py --model yolov8n-face.pt --imgsz 640 --conf 0.25 --topk 100
+    python benchmarks/detect_head.py --model yolov8n.yaml --nc 1   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.utils import ops  # noqa: E402
+from suite import load_model  # noqa: E402
+
+
+@torch.no_grad()
+def head_features(model, im):
+    """Entrées de la tête Detect (sorties des couches précédentes)."""
+    y = []
+    for m in model.model[:-1]:
+        if m.f != -1:
+            x = y[m.f] if isinstance(m.f, int) else [x if j == -1 else y[j] for j in m.f]
+        im = m(im if m.f == -1 else x)
+        y.append(im if m.i in model.save else None)
+    head = model.model[-1]
+    return [y[j] for j in head.f]
+
+
+@torch.no_grad()
+def time_head(head, feats, n):
+    """Temps moyen de la tête en ms (les features sont clonées car la tête les modifie)."""
+    for _ in range(3):
+        head([f.clone() for f in feats])
+    t = 0.0
+    for _ in range(n):
+        x = [f.clone() for f in feats]
+        t0 = time.perf_counter()
+        y = head(x)[0]
+        t += time.perf_counter() - t0
+    return t / n * 1E3, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tête Detect : décodage complet contre confiance d'abord")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--nc', type=int, default=1, help="Nombre de classes (configuration .yaml)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--conf', type=float, default=0.25, help="Seuil de confiance")
+    parser.add_argument('--topk', type=int, default=100, help="Nombre maximal d'ancres décodées")
+    parser.add_argument('--n', type=int, default=100, help="Nombre d'itérations")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = load_model(args.model, args.nc)
+    head = model.model[-1]
+    feats = head_features(model, torch.rand(1, 3, args.imgsz, args.imgsz))
+    if not args.model.endswith('.pt'):
+        # Poids aléatoires : biais de classe relevés pour obtenir des candidats
+        for cv in head.cv3:
+            cv[-1].bias.data += 6.0
+
+    head.topk = 0
+    t_full, y_full = time_head(head, feats, args.n)
+    head.topk, head.conf = args.topk, args.conf
+    t_fast, y_fast = time_head(head, feats, args.n)
+    head.topk = 0
+
+    p_full = ops.non_max_suppression(y_full, args.conf, 0.7)[0]
+    p_fast = ops.non_max_suppression(y_fast, args.conf, 0.7)[0]
+    n_cand = int((y_full[:, 4:].amax(1) > args.conf).sum())
+    parity = p_full.shape == p_fast.shape and torch.allclose(p_full, p_fast, atol=1E-4)
+
+    print(f"{y_full.shape[2]} ancres, {n_cand} au-dessus de conf={args.conf}, topk={args.topk}")
+    print(f"tête complète       : {t_full:6.2f} ms")
+    print(f"confiance d'abord   : {t_fast:6.2f} ms ({t_full / t_fast:.2f}x)")
+    print(f"parité NMS          : {'OK' if parity else 'ÉCHEC'} ({len(p_full)} / {len(p_fast)} détections)")
+    if n_cand > args.topk:
+        print("  (plus de candidats que topk : seules les topk meilleures ancres sont décodées)")
+    sys.exit(0 if parity or n_cand > args.topk else 1)
+
+
+if __name__ == '__main__':
+    main()
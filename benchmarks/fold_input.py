@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification de parité : normalisation intégrée à la première convolution.
+
+Compare le chemin standard (LetterBox, BGR→RGB, HWC→CHW, copie contiguë, uint8→float, /255)
+au modèle fusionné avec fold_input=True, qui reçoit directement l'image uint8 BGR HWC avec une
+seule permutation. Les sorties brutes du modèle et les détections après NMS doivent être identiques
+(à la précision flottante près).
+
+Usage:
+    python benchmarks/fold_input.py --model yolov8n-face.pt --imgsz 640
+    python benchmarks/fold_input.py --model yolov8n.yaml --nc 1   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+from copy import deepcopy
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.data.augment import LetterBox  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+from suite import load_model, timeit  # noqa: E402
+
+
+def preprocess_standard(frame, letterbox):
+    """Chemin standard des loaders et de DetectionPredictor.preprocess."""
+    im = letterbox(image=frame)
+    im = np.ascontiguousarray(im.transpose((2, 0, 1))[::-1])  # HWC to CHW, BGR to RGB
+    im = torch.from_numpy(im).float()
+    im /= 255
+    return im[None]
+
+
+def preprocess_folded(frame, letterbox):
+    """Chemin fold_input : image uint8 BGR HWC, une seule permutation."""
+    im = torch.from_numpy(letterbox(image=frame))
+    return im.movedim(-1, -3).to(torch.float32, memory_format=torch.contiguous_format)[None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalisation d'entrée intégrée à la première convolution")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--nc', type=int, default=1, help="Nombre de classes (configuration .yaml)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--n', type=int, default=50, help="Nombre d'itérations")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (720, 960, 3), dtype=np.uint8)  # taille du flux Tello
+    letterbox = LetterBox(args.imgsz, auto=True, stride=32)
+
+    model = load_model(args.model, args.nc, fuse=False)
+    fused = deepcopy(model).fuse()
+    folded = deepcopy(model).fuse(fold_input=True)
+    assert folded.input_folded, 'la première couche ne peut pas être repliée'
+
+    with torch.no_grad():
+        t_pre_std, im_std = timeit(lambda: preprocess_standard(frame, letterbox), args.n)
+        t_pre_fold, im_fold = timeit(lambda: preprocess_folded(frame, letterbox), args.n)
+        t_std, y_std = timeit(lambda: fused(preprocess_standard(frame, letterbox))[0], args.n)
+        t_fold, y_fold = timeit(lambda: folded(preprocess_folded(frame, letterbox))[0], args.n)
+        y_ref = model(im_std)[0]
+
+    err = (y_std - y_fold).abs().max().item()
+    raw = torch.allclose(y_std, y_fold, rtol=1E-3, atol=1E-3) and torch.allclose(y_ref, y_fold, rtol=1E-3, atol=1E-3)
+    p_std = ops.non_max_suppression(y_std, 0.25, 0.7)[0]
+    p_fold = ops.non_max_suppression(y_fold, 0.25, 0.7)[0]
+    nms = p_std.shape == p_fold.shape and torch.allclose(p_std, p_fold, atol=1E-2)
+
+    print(f"entrée {tuple(im_std.shape)}")
+    print(f"prétraitement standard : {t_pre_std:6.2f} ms | fold_input : {t_pre_fold:6.2f} ms")
+    print(f"bout en bout standard  : {t_std:6.2f} ms | fold_input : {t_fold:6.2f} ms")
+    print(f"parité sorties brutes  : {'OK' if raw else 'ÉCHEC'} (écart max {err:.2e})")
+    print(f"parité NMS             : {'OK' if nms else 'ÉCHEC'} ({len(p_std)} / {len(p_fold)} détections)")
+    sys.exit(0 if raw and nms else 1)
+
+
+if __name__ == '__main__':
+    main()
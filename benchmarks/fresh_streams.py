@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : lot des seuls flux ayant une nouvelle image (LoadStreams) et tampons d'entrée du prédicteur.
+
+1. Images obsolètes : des caméras simulées à cadences différentes (--fps) alimentent LoadStreams
+   pendant --seconds. Compare le nombre d'images inférées et le temps d'inférence du lot des seuls
+   flux frais à ceux d'un lot de tous les flux à chaque itération (comportement précédent, qui
+   ré-inférait les images déjà vues). Vérifie qu'aucune image n'est inférée deux fois.
+2. Allocations : alterne frame réduite et lot de tuiles comme FaceTracker, avec un tampon d'entrée
+   partagé (réalloué à chaque changement de forme) ou un tampon par usage (input_tensor(buffer=)).
+
+Usage:
+    python benchmarks/fresh_streams.py --model yolov8n.yaml --fps 30 15 5 --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.yolo.data.dataloaders import stream_loaders  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+
+H, W = 720, 960  # frame Tello
+
+
+class CameraSimulee:
+    """Caméra à cadence fixe (à la place de cv2.VideoCapture) : grab() attend l'image suivante."""
+
+    def __init__(self, fps):
+        self.fps, self.n, self.t0 = fps, 0, time.perf_counter()
+        self.stop = threading.Event()
+
+    def isOpened(self):
+        return not self.stop.is_set()
+
+    def open(self, _):
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: W, cv2.CAP_PROP_FRAME_HEIGHT: H, cv2.CAP_PROP_FPS: self.fps}.get(prop, 0)
+
+    def grab(self):
+        self.n += 1
+        time.sleep(max(self.t0 + self.n / self.fps - time.perf_counter(), 0))
+        return True
+
+    def retrieve(self):
+        im = np.zeros((H, W, 3), dtype=np.uint8)
+        im[0, :4] = np.frombuffer(self.n.to_bytes(12, 'little'), dtype=np.uint8).reshape(4, 3)
+        return True, im
+
+    def read(self):
+        self.grab()
+        return self.retrieve()
+
+
+def frame_id(im):
+    return int.from_bytes(im[0, :4].tobytes(), 'little')
+
+
+def stale_frames(backend, fps, seconds, imgsz):
+    """Images inférées (lot des flux frais, lot de tous les flux), temps d'inférence (s) et doublons."""
+    cameras = {}
+
+    def capture(s):
+        cameras[s] = CameraSimulee(fps[s])
+        return cameras[s]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        f = Path(tmp) / 'cameras.streams'
+        f.write_text('\n'.join(str(i) for i in range(len(fps))))
+        video_capture, cv2.VideoCapture = cv2.VideoCapture, capture  # caméras simulées
+        try:
+            dataset = stream_loaders.LoadStreams(str(f), imgsz=imgsz, auto=False)
+        finally:
+            cv2.VideoCapture = video_capture
+    seen, dupes, n_fresh, n_all, t_fresh, t_all = set(), 0, 0, 0, 0.0, 0.0
+    t_end = time.perf_counter() + seconds
+    with torch.inference_mode():
+        for _, im, im0, _, _ in dataset:
+            for i, x in zip(dataset.indices, im0):
+                dupes += (i, frame_id(x)) in seen
+                seen.add((i, frame_id(x)))
+            t0 = time.perf_counter()
+            backend(torch.from_numpy(im).float() / 255)  # flux frais seulement
+            t_fresh += time.perf_counter() - t0
+            full, _ = dataset.letterbox.batch(dataset.imgs)  # ancien comportement : tous les flux
+            full = np.ascontiguousarray(full[..., ::-1].transpose((0, 3, 1, 2)))
+            t0 = time.perf_counter()
+            backend(torch.from_numpy(full).float() / 255)
+            t_all += time.perf_counter() - t0
+            n_fresh, n_all = n_fresh + len(im0), n_all + len(fps)
+            if time.perf_counter() > t_end:
+                break
+    for cap in cameras.values():
+        cap.stop.set()
+    return n_fresh, n_all, t_fresh, t_all, dupes
+
+
+def buffer_switches(predictor, tile_batch, det, n, shared):
+    """Alterne frame réduite et tuiles : nombre d'allocations du tampon d'entrée et temps (ms) par paire."""
+    frame = np.zeros((1, 3, *det), dtype=np.uint8)
+    tiles = np.zeros((tile_batch, 3, det[1], det[1]), dtype=np.uint8)
+    fmt, dtype = torch.contiguous_format, predictor.model.dtype
+    predictor.input_buffers.clear()
+    allocs, last = 0, {}
+    t0 = time.perf_counter()
+    for _ in range(n):
+        for im, use in ((frame, 'frames'), (tiles, 'tiles')):
+            key = 'shared' if shared else use
+            predictor.input_tensor(im.shape, dtype, fmt, key).copy_(torch.from_numpy(im))
+            allocs += predictor.input_buffers[key] is not last.get(key)  # nouveau tampon
+            last[key] = predictor.input_buffers[key]
+    return allocs, (time.perf_counter() - t0) / n * 1E3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lot des flux frais et tampons d'entrée")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--imgsz', type=int, default=320, help="Taille d'entrée des flux")
+    parser.add_argument('--fps', type=float, nargs='+', default=[30, 15, 5], help="Cadence de chaque caméra simulée")
+    parser.add_argument('--seconds', type=float, default=5, help="Durée de la mesure des images obsolètes")
+    parser.add_argument('--n', type=int, default=200, help="Paires frame/tuiles de la mesure des allocations")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = YOLO(args.model)
+    model.predict(np.zeros((H, W, 3), dtype=np.uint8), imgsz=args.imgsz, verbose=False)  # crée le prédicteur
+    predictor = model.predictor
+
+    n_fresh, n_all, t_fresh, t_all, dupes = stale_frames(predictor.model, args.fps, args.seconds, args.imgsz)
+    fps = ', '.join(f'{x:g}' for x in args.fps)
+    print(f"{len(args.fps)} caméras simulées à {fps} FPS pendant {args.seconds:g} s\n")
+    print(f"{'lot':<16} | {'images':>7} | {'inférence':>9}")
+    print(f"{'tous les flux':<16} | {n_all:7d} | {t_all:7.2f} s")
+    print(f"{'flux frais':<16} | {n_fresh:7d} | {t_fresh:7.2f} s")
+    print(f"images obsolètes évitées : {1 - n_fresh / max(n_all, 1):.0%}, doublons inférés : {dupes}\n")
+
+    tile_batch, det = len(ops.make_tiles((H, W), 480, 0.2)), (args.imgsz * 3 // 4, args.imgsz)
+    print(f"alternance frame {det[0]}x{det[1]} / {tile_batch} tuiles {det[1]}x{det[1]}, {args.n} paires")
+    for name, shared in (('tampon partagé', True), ('tampon par usage', False)):
+        allocs, ms = buffer_switches(predictor, tile_batch, det, args.n, shared)
+        print(f"{name:<16} | {allocs:5d} allocations | {ms:6.3f} ms par paire")
+    sys.exit(0 if dupes == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : extraction des frames difficiles (tello_mining, mode --mine).
+
+Génère des vols synthétiques de longueurs croissantes (fond texturé, visage simulé qui se déplace,
+passages flous, contre-jour et segments statiques répétés), lance l'extraction et mesure le débit
+et le pic d'allocations Python (tracemalloc), qui ne doit pas croître avec la durée du vol.
+Vérifie ensuite le jeu de données exporté :
+    - au plus K frames, aucune paire de doublons (distance dHash <= HASH_DISTANCE)
+    - une ligne de label YOLO valide par pseudo-label, chargement par YOLODataset
+
+Usage:
+    python benchmarks/hard_frames.py --model yolov8n-face.pt --frames 300 3000 --top-k 50
+    python benchmarks/hard_frames.py --model yolov8n.yaml   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tello_mining  # noqa: E402
+from ultralytics.yolo.data.dataset import YOLODataset  # noqa: E402
+
+
+def make_flight(file, frames, h=360, w=480):
+    """Vol synthétique : visage clair en mouvement, flou, contre-jour et segments statiques."""
+    rng = np.random.default_rng(0)
+    bg = cv2.resize(rng.integers(0, 255, (h // 8, w // 8, 3), dtype=np.uint8), (w, h))
+    writer = cv2.VideoWriter(str(file), cv2.VideoWriter_fourcc(*'mp4v'), 30, (w, h))
+    for t in range(frames):
+        k = t if (t // 50) % 3 else t - t % 50  # un segment sur trois est figé
+        im = bg.copy()
+        x = int(w / 2 + w / 3 * np.sin(k / 40))
+        cv2.ellipse(im, (x, h // 2), (40, 55), 0, 0, 360, (150, 170, 210), -1)
+        if (k // 70) % 4 == 1:
+            im = cv2.blur(im, (15, 15))  # flou de bougé
+        elif (k // 70) % 4 == 2:
+            im = cv2.addWeighted(im, 0.3, np.full_like(im, 255), 0.7, 0)  # contre-jour
+        writer.write(im)
+    writer.release()
+
+
+def check_dataset(data, top_k):
+    """Nombre d'images, absence de doublons, labels valides et chargement par YOLODataset."""
+    root = data.parent
+    images = sorted((root / 'images').rglob('*.jpg'))
+    hashes = [tello_mining.dhash(cv2.imread(str(f))) for f in images]
+    duplicates = sum(tello_mining.hamming(a, b) <= tello_mining.HASH_DISTANCE - 2  # marge pour le JPEG
+                     for i, a in enumerate(hashes) for b in hashes[i + 1:])
+    rows = [line.split() for f in (root / 'labels').rglob('*.txt') for line in f.read_text().splitlines()]
+    valid = all(len(r) == 5 and all(0 <= float(v) <= 1 for v in r[1:]) for r in rows)
+    dataset = YOLODataset(str(root / 'images'), imgsz=320, augment=False)
+    loaded = sum(len(lb['cls']) for lb in dataset.labels)
+    return len(images) <= top_k and duplicates == 0 and valid and loaded == len(rows), len(images), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction des frames difficiles")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--frames', type=int, nargs='+', default=[300, 1500], help="Longueurs des vols (frames)")
+    parser.add_argument('--top-k', type=int, default=50, help="Nombre de frames exportées")
+    parser.add_argument('--imgsz', type=int, default=320, help="Taille d'entrée du détecteur")
+    args = parser.parse_args()
+
+    ok, peaks = True, []
+    print(f"{'frames':>7} | {'frames/s':>8} | {'pic python':>10} | {'exportées':>9} | {'labels':>6} | jeu de données")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.frames:
+            video = Path(tmp) / f'vol_{n}.mp4'
+            make_flight(video, n)
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            data = tello_mining.mine_hard_frames(args.model, str(video), str(Path(tmp) / f'out_{n}'),
+                                                 top_k=args.top_k, imgsz=args.imgsz)
+            dt = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] / 1E6
+            tracemalloc.stop()
+            peaks.append(peak)
+            valid, n_images, n_labels = check_dataset(data, args.top_k)
+            ok &= valid
+            print(f"{n:>7} | {n / dt:8.1f} | {peak:7.1f} Mo | {n_images:>9} | {n_labels:>6} | "
+                  f"{'OK' if valid else 'ÉCHEC'}")
+
+    bounded = max(peaks) <= 1.5 * min(peaks) + 5  # Mo : indépendant de la longueur du vol
+    ok &= bounded
+    print(f"\nmémoire bornée : {'OK' if bounded else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
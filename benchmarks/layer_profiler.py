@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : profileur par couche et par étape (ultralytics.yolo.utils.profiler).
+
+Lance N prédictions sur une frame synthétique avec et sans profileur et vérifie :
+    - une entrée par couche du modèle et par étape (loader, preprocess, inference, nms, results)
+    - la somme des temps des couches est comprise dans le temps de l'étape d'inférence
+    - la trace Chrome exportée est un JSON valide avec un événement par appel
+    - le détachement restaure le prédicteur (trace TorchScript figée, pas de hooks restants)
+et mesure le surcoût du profilage par frame.
+
+Usage:
+    python benchmarks/layer_profiler.py --model yolov8n-face.pt --frames 100
+    python benchmarks/layer_profiler.py --model yolov8n.yaml   # poids aléatoires
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.yolo.utils.profiler import Profiler  # noqa: E402
+
+
+def run(model, im, frames, imgsz, profiler=None):
+    """Temps moyen par frame (ms)."""
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        model(im, imgsz=imgsz, verbose=False)
+        if profiler:
+            profiler.step()
+    return (time.perf_counter() - t0) / frames * 1E3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profileur par couche et par étape")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--frames', type=int, default=50, help="Frames mesurées")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = YOLO(args.model)
+    im = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    model(im, imgsz=args.imgsz, verbose=False)  # construit le prédicteur
+    predictor = model.predictor
+    layers = len(predictor.model.model.model)
+    frozen = predictor.model.frozen
+
+    base = run(model, im, args.frames, args.imgsz)
+    profiler = Profiler().attach(predictor)
+    profiled = run(model, im, args.frames, args.imgsz, profiler)
+    profiler.detach()
+    print(profiler.table() + '\n')
+
+    stats = profiler.stats
+    stages = {name for cat, name in stats if cat == 'stage'}
+    layer_time = sum(s[1] for (cat, _), s in stats.items() if cat == 'layer')
+    inference = stats[('stage', 'inference')][1]
+    checks = {
+        'une entrée par couche': sum(cat == 'layer' for cat, _ in stats) == layers,
+        'étapes du pipeline': {'loader', 'preprocess', 'inference', 'nms', 'results'} <= stages,
+        'couches incluses dans l\'inférence': 0.5 * inference <= layer_time <= inference,
+        'prédicteur restauré': predictor.profiler is None and predictor.model.frozen is frozen and not any(
+            m._forward_hooks or m._forward_pre_hooks for m in predictor.model.model.model)}
+    with tempfile.TemporaryDirectory() as tmp:
+        trace, _ = profiler.export(tmp)
+        events = json.loads(trace.read_text())['traceEvents']
+        checks['trace Chrome'] = len(events) == sum(s[0] for s in stats.values())
+
+    for name, ok in checks.items():
+        print(f"{name:<36} : {'OK' if ok else 'ÉCHEC'}")
+    print(f"\nsans profileur {base:.2f} ms/frame, avec {profiled:.2f} ms/frame ({profiled / base - 1:+.1%})")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
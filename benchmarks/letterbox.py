@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification de parité : LetterBox contre LetterBoxCanvas (canevas réutilisé).
+
+Pour chaque taille d'entrée, vérifie que LetterBoxCanvas produit exactement les mêmes pixels que
+LetterBox et que son ratio_pad replace correctement les boîtes avec ops.scale_boxes, puis mesure
+le temps et la mémoire allouée par frame (pic tracemalloc, en nombre de buffers de la taille de
+l'image letterboxée).
+
+Usage:
+    python benchmarks/letterbox.py --imgsz 640 --shapes 720x960 480x640 1080x1920
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.data.augment import LetterBox, LetterBoxCanvas  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+from suite import timeit  # noqa: E402
+
+
+def allocated_per_frame(fn, frame, n):
+    """Pic de mémoire allouée pendant un appel (octets), après préchauffage."""
+    fn(frame)
+    tracemalloc.start()
+    peaks = []
+    for _ in range(n):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        fn(frame)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return int(np.median(peaks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LetterBox contre LetterBoxCanvas")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée du modèle")
+    parser.add_argument('--shapes', type=str, nargs='+', default=['720x960', '480x640', '1080x1920'],
+                        help="Tailles d'images HxW")
+    parser.add_argument('--auto', action='store_true', help="Padding minimal (multiple du stride)")
+    parser.add_argument('--n', type=int, default=200, help="Nombre d'itérations")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    letterbox = LetterBox(args.imgsz, auto=args.auto, stride=32)
+    canvas = LetterBoxCanvas(args.imgsz, auto=args.auto, stride=32)
+    ok = True
+
+    print(f"{'entrée':>10} | {'LetterBox':>20} | {'LetterBoxCanvas':>20} | parité")
+    for s in args.shapes:
+        h, w = (int(x) for x in s.split('x'))
+        frame = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+        ref = letterbox(image=frame)
+        out, ratio_pad = canvas(frame)
+        parity = ref.shape == out.shape and np.array_equal(ref, out)
+
+        # Une boîte couvrant toute l'image doit revenir sur toute l'image (à 1 px près)
+        top, left = canvas.geometry(frame.shape)[1:3]
+        new_unpad = canvas.geometry(frame.shape)[0]
+        box = torch.tensor([[left, top, left + new_unpad[0], top + new_unpad[1]]], dtype=torch.float32)
+        box = ops.scale_boxes(out.shape[:2], box, frame.shape[:2], ratio_pad)
+        parity &= bool((box - torch.tensor([[0, 0, w, h]])).abs().max() <= 1)
+        ok &= parity
+
+        size = out.nbytes
+        t_ref, t_new = timeit(lambda: letterbox(image=frame), args.n, 1)[0], timeit(lambda: canvas(frame), args.n, 1)[0]
+        m_ref = allocated_per_frame(lambda x: letterbox(image=x), frame, 20)
+        m_new = allocated_per_frame(canvas, frame, 20)
+        print(f"{s:>10} | {t_ref:5.2f} ms {m_ref / size:4.1f} buf | {t_new:5.2f} ms {m_new / size:4.1f} buf | "
+              f"{'OK' if parity else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
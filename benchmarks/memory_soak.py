@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test d'endurance mémoire : boucle de tracking sur une source rejouée (tello_memory.MemoryProbe).
+
+Rejoue en boucle des frames enregistrées (vidéo, dossier d'images ou motif glob), ou des frames
+synthétiques, à travers get_frame, detect_face, calculate_control et draw_overlay d'un FaceTracker
+sans drone, comme TrackingThread. La sonde mémoire rend compte toutes les --interval frames ; le
+test échoue si, après la première fenêtre (préchauffage), le RSS ou la mémoire suivie croissent de
+plus de --max-growth Ko par frame, ou si le p99 de l'allocation par frame dépasse --budget Ko.
+
+Usage:
+    python benchmarks/memory_soak.py --model yolov8n-face.pt --source vol.mp4 --frames 100000
+    python benchmarks/memory_soak.py --model ultralytics/models/v8/yolov8n.yaml --frames 5000 --interval 500
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tello_mining  # noqa: E402
+from suite import make_frames, make_tracker  # noqa: E402
+from tello_memory import MemoryProbe  # noqa: E402
+
+
+class ReplayFrameRead:
+    """Remplace le flux vidéo du drone : frames rejouées en boucle, une nouvelle copie par lecture."""
+
+    def __init__(self, frames):
+        self.frames = itertools.cycle(frames)
+
+    @property
+    def frame(self):
+        return next(self.frames).copy()  # Comme WindowsFrameRead : une copie par lecture
+
+
+def load_frames(source, n, w=960, h=720):
+    """Jusqu'à n frames de la source, à la taille des frames du Tello."""
+    return [cv2.resize(im, (w, h)) for _, _, im, _ in itertools.islice(tello_mining.iter_frames(source, 1), n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test d'endurance mémoire de la boucle de tracking")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Poids (.pt, .slim) ou configuration")
+    parser.add_argument('--source', type=str, default=None, help="Vol enregistré rejoué (défaut : synthétique)")
+    parser.add_argument('--cache', type=int, default=300, help="Frames de la source gardées en mémoire et rejouées")
+    parser.add_argument('--frames', type=int, default=100000, help="Nombre de frames traitées")
+    parser.add_argument('--interval', type=int, default=2000, help="Frames par fenêtre de mesure")
+    parser.add_argument('--max-growth', type=float, default=0.05, help="Croissance tolérée (Ko par frame)")
+    parser.add_argument('--budget', type=float, default=8192, help="Allocation tolérée par frame, p99 (Ko)")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.cache) if args.source else make_frames(args.cache)
+    tracker = make_tracker(args.model, (640, 480))
+    tracker.frame_read = ReplayFrameRead(frames)
+    probe = tracker.enable_memory_probe(args.interval)
+
+    print(f"{len(frames)} frames rejouées, {args.frames} frames traitées\n")
+    t0 = time.perf_counter()
+    while probe.frames < args.frames:
+        frame = tracker.get_frame()
+        if frame is None:
+            continue
+        face_info = tracker.detect_face(frame)
+        velocity = tracker.calculate_control(face_info[:4]) if face_info is not None else (0, 0, 0, 0)
+        tracker.draw_overlay(frame, face_info, velocity)
+        report = probe.step()
+        if report:
+            print(probe.format(report))
+            print(f"  {probe.frames / (time.perf_counter() - t0):.1f} frames/s")
+
+    print(f"\n{probe.summary()}")
+    errors = probe.check(args.max_growth, args.budget)
+    probe.stop()
+    for e in errors:
+        print(f"ÉCHEC : {e}")
+    print(f"\nmémoire bornée et budget par frame : {'ÉCHEC' if errors else 'OK'}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : détection déclenchée par le mouvement (tello_motion.MotionGate).
+
+Rejoue un vol à travers FaceTracker.detect_face avec et sans porte de mouvement. Le vol
+synthétique alterne des phases de vol stationnaire (scène immobile, bruit du capteur et
+micro-tremblement de ±1 px) et des phases de mouvement (visage et fond qui se déplacent).
+Mesures :
+    - temps CPU de detect_face par frame, en stationnaire et en mouvement, avec et sans porte
+    - part des détections sautées par phase
+    - réactivité : frames entre le début de chaque mouvement et la première détection (doit être 0)
+    - écart du centre du visage par rapport à la détection à chaque frame
+
+Usage:
+    python benchmarks/motion_gate.py --model yolov8n-face.pt --segments 6 --length 60
+    python benchmarks/motion_gate.py --model yolov8n-face.pt --source vol.mp4   # vol enregistré
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tello_mining  # noqa: E402
+from suite import make_tracker  # noqa: E402
+from tello_motion import MotionGate  # noqa: E402
+
+
+def make_flight(segments, length, h=720, w=960):
+    """Frames et phases (True = mouvement) : stationnaire et mouvement en alternance."""
+    rng = np.random.default_rng(0)
+    bg = cv2.resize(rng.integers(0, 255, (h // 8, w // 8, 3), dtype=np.uint8), (w + 200, h))
+    frames, moving, x, shift = [], [], w // 2, 0
+    for seg in range(segments):
+        motion = seg % 2 == 1
+        for _ in range(length):
+            if motion:
+                x, shift = (x + 12) % (w - 200) + 100, (shift + 4) % 200  # visage et drone qui tournent
+            jitter = 0 if motion else int(rng.integers(-1, 2))
+            im = np.ascontiguousarray(bg[:, shift + jitter + 1:shift + jitter + 1 + w])
+            cv2.ellipse(im, (x, h // 2), (60, 80), 0, 0, 360, (150, 170, 210), -1)
+            noise = rng.normal(0, 2, im.shape)  # bruit du capteur
+            frames.append(np.clip(im + noise, 0, 255).astype(np.uint8))
+            moving.append(motion)
+    return frames, moving
+
+
+def replay(tracker, frames, gate):
+    """Temps CPU (ms) par frame, résultat et détection effective (True) de chaque frame."""
+    tracker.motion_gate = gate
+    tracker._frames_without_face = 0
+    times, faces, detected = [], [], []
+    for frame in frames:
+        skipped = gate.total_skipped if gate else 0
+        t0 = time.process_time()
+        faces.append(tracker.detect_face(frame))
+        times.append((time.process_time() - t0) * 1E3)
+        detected.append(not gate or gate.total_skipped == skipped)
+    return np.array(times), faces, np.array(detected)
+
+
+def center_error(a, b):
+    """Écart des centres (px), inf si un seul des deux résultats a un visage."""
+    if a is None or b is None:
+        return 0.0 if a is None and b is None else float('inf')
+    return float(np.hypot(a[0] - b[0], a[1] - b[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Détection déclenchée par le mouvement")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Poids (.pt, .slim) ou configuration")
+    parser.add_argument('--source', type=str, default=None, help="Vol enregistré (défaut : vol synthétique)")
+    parser.add_argument('--frames', type=int, default=600, help="Frames rejouées de la source")
+    parser.add_argument('--segments', type=int, default=6, help="Phases du vol synthétique")
+    parser.add_argument('--length', type=int, default=60, help="Frames par phase")
+    args = parser.parse_args()
+
+    if args.source:
+        frames = [im for _, _, im, _ in itertools.islice(tello_mining.iter_frames(args.source), args.frames)]
+        moving = None
+    else:
+        frames, moving = make_flight(args.segments, args.length)
+    tracker = make_tracker(args.model, (640, 480))
+    replay(tracker, frames[:5], None)  # préchauffage
+    t_ref, ref, _ = replay(tracker, frames, None)
+    t_gate, gated, detected = replay(tracker, frames, MotionGate())
+    errors = np.array([center_error(a, b) for a, b in zip(gated, ref)])
+
+    ok = True
+    print(f"{len(frames)} frames\n")
+    print(f"{'phase':<14} | {'sans porte':>10} | {'avec porte':>10} | {'CPU':>7} | {'sautées':>7} | écart centre")
+    phases = {'tout': np.ones(len(frames), bool)}
+    if moving is not None:
+        moving = np.array(moving)
+        phases.update({'stationnaire': ~moving, 'mouvement': moving})
+    for name, m in phases.items():
+        finite = errors[m][np.isfinite(errors[m])]
+        err = f"{finite.mean():.1f} px (max {finite.max():.1f})" if len(finite) else '-'
+        err += f", {np.count_nonzero(~np.isfinite(errors[m]))} désaccords" if not np.isfinite(errors[m]).all() else ''
+        print(f"{name:<14} | {t_ref[m].mean():7.2f} ms | {t_gate[m].mean():7.2f} ms | "
+              f"{t_gate[m].sum() / t_ref[m].sum() - 1:+6.0%} | {1 - detected[m].mean():6.0%} | {err}")
+
+    if moving is not None:
+        # Réactivité : la première frame de chaque mouvement doit être détectée
+        onsets = [i for i in range(1, len(moving)) if moving[i] and not moving[i - 1]]
+        delays = [next((j - i for j in range(i, len(moving)) if detected[j]), len(moving)) for i in onsets]
+        hover_saving = 1 - t_gate[~moving].sum() / t_ref[~moving].sum()
+        reactive = max(delays) == 0
+        ok &= reactive and hover_saving >= 0.5
+        print(f"\nréaction au mouvement : {delays} frames : {'OK' if reactive else 'ÉCHEC'}")
+        print(f"gain CPU en stationnaire : {hover_saving:.0%} : {'OK' if hover_saving >= 0.5 else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification de parité : NMS mono-classe.
+
+Compare, sur des prédictions synthétiques de la forme (batch, 5, ancres) produites par un
+modèle visage, le chemin général de non_max_suppression (forcé en ajoutant une classe vide),
+le chemin rapide mono-classe et le repli numpy sans torchvision. Les sorties doivent être
+identiques.
+
+Usage:
+    python benchmarks/nms.py --anchors 8400 --candidates 50 500 5000
+"""
+
+import argparse
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.utils import ops  # noqa: E402
+from suite import timeit  # noqa: E402
+
+
+def make_prediction(batch, anchors, candidates, imgsz=640):
+    """Prédictions xywh + score avec `candidates` ancres au-dessus du seuil, groupées autour de quelques visages."""
+    xy = torch.rand(batch, 2, anchors) * imgsz
+    wh = torch.rand(batch, 2, anchors) * 40 + 10
+    scores = torch.rand(batch, 1, anchors) * 0.2  # sous le seuil
+    for b in range(batch):
+        i = torch.randperm(anchors)[:candidates]
+        centers = torch.rand(8, 2) * imgsz
+        xy[b, :, i] = (centers[torch.randint(0, 8, (candidates,))] + torch.randn(candidates, 2) * 4).T
+        scores[b, 0, i] = torch.rand(candidates) * 0.7 + 0.3
+    return torch.cat((xy, wh, scores), 1)
+
+
+def general_path(pred, conf, iou):
+    """Chemin général : une classe vide (scores nuls) donne nc == 2 sans changer les détections."""
+    return ops.non_max_suppression(torch.cat((pred, torch.zeros_like(pred[:, :1])), 1), conf, iou)
+
+
+def same(a, b):
+    return all(x.shape == y.shape and torch.allclose(x, y, atol=1E-4) for x, y in zip(a, b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NMS : chemin général contre chemin rapide mono-classe")
+    parser.add_argument('--batch', type=int, default=1, help="Taille du batch")
+    parser.add_argument('--anchors', type=int, default=8400, help="Nombre d'ancres (8400 pour 640x640)")
+    parser.add_argument('--candidates', type=int, nargs='+', default=[50, 500, 5000], help="Ancres au-dessus du seuil")
+    parser.add_argument('--conf', type=float, default=0.25, help="Seuil de confiance")
+    parser.add_argument('--iou', type=float, default=0.7, help="Seuil IoU")
+    parser.add_argument('--n', type=int, default=200, help="Nombre d'itérations")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    ok = True
+    print(f"torchvision : {'oui' if ops.torchvision is not None else 'non (repli numpy)'}\n")
+    print(f"{'candidats':>9} | {'général':>9} | {'rapide':>9} | {'numpy':>9} | parité")
+    for candidates in args.candidates:
+        pred = make_prediction(args.batch, args.anchors, candidates)
+        t_gen, y_gen = timeit(lambda: general_path(pred, args.conf, args.iou), args.n)
+        t_fast, y_fast = timeit(lambda: ops.non_max_suppression(pred, args.conf, args.iou), args.n)
+
+        torchvision, ops.torchvision = ops.torchvision, None  # force le repli numpy
+        try:
+            t_np, y_np = timeit(lambda: ops.non_max_suppression(pred, args.conf, args.iou), args.n)
+        finally:
+            ops.torchvision = torchvision
+
+        parity = same(y_gen, y_fast) and same(y_gen, y_np)
+        ok &= parity
+        print(f"{candidates:>9} | {t_gen:>6.2f} ms | {t_fast:>6.2f} ms | {t_np:>6.2f} ms | "
+              f"{'OK' if parity else 'ÉCHEC'} ({sum(len(y) for y in y_gen)} détections)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
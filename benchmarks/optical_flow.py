@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : propagation de la boîte par flux optique (tello_flow.BoxPropagator).
+
+Rejoue des frames à travers FaceTracker.track_face dans trois modes :
+    - détection : détection YOLO à chaque frame (référence)
+    - flux optique : détection toutes les --interval frames, boîte propagée entre les deux
+    - réutilisation : détection toutes les --interval frames, dernière détection réutilisée
+Mesures : latence par frame (ms), nombre de détections, et précision par rapport à la référence
+(IoU moyen, part des frames à IoU >= 0.5, écart des centres, visages perdus).
+
+Le vol synthétique par défaut est un déplacement de caméra (panoramique et zoom) au-dessus de
+ultralytics/assets/zidane.jpg ; --source rejoue un vol enregistré.
+
+Usage:
+    python benchmarks/optical_flow.py --model yolov8n-face.pt --frames 300 --interval 2
+    python benchmarks/optical_flow.py --model yolov8n-face.pt --source vol.mp4 --interval 3
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tello_mining  # noqa: E402
+from suite import make_tracker  # noqa: E402
+from tello_flow import BoxPropagator  # noqa: E402
+from ultralytics.yolo.utils import ROOT as ULTRALYTICS_ROOT  # noqa: E402
+
+
+def make_flight(n, h=720, w=960):
+    """n frames : panoramique et zoom lents de la caméra au-dessus d'une image avec des visages."""
+    im = cv2.imread(str(ULTRALYTICS_ROOT / 'assets' / 'zidane.jpg'))
+    im = cv2.resize(im, None, fx=1.6, fy=1.6)
+    ih, iw = im.shape[:2]
+    frames = []
+    for i in range(n):
+        t = 2 * np.pi * i / n
+        zoom = 1.0 + 0.15 * np.sin(2 * t)  # Approche et recul
+        cw, ch = int(w / zoom), int(h / zoom)
+        x = int((iw - cw) / 2 * (1 + 0.8 * np.sin(t)))
+        y = int((ih - ch) / 2 * (1 + 0.5 * np.sin(3 * t)))
+        frames.append(cv2.resize(im[y:y + ch, x:x + cw], (w, h)))
+    return frames
+
+
+def replay(tracker, frames, interval, propagator):
+    """Latence (ms) et résultat de chaque frame, et nombre de détections."""
+    tracker.frame_skip_interval = interval
+    tracker.box_propagator = propagator
+    tracker._track_counter, tracker._last_face_info, tracker._frames_without_face = 0, None, 0
+    detect, calls = tracker.detect_face, [0]
+
+    def counted(frame):
+        calls[0] += 1
+        return detect(frame)
+
+    tracker.detect_face = counted
+    times, faces = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        faces.append(tracker.track_face(frame))
+        times.append((time.perf_counter() - t0) * 1E3)
+    del tracker.detect_face
+    return np.array(times), faces, calls[0]
+
+
+def iou(a, b):
+    """IoU de deux boîtes (x_center, y_center, width, height, ...)."""
+    ax1, ay1, ax2, ay2 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx1, by1, bx2, by2 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    inter = max(0, min(ax2, bx2) - max(ax1, bx1)) * max(0, min(ay2, by2) - max(ay1, by1))
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def accuracy(faces, ref):
+    """IoU moyen, part à IoU >= 0.5, écart moyen des centres (px) et visages perdus, sur les frames de référence."""
+    pairs = [(a, b) for a, b in zip(faces, ref) if b is not None]
+    if not pairs:
+        return float('nan'), float('nan'), float('nan'), 0
+    ious = np.array([iou(a, b) if a is not None else 0.0 for a, b in pairs])
+    centers = [np.hypot(a[0] - b[0], a[1] - b[1]) for a, b in pairs if a is not None]
+    lost = sum(a is None for a, _ in pairs)
+    return ious.mean(), (ious >= 0.5).mean(), float(np.mean(centers)) if centers else float('nan'), lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propagation de la boîte par flux optique")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Poids (.pt, .slim) ou configuration")
+    parser.add_argument('--source', type=str, default=None, help="Vol enregistré (défaut : vol synthétique)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames rejouées")
+    parser.add_argument('--interval', type=int, default=2, help="Une détection toutes les N frames")
+    args = parser.parse_args()
+
+    if args.source:
+        frames = [cv2.resize(im, (960, 720)) for _, _, im, _ in
+                  itertools.islice(tello_mining.iter_frames(args.source), args.frames)]
+    else:
+        frames = make_flight(args.frames)
+    tracker = make_tracker(args.model, (640, 480))
+    tracker.motion_gate = None  # Chaque détection passe par YOLO : comparaison à la seule propagation
+    replay(tracker, frames[:5], 1, None)  # préchauffage
+
+    t_ref, ref, n_ref = replay(tracker, frames, 1, None)
+    if not any(f is not None for f in ref):
+        print("ÉCHEC : aucun visage détecté dans les frames de référence")
+        sys.exit(1)
+    modes = {'détection': (t_ref, ref, n_ref),
+             'flux optique': replay(tracker, frames, args.interval, BoxPropagator()),
+             'réutilisation': replay(tracker, frames, args.interval, None)}
+
+    n_faces = sum(f is not None for f in ref)
+    print(f"{len(frames)} frames, {n_faces} avec visage, détection 1 frame sur {args.interval}\n")
+    print(f"{'mode':<14} | {'latence':>9} | {'p90':>9} | {'détections':>10} | {'IoU':>5} | {'IoU>=0.5':>8} | "
+          f"{'centre':>8} | perdus")
+    results = {}
+    for name, (times, faces, calls) in modes.items():
+        results[name] = accuracy(faces, ref)
+        m_iou, hit, center, lost = results[name]
+        print(f"{name:<14} | {times.mean():6.2f} ms | {np.percentile(times, 90):6.2f} ms | {calls:>10} | "
+              f"{m_iou:5.3f} | {hit:8.0%} | {center:5.1f} px | {lost}")
+
+    t_flow = modes['flux optique'][0]
+    faster = t_flow.mean() < t_ref.mean()
+    closer = results['flux optique'][0] >= results['réutilisation'][0]
+    print(f"\nlatence par rapport à la détection à chaque frame : {t_flow.mean() / t_ref.mean() - 1:+.0%} : "
+          f"{'OK' if faster else 'ÉCHEC'}")
+    print(f"IoU par rapport à la réutilisation de la dernière détection : "
+          f"{results['flux optique'][0] - results['réutilisation'][0]:+.3f} : {'OK' if closer else 'ÉCHEC'}")
+    sys.exit(0 if faster and closer else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : décodage préchargé de LoadImages (prefetch, reduce_decode).
+
+Génère un dossier de JPEG haute résolution et une vidéo synthétiques, puis lance la prédiction
+sur le dossier sans préchargement, avec préchargement (prefetch=N, décodage et letterbox sur
+`workers` threads) et avec préchargement + décodage JPEG réduit (IMREAD_REDUCED_*). Pour chaque
+mode, compare le temps total au temps cumulé prétraitement + inférence + post-traitement mesuré
+par le prédicteur : avec préchargement, le débit doit approcher celui de l'inférence seule.
+
+Vérifie que le préchargement donne les mêmes détections que le mode synchrone et que les frames
+vidéo arrivent dans le même ordre, avec le même vid_stride.
+
+Usage:
+    python benchmarks/prefetch.py --model yolov8n-face.pt --n 64 --size 3000x4000
+    python benchmarks/prefetch.py --model yolov8n.yaml   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages  # noqa: E402
+
+
+def make_images(folder, n, h, w):
+    """n JPEG lisses (dégradés flous) de taille h x w."""
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        im = cv2.resize(rng.integers(0, 255, (h // 64, w // 64, 3), dtype=np.uint8), (w, h))
+        cv2.imwrite(str(folder / f'{i:05d}.jpg'), im, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def make_video(file, n, h=720, w=1280):
+    """Vidéo de n frames dont l'intensité encode le numéro de frame."""
+    writer = cv2.VideoWriter(str(file), cv2.VideoWriter_fourcc(*'mp4v'), 30, (w, h))
+    for i in range(n):
+        writer.write(np.full((h, w, 3), i * 4 % 256, dtype=np.uint8))
+    writer.release()
+
+
+def run(model, source, imgsz, **kwargs):
+    """Prédiction complète : temps total, temps cumulé du prédicteur (s) et boîtes par image."""
+    t0 = time.perf_counter()
+    boxes = [r.boxes.data.cpu() for r in model.predict(source, imgsz=imgsz, stream=True, **kwargs)]
+    wall = time.perf_counter() - t0
+    return wall, sum(dt.t for dt in model.predictor.dt), boxes
+
+
+def frame_order(video, vid_stride, prefetch):
+    """Intensités moyennes des frames lues par LoadImages (identifie chaque frame)."""
+    dataset = LoadImages(str(video), imgsz=320, vid_stride=vid_stride, prefetch=prefetch, workers=4)
+    return [(s.split(')')[0], round(float(im0.mean()))) for _, _, im0, _, s in dataset]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Décodage préchargé de LoadImages")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée")
+    parser.add_argument('--n', type=int, default=64, help="Nombre d'images du dossier")
+    parser.add_argument('--size', type=str, default='3000x4000', help="Taille des images HxW")
+    parser.add_argument('--prefetch', type=int, default=8, help="Frames décodées à l'avance")
+    parser.add_argument('--workers', type=int, default=4, help="Threads de décodage")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = YOLO(args.model)
+    h, w = (int(x) for x in args.size.split('x'))
+    modes = {'synchrone': {'prefetch': 0},
+             f'prefetch={args.prefetch}': {'prefetch': args.prefetch, 'workers': args.workers},
+             f'prefetch={args.prefetch} + réduit': {'prefetch': args.prefetch, 'workers': args.workers,
+                                                    'reduce_decode': True}}
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / 'images'
+        folder.mkdir()
+        make_images(folder, args.n, h, w)
+        model.predict(str(folder / '00000.jpg'), imgsz=args.imgsz)  # préchauffage
+
+        print(f"{args.n} JPEG {w}x{h}, imgsz {args.imgsz}, torch {torch.__version__}, "
+              f"{torch.get_num_threads()} threads\n")
+        print(f"{'mode':<24} | {'total':>9} | {'prédicteur':>10} | {'images/s':>8} | parité")
+        ref = None
+        for name, kwargs in modes.items():
+            wall, busy, boxes = run(model, str(folder), args.imgsz, **kwargs)
+            ref = boxes if ref is None else ref
+            if kwargs.get('reduce_decode'):
+                parity = '-'  # autre résolution d'entrée, détections proches mais pas identiques
+            else:
+                same = len(boxes) == len(ref) and all(torch.equal(a, b) for a, b in zip(boxes, ref))
+                ok &= same
+                parity = 'OK' if same else 'ÉCHEC'
+            print(f"{name:<24} | {wall:7.2f} s | {busy:8.2f} s | {args.n / wall:8.1f} | {parity}")
+
+        video = Path(tmp) / 'video.mp4'
+        make_video(video, 60)
+        for vid_stride in (1, 2, 3):
+            same = frame_order(video, vid_stride, 0) == frame_order(video, vid_stride, args.prefetch)
+            ok &= same
+            print(f"ordre des frames vidéo, vid_stride={vid_stride} : {'OK' if same else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
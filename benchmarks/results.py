@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark et vérification : Results/Boxes à conversions paresseuses mises en cache.
+
+Pour plusieurs nombres de boîtes, mesure le temps et les allocations Python (tracemalloc) des
+accès typiques des consommateurs : plus grand visage (FaceDetector._largest_face), parcours boîte
+par boîte avec xywhn comme pour l'écriture des labels, et accès répétés aux conversions. Vérifie
+que les conversions (y compris depuis une boîte indexée) sont identiques aux fonctions de ops.
+
+Usage:
+    python benchmarks/results.py --boxes 1 10 100
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tello_face_tracking import FaceDetector  # noqa: E402
+from ultralytics.yolo.engine.results import Results  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+
+ORIG_SHAPE = (720, 960)
+
+
+def make_results(n):
+    """Résultat d'une image avec n boîtes xyxy, conf, cls."""
+    xy = torch.rand(n, 2) * 600
+    wh = torch.rand(n, 2) * 100 + 10
+    return Results(boxes=torch.cat((xy, xy + wh, torch.rand(n, 1), torch.zeros(n, 1)), 1), orig_shape=ORIG_SHAPE)
+
+
+def per_box(r):
+    """Parcours boîte par boîte, comme write_results() avec save_txt."""
+    return [(float(d.cls), *d.xywhn.view(-1).tolist(), float(d.conf)) for d in reversed(r.boxes)]
+
+
+def repeated(r):
+    """Accès répétés aux conversions d'un même résultat."""
+    for _ in range(10):
+        r.boxes.xywh, r.boxes.xyxyn, r.boxes.xywhn
+
+
+def measure(fn, n):
+    """Temps moyen en µs et pic d'allocations Python en Ko, sur un nouveau résultat à chaque appel."""
+    results = [make_results(n) for _ in range(100)]
+    t0 = time.perf_counter()
+    for r in results:
+        fn(r)
+    t = (time.perf_counter() - t0) / len(results) * 1E6
+    r = make_results(n)
+    tracemalloc.start()
+    fn(r)
+    peak = tracemalloc.get_traced_memory()[1] / 1E3
+    tracemalloc.stop()
+    return t, peak
+
+
+def check(n):
+    """Conversions identiques à ops, pour le bloc entier et pour une boîte indexée."""
+    r = make_results(n)
+    xyxy, gain = r.boxes.data[:, :4], torch.tensor(ORIG_SHAPE)[[1, 0, 1, 0]]
+    ok = torch.allclose(r.boxes.xywh, ops.xyxy2xywh(xyxy)) and torch.allclose(r.boxes.xywhn, ops.xyxy2xywh(xyxy) / gain)
+    i = n // 2
+    ok &= torch.allclose(r.boxes[i].xywhn, (ops.xyxy2xywh(xyxy) / gain)[i:i + 1])
+    ok &= np.allclose(r.boxes.numpy().xyxyn, (xyxy / gain).numpy())
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Results/Boxes : conversions paresseuses en cache")
+    parser.add_argument('--boxes', type=int, nargs='+', default=[1, 10, 100], help="Nombres de boîtes par image")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    ok = True
+    print(f"{'boîtes':>6} | {'plus grand visage':>20} | {'boîte par boîte':>20} | {'accès répétés':>20} | "
+          f"parité")
+    for n in args.boxes:
+        row = [measure(fn, n) for fn in (lambda r: FaceDetector._largest_face(r, 1.0, 1.0), per_box, repeated)]
+        parity = check(n)
+        ok &= parity
+        cells = ' | '.join(f"{t:7.1f} µs {m:6.1f} Ko" for t, m in row)
+        print(f"{n:>6} | {cells} | {'OK' if parity else 'ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : chargement du checkpoint .pt contre l'export slim (poids fusionnés en mémoire mappée).
+
+Exporte le modèle au format slim (yolo export format=slim), puis mesure dans un processus neuf
+pour chaque format le temps de chargement jusqu'au modèle fusionné prêt pour l'inférence et le
+pic de mémoire résidente (RSS) ajouté par le chargement. Les sorties des deux modèles doivent
+être identiques. Linux et macOS (module resource).
+
+Usage:
+    python benchmarks/slim_load.py --model yolov8n-face.pt
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.nn.tasks import attempt_load_one_weight  # noqa: E402
+
+
+def peak_rss_mb():
+    """Pic de RSS du processus en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / (1 << 10)
+
+
+def child(weights, imgsz):
+    """Processus de mesure : chargement du modèle fusionné puis une inférence, résultats en JSON."""
+    rss0 = peak_rss_mb()
+    t0 = time.perf_counter()
+    model = attempt_load_one_weight(weights, fuse=True)[0]
+    t = time.perf_counter() - t0
+    rss = peak_rss_mb() - rss0
+    with torch.inference_mode():
+        y = model(torch.ones(1, 3, imgsz, imgsz))[0]
+    print(json.dumps({'s': t, 'rss': rss, 'sum': y.double().sum().item(), 'max': y.abs().max().item()}))
+
+
+def measure(weights, imgsz):
+    out = subprocess.run([sys.executable, __file__, '--child', str(weights), '--imgsz', str(imgsz)],
+                         check=True, capture_output=True, text=True, cwd=ROOT).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement .pt contre slim")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Poids (.pt)")
+    parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée de la vérification de parité")
+    parser.add_argument('--child', type=str, default='', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.imgsz)
+
+    YOLO(args.model).export(format='slim', imgsz=args.imgsz)
+    slim = Path(args.model).with_suffix('.slim')
+    results = {'.pt': measure(args.model, args.imgsz), '.slim': measure(slim, args.imgsz)}
+
+    print(f"taille : .pt {os.path.getsize(args.model) / 1E6:.1f} Mo | .slim {os.path.getsize(slim) / 1E6:.1f} Mo\n")
+    for name, r in results.items():
+        print(f"{name:<6} chargement {r['s'] * 1E3:7.1f} ms | pic RSS +{r['rss']:6.1f} Mo")
+    a, b = results.values()
+    parity = abs(a['sum'] - b['sum']) <= 1E-3 * max(abs(a['sum']), 1) and abs(a['max'] - b['max']) <= 1E-3
+    print(f"\nparité des sorties : {'OK' if parity else 'ÉCHEC'}")
+    sys.exit(0 if parity else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks du chemin critique : tracking (FaceTracker) et inférence ultralytics, sur CPU.
+
+Les mesures sont des tests pytest-benchmark (tests/test_benchmarks.py, fixtures dans tests/conftest.py),
+sur des frames synthétiques 960x720 (visage simulé sur fond texturé) et les images de ultralytics/assets
+ramenées à la taille des frames du Tello :
+    - detect_face, calculate_control, draw_overlay (FaceTracker, sans drone ni réseau)
+    - letterbox, autobackend_forward, non_max_suppression, scale_boxes (prédicteur du détecteur)
+
+`run` lance ces tests et enregistre le JSON de pytest-benchmark, avec les métadonnées de la machine
+(CPU, versions, threads, commit, modèle). `compare` lit deux de ces JSON et échoue (code 1) si la
+médiane d'une étape régresse au-delà du seuil. Ce module fournit aussi les frames, le tracker sans
+drone, le chargement du modèle et les mesures de temps utilisés par les tests et les autres benchmarks.
+
+Usage (pytest et pytest-benchmark : pip install -r requirements-dev.txt):
+    python benchmarks/suite.py run --model yolov8n-face.pt --output baseline.json
+    python benchmarks/suite.py run --model yolov8n-face.pt --output current.json
+    python benchmarks/suite.py run --model ultralytics/models/v8/yolov8n.yaml   # poids aléatoires
+    python benchmarks/suite.py compare baseline.json current.json --threshold 0.10
+    python -m pytest tests/test_benchmarks.py --bench-model yolov8n-face.pt   # directement
+
+Comparer des résultats obtenus sur la même machine, avec le même modèle et les mêmes threads.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ultralytics.nn.tasks import DetectionModel, attempt_load_one_weight  # noqa: E402
+from ultralytics.yolo.utils import ROOT as ULTRALYTICS_ROOT  # noqa: E402
+
+
+class SimulatedTello:
+    """Remplace le drone pour les lectures de télémétrie de calculate_control et draw_overlay."""
+
+    def __init__(self):
+        self.commands = []  # Commandes rc reçues
+
+    def send_rc_control(self, left_right_velocity, forward_backward_velocity, up_down_velocity, yaw_velocity):
+        self.commands.append((left_right_velocity, forward_backward_velocity, up_down_velocity, yaw_velocity))
+
+    def get_height(self):
+        return 120
+
+    def get_battery(self):
+        return 80
+
+
+def make_frames(n, h=720, w=960):
+    """n frames synthétiques (visage simulé en mouvement) suivies des images de ultralytics/assets."""
+    rng = np.random.default_rng(0)
+    bg = cv2.resize(rng.integers(0, 255, (h // 8, w // 8, 3), dtype=np.uint8), (w, h))
+    frames = []
+    for t in range(n):
+        im = bg.copy()
+        x, y = int(w / 2 + w / 3 * np.sin(t / 10)), int(h / 2 + h / 6 * np.cos(t / 15))
+        cv2.ellipse(im, (x, y), (60, 80), 0, 0, 360, (150, 170, 210), -1)
+        frames.append(im)
+    frames += [cv2.resize(cv2.imread(str(f)), (w, h)) for f in sorted((ULTRALYTICS_ROOT / 'assets').glob('*.jpg'))]
+    return frames
+
+
+def load_model(weights, nc=1, fuse=True):
+    """Modèle en mode évaluation (.pt) ou poids aléatoires (.yaml), fusionné (Conv + BN) si fuse."""
+    if weights.endswith('.pt'):
+        model = attempt_load_one_weight(weights)[0]
+    else:
+        model = DetectionModel(weights, nc=nc, verbose=False)
+    return (model.fuse() if fuse else model).float().eval()
+
+
+def timeit(fn, n, warmup=3):
+    """Temps moyen en ms après préchauffage, et le dernier résultat."""
+    for _ in range(warmup):
+        fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        y = fn()
+    return (time.perf_counter() - t0) / n * 1E3, y
+
+
+def latency(fn, n, warmup=3):
+    """Latences en ms (p50, p99) après préchauffage, et le dernier résultat."""
+    for _ in range(warmup):
+        fn()
+    t = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        y = fn()
+        t.append((time.perf_counter() - t0) * 1E3)
+    return np.percentile(t, 50), np.percentile(t, 99), y
+
+
+def make_detector(model, imgsz):
+    """Détecteur chargé et préchauffé, sans profil de calibration."""
+    from tello_face_tracking import FaceDetector  # djitellopy : seulement pour le tracking
+    detector = FaceDetector(detection_resolution=imgsz, use_calibration=False)
+    detector.load(model)
+    return detector
+
+
+def make_tracker(model, imgsz, detector=None):
+    """FaceTracker sans connexion : détecteur chargé et préchauffé (ou partagé), télémétrie simulée."""
+    from tello_face_tracking import FaceTracker
+    detector = detector or make_detector(model, imgsz)
+    tracker = FaceTracker.__new__(FaceTracker)
+    tracker.detector, tracker.conf_threshold, tracker.tello = detector, detector.conf_threshold, SimulatedTello()
+    tracker._init_control()
+    return tracker
+
+
+def run(args):
+    """Lance tests/test_benchmarks.py avec pytest-benchmark, résultats JSON dans args.output."""
+    if importlib.util.find_spec('pytest_benchmark') is None:
+        print("Erreur: pytest-benchmark n'est pas installé (pip install -r requirements-dev.txt)")
+        return False
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.unlink(missing_ok=True)  # Pas de résultats d'un lancement précédent
+    cmd = [sys.executable, '-m', 'pytest', 'tests/test_benchmarks.py', '-q', '-p', 'no:cacheprovider',
+           f'--benchmark-json={os.path.abspath(args.output)}', f'--benchmark-min-rounds={args.repeat}',
+           '--bench-model', args.model, '--bench-imgsz', *map(str, args.imgsz), '--bench-frames', str(args.frames)]
+    if args.stages:
+        cmd += ['-k', ' or '.join(args.stages)]
+    if subprocess.run(cmd, cwd=ROOT).returncode != 0:
+        return False
+    # Tests sautés (torch, cv2 ou djitellopy absent) : aucune mesure, rien à comparer
+    if not output.exists() or not json.loads(output.read_text()).get('benchmarks'):
+        print(f"Erreur: aucun benchmark mesuré dans {output} (dépendances manquantes ?)")
+        return False
+    return True
+
+
+def load_results(file):
+    """Métadonnées et médiane (ms) de chaque étape d'un JSON de pytest-benchmark."""
+    data = json.loads(Path(file).read_text())
+    medians = {b['name'].replace('test_', '', 1): b['stats']['median'] * 1E3 for b in data['benchmarks']}
+    return data['machine_info'], medians
+
+
+def compare(args):
+    """Échec si la médiane d'une étape commune dépasse celle de la référence de plus de `threshold`."""
+    (meta_ref, baseline), (meta, current) = load_results(args.baseline), load_results(args.current)
+    for file, results in (args.baseline, baseline), (args.current, current):
+        if not results:
+            print(f"Erreur: aucun benchmark dans {file}")
+            return False
+    for key in ('cpu', 'torch', 'torch_threads', 'model', 'detection_resolution'):
+        a, b = meta_ref.get(key), meta.get(key)
+        if a != b:
+            print(f"⚠ {key} différent : {a} (référence) / {b} — comparaison peu fiable")
+
+    ok = True
+    print(f"{'étape':<22} | {'référence':>10} | {'actuel':>10} | {'écart':>8} | statut")
+    for name, ref in baseline.items():
+        if name not in current:
+            print(f"{name:<22} | {ref:7.3f} ms | {'-':>10} | {'-':>8} | absente")
+            continue
+        cur = current[name]
+        change = cur / max(ref, 1E-9) - 1
+        regressed = change > args.threshold
+        ok &= not regressed
+        print(f"{name:<22} | {ref:7.3f} ms | {cur:7.3f} ms | {change:+7.1%} | {'ÉCHEC' if regressed else 'OK'}")
+    print(f"\nseuil de régression {args.threshold:.0%} : {'OK' if ok else 'ÉCHEC'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du chemin critique (CPU, sans drone)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('run', help="Mesure les étapes et enregistre les résultats")
+    p.add_argument('--model', type=str, default='yolov8n-face.pt', help="Poids (.pt, .slim) ou configuration (.yaml)")
+    p.add_argument('--imgsz', type=int, nargs=2, default=[640, 480], help="Résolution de détection (largeur hauteur)")
+    p.add_argument('--frames', type=int, default=30, help="Nombre de frames synthétiques")
+    p.add_argument('--repeat', type=int, default=5, help="Nombre minimal de mesures par étape")
+    p.add_argument('--stages', type=str, nargs='+', default=None, help="Étapes à mesurer (toutes par défaut)")
+    p.add_argument('--output', type=str, default='benchmarks/results.json', help="Fichier JSON des résultats")
+    p = sub.add_parser('compare', help="Compare des résultats à une référence")
+    p.add_argument('baseline', type=str, help="Résultats de référence (JSON de pytest-benchmark)")
+    p.add_argument('current', type=str, help="Résultats à vérifier (JSON de pytest-benchmark)")
+    p.add_argument('--threshold', type=float, default=0.10, help="Régression tolérée de la médiane (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    sys.exit(0 if (run if args.command == 'run' else compare)(args) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : latence d'inférence (p50/p99) avec et sans budget de threads, sur une machine chargée.
+
+Le processus est restreint à 4 cœurs (--cores) et des processus de charge occupent le CPU
+pour simuler le décodage vidéo et l'interface. Chaque mode exécute FaceDetector.detect sur
+des frames synthétiques de la taille du flux Tello.
+
+Usage:
+    python benchmarks/thread_budget.py --model yolov8n-face.pt --cores 4 --load 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tello_face_tracking import FaceDetector  # noqa: E402
+from tello_threads import ThreadBudget  # noqa: E402
+
+
+def _burn(cores, stop):
+    """Charge un cœur en boucle (simule décodage H.264 et interface)."""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    x = 0
+    while not stop.is_set():
+        x = (x * 31 + 7) % 1000003
+
+
+def _measure(detector, frames, n):
+    """Latences de détection en ms."""
+    for frame in frames[:5]:
+        detector.detect(frame)
+    latencies = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        detector.detect(frames[i % len(frames)])
+        latencies.append((time.perf_counter() - t0) * 1E3)
+    return np.array(latencies)
+
+
+def _run_mode(name, model, cores, load, n, use_budget):
+    """Mesure un mode dans un processus séparé (les réglages de threads PyTorch ne sont pas réversibles)."""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    stop = multiprocessing.Event()
+    budget = ThreadBudget(cores=cores, pin=use_budget)
+    # Même placement de la charge dans les deux modes : cœurs du décodage et de l'interface
+    load_cores = sorted(set(budget.decoder_cores + budget.control_cores))
+    if use_budget:
+        budget.apply()
+        budget.pin_current('detector')
+    burners = [multiprocessing.Process(target=_burn, args=(load_cores, stop), daemon=True) for _ in range(load)]
+    for p in burners:
+        p.start()
+
+    detector = FaceDetector(model, use_calibration=False)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (720, 960, 3), dtype=np.uint8) for _ in range(10)]
+    lat = _measure(detector, frames, n)
+
+    stop.set()
+    for p in burners:
+        p.join()
+    print(f"{name:<14} p50 {np.percentile(lat, 50):7.1f} ms | p99 {np.percentile(lat, 99):7.1f} ms | "
+          f"max {lat.max():7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence d'inférence avec et sans budget de threads")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Modèle YOLO-face (.pt)")
+    parser.add_argument('--cores', type=int, default=4, help="Nombre de cœurs utilisés")
+    parser.add_argument('--load', type=int, default=2, help="Nombre de processus de charge")
+    parser.add_argument('--n', type=int, default=300, help="Nombre d'inférences mesurées par mode")
+    args = parser.parse_args()
+
+    from tello_threads import available_cores
+    cores = available_cores()[:args.cores]
+    print(f"{len(cores)} cœurs {cores}, {args.load} processus de charge, {args.n} inférences\n")
+    for name, use_budget in (('sans budget', False), ('avec budget', True)):
+        p = multiprocessing.Process(target=_run_mode, args=(name, args.model, cores, args.load, args.n, use_budget))
+        p.start()
+        p.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : rappel et latence de la détection par tuiles sur des visages lointains.
+
+Chaque image annotée (format YOLO, labels/ à côté de images/) est réduite d'un facteur
+--scales puis placée dans une frame 960x720 (taille du flux Tello), ce qui simule des visages
+de 10-20 px. Le rappel (IoU >= 0.5 avec la vérité terrain) et la latence sont mesurés pour la
+détection normale (FaceDetector.detect) et la détection par tuiles (FaceDetector.detect_tiled).
+
+Usage:
+    python benchmarks/tiled_detection.py --model yolov8n-face.pt --images datasets/faces/images/val
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tello_face_tracking import FaceDetector  # noqa: E402
+from ultralytics.yolo.data.utils import img2label_paths  # noqa: E402
+
+FRAME_W, FRAME_H = 960, 720
+
+
+def load_sample(im_file, label_file, scale):
+    """Place l'image réduite au centre d'une frame Tello et retourne la frame et les boîtes xyxy."""
+    im = cv2.imread(im_file)
+    if im is None or not os.path.exists(label_file):
+        return None, None
+    h, w = im.shape[:2]
+    r = min(FRAME_W / w, FRAME_H / h) * scale
+    im = cv2.resize(im, (max(int(w * r), 1), max(int(h * r), 1)), interpolation=cv2.INTER_AREA)
+    frame = np.full((FRAME_H, FRAME_W, 3), 114, dtype=np.uint8)
+    y0, x0 = (FRAME_H - im.shape[0]) // 2, (FRAME_W - im.shape[1]) // 2
+    frame[y0:y0 + im.shape[0], x0:x0 + im.shape[1]] = im
+
+    labels = np.loadtxt(label_file, ndmin=2)
+    if not len(labels):
+        return None, None
+    xc, yc, bw, bh = labels[:, 1] * im.shape[1], labels[:, 2] * im.shape[0], labels[:, 3] * im.shape[1], \
+        labels[:, 4] * im.shape[0]
+    boxes = np.stack([x0 + xc - bw / 2, y0 + yc - bh / 2, x0 + xc + bw / 2, y0 + yc + bh / 2], 1)
+    return frame, boxes
+
+
+def iou(face, boxes):
+    """IoU entre une détection (x_center, y_center, width, height, conf) et des boîtes xyxy."""
+    x1, y1, x2, y2 = face[0] - face[2] / 2, face[1] - face[3] / 2, face[0] + face[2] / 2, face[1] + face[3] / 2
+    iw = (np.minimum(x2, boxes[:, 2]) - np.maximum(x1, boxes[:, 0])).clip(0)
+    ih = (np.minimum(y2, boxes[:, 3]) - np.maximum(y1, boxes[:, 1])).clip(0)
+    inter = iw * ih
+    return inter / ((x2 - x1) * (y2 - y1) + (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]) - inter)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rappel et latence de la détection par tuiles")
+    parser.add_argument('--model', type=str, default='yolov8n-face.pt', help="Modèle YOLO-face (.pt)")
+    parser.add_argument('--images', type=str, required=True, help="Dossier d'images annotées (format YOLO)")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.5, 0.25], help="Facteurs de réduction")
+    parser.add_argument('--tile', type=int, default=480, help="Taille des tuiles")
+    parser.add_argument('--overlap', type=float, default=0.2, help="Chevauchement des tuiles")
+    parser.add_argument('--conf', type=float, default=0.25, help="Seuil de confiance")
+    parser.add_argument('--n', type=int, default=200, help="Nombre maximal d'images")
+    args = parser.parse_args()
+
+    im_files = sorted(f for ext in ('jpg', 'jpeg', 'png') for f in glob.glob(os.path.join(args.images, f'*.{ext}')))
+    im_files = im_files[:args.n]
+    label_files = img2label_paths(im_files)
+    detector = FaceDetector(args.model, conf_threshold=args.conf, use_calibration=False)
+
+    print(f"{len(im_files)} images, tuiles {args.tile}px, chevauchement {args.overlap}\n")
+    print(f"{'échelle':>8} | {'mode':<8} | {'rappel':>7} | {'latence':>10}")
+    for scale in args.scales:
+        samples = [load_sample(f, lb, scale) for f, lb in zip(im_files, label_files)]
+        samples = [(frame, boxes) for frame, boxes in samples if frame is not None]
+        for mode in ('normal', 'tuiles'):
+            hits, times = 0, []
+            for frame, boxes in samples:
+                t0 = time.perf_counter()
+                face = detector.detect(frame) if mode == 'normal' else \
+                    detector.detect_tiled(frame, tile_size=args.tile, overlap=args.overlap)
+                times.append((time.perf_counter() - t0) * 1E3)
+                hits += face is not None and iou(face, boxes).max() >= 0.5
+            recall = hits / max(len(samples), 1)  # le tracker ne suit qu'un visage par frame
+            print(f"{scale:>8.2f} | {mode:<8} | {recall:>7.1%} | {np.mean(times):>7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
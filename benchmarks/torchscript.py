@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : latence CPU du modèle eager, d'une trace TorchScript et de la trace figée
+(torch.jit.freeze + optimize_for_inference, voir torch_utils.frozen_torchscript).
+
+Mesure aussi le temps de compilation au premier lancement (cache vide) et le temps de
+chargement depuis le cache, et vérifie que les trois variantes donnent les mêmes sorties.
+
+Usage:
+    python benchmarks/torchscript.py --model yolov8n-face.pt --shape 480 640
+    python benchmarks/torchscript.py --model yolov8n.yaml --nc 1   # poids aléatoires
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics.yolo.utils.torch_utils import frozen_torchscript  # noqa: E402
+from suite import latency, load_model  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager, TorchScript et TorchScript figé sur CPU")
+    parser.add_argument('--model', type=str, default='yolov8n.yaml', help="Poids (.pt) ou configuration (.yaml)")
+    parser.add_argument('--nc', type=int, default=1, help="Nombre de classes (configuration .yaml)")
+    parser.add_argument('--shape', type=int, nargs=2, default=[480, 640], help="Taille d'entrée H W")
+    parser.add_argument('--threads', type=int, default=0, help="Threads PyTorch (0 = défaut)")
+    parser.add_argument('--n', type=int, default=100, help="Nombre d'inférences mesurées")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    model = load_model(args.model, args.nc)
+    im = torch.rand(1, 3, *args.shape)
+
+    with torch.no_grad():
+        traced = torch.jit.trace(model, im, strict=False)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            t0 = time.perf_counter()
+            frozen_torchscript(model, im, cache_dir)
+            t_compile = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            frozen = frozen_torchscript(model, im, cache_dir)
+            t_load = time.perf_counter() - t0
+
+        variants = {'eager': model, 'torchscript': traced, 'figé + optimisé': frozen}
+        outputs = {name: m(im)[0] for name, m in variants.items()}
+        print(f"entrée {tuple(im.shape)}, {torch.get_num_threads()} threads, torch {torch.__version__}")
+        print(f"compilation (cache vide) : {t_compile:.2f} s | chargement depuis le cache : {t_load:.2f} s\n")
+        for name, m in variants.items():
+            p50, p99, _ = latency(lambda: m(im), args.n, warmup=5)
+            print(f"{name:<16} p50 {p50:7.2f} ms | p99 {p99:7.2f} ms")
+
+    ref = outputs['eager']
+    parity = all(torch.allclose(ref, y, rtol=1E-3, atol=1E-3) for y in outputs.values())
+    print(f"\nparité des sorties : {'OK' if parity else 'ÉCHEC'}")
+    sys.exit(0 if parity else 1)
+
+
+if __name__ == '__main__':
+    main()
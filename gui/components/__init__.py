@@ -2,6 +2,7 @@
 
 from .tracking_thread import TrackingThread
 from .init_thread import InitializationThread
+from .detector_thread import DetectorLoadThread
 
-__all__ = ['TrackingThread', 'InitializationThread']
+__all__ = ['TrackingThread', 'InitializationThread', 'DetectorLoadThread']
 
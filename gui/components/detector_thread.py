@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thread de chargement du modèle YOLO en arrière-plan.
+Permet de précharger le détecteur au démarrage de l'application et de changer
+de modèle sans bloquer l'interface ni interrompre une session en cours.
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal, QObject
+from typing import Optional
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from tello_face_tracking import FaceDetector
+
+
+class DetectorLoadThread(QThread):
+    """
+    Thread pour charger (ou remplacer) le modèle d'un FaceDetector partagé.
+    """
+
+    # Signaux pour communiquer avec la GUI
+    progress_update = pyqtSignal(str, str)  # (message, niveau: "info", "warning", "error")
+    load_complete = pyqtSignal(str)  # Chemin du modèle chargé
+    load_failed = pyqtSignal(str)  # Message d'erreur
+
+    def __init__(self, detector: FaceDetector, model_path: str, parent: Optional[QObject] = None):
+        """
+        Initialise le thread de chargement.
+
+        Args:
+            detector: Détecteur partagé dont le modèle doit être chargé
+            model_path: Chemin vers le modèle YOLO-face (.pt)
+            parent: Parent QObject (optionnel)
+        """
+        super().__init__(parent)
+        self.detector = detector
+        self.model_path = model_path
+
+    def run(self):
+        """
+        Charge et préchauffe le modèle dans le thread.
+        """
+        try:
+            self.progress_update.emit(f"Préchargement du modèle YOLO ({self.model_path})...", "info")
+            self.detector.load(self.model_path)
+            self.progress_update.emit("Modèle YOLO chargé et préchauffé", "info")
+            self.load_complete.emit(self.detector.model_path)
+        except Exception as e:
+            error_msg = str(e)
+            if self.detector.is_ready:
+                error_msg += f" (modèle précédent conservé: {self.detector.model_path})"
+            self.progress_update.emit(f"Erreur lors du chargement du modèle: {error_msg}", "error")
+            self.load_failed.emit(error_msg)
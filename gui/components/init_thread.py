@@ -3,6 +3,7 @@
 """
 Thread d'initialisation pour créer le FaceTracker dans un thread séparé.
 Évite de bloquer l'interface GUI pendant la connexion au drone.
+Le modèle YOLO est fourni par le détecteur partagé de l'application (pas de rechargement).
 """
 
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
@@ -13,7 +14,7 @@ import os
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from tello_face_tracking import FaceTracker
+from tello_face_tracking import FaceTracker, FaceDetector
 
 
 class InitializationThread(QThread):
@@ -27,16 +28,19 @@ class InitializationThread(QThread):
     initialization_complete = pyqtSignal(object)  # FaceTracker initialisé
     initialization_failed = pyqtSignal(str)  # Message d'erreur
     
-    def __init__(self, config: Dict[str, Any], parent: Optional[QObject] = None):
+    def __init__(self, config: Dict[str, Any], detector: Optional[FaceDetector] = None,
+                 parent: Optional[QObject] = None):
         """
         Initialise le thread d'initialisation.
         
         Args:
             config: Dictionnaire de configuration pour le FaceTracker
+            detector: Détecteur partagé (préchargé en arrière-plan). Si None, le modèle est chargé ici.
             parent: Parent QObject (optionnel)
         """
         super().__init__(parent)
         self.config = config
+        self.detector = detector
         self._cancel_requested = False
     
     def run(self):
@@ -51,8 +55,21 @@ class InitializationThread(QThread):
             conf_threshold = self.config.get('conf_threshold', 0.25)
             auto_wifi = self.config.get('auto_wifi', False)
             tello_ssid = self.config.get('tello_ssid', None)
+            offline = self.config.get('offline', False)
+            pin_threads = self.config.get('pin_threads', False)
             
-            self.progress_update.emit("Chargement du modèle YOLO...", "info")
+            if self.detector is not None:
+                # Attendre la fin du préchargement en arrière-plan si nécessaire
+                if not self.detector.wait_ready(0):
+                    self.progress_update.emit("Attente du préchargement du modèle YOLO...", "info")
+                    while not self.detector.wait_ready(0.2):
+                        if self._cancel_requested:
+                            return
+                        if self.detector.error is not None:
+                            raise RuntimeError(f"Modèle YOLO indisponible: {self.detector.error}")
+                self.progress_update.emit("Modèle YOLO déjà chargé", "info")
+            else:
+                self.progress_update.emit("Chargement du modèle YOLO...", "info")
             
             # Création du tracker (cela peut prendre du temps)
             # La connexion au drone se fait dans le constructeur
@@ -61,7 +78,10 @@ class InitializationThread(QThread):
                 conf_threshold=conf_threshold,
                 auto_wifi=auto_wifi,
                 tello_ssid=tello_ssid,
-                gui_mode=True
+                gui_mode=True,
+                offline=offline,
+                detector=self.detector,
+                pin_threads=pin_threads
             )
             
             if self._cancel_requested:
@@ -85,6 +105,14 @@ class InitializationThread(QThread):
             tracker.max_speed_forward = self.config.get('max_speed_forward', 50)
             tracker.dead_zone = self.config.get('dead_zone', 40)
             tracker.target_face_size = self.config.get('target_face_size', 150)
+            if not self.config.get('motion_gate', True):
+                tracker.motion_gate = None
+            if not self.config.get('optical_flow', True):
+                tracker.box_propagator = None
+                tracker.frame_skip_interval = 1  # Sans flux optique, détection à chaque frame
+            if self.config.get('memory_probe', False):
+                tracker.enable_memory_probe()
+                self.progress_update.emit("Instrumentation mémoire activée (tracemalloc, plus lent)", "warning")
             
             if self._cancel_requested:
                 try:
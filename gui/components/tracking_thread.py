@@ -42,6 +42,7 @@ class TrackingThread(QThread):
         self.tracker = tracker
         self._stop_requested = False
         self._is_flying = False
+        self._moving = False  # Dernière commande rc envoyée non nulle
         self._tracker_initialized = False
         
         # Throttling pour limiter le taux d'émission des frames (max 30 FPS pour l'affichage)
@@ -70,6 +71,9 @@ class TrackingThread(QThread):
             self.tracker.center_x = w // 2
             self.tracker.center_y = h // 2
             
+            # Ce thread exécute la détection : épinglage sur les cœurs de détection
+            self.tracker.thread_budget.pin_current('detector')
+            
             self._tracker_initialized = True
             self.log_message.emit("Tracking démarré avec succès", "info")
             
@@ -84,15 +88,16 @@ class TrackingThread(QThread):
                 if frame is None:
                     continue
                 
-                # Détection du visage
-                face_info = self.tracker.detect_face(frame)
+                # Détection du visage (toutes les N frames, flux optique entre les deux)
+                face_info = self.tracker.track_face(frame)
                 
                 # Calcul des commandes de contrôle
                 if face_info is not None:
                     x_center, y_center, width, height, confidence = face_info
-                    left_right, forward_backward, up_down, yaw = self.tracker.calculate_control(
-                        (x_center, y_center, width, height)
-                    )
+                    with self.tracker.profile_stage('control'):
+                        left_right, forward_backward, up_down, yaw = self.tracker.calculate_control(
+                            (x_center, y_center, width, height)
+                        )
                     self.tracker.no_detection_count = 0
                 else:
                     # Aucun visage détecté - arrêter le mouvement
@@ -104,8 +109,11 @@ class TrackingThread(QThread):
                     try:
                         self.tracker.rc_command_counter += 1
                         if self.tracker.rc_command_counter >= self.tracker.rc_command_interval:
-                            if left_right != 0 or forward_backward != 0 or up_down != 0 or yaw != 0:
-                                self.tracker.tello.send_rc_control(
+                            # Commandes non nulles, et la commande nulle qui arrête le drone après un mouvement
+                            moving = left_right != 0 or forward_backward != 0 or up_down != 0 or yaw != 0
+                            if moving or self._moving:
+                                self._moving = moving
+                                self.tracker.send_rc_control(
                                     left_right_velocity=left_right,
                                     forward_backward_velocity=forward_backward,
                                     up_down_velocity=-up_down,
@@ -118,11 +126,12 @@ class TrackingThread(QThread):
                         break
                 
                 # Dessin de l'overlay
-                frame = self.tracker.draw_overlay(
-                    frame, 
-                    face_info, 
-                    (left_right, forward_backward, up_down, yaw)
-                )
+                with self.tracker.profile_stage('overlay'):
+                    frame = self.tracker.draw_overlay(
+                        frame, 
+                        face_info, 
+                        (left_right, forward_backward, up_down, yaw)
+                    )
                 
                 # Throttling : ne pas émettre plus de 30 FPS pour éviter de saturer l'interface
                 current_time = time.time()
@@ -154,7 +163,8 @@ class TrackingThread(QThread):
                     'forward_backward': forward_backward,
                     'up_down': up_down,
                     'yaw': yaw,
-                    'is_flying': self._is_flying
+                    'is_flying': self._is_flying,
+                    'thread_budget': self.tracker.thread_budget.summary()
                 }
                 
                 if face_info is not None:
@@ -176,6 +186,18 @@ class TrackingThread(QThread):
                 if elapsed_time > 0:
                     self.tracker.fps = self.tracker.frame_count / elapsed_time
                 
+                # Instrumentation mémoire (si activée)
+                probe = self.tracker.memory_probe
+                if probe is not None:
+                    report = probe.step()
+                    if report:
+                        self.log_message.emit(probe.format(report), "info")
+                
+                # Profilage (si demandé depuis l'interface)
+                message = self.tracker.profile_step()
+                if message:
+                    self.log_message.emit(message, "info")
+                
         except Exception as e:
             self.error_occurred.emit(f"Erreur dans la boucle de tracking: {str(e)}")
             import traceback
@@ -4,6 +4,7 @@
 Interface graphique PyQt6 pour le tracking de visage avec le drone Tello.
 """
 
+import html
 import sys
 import os
 import platform
@@ -38,15 +39,17 @@ from PyQt6.QtWidgets import (
     QTabWidget, QProgressBar, QTextEdit, QGroupBox, QMessageBox, QSplitter,
     QStatusBar, QMenuBar, QToolBar, QApplication
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSlot
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, pyqtSlot
 from PyQt6.QtGui import QImage, QPixmap, QFont, QIcon, QAction
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from tello_face_tracking import FaceTracker
+from tello_face_tracking import FaceTracker, FaceDetector
+from ultralytics.yolo.utils import set_offline
 from gui.components.tracking_thread import TrackingThread
 from gui.components.init_thread import InitializationThread
+from gui.components.detector_thread import DetectorLoadThread
 
 
 class TelloFaceTrackingGUI(QMainWindow):
@@ -62,6 +65,8 @@ class TelloFaceTrackingGUI(QMainWindow):
         self.tracker: Optional[FaceTracker] = None
         self.tracking_thread: Optional[TrackingThread] = None
         self.init_thread: Optional[InitializationThread] = None
+        self.detector_thread: Optional[DetectorLoadThread] = None
+        self._pending_model_path: Optional[str] = None
         
         # Configuration par défaut
         # Détection automatique de Windows : désactiver auto_wifi
@@ -71,6 +76,7 @@ class TelloFaceTrackingGUI(QMainWindow):
             'conf_threshold': 0.25,
             'auto_wifi': not is_windows,  # Désactivé sous Windows (pas de nmcli)
             'tello_ssid': None,
+            'offline': os.environ.get('YOLO_OFFLINE', '').lower() == 'true',  # --offline ou YOLO_OFFLINE=True
             'kp_x': 0.15,
             'kp_y': 0.12,
             'kd_x': 0.25,
@@ -80,7 +86,11 @@ class TelloFaceTrackingGUI(QMainWindow):
             'max_speed_horizontal': 40,
             'max_speed_forward': 50,
             'dead_zone': 40,
-            'target_face_size': 150
+            'target_face_size': 150,
+            'pin_threads': False,
+            'motion_gate': True,
+            'optical_flow': True,
+            'memory_probe': False
         }
         
         # État de l'application
@@ -92,6 +102,11 @@ class TelloFaceTrackingGUI(QMainWindow):
         self.setup_menu()
         self.setup_toolbar()
         
+        # Détecteur partagé entre les sessions : le modèle est chargé une seule fois,
+        # en arrière-plan, dès le démarrage de l'application
+        self.detector = FaceDetector(conf_threshold=self.config['conf_threshold'])
+        self.load_detector(self.config['model_path'])
+        
         # Timer pour la mise à jour périodique (moins fréquent pour éviter la saturation)
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_ui)
@@ -249,6 +264,13 @@ class TelloFaceTrackingGUI(QMainWindow):
         ssid_hbox.addWidget(self.ssid_input)
         wifi_layout.addLayout(ssid_hbox)
         
+        self.offline_checkbox = QCheckBox("Mode hors ligne (aucun accès réseau d'ultralytics)")
+        self.offline_checkbox.setChecked(self.config['offline'])
+        self.offline_checkbox.setToolTip("Évite les téléchargements et vérifications réseau au démarrage "
+                                         "(le Wi-Fi du Tello n'a pas d'accès Internet)")
+        self.offline_checkbox.toggled.connect(self.on_offline_toggled)
+        wifi_layout.addWidget(self.offline_checkbox)
+        
         wifi_group.setLayout(wifi_layout)
         layout.addWidget(wifi_group)
         
@@ -309,6 +331,28 @@ class TelloFaceTrackingGUI(QMainWindow):
         control_group.setLayout(control_layout)
         layout.addWidget(control_group)
         
+        # Profilage sur la machine de vol (temps par couche et par étape, trace Chrome)
+        profile_group = QGroupBox("Profilage")
+        profile_layout = QVBoxLayout()
+        
+        frames_hbox = QHBoxLayout()
+        frames_hbox.addWidget(QLabel("Frames:"))
+        self.profile_frames_spin = QSpinBox()
+        self.profile_frames_spin.setRange(10, 10000)
+        self.profile_frames_spin.setValue(300)
+        frames_hbox.addWidget(self.profile_frames_spin)
+        profile_layout.addLayout(frames_hbox)
+        
+        self.profile_button = QPushButton("Profiler")
+        self.profile_button.setEnabled(False)
+        self.profile_button.setToolTip("Temps par couche du modèle et par étape, exportés dans profiles/ "
+                                       "(trace.json pour chrome://tracing et profile.txt)")
+        self.profile_button.clicked.connect(self.on_profile_clicked)
+        profile_layout.addWidget(self.profile_button)
+        
+        profile_group.setLayout(profile_layout)
+        layout.addWidget(profile_group)
+        
         layout.addStretch()
         
         return tab
@@ -437,6 +481,30 @@ class TelloFaceTrackingGUI(QMainWindow):
         tfs_hbox.addWidget(self.target_face_size_spin)
         other_layout.addLayout(tfs_hbox)
         
+        self.pin_threads_checkbox = QCheckBox("Épingler les threads sur des cœurs dédiés (Linux)")
+        self.pin_threads_checkbox.setChecked(self.config['pin_threads'])
+        self.pin_threads_checkbox.setToolTip("Sépare décodage vidéo, détection et interface sur des cœurs distincts "
+                                             "pour réduire les pics de latence")
+        other_layout.addWidget(self.pin_threads_checkbox)
+        
+        self.motion_gate_checkbox = QCheckBox("Détection déclenchée par le mouvement")
+        self.motion_gate_checkbox.setChecked(self.config['motion_gate'])
+        self.motion_gate_checkbox.setToolTip("Saute la détection YOLO tant que l'image et le visage sont immobiles "
+                                             "(vol stationnaire) pour réduire l'utilisation CPU")
+        other_layout.addWidget(self.motion_gate_checkbox)
+        
+        self.optical_flow_checkbox = QCheckBox("Flux optique entre les détections")
+        self.optical_flow_checkbox.setChecked(self.config['optical_flow'])
+        self.optical_flow_checkbox.setToolTip("Détecte une frame sur deux et déplace la boîte du visage par flux "
+                                              "optique entre les détections (sinon détection à chaque frame)")
+        other_layout.addWidget(self.optical_flow_checkbox)
+        
+        self.memory_probe_checkbox = QCheckBox("Instrumentation mémoire (diagnostic, plus lent)")
+        self.memory_probe_checkbox.setChecked(self.config['memory_probe'])
+        self.memory_probe_checkbox.setToolTip("Allocations par frame et croissance mémoire attribuées aux lignes de "
+                                              "code responsables, rapport dans les logs")
+        other_layout.addWidget(self.memory_probe_checkbox)
+        
         other_group.setLayout(other_layout)
         layout.addWidget(other_group)
         
@@ -525,6 +593,11 @@ class TelloFaceTrackingGUI(QMainWindow):
         self.fps_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         fps_layout.addWidget(self.fps_label)
         
+        self.thread_budget_label = QLabel("Threads: -")
+        self.thread_budget_label.setWordWrap(True)
+        self.thread_budget_label.setStyleSheet("color: gray; font-size: 10px;")
+        fps_layout.addWidget(self.thread_budget_label)
+        
         fps_group.setLayout(fps_layout)
         layout.addWidget(fps_group)
         
@@ -580,6 +653,7 @@ class TelloFaceTrackingGUI(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Courier", 9))
+        self.log_text.document().setMaximumBlockCount(5000)  # Log borné : les plus anciennes lignes sont supprimées
         layout.addWidget(self.log_text)
         
         # Boutons de contrôle des logs
@@ -645,11 +719,13 @@ class TelloFaceTrackingGUI(QMainWindow):
             self,
             "Sélectionner le modèle YOLO",
             "",
-            "Fichiers PyTorch (*.pt);;Tous les fichiers (*)"
+            "Modèles YOLO (*.pt *.slim);;Tous les fichiers (*)"
         )
         if file_path:
             self.config['model_path'] = file_path
             self.model_path_label.setText(file_path)
+            # Remplacement du modèle en arrière-plan (la session en cours continue avec l'ancien)
+            self.load_detector(file_path)
             self.add_log(f"Modèle sélectionné: {file_path}", "info")
     
     def on_conf_changed(self, value: int):
@@ -668,6 +744,13 @@ class TelloFaceTrackingGUI(QMainWindow):
         self.config['auto_wifi'] = checked
         self.ssid_input.setEnabled(not checked)
     
+    def on_offline_toggled(self, checked: bool):
+        """
+        Gère le changement de l'option mode hors ligne.
+        """
+        self.config['offline'] = checked
+        set_offline(checked)  # Appliqué immédiatement : chargements de modèle suivants compris
+    
     def reset_advanced_params(self):
         """
         Réinitialise les paramètres avancés aux valeurs par défaut.
@@ -717,6 +800,10 @@ class TelloFaceTrackingGUI(QMainWindow):
             self.config['max_speed_forward'] = self.max_speed_forward_spin.value()
             self.config['dead_zone'] = self.dead_zone_spin.value()
             self.config['target_face_size'] = self.target_face_size_spin.value()
+            self.config['pin_threads'] = self.pin_threads_checkbox.isChecked()
+            self.config['motion_gate'] = self.motion_gate_checkbox.isChecked()
+            self.config['optical_flow'] = self.optical_flow_checkbox.isChecked()
+            self.config['memory_probe'] = self.memory_probe_checkbox.isChecked()
             
             # Désactiver le bouton pendant l'initialisation
             self.start_button.setEnabled(False)
@@ -728,7 +815,7 @@ class TelloFaceTrackingGUI(QMainWindow):
             self.add_log("Démarrage de l'initialisation...", "info")
             
             # Créer et démarrer le thread d'initialisation
-            self.init_thread = InitializationThread(self.config)
+            self.init_thread = InitializationThread(self.config, detector=self.detector)
             self.init_thread.progress_update.connect(self.add_log)
             self.init_thread.initialization_complete.connect(self.on_tracker_initialized)
             self.init_thread.initialization_failed.connect(self.on_tracker_init_failed)
@@ -751,6 +838,12 @@ class TelloFaceTrackingGUI(QMainWindow):
             self.tracker = tracker
             self.add_log("Tracker initialisé, démarrage du tracking...", "info")
             
+            # Le thread principal (Qt) gère l'interface et les commandes : cœurs de contrôle
+            budget = self.tracker.thread_budget
+            QThreadPool.globalInstance().setMaxThreadCount(max(budget.qt_threads, 1))
+            budget.pin_current('control')
+            self.add_log(f"Budget de threads: {budget.summary()}", "info")
+            
             # Création et connexion du thread de tracking
             self.tracking_thread = TrackingThread(self.tracker)
             self.tracking_thread.frame_ready.connect(self.on_frame_received)
@@ -822,6 +915,44 @@ class TelloFaceTrackingGUI(QMainWindow):
             self.init_thread.deleteLater()
             self.init_thread = None
     
+    def load_detector(self, model_path: str):
+        """
+        Charge (ou remplace) le modèle du détecteur partagé en arrière-plan.
+        Si un chargement est déjà en cours, le nouveau modèle est chargé à sa suite.
+        """
+        if self.detector_thread and self.detector_thread.isRunning():
+            self._pending_model_path = model_path
+            return
+        
+        set_offline(self.config['offline'])  # Avant tout accès d'ultralytics au réseau
+        self.statusBar().showMessage("Chargement du modèle YOLO en arrière-plan...")
+        self.detector_thread = DetectorLoadThread(self.detector, model_path)
+        self.detector_thread.progress_update.connect(self.add_log)
+        self.detector_thread.load_complete.connect(self.on_detector_loaded)
+        self.detector_thread.finished.connect(self.on_detector_thread_finished)
+        self.detector_thread.start()
+    
+    def on_detector_loaded(self, model_path: str):
+        """
+        Callback appelé quand le modèle du détecteur est chargé.
+        """
+        if self.tracker:
+            # Comme en ligne de commande : réglages calibrés du nouveau modèle conservés, le reste selon le budget
+            self.tracker.thread_budget.apply(self.detector.calibration)
+        if not self.is_tracking:
+            self.statusBar().showMessage("Prêt")
+    
+    def on_detector_thread_finished(self):
+        """
+        Callback appelé quand le thread de chargement du modèle se termine.
+        """
+        if self.detector_thread:
+            self.detector_thread.deleteLater()
+            self.detector_thread = None
+        if self._pending_model_path:
+            model_path, self._pending_model_path = self._pending_model_path, None
+            self.load_detector(model_path)
+    
     def stop_tracking(self):
         """
         Arrête le tracking.
@@ -927,6 +1058,8 @@ class TelloFaceTrackingGUI(QMainWindow):
         # FPS
         fps = stats.get('fps', 0.0)
         self.fps_label.setText(f"FPS: {fps:.1f}")
+        if 'thread_budget' in stats:
+            self.thread_budget_label.setText(f"Threads: {stats['thread_budget']}")
         
         # Détection
         face_detected = stats.get('face_detected', False)
@@ -989,6 +1122,18 @@ class TelloFaceTrackingGUI(QMainWindow):
             else:
                 self.tracking_thread.request_takeoff()
     
+    def on_profile_clicked(self):
+        """
+        Démarre ou arrête le profilage (appliqué par le thread de tracking à la frame suivante).
+        """
+        if self.tracker is None or not self.is_tracking:
+            return
+        if self.tracker.profiler is None:
+            self.tracker.request_profile(self.profile_frames_spin.value())
+        else:
+            self.tracker.request_profile(0)
+            self.add_log("Arrêt du profilage demandé", "info")
+    
     def on_emergency_stop(self):
         """
         Gère l'arrêt d'urgence.
@@ -1026,6 +1171,8 @@ class TelloFaceTrackingGUI(QMainWindow):
             prefix = "[INFO]"
             color = "black"
         
+        if '\n' in message:  # Rapports multi-lignes (profilage, mémoire) : tableaux conservés
+            message = f'<pre>{html.escape(message)}</pre>'
         log_entry = f'<span style="color: {color};">[{timestamp}] {prefix} {message}</span>'
         self.log_text.append(log_entry)
         
@@ -1037,8 +1184,10 @@ class TelloFaceTrackingGUI(QMainWindow):
         """
         Met à jour l'interface utilisateur périodiquement.
         """
-        # Cette méthode peut être utilisée pour des mises à jour périodiques
-        pass
+        # Bouton de profilage : le profilage se termine seul après le nombre de frames demandé
+        profiling = self.tracker is not None and self.tracker.profiler is not None
+        self.profile_button.setEnabled(self.is_tracking)
+        self.profile_button.setText("Arrêter le profilage" if profiling else "Profiler")
     
     def show_about(self):
         """
@@ -1076,6 +1225,11 @@ class TelloFaceTrackingGUI(QMainWindow):
             import time
             time.sleep(1)
         
+        # Attendre la fin d'un éventuel chargement de modèle
+        self._pending_model_path = None
+        if self.detector_thread and self.detector_thread.isRunning():
+            self.detector_thread.wait(5000)
+        
         # Arrêter le timer de mise à jour
         if hasattr(self, 'update_timer'):
             self.update_timer.stop()
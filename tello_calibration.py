@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calibration automatique des paramètres de performance (mode --calibrate).
+
+Mesure une grille de réglages (threads PyTorch, threads OpenCV, résolution de détection,
+backend d'inférence) sur des frames enregistrées ou synthétiques, et retient la
+configuration la plus rapide dont la précision reste au-dessus d'un seuil par rapport
+à une exécution de référence. Le résultat est enregistré dans un profil propre à la
+machine, chargé automatiquement par FaceDetector.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import platform
+import time
+from itertools import product
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from ultralytics.yolo.utils import get_user_config_dir
+from ultralytics.yolo.utils.torch_utils import cpu_supports_bf16
+
+PROFILE_VERSION = 1
+
+# Résolution et backend de l'exécution de référence
+REFERENCE_RESOLUTION = (640, 480)
+RESOLUTIONS = [(640, 480), (512, 384), (416, 320), (320, 240)]
+
+# Résolution du flux vidéo du Tello (pour les frames synthétiques)
+TELLO_FRAME_SIZE = (960, 720)
+
+
+def hardware_fingerprint() -> Dict[str, Any]:
+    """
+    Décrit le matériel et les bibliothèques qui influencent les performances.
+
+    Returns:
+        Dictionnaire décrivant la machine
+    """
+    info = {
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'opencv': cv2.__version__,
+        'cuda': torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
+    }
+    return info
+
+
+def hardware_hash() -> str:
+    """
+    Empreinte courte du matériel (change si le CPU, le GPU ou les versions changent).
+    """
+    return hashlib.sha256(json.dumps(hardware_fingerprint(), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def file_hash(path: str) -> str:
+    """
+    Empreinte courte du contenu d'un fichier (lecture par blocs).
+    """
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def profile_path() -> Path:
+    """
+    Chemin du profil de calibration de cette machine.
+    """
+    host = platform.node() or 'localhost'
+    return get_user_config_dir('TelloFaceTracking') / f'calibration_{host}.json'
+
+
+def read_profile() -> Optional[Dict[str, Any]]:
+    """
+    Lit le profil de cette machine sans vérifier sa validité.
+
+    Returns:
+        Profil, ou None s'il n'existe pas ou est illisible
+    """
+    path = profile_path()
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            profile = json.load(f)
+        return profile if profile.get('version') == PROFILE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def is_profile_valid(profile: Dict[str, Any], model_path: str) -> bool:
+    """
+    Vérifie que le profil correspond au matériel et au modèle actuels.
+    """
+    try:
+        return profile['hardware_hash'] == hardware_hash() and profile['model_hash'] == file_hash(model_path)
+    except (KeyError, OSError):
+        return False
+
+
+def load_profile(model_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Charge le profil de calibration s'il est valide pour ce matériel et ce modèle.
+
+    Args:
+        model_path: Chemin vers le modèle YOLO-face (.pt)
+
+    Returns:
+        Profil valide, ou None (absent ou obsolète)
+    """
+    profile = read_profile()
+    if profile is None:
+        return None
+    if not is_profile_valid(profile, model_path):
+        print("⚠ Profil de calibration obsolète (matériel ou modèle modifié), relancez --calibrate")
+        return None
+    return profile
+
+
+def needs_recalibration(model_path: str) -> bool:
+    """
+    Indique si une calibration existe mais ne correspond plus au matériel ou au modèle.
+    Une machine jamais calibrée ne déclenche pas de recalibration automatique.
+    """
+    profile = read_profile()
+    return profile is not None and not is_profile_valid(profile, model_path)
+
+
+def save_profile(profile: Dict[str, Any]) -> Path:
+    """
+    Enregistre le profil de calibration de cette machine.
+    """
+    path = profile_path()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    return path
+
+
+def apply_thread_settings(settings: Dict[str, Any]):
+    """
+    Applique les réglages de threads (PyTorch et OpenCV) au processus courant.
+    """
+    if settings.get('torch_threads'):
+        torch.set_num_threads(int(settings['torch_threads']))
+    if settings.get('cv2_threads') is not None:
+        cv2.setNumThreads(int(settings['cv2_threads']))
+
+
+def load_frames(source: Optional[str], n: int) -> Tuple[List[np.ndarray], bool]:
+    """
+    Charge les frames de calibration.
+
+    Args:
+        source: Vidéo, dossier d'images ou motif glob. Si None, frames synthétiques.
+        n: Nombre de frames
+
+    Returns:
+        Tuple (frames, recorded) où recorded indique des frames réelles
+    """
+    frames = []
+    if source:
+        if os.path.isdir(source):
+            files = sorted(f for ext in ('jpg', 'jpeg', 'png', 'bmp') for f in glob.glob(os.path.join(source, f'*.{ext}')))
+        elif any(c in source for c in '*?['):
+            files = sorted(glob.glob(source))
+        else:
+            files = []
+            cap = cv2.VideoCapture(source)
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or n
+            step = max(total // n, 1)  # frames réparties sur toute la vidéo
+            i = 0
+            while cap.isOpened() and len(frames) < n:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if i % step == 0:
+                    frames.append(frame)
+                i += 1
+            cap.release()
+        for f in files[:n]:
+            frame = cv2.imread(f)
+            if frame is not None:
+                frames.append(frame)
+        if not frames:
+            raise FileNotFoundError(f"Aucune frame lisible dans {source}")
+        return frames, True
+
+    rng = np.random.default_rng(0)
+    w, h = TELLO_FRAME_SIZE
+    for _ in range(n):
+        frames.append(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+    return frames, False
+
+
+def _iou(a: Optional[Tuple], b: Optional[Tuple]) -> float:
+    """
+    IoU entre deux détections (x_center, y_center, width, height, ...). Deux absences concordent.
+    """
+    if a is None or b is None:
+        return float(a is None and b is None)
+    ax1, ay1, ax2, ay2 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx1, by1, bx2, by2 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    inter = max(0, min(ax2, bx2) - max(ax1, bx1)) * max(0, min(ay2, by2) - max(ay1, by1))
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _candidate_backends() -> List[Dict[str, Any]]:
+    """
+    Backends d'inférence disponibles sur cette machine.
+    """
+    cpu = {'device': 'cpu', 'half': False, 'bf16': False, 'channels_last': False}
+    backends = [cpu]  # Référence : fp32, mémoire contiguë
+    if torch.backends.mkldnn.is_available():
+        backends.append({**cpu, 'channels_last': True})
+        if cpu_supports_bf16():
+            backends.append({**cpu, 'bf16': True, 'channels_last': True})
+    if torch.cuda.is_available():
+        gpu = {**cpu, 'device': '0'}
+        backends += [gpu, {**gpu, 'half': True}, {**gpu, 'half': True, 'channels_last': True}]
+    return backends
+
+
+def describe_backend(settings: Dict[str, Any]) -> str:
+    """
+    Description courte d'un backend, par exemple « cpu bf16 nhwc ».
+    """
+    return (f"{settings['device']}{' fp16' if settings['half'] else ''}{' bf16' if settings.get('bf16') else ''}"
+            f"{' nhwc' if settings.get('channels_last') else ''}")
+
+
+def _candidate_threads() -> List[int]:
+    """
+    Nombres de threads testés, bornés par le nombre de cœurs.
+    """
+    n = os.cpu_count() or 1
+    return sorted({t for t in (1, 2, 4, n // 2, n) if 1 <= t <= n})
+
+
+def _run(detector, frames: List[np.ndarray], resolution: Tuple[int, int], conf: float,
+         warmup: int = 3) -> Tuple[float, List[Optional[Tuple]]]:
+    """
+    Exécute la détection sur toutes les frames.
+
+    Returns:
+        Tuple (temps moyen par frame en ms, détections)
+    """
+    for frame in frames[:warmup]:
+        detector.detect(frame, conf, resolution)
+    detections = []
+    t0 = time.perf_counter()
+    for frame in frames:
+        detections.append(detector.detect(frame, conf, resolution))
+    return (time.perf_counter() - t0) / len(frames) * 1E3, detections
+
+
+def calibrate(model_path: str, source: Optional[str] = None, target_accuracy: float = 0.9,
+              n_frames: int = 30, conf_threshold: float = 0.25) -> Dict[str, Any]:
+    """
+    Mesure la grille de réglages et enregistre la configuration la plus rapide
+    dont la précision (IoU moyen avec la référence) atteint target_accuracy.
+
+    Args:
+        model_path: Chemin vers le modèle YOLO-face (.pt)
+        source: Frames enregistrées (vidéo, dossier ou motif glob). Si None, frames synthétiques.
+        target_accuracy: Précision minimale par rapport à l'exécution de référence (0.0-1.0)
+        n_frames: Nombre de frames mesurées par configuration
+        conf_threshold: Seuil de confiance utilisé pour la mesure
+
+    Returns:
+        Profil enregistré
+    """
+    from tello_face_tracking import FaceDetector
+
+    model_path = FaceDetector.resolve_model_path(model_path)
+    frames, recorded = load_frames(source, n_frames)
+    resolutions = RESOLUTIONS
+    if not recorded:
+        # Sans visages réels, la précision ne peut pas être mesurée : la résolution reste celle de référence
+        print("⚠ Frames synthétiques : la résolution de détection n'est pas calibrée (utilisez --calibrate-source)")
+        resolutions = [REFERENCE_RESOLUTION]
+
+    default_threads = {'torch_threads': torch.get_num_threads(), 'cv2_threads': cv2.getNumThreads()}
+    print(f"\n=== Calibration ({len(frames)} frames, précision cible {target_accuracy:.0%}) ===")
+
+    results = []
+    reference = None
+    for backend in _candidate_backends():
+        detector = FaceDetector(conf_threshold=conf_threshold, use_calibration=False, **backend)
+        detector.load(model_path)
+
+        if reference is None:
+            # Exécution de référence : réglages par défaut, résolution de référence, premier backend (CPU)
+            apply_thread_settings(default_threads)
+            reference_ms, reference = _run(detector, frames, REFERENCE_RESOLUTION, conf_threshold)
+            print(f"Référence: {reference_ms:.1f} ms/frame")
+
+        for torch_threads, cv2_threads, resolution in product(_candidate_threads(), (1, os.cpu_count() or 1),
+                                                               resolutions):
+            settings = {'torch_threads': torch_threads, 'cv2_threads': cv2_threads,
+                        'detection_resolution': list(resolution), **backend}
+            apply_thread_settings(settings)
+            ms, detections = _run(detector, frames, resolution, conf_threshold)
+            accuracy = float(np.mean([_iou(d, r) for d, r in zip(detections, reference)]))
+            results.append({'settings': settings, 'ms_per_frame': ms, 'accuracy': accuracy})
+            print(f"  {describe_backend(backend):>14} | torch {torch_threads:>2} | "
+                  f"cv2 {cv2_threads:>2} | {resolution[0]}x{resolution[1]} | {ms:6.1f} ms | précision {accuracy:.2f}")
+
+    apply_thread_settings(default_threads)
+    valid = [r for r in results if r['accuracy'] >= target_accuracy] or \
+        [r for r in results if r['settings']['detection_resolution'] == list(REFERENCE_RESOLUTION)]
+    best = min(valid, key=lambda r: r['ms_per_frame'])
+
+    profile = {
+        'version': PROFILE_VERSION,
+        'host': platform.node(),
+        'hardware': hardware_fingerprint(),
+        'hardware_hash': hardware_hash(),
+        'model_path': model_path,
+        'model_hash': file_hash(model_path),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'target_accuracy': target_accuracy,
+        'settings': best['settings'],
+        'benchmark': {'ms_per_frame': best['ms_per_frame'], 'accuracy': best['accuracy'],
+                      'reference_ms_per_frame': reference_ms}}
+    path = save_profile(profile)
+
+    s = best['settings']
+    print(f"\n✓ Meilleure configuration: torch {s['torch_threads']} threads, cv2 {s['cv2_threads']} threads, "
+          f"{s['detection_resolution'][0]}x{s['detection_resolution'][1]}, {describe_backend(s)} "
+          f"({best['ms_per_frame']:.1f} ms/frame contre {reference_ms:.1f} ms en référence)")
+    print(f"Profil enregistré dans {path}")
+    return profile
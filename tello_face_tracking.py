@@ -6,9 +6,11 @@ Utilise YOLO-face pour détecter les visages et ajuster la position du drone
 pour garder le visage au centre de l'image.
 """
 
+import contextlib
 import cv2
 import numpy as np
 import time
+from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
 import sys
 import os
@@ -19,9 +21,15 @@ import threading
 # Ne pas forcer xcb ici car cela peut causer des conflits avec PyQt6
 # La configuration Qt sera gérée par PyQt6 si nécessaire
 
+# Le mode hors ligne doit être activé avant l'import d'ultralytics :
+# Sentry et les vérifications réseau sont initialisés à l'import
+if '--offline' in sys.argv:
+    os.environ['YOLO_OFFLINE'] = 'True'
+
 # Import de YOLO depuis ultralytics
 try:
     from ultralytics import YOLO
+    from ultralytics.yolo.utils import ops, set_offline
 except ImportError:
     print("Erreur: Le module ultralytics n'est pas installé.")
     print("Installez-le avec: pip install ultralytics")
@@ -35,6 +43,12 @@ except ImportError:
     print("Installez-le avec: pip install djitellopy")
     sys.exit(1)
 
+# Modules du projet (hors des blocs ci-dessus : une erreur d'import n'y est pas une dépendance manquante)
+import tello_calibration
+from tello_flow import BoxPropagator
+from tello_motion import MotionGate
+from tello_threads import ThreadBudget
+
 
 def get_resource_path(relative_path: str) -> str:
     """
@@ -362,6 +376,288 @@ class TelloWiFiManager:
             self.restore_connection()
 
 
+class FaceDetector:
+    """
+    Service de détection de visage, indépendant de la connexion au drone.
+    
+    Le modèle YOLO est chargé (et préchauffé) une seule fois puis partagé entre les
+    sessions de tracking : l'interface graphique le crée au démarrage de l'application
+    et une reconnexion au drone n'a plus à recharger les poids.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None, conf_threshold: float = 0.25,
+                 detection_resolution: Optional[Tuple[int, int]] = None, device: Optional[str] = None,
+                 half: bool = False, bf16: bool = False, channels_last: bool = False, use_calibration: bool = True):
+        """
+        Initialise le détecteur.
+        
+        Args:
+            model_path: Chemin vers le modèle YOLO-face (.pt ou .slim). Si None, le modèle sera chargé plus tard avec load()
+            conf_threshold: Seuil de confiance par défaut pour la détection (0.0-1.0)
+            detection_resolution: Résolution par défaut pour la détection YOLO (largeur, hauteur).
+                                  Si None, celle du profil de calibration, sinon 640x480.
+            device: Périphérique d'inférence ('cpu', '0', ...). Si None, celui du profil de calibration.
+            half: Inférence en demi-précision (CUDA uniquement)
+            bf16: Inférence en bfloat16 (CPU avec instructions AVX512-BF16 ou AMX, fp32 sinon)
+            channels_last: Poids et entrées au format mémoire NHWC
+            use_calibration: Applique le profil de calibration de la machine (voir --calibrate)
+        """
+        self.model = None
+        self.model_path = None
+        self.conf_threshold = conf_threshold
+        self.detection_width, self.detection_height = detection_resolution or (640, 480)
+        self.device = device
+        self.half = half
+        self.bf16 = bf16
+        self.channels_last = channels_last
+        self.use_calibration = use_calibration
+        self.calibration: Optional[Dict[str, Any]] = None  # Profil appliqué
+        self.head_topk = 100  # Décodage « confiance d'abord » : DFL uniquement sur les 100 meilleures ancres
+        self.fold_input = True  # Normalisation et BGR→RGB intégrées à la première convolution (frames uint8 HWC)
+        self.jit_cache = True  # CPU : trace TorchScript figée à la résolution de détection, en cache sur disque
+        # Tuiles d'une frame Tello 960x720 (voir FaceTracker.tile_size), préchauffées en un seul batch
+        self.tile_batch = len(ops.make_tiles((720, 960), 480, 0.2))
+        self._user_resolution = detection_resolution is not None
+        self._user_device = device is not None
+        self.error: Optional[Exception] = None  # Erreur du dernier chargement
+        
+        self._ready = threading.Event()  # Signalé à la fin de chaque chargement (succès ou échec)
+        self._load_lock = threading.Lock()  # Sérialise les chargements concurrents
+        
+        if model_path is not None:
+            self.load(model_path)
+    
+    @staticmethod
+    def resolve_model_path(model_path: str) -> str:
+        """
+        Résout le chemin du modèle, y compris dans les ressources PyInstaller.
+        
+        Args:
+            model_path: Chemin vers le modèle (absolu ou relatif)
+            
+        Returns:
+            Chemin vers le modèle
+        """
+        if not os.path.isabs(model_path) and not os.path.exists(model_path):
+            resource_path = get_resource_path(model_path)
+            if os.path.exists(resource_path):
+                return resource_path
+        return model_path
+    
+    @property
+    def is_ready(self) -> bool:
+        """
+        Indique si un modèle est chargé et utilisable.
+        """
+        return self.model is not None
+    
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du chargement en cours.
+        
+        Args:
+            timeout: Temps d'attente maximal en secondes (None = illimité)
+            
+        Returns:
+            True si un modèle est utilisable
+        """
+        self._ready.wait(timeout)
+        return self.is_ready
+    
+    def load(self, model_path: str, warmup: bool = True):
+        """
+        Charge un modèle YOLO et le substitue au modèle courant.
+        
+        Le nouveau modèle est entièrement chargé et préchauffé avant la bascule : une session
+        en cours continue d'utiliser l'ancien modèle jusque-là. En cas d'échec, l'ancien modèle
+        est conservé.
+        
+        Args:
+            model_path: Chemin vers le modèle YOLO-face (.pt, ou .slim exporté avec `yolo export format=slim`)
+            warmup: Exécute une inférence à vide pour initialiser le prédicteur
+            
+        Raises:
+            FileNotFoundError: Si le fichier du modèle n'existe pas
+        """
+        with self._load_lock:
+            self._ready.clear()
+            try:
+                model_path = self.resolve_model_path(model_path)
+                print(f"Chargement du modèle YOLO depuis {model_path}...")
+                if not os.path.exists(model_path):
+                    raise FileNotFoundError(f"Le fichier {model_path} n'existe pas.")
+                
+                if self.use_calibration:
+                    self._apply_calibration(model_path)
+                
+                model = YOLO(model_path)
+                if warmup:
+                    self._warmup(model)
+                
+                # Bascule atomique : detect() lit self.model une seule fois par appel
+                self.model, self.model_path = model, model_path
+                self.error = None
+            except Exception as e:
+                self.error = e
+                raise
+            finally:
+                self._ready.set()
+    
+    def _apply_calibration(self, model_path: str):
+        """
+        Applique le profil de calibration de la machine s'il correspond au matériel et au modèle.
+        Les réglages passés explicitement au constructeur restent prioritaires.
+        """
+        profile = tello_calibration.load_profile(model_path)
+        self.calibration = profile
+        if profile is None:
+            return
+        
+        settings = profile['settings']
+        tello_calibration.apply_thread_settings(settings)
+        if not self._user_resolution:
+            self.detection_width, self.detection_height = settings['detection_resolution']
+        if not self._user_device:
+            self.device, self.half = settings['device'], settings['half']
+            self.bf16, self.channels_last = settings.get('bf16', False), settings.get('channels_last', False)
+        print(f"✓ Profil de calibration appliqué: {settings['torch_threads']} threads torch, "
+              f"{settings['cv2_threads']} threads cv2, {self.detection_width}x{self.detection_height}, "
+              f"{tello_calibration.describe_backend(vars(self))}")
+    
+    @property
+    def predict_args(self) -> Dict[str, Any]:
+        """
+        Arguments d'inférence propres au backend choisi.
+        """
+        args = {'head_topk': self.head_topk, 'fold_input': self.fold_input,
+                'bf16': self.bf16, 'channels_last': self.channels_last,
+                # Formes pré-exécutées au premier appel, CPU compris : frame réduite et batch de tuiles (carrées)
+                'warmup_shapes': [(self.detection_height, self.detection_width),
+                                  (self.tile_batch, self.detection_width, self.detection_width)]}
+        if self.device is not None:
+            args.update(device=self.device, half=self.half)
+        if self.jit_cache:
+            import torch
+            device = str(self.device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+            args['jit_cache'] = device == 'cpu'  # Trace figée uniquement sur CPU
+        return args
+    
+    def _warmup(self, model):
+        """
+        Exécute une inférence sur une image noire pour construire le prédicteur (fusion, backend).
+        """
+        t0 = time.time()
+        dummy = np.zeros((self.detection_height, self.detection_width, 3), dtype=np.uint8)
+        model(dummy, conf=self.conf_threshold, imgsz=self.detection_width, verbose=False, **self.predict_args)
+        print(f"✓ Modèle préchauffé en {time.time() - t0:.2f}s")
+    
+    def detect(self, frame: np.ndarray, conf_threshold: Optional[float] = None,
+               detection_resolution: Optional[Tuple[int, int]] = None) -> Optional[Tuple]:
+        """
+        Détecte le plus grand visage dans la frame.
+        
+        Args:
+            frame: Image en format numpy array (BGR)
+            conf_threshold: Seuil de confiance (None = valeur par défaut du détecteur)
+            detection_resolution: Résolution de détection (None = valeur par défaut du détecteur)
+            
+        Returns:
+            Tuple (x_center, y_center, width, height, confidence) dans les coordonnées de la frame,
+            ou None si aucun visage n'est détecté
+        """
+        model = self.model
+        if model is None:
+            return None
+        
+        conf_threshold = self.conf_threshold if conf_threshold is None else conf_threshold
+        target_width, target_height = detection_resolution or (self.detection_width, self.detection_height)
+        
+        # OPTIMISATION : Redimensionner la frame pour accélérer YOLO
+        # Garder les dimensions originales pour le calcul des coordonnées
+        original_h, original_w = frame.shape[:2]
+        
+        # Calculer le ratio de redimensionnement
+        scale_x = original_w / target_width
+        scale_y = original_h / target_height
+        
+        # Redimensionner la frame pour YOLO
+        # Cela accélère considérablement la détection (4x plus rapide pour 640x480 vs 1280x720)
+        small_frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
+        
+        # Exécution de la détection YOLO sur la frame réduite
+        # Utiliser imgsz pour correspondre à notre redimensionnement
+        results = model(small_frame, conf=conf_threshold, imgsz=target_width, verbose=False, **self.predict_args)
+        
+        # Extraction des détections
+        if len(results) > 0:
+            return self._largest_face(results[0], scale_x, scale_y)
+        
+        return None
+    
+    def detect_tiled(self, frame: np.ndarray, conf_threshold: Optional[float] = None,
+                     tile_size: int = 480, overlap: float = 0.2) -> Optional[Tuple]:
+        """
+        Détection par tuiles sur la frame en pleine résolution, pour les visages lointains (10-20 px)
+        perdus lors du redimensionnement. Les tuiles se chevauchent, passent en un seul batch dans le
+        modèle (agrandies à la taille d'entrée) et les détections sont fusionnées par NMS inter-tuiles.
+        Plusieurs fois plus coûteux que detect() : à réserver aux frames sans visage détecté.
+        
+        Args:
+            frame: Image en format numpy array (BGR), en pleine résolution
+            conf_threshold: Seuil de confiance (None = valeur par défaut du détecteur)
+            tile_size: Taille des tuiles en pixels
+            overlap: Chevauchement entre tuiles voisines (0.0-1.0)
+            
+        Returns:
+            Tuple (x_center, y_center, width, height, confidence) dans les coordonnées de la frame,
+            ou None si aucun visage n'est détecté
+        """
+        model = self.model
+        if model is None or model.predictor is None:
+            return None  # Le prédicteur est construit par la première détection (ou le préchauffage)
+        
+        conf_threshold = self.conf_threshold if conf_threshold is None else conf_threshold
+        result = model.predictor.predict_tiles(frame, tile=tile_size, overlap=overlap, conf=conf_threshold)
+        return self._largest_face(result, 1.0, 1.0)
+    
+    @staticmethod
+    def _largest_face(result, scale_x: float, scale_y: float) -> Optional[Tuple]:
+        """
+        Extrait le plus grand visage (le plus proche) d'un résultat YOLO.
+        
+        Args:
+            result: Résultat YOLO (Results) d'une image
+            scale_x: Facteur d'échelle horizontal vers la frame originale
+            scale_y: Facteur d'échelle vertical vers la frame originale
+            
+        Returns:
+            Tuple (x_center, y_center, width, height, confidence) ou None
+        """
+        boxes = result.boxes
+        if len(boxes) == 0:
+            return None
+        
+        # Un seul transfert du bloc (n, 6) de l'image, puis calculs vectorisés
+        boxes = boxes.cpu().numpy()
+        xyxy = boxes.xyxy
+        
+        # Prendre le visage le plus grand (le plus proche)
+        areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        largest_idx = int(np.argmax(areas))
+        
+        # Coordonnées de la bounding box (sur la frame réduite)
+        x1, y1, x2, y2 = xyxy[largest_idx]
+        confidence = boxes.conf[largest_idx]
+        
+        # Convertir les coordonnées de la frame réduite vers la frame originale
+        x_center = int((x1 + x2) / 2 * scale_x)
+        y_center = int((y1 + y2) / 2 * scale_y)
+        width = int((x2 - x1) * scale_x)
+        height = int((y2 - y1) * scale_y)
+        
+        return (x_center, y_center, width, height, confidence)
+
+
 class FaceTracker:
     """
     Classe principale pour le tracking de visage avec le drone Tello.
@@ -369,20 +665,33 @@ class FaceTracker:
     
     def __init__(self, model_path: str = "yolov8n-face.pt", conf_threshold: float = 0.25, 
                  auto_wifi: bool = True, tello_ssid: Optional[str] = None,
-                 gui_mode: bool = False, detection_resolution: Tuple[int, int] = (640, 480)):
+                 gui_mode: bool = False, detection_resolution: Optional[Tuple[int, int]] = None,
+                 offline: bool = False, detector: Optional[FaceDetector] = None,
+                 pin_threads: bool = False, thread_budget: Optional[ThreadBudget] = None):
         """
         Initialise le tracker de visage.
         
         Args:
-            model_path: Chemin vers le modèle YOLO-face (.pt)
+            model_path: Chemin vers le modèle YOLO-face (.pt, ou .slim exporté avec `yolo export format=slim`)
             conf_threshold: Seuil de confiance pour la détection (0.0-1.0)
             auto_wifi: Active la gestion automatique Wi-Fi (True par défaut, forcé à False sous Windows)
             tello_ssid: SSID du réseau Tello (si None, sera détecté automatiquement)
             gui_mode: Active le mode GUI (désactive les prompts interactifs)
             detection_resolution: Résolution pour la détection YOLO (largeur, hauteur). Plus petit = plus rapide.
+                                  Si None, celle du détecteur (profil de calibration ou 640x480).
+            offline: Mode hors ligne : aucun accès réseau (téléchargements, vérifications, analytics).
+                     Recommandé une fois connecté au Wi-Fi du Tello, qui n'a pas d'accès Internet.
+            detector: Détecteur déjà chargé à réutiliser (model_path est alors ignoré).
+                      Si None, un détecteur est créé et le modèle chargé depuis model_path.
+            pin_threads: Épingle les threads de décodage et de détection sur des cœurs dédiés (Linux)
+            thread_budget: Budget de threads partagé (si None, un budget est calculé pour cette machine)
         """
         self.gui_mode = gui_mode
         
+        # Mode hors ligne : évite les timeouts DNS/socket au démarrage
+        if offline:
+            set_offline(True)
+        
         # Détection automatique de Windows : désactiver la gestion WiFi automatique
         # La gestion WiFi automatique utilise nmcli (Linux uniquement)
         if platform.system() == "Windows" and auto_wifi:
@@ -415,23 +724,25 @@ class FaceTracker:
                             sys.exit(0)
             print("=" * 40 + "\n")
         
-        # Chargement du modèle YOLO
-        # Si le chemin est relatif, essayer de le trouver dans les ressources PyInstaller
-        if not os.path.isabs(model_path) and not os.path.exists(model_path):
-            # Essayer de trouver le modèle dans les ressources PyInstaller
-            resource_path = get_resource_path(model_path)
-            if os.path.exists(resource_path):
-                model_path = resource_path
+        # Chargement du modèle YOLO (sauf si un détecteur déjà chargé est fourni)
+        if detector is None:
+            detector = FaceDetector(conf_threshold=conf_threshold, detection_resolution=detection_resolution)
+            try:
+                detector.load(model_path)
+            except FileNotFoundError as e:
+                print(f"Erreur: {e}")
+                print("Assurez-vous que le modèle est présent dans le répertoire courant.")
+                if self.wifi_manager:
+                    self.wifi_manager.cleanup()
+                sys.exit(1)
+        else:
+            print(f"Modèle YOLO déjà chargé ({detector.model_path}), chargement ignoré.")
         
-        print(f"Chargement du modèle YOLO depuis {model_path}...")
-        if not os.path.exists(model_path):
-            print(f"Erreur: Le fichier {model_path} n'existe pas.")
-            print("Assurez-vous que le modèle est présent dans le répertoire courant.")
-            if self.wifi_manager:
-                self.wifi_manager.cleanup()
-            sys.exit(1)
+        self.detector = detector
         
-        self.model = YOLO(model_path)
+        # Répartition des cœurs entre décodage, détection et contrôle (sans écraser la calibration)
+        self.thread_budget = (thread_budget or ThreadBudget(pin=pin_threads)).apply(detector.calibration)
+        print(f"Budget de threads: {self.thread_budget.summary()}")
         self.conf_threshold = conf_threshold
         
         print("Connexion au drone Tello...")
@@ -591,6 +902,21 @@ class FaceTracker:
             else:
                 raise
         
+        # Épinglage du thread de décodage vidéo (djitellopy : worker, Windows : read_thread)
+        frame_read = getattr(self, 'frame_read', None)
+        self.thread_budget.pin_thread(getattr(frame_read, 'worker', None) or getattr(frame_read, 'read_thread', None),
+                                      'decoder')
+        
+        self._init_control(detection_resolution)
+        
+    def _init_control(self, detection_resolution: Optional[Tuple[int, int]] = None):
+        """
+        Initialise les paramètres et l'état du contrôle, de la détection et des statistiques.
+        Ne dépend que de self.detector : utilisable sans drone (voir benchmarks/suite.py).
+        
+        Args:
+            detection_resolution: Résolution pour la détection YOLO (largeur, hauteur), None = celle du détecteur
+        """
         # Paramètres de contrôle
         self.center_x = 0  # Centre horizontal de l'image (sera mis à jour)
         self.center_y = 0  # Centre vertical de l'image (sera mis à jour)
@@ -642,13 +968,112 @@ class FaceTracker:
         self.rc_command_interval = 3
         
         # OPTIMISATION : Résolution pour la détection YOLO (plus petit = plus rapide)
-        self.detection_width, self.detection_height = detection_resolution
+        self.detection_width, self.detection_height = detection_resolution or \
+            (self.detector.detection_width, self.detector.detection_height)
         self.frame_skip_interval = 2  # Traiter 1 frame sur 2 pour améliorer les performances
         self._last_face_info = None  # Cache pour la dernière détection
+        self._track_counter = 0
+        
+        # Frames sans détection : boîte propagée par flux optique (None : dernière détection réutilisée)
+        self.box_propagator = BoxPropagator()
+        
+        # Détection par tuiles en pleine résolution (visages lointains), seulement sans visage détecté
+        self.tiled_detection = True
+        self.tile_size = 480  # Tuiles agrandies à la taille d'entrée du modèle (~2x par rapport à 640x480)
+        self.tile_overlap = 0.2
+        self.tiled_detection_interval = 5  # Une tentative par tuiles toutes les N frames sans visage
+        self._frames_without_face = 0
+        
+        # Détection déclenchée par le mouvement : YOLO sauté tant que la scène et le visage sont immobiles
+        self.motion_gate = MotionGate()
+        
+        # Instrumentation mémoire (désactivée par défaut, voir enable_memory_probe)
+        self.memory_probe = None
+        
+        # Profilage par couche et par étape (désactivé par défaut, voir request_profile)
+        self.profiler = None
+        self._profile_request = None  # (frames, dossier) demandé, appliqué par la boucle de tracking
+        self._profile_frames = 0
+        self._profile_output = None
         
         # Flag pour éviter les appels multiples de cleanup
         self._cleaning = False
         
+    def enable_memory_probe(self, interval: int = 500):
+        """
+        Active l'instrumentation mémoire : allocations par frame et croissance attribuées aux lignes
+        de FaceTracker, BasePredictor et TrackingThread, avec un rapport toutes les `interval` frames.
+        Ralentit fortement la boucle (tracemalloc) : à réserver au diagnostic.
+        
+        Args:
+            interval: Nombre de frames entre deux rapports
+            
+        Returns:
+            La sonde (tello_memory.MemoryProbe)
+        """
+        from tello_memory import MemoryProbe
+        self.memory_probe = MemoryProbe(interval=interval).start()
+        print(f"Instrumentation mémoire activée (rapport toutes les {interval} frames)")
+        return self.memory_probe
+    
+    def request_profile(self, frames: int = 300, output: str = "profiles"):
+        """
+        Demande le profilage des `frames` prochaines frames : temps par couche du modèle et par étape
+        (chargement, prétraitement, inférence, NMS, résultats, contrôle, overlay), exportés en trace
+        Chrome (trace.json, à ouvrir dans chrome://tracing ou https://ui.perfetto.dev) et en tableau
+        trié (profile.txt) dans output/<date>/. Appelable depuis un autre thread (GUI) : la demande
+        est appliquée par la boucle de tracking à la frame suivante. frames=0 arrête le profilage
+        en cours et exporte les frames déjà mesurées.
+        
+        Args:
+            frames: Nombre de frames à profiler (0 = arrêt)
+            output: Dossier des profils
+        """
+        self._profile_request = (frames, output)
+    
+    def profile_stage(self, name: str):
+        """
+        Chronomètre une étape de la boucle de tracking pendant un profilage (sans effet sinon).
+        """
+        profiler = self.profiler
+        return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
+    
+    def profile_step(self) -> Optional[str]:
+        """
+        À appeler une fois par frame par la boucle de tracking : applique les demandes de profilage,
+        compte les frames profilées et exporte le profil une fois le nombre de frames atteint.
+        
+        Returns:
+            Message à afficher (début ou résultat du profilage), None sinon
+        """
+        request, self._profile_request = self._profile_request, None
+        if request is None:
+            if self.profiler is None:
+                return None
+            self.profiler.step()
+            return self._finish_profile() if self.profiler.frames >= self._profile_frames else None
+        
+        frames, output = request
+        message = self._finish_profile() if self.profiler is not None else None
+        if frames <= 0:
+            return message
+        model = self.model
+        if model is None or model.predictor is None:
+            return "Profilage impossible: modèle non chargé"
+        from ultralytics.yolo.utils.profiler import Profiler
+        self.profiler = Profiler().attach(model.predictor)
+        self._profile_frames, self._profile_output = frames, output
+        return f"Profilage des {frames} prochaines frames..."
+    
+    def _finish_profile(self) -> str:
+        """
+        Termine le profilage en cours et exporte la trace et le tableau.
+        """
+        profiler, self.profiler = self.profiler, None
+        profiler.detach()
+        trace, _ = profiler.export(Path(self._profile_output) / time.strftime("%Y%m%d-%H%M%S"))
+        return f"{profiler.table()}\nProfil exporté: {trace} (chrome://tracing)"
+    
     def get_frame(self) -> Optional[np.ndarray]:
         """
         Récupère une frame du flux vidéo du Tello.
@@ -674,6 +1099,13 @@ class FaceTracker:
             print(f"Erreur lors de la récupération de la frame: {e}")
         return None
     
+    @property
+    def model(self):
+        """
+        Modèle YOLO courant du détecteur (peut changer si le détecteur recharge un modèle).
+        """
+        return self.detector.model
+    
     def detect_face(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """
         Détecte un visage dans la frame en utilisant YOLO.
@@ -685,53 +1117,64 @@ class FaceTracker:
             Tuple (x_center, y_center, width, height) du visage détecté,
             ou None si aucun visage n'est détecté
         """
-        # OPTIMISATION : Redimensionner la frame pour accélérer YOLO
-        # Garder les dimensions originales pour le calcul des coordonnées
-        original_h, original_w = frame.shape[:2]
-        
-        # Redimensionner à une résolution plus petite pour YOLO
-        # Cela accélère considérablement la détection (4x plus rapide pour 640x480 vs 1280x720)
-        target_width = self.detection_width
-        target_height = self.detection_height
-        
-        # Calculer le ratio de redimensionnement
-        scale_x = original_w / target_width
-        scale_y = original_h / target_height
-        
-        # Redimensionner la frame pour YOLO
-        small_frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
-        
-        # Exécution de la détection YOLO sur la frame réduite
-        # Utiliser imgsz pour correspondre à notre redimensionnement
-        results = self.model(small_frame, conf=self.conf_threshold, imgsz=target_width, verbose=False)
+        # Scène immobile et visage stable : dernier résultat réutilisé sans passer par YOLO
+        gate = self.motion_gate
+        if gate is not None and not gate.should_detect(frame):
+            return gate.face_info
+        face_info = self._detect(frame)
+        if gate is not None:
+            gate.update(frame, face_info)
+        return face_info
+    
+    def track_face(self, frame: np.ndarray) -> Optional[Tuple]:
+        """
+        Visage de la frame pour la boucle de tracking : détection toutes les frame_skip_interval frames,
+        et entre deux détections, boîte propagée par flux optique. Si la qualité de la propagation
+        devient insuffisante, la détection est relancée sur la frame même.
         
-        # Extraction des détections
-        if len(results) > 0 and len(results[0].boxes) > 0:
-            # Prendre le visage le plus grand (le plus proche)
-            boxes = results[0].boxes
-            areas = []
-            for box in boxes:
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                area = (x2 - x1) * (y2 - y1)
-                areas.append(area)
-            
-            # Index du visage le plus grand
-            largest_idx = np.argmax(areas)
-            box = boxes[largest_idx]
-            
-            # Coordonnées de la bounding box (sur la frame réduite)
-            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-            confidence = box.conf[0].cpu().numpy()
-            
-            # Convertir les coordonnées de la frame réduite vers la frame originale
-            x_center = int((x1 + x2) / 2 * scale_x)
-            y_center = int((y1 + y2) / 2 * scale_y)
-            width = int((x2 - x1) * scale_x)
-            height = int((y2 - y1) * scale_y)
+        Args:
+            frame: Image en format numpy array (BGR)
             
-            return (x_center, y_center, width, height, confidence)
-        
-        return None
+        Returns:
+            Tuple (x_center, y_center, width, height, confidence) du visage, ou None
+        """
+        self._track_counter += 1
+        propagator = self.box_propagator
+        if self._track_counter % self.frame_skip_interval != 0:
+            if propagator is None or not propagator.active:
+                return self._last_face_info  # Pas de piste : dernière détection réutilisée
+            with self.profile_stage('optical_flow'):
+                face_info = propagator.propagate(frame)
+            if face_info is not None:
+                self._last_face_info = face_info
+                return face_info
+            self._track_counter = 0  # Propagation décrochée : détection immédiate, cadence recalée
+        
+        with self.profile_stage('detect_face'):
+            face_info = self.detect_face(frame)
+        if propagator is not None:
+            with self.profile_stage('optical_flow'):
+                propagator.start(frame, face_info)
+        self._last_face_info = face_info  # Aucun visage : pas de dernière détection à réutiliser
+        return face_info
+    
+    def _detect(self, frame: np.ndarray) -> Optional[Tuple]:
+        """
+        Détection YOLO à la résolution de détection, puis par tuiles en pleine résolution
+        périodiquement tant qu'aucun visage n'est trouvé.
+        """
+        face_info = self.detector.detect(frame, self.conf_threshold, (self.detection_width, self.detection_height))
+        if face_info is not None:
+            self._frames_without_face = 0
+            return face_info
+        
+        # Aucun visage à la résolution normale : tentative périodique par tuiles en pleine résolution
+        self._frames_without_face += 1
+        if self.tiled_detection and self._frames_without_face % self.tiled_detection_interval == 0:
+            face_info = self.detector.detect_tiled(frame, self.conf_threshold, self.tile_size, self.tile_overlap)
+            if face_info is not None:
+                self._frames_without_face = 0
+        return face_info
     
     def calculate_control(self, face_info: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
         """
@@ -842,6 +1285,16 @@ class FaceTracker:
         
         return (left_right, forward_backward, up_down, yaw)
     
+    def send_rc_control(self, left_right_velocity: int, forward_backward_velocity: int, up_down_velocity: int,
+                        yaw_velocity: int):
+        """
+        Envoie une commande rc au drone et la signale à la porte de mouvement : tant que le drone se
+        déplace, la détection n'est pas sautée, même si l'image change peu (scène peu contrastée).
+        """
+        self.tello.send_rc_control(left_right_velocity, forward_backward_velocity, up_down_velocity, yaw_velocity)
+        if self.motion_gate is not None:
+            self.motion_gate.command(left_right_velocity, forward_backward_velocity, up_down_velocity, yaw_velocity)
+    
     def draw_overlay(self, frame: np.ndarray, face_info: Optional[Tuple], 
                      velocity: Tuple[int, int, int, int]) -> np.ndarray:
         """
@@ -972,7 +1425,8 @@ class FaceTracker:
         print("Appuyez sur 'q' pour quitter")
         print("Appuyez sur 't' pour decoller/atterrir")
         print("Appuyez sur 'w/a/s/d' pour controle manuel")
-        print("Appuyez sur 'r' pour reset les parametres PID\n")
+        print("Appuyez sur 'r' pour reset les parametres PID")
+        print("Appuyez sur 'p' pour profiler les 300 prochaines frames (ou arreter le profilage)\n")
         
         # Initialisation du centre de l'image (sera mis à jour avec la première frame)
         frame = self.get_frame()
@@ -985,12 +1439,12 @@ class FaceTracker:
         self.center_x = w // 2
         self.center_y = h // 2
         
+        # La boucle exécute la détection : épinglage sur les cœurs de détection
+        self.thread_budget.pin_current('detector')
+        
         # État du drone
         is_flying = False
         
-        # OPTIMISATION : Compteur pour sauter des frames (traiter 1 frame sur N)
-        frame_skip_counter = 0
-        
         try:
             while True:
                 # Récupération de la frame
@@ -998,25 +1452,15 @@ class FaceTracker:
                 if frame is None:
                     continue
                 
-                # OPTIMISATION : Sauter certaines frames pour la détection
-                # Cela améliore les performances en traitant moins de frames
-                frame_skip_counter += 1
-                should_detect = (frame_skip_counter % self.frame_skip_interval == 0)
-                
-                # Détection du visage (seulement toutes les N frames)
-                if should_detect:
-                    face_info = self.detect_face(frame)
-                    # Sauvegarder la dernière détection pour les frames sautées
-                    if face_info is not None:
-                        self._last_face_info = face_info
-                else:
-                    # Réutiliser la dernière détection pour les frames sautées
-                    face_info = self._last_face_info
+                # OPTIMISATION : Détection toutes les N frames, flux optique entre les deux
+                face_info = self.track_face(frame)
                 
                 # Calcul des commandes de contrôle
                 if face_info is not None:
                     x_center, y_center, width, height, _ = face_info
-                    left_right, forward_backward, up_down, yaw = self.calculate_control((x_center, y_center, width, height))
+                    with self.profile_stage('control'):
+                        left_right, forward_backward, up_down, yaw = self.calculate_control(
+                            (x_center, y_center, width, height))
                     self.no_detection_count = 0
                 else:
                     # Aucun visage détecté - arrêter le mouvement
@@ -1045,7 +1489,7 @@ class FaceTracker:
                     # - Distance: avancer/reculer selon la taille du visage
                     self.rc_command_counter += 1
                     if self.rc_command_counter >= self.rc_command_interval:
-                            self.tello.send_rc_control(
+                            self.send_rc_control(
                                 left_right_velocity=left_right,      # Mouvement latéral (gauche/droite)
                                 forward_backward_velocity=forward_backward,  # Avancer/reculer
                                 up_down_velocity=-up_down,          # Mouvement vertical (inversé: visage en haut = descendre)
@@ -1056,7 +1500,8 @@ class FaceTracker:
                     #    self.tello.send_rc_control(0, 0, 0, 0)
                 
                 # Dessin de l'overlay
-                frame = self.draw_overlay(frame, face_info, (left_right, forward_backward, up_down, yaw))
+                with self.profile_stage('overlay'):
+                    frame = self.draw_overlay(frame, face_info, (left_right, forward_backward, up_down, yaw))
                 
                 # Affichage de la frame
                 cv2.imshow("Tello Face Tracking", frame)
@@ -1074,28 +1519,30 @@ class FaceTracker:
                         time.sleep(3)
                     else:
                         print("Atterrissage...")
-                        self.tello.send_rc_control(0, 0, 0, 0)
+                        self.send_rc_control(0, 0, 0, 0)
                         time.sleep(1)
                         self.tello.land()
                         is_flying = False
                 elif key == ord('z') and is_flying:
-                    self.tello.send_rc_control(0, 20, 0, 0)  # Avancer
+                    self.send_rc_control(0, 20, 0, 0)  # Avancer
                 elif key == ord('s') and is_flying:
-                    self.tello.send_rc_control(0, -20, 0, 0)  # Reculer
+                    self.send_rc_control(0, -20, 0, 0)  # Reculer
                 elif key == ord('q') and is_flying:
-                    self.tello.send_rc_control(-20, 0, 0, 0)  # Gauche
+                    self.send_rc_control(-20, 0, 0, 0)  # Gauche
                 elif key == ord('d') and is_flying:
-                    self.tello.send_rc_control(20, 0, 0, 0)  # Droite
+                    self.send_rc_control(20, 0, 0, 0)  # Droite
                 elif key == 82 and is_flying:
-                    self.tello.send_rc_control(0, 0, 20, 0)  # Monter
+                    self.send_rc_control(0, 0, 20, 0)  # Monter
                 elif key == 84 and is_flying:
-                    self.tello.send_rc_control(0, 0, -20, 0)  # Descendre
+                    self.send_rc_control(0, 0, -20, 0)  # Descendre
                 elif key == 83 and is_flying:
-                    self.tello.send_rc_control(0, 0, 0, 20)  # Tourner à droite
+                    self.send_rc_control(0, 0, 0, 20)  # Tourner à droite
                 elif key == 81 and is_flying:
-                    self.tello.send_rc_control(0, 0, 0, -20)  # Tourner à gauche
+                    self.send_rc_control(0, 0, 0, -20)  # Tourner à gauche
                 elif key == ord(' ') and is_flying:
-                    self.tello.send_rc_control(0, 0, 0, 0)  # Stop
+                    self.send_rc_control(0, 0, 0, 0)  # Stop
+                elif key == ord('p'):
+                    self.request_profile(0 if self.profiler is not None else 300)  # Profilage marche/arrêt
                 
                 # Calcul du FPS
                 self.frame_count += 1
@@ -1103,6 +1550,17 @@ class FaceTracker:
                 if elapsed > 0:
                     self.fps = self.frame_count / elapsed
                 
+                # Instrumentation mémoire (si activée)
+                if self.memory_probe is not None:
+                    report = self.memory_probe.step()
+                    if report:
+                        print(self.memory_probe.format(report))
+                
+                # Profilage (si demandé)
+                message = self.profile_step()
+                if message:
+                    print(message)
+                
         except KeyboardInterrupt:
             print("\nInterruption clavier detectee...")
         except Exception as e:
@@ -1122,6 +1580,19 @@ class FaceTracker:
         
         print("\nNettoyage des ressources...")
         
+        # Export du profilage en cours
+        if getattr(self, 'profiler', None) is not None:
+            try:
+                print(self._finish_profile())
+            except Exception as e:
+                print(f"Erreur lors de l'export du profil: {e}")
+        
+        # Bilan de l'instrumentation mémoire
+        if getattr(self, 'memory_probe', None) is not None:
+            print(self.memory_probe.summary())
+            self.memory_probe.stop()
+            self.memory_probe = None
+        
         # Atterrissage du drone si nécessaire
         try:
             if hasattr(self, 'tello') and self.tello is not None:
@@ -1207,7 +1678,7 @@ def main():
         '--model',
         type=str,
         default="yolov8n-face.pt",
-        help="Chemin vers le modèle YOLO-face (.pt)"
+        help="Chemin vers le modèle YOLO-face (.pt, ou .slim : chargement plus rapide, voir yolo export format=slim)"
     )
     parser.add_argument(
         '--conf',
@@ -1226,6 +1697,89 @@ def main():
         default=None,
         help="SSID du réseau Tello (si non spécifié, sera détecté automatiquement)"
     )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help="Mode hors ligne : désactive tout accès réseau d'ultralytics (équivalent à YOLO_OFFLINE=True)"
+    )
+    parser.add_argument(
+        '--pin-threads',
+        action='store_true',
+        help="Épingle les threads de décodage et de détection sur des cœurs dédiés (Linux)"
+    )
+    parser.add_argument(
+        '--no-motion-gate',
+        action='store_true',
+        help="Détecte à chaque frame, même quand la scène est immobile (vol stationnaire)"
+    )
+    parser.add_argument(
+        '--no-optical-flow',
+        action='store_true',
+        help="Réutilise la dernière détection entre deux détections au lieu de propager la boîte par flux optique"
+    )
+    parser.add_argument(
+        '--memory-probe',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Instrumentation mémoire (tracemalloc) : allocations et croissance toutes les N frames (0 = désactivée)"
+    )
+    parser.add_argument(
+        '--profile',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Profile les N premières frames (temps par couche et par étape, trace Chrome dans profiles/)"
+    )
+    parser.add_argument(
+        '--calibrate',
+        action='store_true',
+        help="Calibre les threads, la résolution de détection et le backend pour cette machine, puis quitte"
+    )
+    parser.add_argument(
+        '--calibrate-source',
+        type=str,
+        default=None,
+        help="Frames enregistrées pour la calibration (vidéo, dossier d'images ou motif glob). "
+             "Par défaut : frames synthétiques"
+    )
+    parser.add_argument(
+        '--calibrate-target',
+        type=float,
+        default=0.9,
+        help="Précision minimale par rapport à l'exécution de référence (0.0-1.0)"
+    )
+    parser.add_argument(
+        '--calibrate-frames',
+        type=int,
+        default=30,
+        help="Nombre de frames mesurées par configuration"
+    )
+    parser.add_argument(
+        '--mine',
+        type=str,
+        default=None,
+        help="Extrait les frames difficiles des vols enregistrés (vidéo, dossier ou motif glob) "
+             "au format jeu de données YOLO, puis quitte"
+    )
+    parser.add_argument(
+        '--mine-output',
+        type=str,
+        default='hard_frames',
+        help="Dossier du jeu de données des frames difficiles"
+    )
+    parser.add_argument(
+        '--mine-top-k',
+        type=int,
+        default=200,
+        help="Nombre de frames difficiles exportées"
+    )
+    parser.add_argument(
+        '--mine-stride',
+        type=int,
+        default=1,
+        help="Analyse une frame vidéo sur N"
+    )
     parser.add_argument(
         '--gui',
         action='store_true',
@@ -1239,6 +1793,30 @@ def main():
     
     args = parser.parse_args()
     
+    model_path = FaceDetector.resolve_model_path(args.model)
+    if args.mine:
+        import tello_mining
+        tello_mining.mine_hard_frames(model_path, args.mine, args.mine_output, top_k=args.mine_top_k,
+                                      conf_threshold=args.conf, stride=args.mine_stride)
+        return
+
+    # Calibration explicite, ou recalibration si le matériel ou le modèle ont changé
+    if args.calibrate or (os.path.exists(model_path) and tello_calibration.needs_recalibration(model_path)):
+        if not args.calibrate:
+            print("Matériel ou modèle modifié depuis la dernière calibration, recalibration...")
+        source = args.calibrate_source
+        if source is None and not args.calibrate:
+            source = (tello_calibration.read_profile() or {}).get('source')  # Reprendre les frames précédentes
+        try:
+            tello_calibration.calibrate(model_path, source=source, target_accuracy=args.calibrate_target,
+                                        n_frames=args.calibrate_frames, conf_threshold=args.conf)
+        except Exception as e:
+            if args.calibrate:
+                raise
+            print(f"⚠ Recalibration impossible ({e}), réglages par défaut utilisés")
+        if args.calibrate:
+            return
+    
     # Détection du mode GUI
     use_gui = False
     if args.gui:
@@ -1267,8 +1845,18 @@ def main():
             conf_threshold=args.conf,
             auto_wifi=not args.no_auto_wifi,
             tello_ssid=args.tello_ssid,
-            gui_mode=False
+            gui_mode=False,
+            offline=args.offline,
+            pin_threads=args.pin_threads
         )
+        if args.no_motion_gate:
+            tracker.motion_gate = None
+        if args.no_optical_flow:
+            tracker.box_propagator = None
+        if args.memory_probe > 0:
+            tracker.enable_memory_probe(args.memory_probe)
+        if args.profile > 0:
+            tracker.request_profile(args.profile)
         tracker.run()
 
 
@@ -84,6 +84,8 @@ a = Analysis(
         # Modules GUI
         'gui.tello_gui',
         'gui.components.tracking_thread',
+        'gui.components.init_thread',
+        'gui.components.detector_thread',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Propagation de la boîte du visage par flux optique entre deux détections.
+
+Entre deux passages de YOLO, la boîte du visage est déplacée en suivant quelques points
+caractéristiques (cv2.goodFeaturesToTrack) à l'intérieur de la dernière boîte détectée, avec
+le flux optique de Lucas-Kanade pyramidal (cv2.calcOpticalFlowPyrLK) sur des frames réduites en
+niveaux de gris. Beaucoup moins coûteux qu'une détection.
+
+Estimation robuste :
+    - les points sont suivis aller-retour : ceux dont l'erreur aller-retour dépasse 1 px sont écartés
+    - translation : médiane des déplacements des points restants
+    - échelle : médiane des rapports de distances entre paires de points
+La qualité (0.0-1.0) combine la part de points conservés et la dispersion des déplacements autour
+de la médiane ; sous le seuil, la propagation s'arrête et une nouvelle détection est nécessaire.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class BoxPropagator:
+    """
+    Propagation d'une boîte (x_center, y_center, width, height, confidence) de frame en frame.
+
+    Exemple :
+        propagator.start(frame, face_info)  # après une détection
+        face_info = propagator.propagate(next_frame)  # None : détection nécessaire
+    """
+
+    def __init__(self, width: int = 320, max_points: int = 30, min_points: int = 5, min_quality: float = 0.5,
+                 fb_threshold: float = 1.0):
+        """
+        Args:
+            width: Largeur des frames réduites sur lesquelles les points sont suivis
+            max_points: Nombre maximal de points suivis dans la boîte
+            min_points: Nombre minimal de points conservés pour propager la boîte
+            min_quality: Qualité minimale (0.0-1.0) en dessous de laquelle une détection est demandée
+            fb_threshold: Erreur aller-retour maximale d'un point (px, sur la frame réduite)
+        """
+        self.width = width
+        self.max_points = max_points
+        self.min_points = min_points
+        self.min_quality = min_quality
+        self.fb_threshold = fb_threshold
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.quality = 0.0  # Qualité de la dernière propagation
+        self.reset()
+
+    def reset(self):
+        """
+        Abandonne la piste : la prochaine boîte viendra d'une détection.
+        """
+        self.points: Optional[np.ndarray] = None  # Points suivis (n, 1, 2), coordonnées réduites
+        self.gray: Optional[np.ndarray] = None  # Frame réduite précédente
+        self.box: Optional[np.ndarray] = None  # x_center, y_center, width, height (coordonnées réduites)
+        self.confidence = 0.0
+        self.scale = 1.0  # Frame réduite / frame originale
+        self.seeded = 0  # Points trouvés à la dernière détection
+
+    @property
+    def active(self) -> bool:
+        """
+        Une piste est en cours (boîte détectée avec assez de points).
+        """
+        return self.points is not None
+
+    def _gray(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        self.scale = min(self.width / w, 1.0)
+        small = cv2.resize(frame, (round(w * self.scale), round(h * self.scale)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def start(self, frame: np.ndarray, face_info: Optional[Tuple]) -> bool:
+        """
+        Initialise la piste sur une boîte détectée : points caractéristiques à l'intérieur de la boîte.
+
+        Args:
+            frame: Frame de la détection (BGR)
+            face_info: Boîte détectée (x_center, y_center, width, height, confidence), None abandonne la piste
+
+        Returns:
+            True si assez de points ont été trouvés pour propager la boîte
+        """
+        self.reset()
+        if face_info is None:
+            return False
+        gray = self._gray(frame)
+        box = np.array(face_info[:4], dtype=np.float32) * self.scale
+        x, y, w, h = box
+        mask = np.zeros_like(gray)
+        # Intérieur de la boîte (80 %) : évite les points du fond, qui ne suivent pas le visage
+        x1, y1 = max(int(x - 0.4 * w), 0), max(int(y - 0.4 * h), 0)
+        x2, y2 = int(x + 0.4 * w), int(y + 0.4 * h)
+        mask[y1:y2, x1:x2] = 255
+        points = cv2.goodFeaturesToTrack(gray, self.max_points, qualityLevel=0.01,
+                                         minDistance=max(2, int(min(w, h) / 10)), mask=mask)
+        if points is None or len(points) < self.min_points:
+            return False
+        self.points, self.gray, self.box = points.astype(np.float32), gray, box
+        self.confidence = float(face_info[4]) if len(face_info) > 4 else 1.0
+        self.seeded = len(points)
+        self.quality = 1.0
+        return True
+
+    def propagate(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int, float]]:
+        """
+        Déplace la boîte sur une nouvelle frame.
+
+        Returns:
+            Boîte (x_center, y_center, width, height, confidence) dans les coordonnées de la frame, la
+            confiance de la détection étant pondérée par la qualité, ou None si la qualité est
+            insuffisante (une détection est alors nécessaire)
+        """
+        if self.points is None:
+            return None
+        gray = self._gray(frame)
+        p0 = self.points
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self.gray, gray, p0, None, **self.lk_params)
+        p0r, st_r, _ = cv2.calcOpticalFlowPyrLK(gray, self.gray, p1, None, **self.lk_params)
+        fb_error = np.linalg.norm((p0 - p0r).reshape(-1, 2), axis=1)
+        good = (st.ravel() == 1) & (st_r.ravel() == 1) & (fb_error < self.fb_threshold)
+        if np.count_nonzero(good) < self.min_points:
+            self.quality = 0.0
+            self.reset()
+            return None
+
+        a, b = p0[good].reshape(-1, 2), p1[good].reshape(-1, 2)
+        d = b - a
+        translation = np.median(d, axis=0)
+        i, j = np.triu_indices(len(a), k=1)
+        da, db = np.linalg.norm(a[i] - a[j], axis=1), np.linalg.norm(b[i] - b[j], axis=1)
+        valid = da > 1.0  # Paires trop proches : rapport instable
+        scale = float(np.median(db[valid] / da[valid])) if np.any(valid) else 1.0
+
+        x, y, w, h = self.box
+        residual = float(np.median(np.linalg.norm(d - translation, axis=1)))
+        size = max(min(w, h), 1.0)
+        self.quality = len(a) / self.seeded * max(0.0, 1.0 - residual / (0.1 * size))
+        box = np.array([x + translation[0], y + translation[1], w * scale, h * scale], dtype=np.float32)
+        gh, gw = gray.shape[:2]
+        if self.quality < self.min_quality or not (0 <= box[0] < gw and 0 <= box[1] < gh):
+            self.reset()
+            return None
+
+        self.points, self.gray, self.box = b.reshape(-1, 1, 2), gray, box
+        x, y, w, h = box / self.scale
+        return int(x), int(y), int(w), int(h), self.confidence * self.quality
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation mémoire des sessions de tracking longues.
+
+Sur un long vol, la mémoire résidente (RSS) du processus augmente lentement. La sonde suit,
+frame par frame, les allocations Python et numpy (tracemalloc) et, par fenêtres de N frames,
+compare deux instantanés pour attribuer la croissance aux lignes de FaceTracker, BasePredictor
+et TrackingThread qui l'ont provoquée (premier appelant surveillé dans la pile d'allocation).
+
+Mesures de chaque fenêtre :
+    - RSS et mémoire suivie par tracemalloc, croissance par frame
+    - allocations par frame : pic de mémoire allouée pendant la frame, au-delà de la mémoire conservée
+    - statistiques de l'allocateur torch (CUDA uniquement : les tenseurs CPU n'apparaissent que dans le RSS)
+
+tracemalloc ralentit fortement l'interpréteur : mode de diagnostic, pas de production.
+"""
+
+import os
+import tracemalloc
+from collections import Counter, deque
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+import psutil
+import torch
+
+# Fichiers auxquels les allocations sont attribuées (du plus spécifique au plus général)
+WATCHED = ('tello_face_tracking.py', 'gui/components/tracking_thread.py', 'ultralytics/yolo/engine/predictor.py',
+           'ultralytics/yolo/v8/detect/predict.py', 'ultralytics/yolo/engine/results.py')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def rss_mb() -> float:
+    """
+    Mémoire résidente du processus en Mo.
+    """
+    return psutil.Process().memory_info().rss / 1E6
+
+
+def torch_allocator_stats() -> Dict[str, float]:
+    """
+    Mémoire allouée et réservée par l'allocateur CUDA de torch (Mo), vide sans GPU.
+    """
+    if not torch.cuda.is_available() or not torch.cuda.is_initialized():
+        return {}
+    stats = torch.cuda.memory_stats()
+    return {'allocated_mb': stats.get('allocated_bytes.all.current', 0) / 1E6,
+            'reserved_mb': stats.get('reserved_bytes.all.current', 0) / 1E6,
+            'alloc_retries': stats.get('num_alloc_retries', 0)}
+
+
+class MemoryProbe:
+    """
+    Sonde d'allocations et de croissance mémoire, appelée une fois par frame avec step().
+
+    Exemple :
+        probe = MemoryProbe(interval=500).start()
+        while ...:
+            ...  # traitement d'une frame
+            report = probe.step()
+            if report:
+                print(probe.format(report))
+        print(probe.summary())
+        probe.stop()
+    """
+
+    def __init__(self, interval: int = 500, nframe: int = 12, top: int = 5, watched: Tuple[str, ...] = WATCHED):
+        """
+        Args:
+            interval: Nombre de frames par fenêtre (un instantané tracemalloc et un rapport par fenêtre)
+            nframe: Profondeur des piles d'allocation enregistrées (assez pour remonter aux fichiers surveillés)
+            top: Nombre de lignes responsables affichées par rapport
+            watched: Fichiers (chemins relatifs au projet) auxquels attribuer les allocations
+        """
+        self.interval = interval
+        self.nframe = nframe
+        self.top = top
+        self.watched = tuple(w.replace('/', os.sep) for w in watched)
+        self.frames = 0
+        self.reports = deque(maxlen=1000)  # Borné : la sonde ne doit pas grossir avec la session
+        self._frame_allocs = []  # Pic alloué par frame de la fenêtre courante (octets)
+        self._base = 0  # Mémoire suivie à la fin de la frame précédente
+        self._snapshot = None
+        self._window = (0, 0.0, 0)  # Début de la fenêtre courante : frame, RSS (Mo), mémoire suivie
+        self._started = False
+
+    def start(self) -> 'MemoryProbe':
+        """
+        Démarre tracemalloc (s'il ne l'est pas déjà) et prend l'instantané de référence.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframe)
+            self._started = True
+        self._snapshot = self._take_snapshot()
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        self._window = (self.frames, rss_mb(), self._base)
+        return self
+
+    def stop(self):
+        """
+        Arrête tracemalloc s'il a été démarré par la sonde.
+        """
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        self._snapshot = None
+
+    def step(self) -> Optional[Dict[str, Any]]:
+        """
+        Termine la frame courante. Retourne le rapport de la fenêtre toutes les `interval` frames, None sinon.
+        """
+        if self._snapshot is None:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        self._frame_allocs.append(max(peak - self._base, 0))
+        tracemalloc.reset_peak()
+        self._base = current
+        self.frames += 1
+        if self.frames % self.interval:
+            return None
+
+        # Fin de fenêtre : croissance et attribution par différence d'instantanés
+        snapshot = self._take_snapshot()
+        sites = self._attribute(snapshot.compare_to(self._snapshot, 'traceback'))
+        self._snapshot = snapshot
+        start_frame, start_rss, start_traced = self._window
+        n = self.frames - start_frame
+        rss = rss_mb()
+        allocs = np.array(self._frame_allocs) / 1E3
+        report = {'frame': self.frames,
+                  'rss_mb': round(rss, 1),
+                  'traced_mb': round(current / 1E6, 3),
+                  'rss_growth_kb_per_frame': round((rss - start_rss) * 1E3 / n, 3),
+                  'traced_growth_kb_per_frame': round((current - start_traced) / 1E3 / n, 3),
+                  'alloc_kb_per_frame': round(float(np.median(allocs)), 1),
+                  'alloc_kb_per_frame_p99': round(float(np.percentile(allocs, 99)), 1),
+                  'alloc_kb_per_frame_max': round(float(allocs.max()), 1),
+                  'torch': torch_allocator_stats(),
+                  'sites': sites.most_common(self.top)}
+        self.reports.append(report)
+        self._frame_allocs = []
+        self._window = (self.frames, rss, current)  # Mesures avant instantané, comme en fin de fenêtre
+        tracemalloc.reset_peak()  # L'instantané ne compte pas dans la frame suivante
+        self._base = tracemalloc.get_traced_memory()[0]
+        return report
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            tracemalloc.Filter(False, '<unknown>')))
+
+    def _attribute(self, diff) -> Counter:
+        """
+        Croissance (Ko) par ligne responsable : le plus récent appelant situé dans un fichier surveillé,
+        à défaut le lieu d'allocation lui-même.
+        """
+        sites = Counter()
+        for stat in diff:
+            if stat.size_diff:
+                sites[self._site(stat.traceback)] += stat.size_diff / 1E3
+        return sites
+
+    def _site(self, traceback) -> str:
+        for frame in reversed(traceback):  # Du plus récent au plus ancien
+            if frame.filename.endswith(self.watched):
+                return f"{os.path.relpath(frame.filename, ROOT)}:{frame.lineno}"
+        frame = traceback[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+    @staticmethod
+    def format(report: Dict[str, Any]) -> str:
+        """
+        Rapport d'une fenêtre sur quelques lignes.
+        """
+        lines = [f"[mémoire] frame {report['frame']}: RSS {report['rss_mb']:.1f} Mo "
+                 f"({report['rss_growth_kb_per_frame']:+.2f} Ko/frame), suivie {report['traced_mb']:.1f} Mo "
+                 f"({report['traced_growth_kb_per_frame']:+.2f} Ko/frame), allouée par frame "
+                 f"{report['alloc_kb_per_frame']:.0f} Ko (p99 {report['alloc_kb_per_frame_p99']:.0f} Ko)"]
+        if report['torch']:
+            lines.append("  torch CUDA: " + ", ".join(f"{k} {v:.1f}" for k, v in report['torch'].items()))
+        lines += [f"  {kb:+10.1f} Ko  {site}" for site, kb in report['sites'] if kb > 0]
+        return "\n".join(lines)
+
+    def growth(self, skip: int = 1) -> Dict[str, float]:
+        """
+        Croissance moyenne par frame (Ko) sur la session, hors `skip` premières fenêtres (préchauffage,
+        caches et buffers alloués une fois).
+        """
+        reports = list(self.reports)[skip:]
+        if len(reports) < 2:
+            return {}
+        first, last = reports[0], reports[-1]
+        n = last['frame'] - first['frame']
+        return {'rss_kb_per_frame': (last['rss_mb'] - first['rss_mb']) * 1E3 / n,
+                'traced_kb_per_frame': (last['traced_mb'] - first['traced_mb']) * 1E3 / n,
+                'alloc_kb_per_frame': max(r['alloc_kb_per_frame'] for r in reports),
+                'alloc_kb_per_frame_p99': max(r['alloc_kb_per_frame_p99'] for r in reports),
+                'alloc_kb_per_frame_max': max(r['alloc_kb_per_frame_max'] for r in reports)}
+
+    def check(self, max_growth_kb: float, alloc_budget_kb: float, skip: int = 1) -> List[str]:
+        """
+        Vérifie une croissance bornée et le budget d'allocation par frame.
+
+        Args:
+            max_growth_kb: Croissance maximale tolérée du RSS et de la mémoire suivie (Ko par frame)
+            alloc_budget_kb: Allocation maximale par frame (p99 de chaque fenêtre, Ko) : la médiane masquerait
+                des pics réguliers, une frame sur dix qui alloue dix fois plus par exemple
+            skip: Fenêtres de préchauffage ignorées
+
+        Returns:
+            Liste des dépassements (vide si tout est dans les limites)
+        """
+        growth = self.growth(skip)
+        if not growth:
+            return [f"pas assez de fenêtres ({len(self.reports)}) pour mesurer la croissance"]
+        errors = [f"{key} = {growth[key]:.3f} Ko > {max_growth_kb} Ko"
+                  for key in ('rss_kb_per_frame', 'traced_kb_per_frame') if growth[key] > max_growth_kb]
+        if growth['alloc_kb_per_frame_p99'] > alloc_budget_kb:
+            errors.append(f"allocation par frame (p99) {growth['alloc_kb_per_frame_p99']:.0f} Ko "
+                          f"> {alloc_budget_kb} Ko")
+        return errors
+
+    def summary(self) -> str:
+        """
+        Bilan de la session : croissance par frame et lignes responsables cumulées.
+        """
+        growth = self.growth()
+        if not growth:
+            return f"[mémoire] {self.frames} frames, pas assez de fenêtres pour un bilan"
+        sites = Counter()
+        for report in list(self.reports)[1:]:
+            sites.update(dict(report['sites']))
+        lines = [f"[mémoire] bilan sur {self.frames} frames: RSS {growth['rss_kb_per_frame']:+.3f} Ko/frame, "
+                 f"suivie {growth['traced_kb_per_frame']:+.3f} Ko/frame, "
+                 f"allocation par frame {growth['alloc_kb_per_frame']:.0f} Ko "
+                 f"(p99 {growth['alloc_kb_per_frame_p99']:.0f} Ko, max {growth['alloc_kb_per_frame_max']:.0f} Ko)"]
+        lines += [f"  {kb:+10.1f} Ko  {site}" for site, kb in sites.most_common(self.top) if kb > 0]
+        return "\n".join(lines)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extraction des frames difficiles des vols enregistrés (mode --mine).
+
+Le détecteur est exécuté sur les vidéos (ou dossiers d'images) enregistrées et chaque frame
+reçoit un score de difficulté :
+    - confiance ambiguë : détections proches du seuil de confiance (contre-jour, flou)
+    - discontinuité de piste : le visage principal saute ou disparaît d'une frame à l'autre
+    - scintillement : la détection apparaît et disparaît sur les dernières frames
+Les frames quasi identiques sont dédupliquées par une empreinte de l'image réduite (dHash
+64 bits), et les top-K frames sont exportées au format jeu de données YOLO (images/, labels/
+avec pseudo-labels, data.yaml), directement utilisable par YOLODataset. Les pseudo-labels sont
+à relire avant l'entraînement.
+
+Le traitement est en flux : seules les K meilleures frames (encodées en JPEG) et une courte
+fenêtre de frames précédentes sont gardées en mémoire, quelle que soit la durée des vols.
+"""
+
+import csv
+import heapq
+import os
+from collections import deque
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+import cv2
+import numpy as np
+
+from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages
+from ultralytics.yolo.data.utils import IMG_FORMATS
+
+# Poids des critères dans le score de difficulté
+WEIGHTS = {'confidence': 1.0, 'discontinuity': 1.0, 'flicker': 1.0}
+
+FLICKER_WINDOW = 6  # Frames de l'historique de présence
+HASH_DISTANCE = 6  # Distance de Hamming (sur 64 bits) en dessous de laquelle deux frames sont des doublons
+
+
+def dhash(frame: np.ndarray) -> int:
+    """
+    Empreinte 64 bits de l'image réduite à 9x8 en niveaux de gris (gradients horizontaux).
+    Insensible à la compression, au bruit et aux faibles changements de luminosité.
+    """
+    gray = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    """
+    Nombre de bits différents entre deux empreintes.
+    """
+    return bin(a ^ b).count('1')
+
+
+def box_iou(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> float:
+    """
+    IoU entre deux boîtes xyxy. Deux absences concordent.
+    """
+    if a is None or b is None:
+        return float(a is None and b is None)
+    inter = max(0.0, min(a[2], b[2]) - max(a[0], b[0])) * max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return float(inter / union) if union > 0 else 0.0
+
+
+def iter_frames(source: str, stride: int = 1) -> Iterator[Tuple[str, int, np.ndarray, bool]]:
+    """
+    Parcourt les frames des vidéos et images d'une source, une frame à la fois.
+
+    Args:
+        source: Vidéo, image, dossier, motif glob ou liste .txt (comme yolo predict)
+        stride: Une frame vidéo sur stride
+
+    Yields:
+        (nom, index de frame, frame BGR, début d'une nouvelle séquence). Le nom est le chemin du fichier
+        relatif au dossier le plus profond qui contient tous les fichiers (ex. a/vol.mp4 et b/vol.mp4),
+        unique dans la source. Les images d'un même dossier forment une séquence, chaque vidéo en est une.
+    """
+    files = LoadImages(source).files
+    root = os.path.commonpath([os.path.dirname(f) for f in files]) if files else ''
+    previous_dir = None
+    for path in files:
+        p = Path(path)
+        name = Path(os.path.relpath(path, root)).as_posix()
+        if p.suffix[1:].lower() in IMG_FORMATS:
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield name, 0, frame, p.parent != previous_dir
+                previous_dir = p.parent
+            continue
+        previous_dir = None
+        cap, i = cv2.VideoCapture(path), 0
+        while cap.isOpened():
+            if not cap.grab():
+                break
+            if i % stride == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield name, i, frame, i == 0
+            i += 1
+        cap.release()
+
+
+class HardFrameScorer:
+    """
+    Score de difficulté d'une frame à partir de ses détections et de celles des frames précédentes.
+    """
+
+    def __init__(self, conf_threshold: float = 0.25, weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            conf_threshold: Seuil de confiance de la détection en vol
+            weights: Poids des critères (voir WEIGHTS)
+        """
+        self.conf_threshold = conf_threshold
+        self.weights = {**WEIGHTS, **(weights or {})}
+        self.reset()
+
+    def reset(self):
+        """
+        Nouvelle séquence : oublie la piste et l'historique de présence.
+        """
+        self.previous: Optional[np.ndarray] = None  # Visage principal de la frame précédente (xyxy)
+        self.presence = deque(maxlen=FLICKER_WINDOW)
+
+    def __call__(self, det: np.ndarray) -> Dict[str, float]:
+        """
+        Args:
+            det: Détections (n, 6) xyxy, conf, cls, y compris sous le seuil de confiance
+
+        Returns:
+            Score total et score de chaque critère (0-1)
+        """
+        t = self.conf_threshold
+        # Confiance ambiguë : 1 au seuil, 0 pour les détections sûres ou négligeables
+        confidence = float(np.max(1 - np.abs(det[:, 4] - t) / max(t, 1 - t))) if len(det) else 0.0
+
+        # Discontinuité : le visage principal (plus grande détection sûre) ne recouvre plus le précédent
+        kept = det[det[:, 4] >= t]
+        face = None
+        if len(kept):
+            face = kept[np.argmax((kept[:, 2] - kept[:, 0]) * (kept[:, 3] - kept[:, 1])), :4]
+        discontinuity = 0.0 if self.previous is None and face is None else 1 - box_iou(self.previous, face)
+        self.previous = face
+
+        # Scintillement : changements de présence sur la fenêtre
+        self.presence.append(face is not None)
+        changes = sum(a != b for a, b in zip(self.presence, list(self.presence)[1:]))
+        flicker = changes / (FLICKER_WINDOW - 1)
+
+        scores = {'confidence': confidence, 'discontinuity': discontinuity, 'flicker': flicker}
+        scores['score'] = sum(self.weights[k] * v for k, v in scores.items())
+        return scores
+
+
+class TopKFrames:
+    """
+    Les K frames les plus difficiles, sans doublons, en mémoire bornée (frames encodées en JPEG).
+    """
+
+    def __init__(self, k: int, hash_distance: int = HASH_DISTANCE):
+        self.k = k
+        self.hash_distance = hash_distance
+        self.heap: List[Tuple[float, int, Dict[str, Any]]] = []  # Tas min sur le score
+        self.counter = 0  # Départage les scores égaux sans comparer les dictionnaires
+
+    def min_score(self) -> float:
+        """
+        Score minimal pour entrer dans le top-K.
+        """
+        return self.heap[0][0] if len(self.heap) >= self.k else float('-inf')
+
+    def push(self, score: float, frame: np.ndarray, entry: Dict[str, Any]) -> bool:
+        """
+        Ajoute une frame si elle entre dans le top-K. Un doublon d'une frame retenue la remplace
+        seulement si son score est plus élevé.
+
+        Returns:
+            True si la frame est retenue
+        """
+        if score <= self.min_score():
+            return False
+        h = dhash(frame)
+        duplicate = next((i for i, (_, _, e) in enumerate(self.heap) if hamming(e['hash'], h) <= self.hash_distance),
+                         None)
+        if duplicate is not None:
+            if self.heap[duplicate][0] >= score:
+                return False
+            self.heap[duplicate] = self.heap[-1]
+            self.heap.pop()
+            heapq.heapify(self.heap)
+
+        entry = {**entry, 'hash': h, 'jpeg': cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes(),
+                 'shape': frame.shape[:2]}
+        self.counter += 1
+        item = (score, self.counter, entry)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        else:
+            heapq.heapreplace(self.heap, item)
+        return True
+
+    def sorted(self) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Frames retenues, de la plus difficile à la moins difficile.
+        """
+        return [(s, e) for s, _, e in sorted(self.heap, key=lambda x: -x[0])]
+
+
+def pseudo_labels(det: np.ndarray, shape: Tuple[int, int], label_conf: float) -> List[str]:
+    """
+    Lignes de labels YOLO (classe xc yc w h normalisés) des détections au-dessus de label_conf.
+    """
+    h, w = shape
+    lines = []
+    for x1, y1, x2, y2, conf, cls in det:
+        if conf >= label_conf:
+            lines.append(f"{int(cls)} {(x1 + x2) / 2 / w:.6f} {(y1 + y2) / 2 / h:.6f} "
+                         f"{(x2 - x1) / w:.6f} {(y2 - y1) / h:.6f}")
+    return lines
+
+
+def export_dataset(frames: List[Tuple[float, Dict[str, Any]]], output: str, names) -> Path:
+    """
+    Écrit les frames au format jeu de données YOLO : images/, labels/, data.yaml et scores.csv.
+    Chaque frame est nommée d'après le chemin de sa source et son index (images/a/vol.mp4_000042.jpg),
+    les sous-dossiers de la source sont reproduits : deux fichiers de même nom ne s'écrasent pas.
+
+    Args:
+        frames: Frames retenues (voir TopKFrames.sorted)
+        output: Dossier du jeu de données
+        names: Noms des classes du modèle (dictionnaire ou liste)
+
+    Returns:
+        Chemin du data.yaml
+    """
+    names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else names
+    out = Path(output)
+    (out / 'images').mkdir(parents=True, exist_ok=True)
+    (out / 'labels').mkdir(parents=True, exist_ok=True)
+    with open(out / 'scores.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['image', 'source', 'frame', 'score', 'confidence', 'discontinuity', 'flicker', 'labels'])
+        for score, e in frames:
+            name = f"{e['source']}_{e['frame']:06d}"
+            for d in 'images', 'labels':
+                (out / d / name).parent.mkdir(parents=True, exist_ok=True)
+            (out / 'images' / f'{name}.jpg').write_bytes(e['jpeg'])
+            (out / 'labels' / f'{name}.txt').write_text(''.join(f'{x}\n' for x in e['labels']))
+            writer.writerow([f'{name}.jpg', e['source'], e['frame'], f'{score:.4f}', f"{e['confidence']:.4f}",
+                             f"{e['discontinuity']:.4f}", f"{e['flicker']:.4f}", len(e['labels'])])
+
+    data = out / 'data.yaml'
+    data.write_text(f"path: {out.resolve()}\ntrain: images\nval: images\nnames:\n" +
+                    ''.join(f"  {i}: {n}\n" for i, n in names.items()))
+    return data
+
+
+def mine_hard_frames(model_path: str, source: str, output: str, top_k: int = 200, conf_threshold: float = 0.25,
+                     mine_conf: float = 0.05, label_conf: Optional[float] = None, stride: int = 1,
+                     imgsz: int = 640, weights: Optional[Dict[str, float]] = None) -> Path:
+    """
+    Extrait les top-K frames difficiles des vols enregistrés et les exporte au format YOLO.
+
+    Args:
+        model_path: Chemin vers le modèle YOLO-face (.pt ou .slim)
+        source: Vols enregistrés (vidéo, dossier, motif glob ou liste .txt)
+        output: Dossier du jeu de données exporté
+        top_k: Nombre de frames exportées
+        conf_threshold: Seuil de confiance de la détection en vol (centre de la zone ambiguë)
+        mine_conf: Seuil de confiance du détecteur pendant l'extraction (détections faibles comprises)
+        label_conf: Seuil des pseudo-labels (par défaut conf_threshold)
+        stride: Une frame vidéo sur stride
+        imgsz: Taille d'entrée du détecteur
+        weights: Poids des critères du score (voir WEIGHTS)
+
+    Returns:
+        Chemin du data.yaml du jeu de données
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    label_conf = conf_threshold if label_conf is None else label_conf
+    scorer = HardFrameScorer(conf_threshold, weights)
+    top = TopKFrames(top_k)
+    n = 0
+
+    print(f"\n=== Extraction des frames difficiles ({source}, top {top_k}) ===")
+    for name, index, frame, new_sequence in iter_frames(source, stride):
+        if new_sequence:
+            scorer.reset()
+            print(f"  {name}...")
+        det = model.predict(frame, conf=mine_conf, imgsz=imgsz, verbose=False)[0].boxes.data.cpu().numpy()
+        scores = scorer(det)
+        if scores['score'] > 0:  # Frames sans difficulté jamais retenues
+            top.push(scores['score'], frame, {'source': name, 'frame': index,
+                                              'labels': pseudo_labels(det, frame.shape[:2], label_conf), **scores})
+        n += 1
+
+    frames = top.sorted()
+    data = export_dataset(frames, output, model.names)
+    print(f"✓ {len(frames)} frames difficiles sur {n} exportées dans {os.path.dirname(data)} "
+          f"(pseudo-labels à relire, jeu de données : {data})")
+    return data
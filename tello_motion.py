@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection déclenchée par le mouvement (différence d'images réduites).
+
+Quand le drone est en vol stationnaire et que la personne ne bouge pas, les frames successives
+sont quasi identiques et une détection YOLO complète n'apporte rien. La porte compare une
+miniature en niveaux de gris (80x60) de la frame courante à celle de la dernière frame détectée :
+si la part de pixels modifiés reste sous le seuil et que la boîte suivie est stable sur les
+dernières détections, la détection est sautée et le dernier résultat est réutilisé.
+
+La comparaison porte sur chaque frame : dès que le mouvement reprend, la détection repart à la
+frame suivante. Une détection est de toute façon forcée toutes les `refresh_interval` frames.
+
+Une scène peu contrastée (mur uni, ciel) change peu quand le drone se déplace : la différence
+d'images ne suffit pas à voir son propre mouvement. Toute commande rc non nulle envoyée depuis la
+dernière détection (voir command) force donc la détection de la frame suivante, et la détection
+n'est plus sautée pendant `command_hold` frames après chaque commande non nulle (le Tello maintient
+la dernière commande). Une commande nulle, ou l'absence de nouvelle commande pendant ces frames,
+rend la main à la différence d'images.
+"""
+
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def box_stable(a: Optional[Tuple], b: Optional[Tuple], tolerance: float) -> bool:
+    """
+    Deux résultats (x_center, y_center, width, height, ...) concordent : même position et même taille
+    à `tolerance` près (relative à la taille de la boîte). Deux absences de visage concordent.
+    """
+    if a is None or b is None:
+        return a is None and b is None
+    size = max(a[2], a[3], 1)
+    return (abs(a[0] - b[0]) <= tolerance * size and abs(a[1] - b[1]) <= tolerance * size and
+            abs(a[2] - b[2]) <= tolerance * size and abs(a[3] - b[3]) <= tolerance * size)
+
+
+class MotionGate:
+    """
+    Porte de détection : décide, frame par frame, si une détection YOLO est nécessaire.
+
+    Exemple :
+        if gate.should_detect(frame):
+            face_info = detector.detect(frame)
+            gate.update(frame, face_info)
+        else:
+            face_info = gate.face_info  # dernier résultat
+        ...
+        tello.send_rc_control(*velocity)
+        gate.command(*velocity)  # le drone bouge : détection à la frame suivante
+    """
+
+    def __init__(self, size: Tuple[int, int] = (80, 60), pixel_threshold: int = 12, motion_threshold: float = 0.01,
+                 box_tolerance: float = 0.15, refresh_interval: int = 10, command_hold: int = 10):
+        """
+        Args:
+            size: Taille de la miniature comparée (largeur, hauteur)
+            pixel_threshold: Écart de niveau de gris à partir duquel un pixel de la miniature a changé
+                             (au-dessus du bruit du capteur et de la compression)
+            motion_threshold: Part de pixels modifiés (0.0-1.0) au-delà de laquelle la détection est relancée
+            box_tolerance: Écart relatif toléré entre les dernières boîtes détectées pour les considérer stables
+            refresh_interval: Nombre maximal de frames consécutives sans détection
+            command_hold: Nombre de frames détectées après une commande rc non nulle, renouvelé à chaque
+                          commande (au-delà de l'intervalle d'envoi des commandes de la boucle de tracking)
+        """
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.motion_threshold = motion_threshold
+        self.box_tolerance = box_tolerance
+        self.refresh_interval = refresh_interval
+        self.command_hold = command_hold
+        self.reset()
+
+    def reset(self):
+        """
+        Oublie la frame de référence : la prochaine frame est détectée.
+        """
+        self.reference: Optional[np.ndarray] = None  # Miniature de la dernière frame détectée
+        self.history = deque(maxlen=2)  # Derniers résultats de détection
+        self.face_info: Optional[Tuple] = None  # Dernier résultat, réutilisé pour les frames sautées
+        self.motion = 1.0  # Part de pixels modifiés à la dernière comparaison
+        self.skipped = 0  # Frames sautées depuis la dernière détection
+        self.commanded = False  # Commande rc non nulle envoyée depuis la dernière détection
+        self.moving = 0  # Frames encore détectées après la dernière commande rc non nulle
+        self.total_frames = 0
+        self.total_skipped = 0
+        self._thumbnail: Optional[np.ndarray] = None
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Miniature en niveaux de gris (réduction par moyenne, qui lisse aussi le bruit).
+        """
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def command(self, *velocity: int):
+        """
+        Enregistre une commande rc envoyée au drone : si elle n'est pas nulle, le drone se déplace et
+        les `command_hold` frames suivantes sont détectées, quel que soit le mouvement mesuré dans
+        l'image. Une commande nulle arrête le drone et met fin à cette période.
+        """
+        self.moving = self.command_hold if any(velocity) else 0
+        self.commanded |= self.moving > 0
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        """
+        Indique si la frame doit passer par le détecteur. Si non, la frame est comptée comme sautée
+        et self.face_info est le résultat à utiliser.
+        """
+        self.total_frames += 1
+        self._thumbnail = self.thumbnail(frame)
+        moving, self.moving = self.moving > 0, max(self.moving - 1, 0)
+        if self.commanded or moving or self.reference is None or self.skipped >= self.refresh_interval or \
+                len(self.history) < 2 or not box_stable(self.history[0], self.history[1], self.box_tolerance):
+            return True
+        diff = cv2.absdiff(self._thumbnail, self.reference)
+        self.motion = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        if self.motion > self.motion_threshold:
+            return True
+        self.skipped += 1
+        self.total_skipped += 1
+        return False
+
+    def update(self, frame: np.ndarray, face_info: Optional[Tuple]):
+        """
+        Enregistre le résultat d'une détection : la frame devient la référence.
+        """
+        self.reference = self._thumbnail if self._thumbnail is not None else self.thumbnail(frame)
+        self._thumbnail = None
+        self.history.append(face_info)
+        self.face_info = face_info
+        self.skipped = 0
+        self.commanded = False
+
+    @property
+    def skip_ratio(self) -> float:
+        """
+        Part des frames dont la détection a été sautée.
+        """
+        return self.total_skipped / max(self.total_frames, 1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Répartition des cœurs CPU entre les sous-systèmes (budget de threads).
+
+Le pool interne d'OpenCV (cv2.resize, cvtColor, LetterBox), les threads intra-op de
+PyTorch et les threads Qt/djitellopy se disputent les mêmes cœurs, ce qui provoque des
+pics de latence périodiques. Le budget attribue au démarrage un ensemble de cœurs et un
+nombre de threads à chaque sous-système, et peut épingler les threads de décodage, de
+détection et de contrôle avec os.sched_setaffinity (Linux uniquement).
+"""
+
+import os
+import threading
+from typing import Optional, List, Dict, Any
+
+import cv2
+import torch
+
+ROLES = ('decoder', 'detector', 'control')
+
+
+def available_cores() -> List[int]:
+    """
+    Cœurs utilisables par le processus (respecte taskset/cgroups sous Linux).
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ThreadBudget:
+    """
+    Budget de threads et de cœurs pour le décodage vidéo, la détection et le contrôle.
+
+    Répartition :
+        - 1 cœur : tout partagé
+        - 2-3 cœurs : décodage et contrôle sur le premier cœur, détection sur les autres
+        - 4 cœurs et plus : un cœur pour le décodage, un pour le contrôle (Qt, commandes RC),
+          le reste pour la détection
+    """
+
+    def __init__(self, cores: Optional[List[int]] = None, pin: bool = False):
+        """
+        Calcule la répartition.
+
+        Args:
+            cores: Cœurs à répartir (par défaut tous les cœurs disponibles)
+            pin: Épingle les threads sur leurs cœurs avec os.sched_setaffinity
+        """
+        self.cores = list(cores) if cores else available_cores()
+        self.pin = pin and hasattr(os, 'sched_setaffinity')
+        self.pinned: Dict[str, List[int]] = {}  # Rôle -> cœurs effectivement épinglés
+
+        n = len(self.cores)
+        if n == 1:
+            self.decoder_cores = self.control_cores = self.detector_cores = self.cores
+        elif n < 4:
+            self.decoder_cores = self.control_cores = self.cores[:1]
+            self.detector_cores = self.cores[1:]
+        else:
+            self.decoder_cores = self.cores[:1]
+            self.control_cores = self.cores[1:2]
+            self.detector_cores = self.cores[2:]
+
+        self.torch_threads = len(self.detector_cores)
+        self.cv2_threads = 1  # Redimensionnements courts : le pool OpenCV coûte plus qu'il ne rapporte
+        self.qt_threads = len(self.control_cores)
+
+    def cores_for(self, role: str) -> List[int]:
+        """
+        Cœurs attribués à un rôle ('decoder', 'detector' ou 'control').
+        """
+        return {'decoder': self.decoder_cores, 'detector': self.detector_cores, 'control': self.control_cores}[role]
+
+    def apply(self, calibration: Optional[Dict[str, Any]] = None) -> 'ThreadBudget':
+        """
+        Applique les nombres de threads à OpenCV et PyTorch, sauf ceux déjà réglés par le profil de
+        calibration. Avec l'épinglage, les threads PyTorch sont de toute façon limités aux cœurs de
+        détection (un nombre plus faible, calibré, est conservé).
+
+        Args:
+            calibration: Profil de calibration appliqué par le détecteur (None : machine non calibrée)
+
+        Returns:
+            self
+        """
+        settings = (calibration or {}).get('settings') or {}
+        if self.pin or not settings.get('torch_threads'):
+            torch.set_num_threads(min(torch.get_num_threads(), len(self.detector_cores)))
+            try:
+                torch.set_num_interop_threads(1)  # Possible uniquement avant la première inférence
+            except RuntimeError:
+                pass
+        if settings.get('cv2_threads') is None:
+            cv2.setNumThreads(self.cv2_threads)
+        self.torch_threads, self.cv2_threads = torch.get_num_threads(), cv2.getNumThreads()
+        return self
+
+    def pin_current(self, role: str) -> bool:
+        """
+        Épingle le thread appelant sur les cœurs de son rôle.
+        Les threads créés ensuite par ce thread (pool PyTorch) héritent de l'affinité.
+
+        Returns:
+            True si le thread a été épinglé
+        """
+        return self._pin(0, role)
+
+    def pin_thread(self, thread: Optional[threading.Thread], role: str) -> bool:
+        """
+        Épingle un thread Python déjà démarré (ex. thread de lecture du flux vidéo).
+
+        Returns:
+            True si le thread a été épinglé
+        """
+        native_id = getattr(thread, 'native_id', None)
+        return native_id is not None and self._pin(native_id, role)
+
+    def _pin(self, tid: int, role: str) -> bool:
+        if not self.pin:
+            return False
+        cores = self.cores_for(role)
+        try:
+            os.sched_setaffinity(tid, cores)
+        except OSError as e:
+            print(f"⚠ Impossible d'épingler le thread {role} sur {cores}: {e}")
+            return False
+        self.pinned[role] = cores
+        return True
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Répartition courante, pour les statistiques.
+        """
+        return {
+            'cores': len(self.cores),
+            'decoder_cores': self.decoder_cores,
+            'detector_cores': self.detector_cores,
+            'control_cores': self.control_cores,
+            'torch_threads': torch.get_num_threads(),
+            'cv2_threads': cv2.getNumThreads(),
+            'qt_threads': self.qt_threads,
+            'pinned': sorted(self.pinned)}
+
+    def summary(self) -> str:
+        """
+        Résumé court de la répartition (affiché dans les statistiques).
+        """
+        pinned = f", épinglés: {', '.join(sorted(self.pinned))}" if self.pinned else ''
+        return (f"{len(self.cores)} cœurs | décodage {self.decoder_cores} | détection {self.detector_cores} | "
+                f"contrôle {self.control_cores} | torch {torch.get_num_threads()} / cv2 {cv2.getNumThreads()} threads"
+                f"{pinned}")
@@ -0,0 +1,65 @@
+# Tests du tracking Tello et du fork d'ultralytics, lancés depuis la racine du dépôt : python -m pytest tests
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('tello', 'tracker sans drone (tests/test_benchmarks.py et tests du tracking)')
+    group.addoption('--bench-model', default=None, help="Poids (.pt, .slim) ou configuration (.yaml) du détecteur, "
+                    "yolov8n.yaml à poids aléatoires par défaut")
+    group.addoption('--bench-imgsz', type=int, nargs=2, default=[640, 480], help="Résolution de détection (l h)")
+    group.addoption('--bench-frames', type=int, default=30, help="Nombre de frames synthétiques")
+
+
+def _bench_model(config):
+    from ultralytics.yolo.utils import ROOT
+    return config.getoption('--bench-model') or str(ROOT / 'models/v8/yolov8n.yaml')
+
+
+@pytest.fixture(scope='session')
+def face_detector(request):
+    """FaceDetector chargé et préchauffé une fois pour la session, hors ligne."""
+    for module in 'torch', 'cv2', 'djitellopy':
+        pytest.importorskip(module)
+    from benchmarks.suite import make_detector
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('YOLO_OFFLINE', 'True')
+        yield make_detector(_bench_model(request.config), tuple(request.config.getoption('--bench-imgsz')))
+
+
+@pytest.fixture
+def tracker(face_detector):
+    """FaceTracker sans drone (télémétrie simulée), état de contrôle neuf à chaque test."""
+    from benchmarks.suite import make_tracker
+    return make_tracker(None, None, face_detector)
+
+
+@pytest.fixture(scope='session')
+def frames(request):
+    """Frames synthétiques 960x720 (visage simulé en mouvement) et images de ultralytics/assets."""
+    pytest.importorskip('cv2')
+    pytest.importorskip('djitellopy')
+    from benchmarks.suite import make_frames
+    return make_frames(request.config.getoption('--bench-frames'))
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    pass
+else:
+    def pytest_benchmark_update_machine_info(config, machine_info):
+        # Versions, threads et modèle qui conditionnent les temps, comparés par benchmarks/suite.py compare
+        try:
+            import cv2
+            import numpy as np
+            import torch
+        except ImportError:  # benchmarks skipped
+            return
+        machine_info.update(torch=torch.__version__, opencv=cv2.__version__, numpy=np.__version__,
+                            torch_threads=torch.get_num_threads(), cv2_threads=cv2.getNumThreads(),
+                            model=_bench_model(config), detection_resolution=config.getoption('--bench-imgsz'))
@@ -0,0 +1,70 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Activation memory planner (BaseModel.memory_planner and ActivationPool): same outputs as plain inference, pool used by
+its owner thread only, buffers of unused shapes dropped.
+"""
+
+import threading
+from copy import deepcopy
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.modules import ACTIVATION_POOLS, ActivationPool, Concat  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+
+
+@torch.no_grad()
+def test_planner_parity():
+    torch.manual_seed(0)
+    model = DetectionModel(CFG, nc=1, verbose=False).fuse().eval()
+    plain = deepcopy(model)
+    plain.memory_planner = False
+    for shape in (160, 224), (160, 224), (96, 96):  # reused buffers, then a new shape
+        im = torch.rand(2, 3, *shape)
+        torch.testing.assert_close(model(im)[0], plain(im)[0])
+
+
+def test_owner_only():
+    pool = ActivationPool()
+    concat = Concat()
+    ACTIVATION_POOLS[concat] = pool
+    x = [torch.rand(1, 2, 4, 4), torch.rand(1, 3, 4, 4)]
+    assert pool.acquire()
+    owner = pool.owner
+    out = concat(x)  # owner thread: pooled buffer
+    assert any(t is out for t, _ in pool.lent)
+
+    results = {}
+
+    def other():
+        results['acquired'] = pool.acquire()  # fails without touching the owner's pass
+        results['out'] = concat(x)
+
+    t = threading.Thread(target=other)
+    t.start()
+    t.join()
+    assert not results['acquired'] and pool.owner == owner
+    assert not any(t is results['out'] for t, _ in pool.lent)  # torch.cat(), not pooled
+    torch.testing.assert_close(results['out'], torch.cat(x, 1))
+    pool.release()
+    assert pool.owner is None
+    assert concat(x) is not out and not pool.lent  # inactive: plain torch.cat()
+
+
+def test_unused_keys_dropped():
+    pool = ActivationPool(max_idle=2)
+    like = torch.empty(1)
+    pool.acquire()
+    pool.give(pool.take((1, 8, 4, 4), like))  # tile shape, used once
+    pool.release()
+    for _ in range(3):
+        pool.acquire()
+        pool.give(pool.take((1, 8, 2, 2), like))  # frame shape, every pass
+        pool.release()
+    assert [k[0] for k in pool.free] == [(1, 8, 2, 2)]
+    assert len(pool.free[next(iter(pool.free))]) == 1  # one buffer reused across passes
@@ -0,0 +1,49 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+predict_batch() outputs: one .npz per source file keyed by its path relative to the glob root, so that same-named
+files of different directories neither collide nor are skipped on resume.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+cv2 = pytest.importorskip('cv2')
+
+from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages  # noqa: E402
+from ultralytics.yolo.engine.predictor import BasePredictor  # noqa: E402
+from ultralytics.yolo.engine.results import Results  # noqa: E402
+
+
+@pytest.fixture
+def source(tmp_path):
+    for d in 'a', 'b', 'b/c':
+        (tmp_path / 'vols' / d).mkdir(parents=True)
+        cv2.imwrite(str(tmp_path / 'vols' / d / 'frame.jpg'), np.zeros((32, 32, 3), np.uint8))
+    return tmp_path
+
+
+def test_same_names(source):
+    out = source / 'detections'
+    files = LoadImages(str(source / 'vols' / '**' / '*.jpg')).files
+    npz = [f for _, f in BasePredictor.detections_files(files, out)]
+    assert len(files) == 3 and len(set(npz)) == 3
+    assert sorted(f.relative_to(out).as_posix() for f in npz) == ['a/frame.jpg.npz', 'b/c/frame.jpg.npz',
+                                                                  'b/frame.jpg.npz']
+
+
+def test_resume(source):
+    out = source / 'detections'
+    files = LoadImages(str(source / 'vols' / '**' / '*.jpg')).files
+    done = BasePredictor.detections_files(files, out)[0]
+    boxes = torch.tensor([[1.0, 2.0, 10.0, 12.0, 0.9, 0.0]])
+    BasePredictor.save_detections(done[1], [0], [Results(boxes=boxes, orig_shape=(32, 32))])
+    todo = [f for f, npz in BasePredictor.detections_files(files, out) if not npz.exists()]
+    assert done[0] not in todo and len(todo) == 2  # same-named files elsewhere are still to do
+    data = np.load(done[1])
+    assert data['boxes'].tolist() == [[1.0, 2.0, 10.0, 12.0]] and int(data['frames']) == 1
+
+
+def test_single_file(source):
+    f = str(source / 'vols' / 'a' / 'frame.jpg')
+    assert BasePredictor.detections_files([f], source)[0][1] == source / 'frame.jpg.npz'
@@ -0,0 +1,86 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+CPU benchmarks of the tracking hot path (FaceTracker) and of the ultralytics inference path, with pytest-benchmark.
+No drone, GPU or network. benchmarks/suite.py runs them to JSON and compares two runs.
+
+    python -m pytest tests/test_benchmarks.py --bench-model yolov8n-face.pt --benchmark-json=current.json
+"""
+
+from itertools import cycle
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+torch = pytest.importorskip('torch')
+cv2 = pytest.importorskip('cv2')
+
+from ultralytics.yolo.data.augment import LetterBox  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def inference(face_detector, frames):
+    """Inputs of each predictor stage, computed once from the frames resized to the detection resolution."""
+    predictor = face_detector.model.predictor
+    backend, cfg = predictor.model, predictor.args
+    width, height = face_detector.detection_width, face_detector.detection_height
+    small = [cv2.resize(f, (width, height), interpolation=cv2.INTER_LINEAR) for f in frames]
+    letterbox = LetterBox(width, auto=True, stride=backend.stride)
+    with torch.inference_mode():
+        inputs = [predictor.preprocess(letterbox(image=im)).clone() for im in small]
+        preds = [backend(im) for im in inputs]
+
+    def nms(p):
+        return ops.non_max_suppression(p, cfg.conf, cfg.iou, max_det=cfg.max_det)
+
+    dets = [(im.shape[2:], nms(p)[0], s.shape) for im, p, s in zip(inputs, preds, small)]
+    return {'small': small, 'letterbox': letterbox, 'backend': backend, 'inputs': inputs, 'preds': preds,
+            'nms': nms, 'dets': dets}
+
+
+@pytest.fixture
+def faces(tracker, frames):
+    width, height = tracker.detection_width, tracker.detection_height
+    return [tracker.detect_face(f) or (width // 2, height // 2, 150, 150, 0.5) for f in frames]
+
+
+def run(benchmark, fn, inputs):
+    """Times fn over the inputs in turn, one input per call."""
+    it = cycle(inputs)
+    with torch.inference_mode():
+        benchmark(lambda: fn(next(it)))
+
+
+@pytest.mark.benchmark(group='tracking')
+def test_detect_face(benchmark, tracker, frames):
+    run(benchmark, tracker.detect_face, frames)
+
+
+@pytest.mark.benchmark(group='tracking')
+def test_calculate_control(benchmark, tracker, faces):
+    run(benchmark, lambda face: tracker.calculate_control(face[:4]), faces)
+
+
+@pytest.mark.benchmark(group='tracking')
+def test_draw_overlay(benchmark, tracker, frames, faces):
+    run(benchmark, lambda x: tracker.draw_overlay(x[0].copy(), x[1], (10, -5, 3, 2)), list(zip(frames, faces)))
+
+
+@pytest.mark.benchmark(group='inference')
+def test_letterbox(benchmark, inference):
+    run(benchmark, lambda im: inference['letterbox'](image=im), inference['small'])
+
+
+@pytest.mark.benchmark(group='inference')
+def test_autobackend_forward(benchmark, inference):
+    run(benchmark, inference['backend'], inference['inputs'])
+
+
+@pytest.mark.benchmark(group='inference')
+def test_non_max_suppression(benchmark, inference):
+    run(benchmark, inference['nms'], inference['preds'])
+
+
+@pytest.mark.benchmark(group='inference')
+def test_scale_boxes(benchmark, inference):
+    run(benchmark, lambda d: ops.scale_boxes(d[0], d[1][:, :4].clone(), d[2]), inference['dets'])
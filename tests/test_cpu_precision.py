@@ -0,0 +1,68 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+AutoBackend CPU modes: channels_last gives the fp32 outputs, bf16 (only on CPUs with native bf16 instructions) keeps
+the fp32 detections within a box tolerance. benchmarks/cpu_precision.py measures the latency and the mAP on a dataset.
+"""
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.autobackend import AutoBackend  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.utils.metrics import box_iou  # noqa: E402
+from ultralytics.yolo.utils.ops import non_max_suppression  # noqa: E402
+from ultralytics.yolo.utils.torch_utils import cpu_supports_bf16  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+MAX_DROP = 0.05  # tolerated drop, above cpu_precision.py --max-drop: random weights give dense overlapping boxes
+
+
+@pytest.fixture(scope='module')
+def model():
+    torch.manual_seed(0)
+    model = DetectionModel(CFG, nc=1, verbose=False).float().eval()
+    for cv in model.model[-1].cv3:
+        cv[-1].bias.data += 3.0  # detections to compare
+    return model
+
+
+@pytest.fixture(scope='module')
+def im():
+    return torch.rand(2, 3, 320, 320, generator=torch.Generator().manual_seed(0))
+
+
+@torch.inference_mode()
+def predict(model, im, **kwargs):
+    return AutoBackend(model, device=torch.device('cpu'), **kwargs).eval()(im)[0].float()
+
+
+def recall50_95(pred, ref):
+    """Recall of the reference detections ref by pred averaged over IoU 0.5:0.95, the mAP50-95 proxy of this test."""
+    hits = []
+    for p, r in zip(pred, ref):
+        best = box_iou(r[:, :4], p[:, :4]).amax(1) if len(p) else torch.zeros(len(r))
+        hits.extend((best >= t).float().mean().item() for t in torch.linspace(0.5, 0.95, 10) if len(r))
+    return sum(hits) / len(hits) if hits else 0.0
+
+
+def test_channels_last(model, im):
+    torch.testing.assert_close(predict(model, im, channels_last=True), predict(model, im), rtol=1E-3, atol=1E-3)
+
+
+@pytest.mark.skipif(not cpu_supports_bf16(), reason='CPU without native bf16 instructions (AVX512-BF16 or AMX)')
+@pytest.mark.parametrize('channels_last', [False, True])
+def test_bf16(model, im, channels_last):
+    y_ref = predict(model, im)
+    y = predict(model, im, bf16=True, channels_last=channels_last)
+    assert y.dtype == torch.float32 and y.shape == y_ref.shape  # Detect decodes in fp32
+    ref = non_max_suppression(y_ref, 0.25, 0.7)
+    pred = non_max_suppression(y, 0.25, 0.7)
+    assert sum(len(r) for r in ref), 'no reference detections'
+    assert recall50_95(pred, ref) >= 1 - MAX_DROP and recall50_95(ref, pred) >= 1 - MAX_DROP  # misses, extras
+    for p, r in zip(pred, ref):  # matched boxes within a few pixels
+        if len(p) and len(r):
+            iou, j = box_iou(r[:, :4], p[:, :4]).max(1)
+            matched = iou >= 0.5
+            torch.testing.assert_close(p[j[matched], :4], r[matched, :4], atol=4.0, rtol=0.02)
@@ -0,0 +1,86 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Confidence-first decoding of the Detect head (Detect.topk): same boxes after NMS as the full decode. Anchor cache kept
+out of the model (ANCHOR_CACHES).
+"""
+
+import io
+from copy import deepcopy
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.modules import ANCHOR_CACHES  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.utils.ops import non_max_suppression  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+IMGSZ = 160  # 525 anchors
+
+
+@pytest.fixture(scope='module')
+def model():
+    torch.manual_seed(0)
+    model = DetectionModel(CFG, nc=1, verbose=False).fuse().eval()
+    yield model
+    model.model[-1].topk = 0
+
+
+@torch.no_grad()
+def predict(model, im, topk, conf):
+    head = model.model[-1]
+    head.topk, head.conf = topk, conf
+    try:
+        return model(im)[0]
+    finally:
+        head.topk = 0
+
+
+@pytest.mark.parametrize('cls_bias', [0.0, 3.0, 6.0])  # few, many and all anchors above conf
+@pytest.mark.parametrize('batch', [1, 2])
+def test_topk_parity(model, cls_bias, batch):
+    head = model.model[-1]
+    for cv in head.cv3:
+        cv[-1].bias.data += cls_bias
+    try:
+        im = torch.rand(batch, 3, IMGSZ, IMGSZ)
+        conf = 0.25
+        y_full = predict(model, im, 0, conf)
+        y_fast = predict(model, im, y_full.shape[2], conf)  # topk never truncates the candidates
+    finally:
+        for cv in head.cv3:
+            cv[-1].bias.data -= cls_bias
+
+    assert y_fast.shape[1] == y_full.shape[1]
+    for p_full, p_fast in zip(non_max_suppression(y_full, conf, 0.7), non_max_suppression(y_fast, conf, 0.7)):
+        assert p_full.shape == p_fast.shape
+        # NMS output is sorted by confidence: same rows in the same order
+        torch.testing.assert_close(p_fast, p_full, atol=1E-4, rtol=1E-4)
+
+
+def test_topk_caps_candidates(model):
+    head = model.model[-1]
+    for cv in head.cv3:
+        cv[-1].bias.data += 6.0  # every anchor is a candidate
+    try:
+        y = predict(model, torch.rand(1, 3, IMGSZ, IMGSZ), 10, 0.25)
+    finally:
+        for cv in head.cv3:
+            cv[-1].bias.data -= 6.0
+    assert y.shape == (1, 4 + head.nc, 10)
+
+
+@torch.no_grad()
+def test_anchor_cache_not_saved(model):
+    head = model.model[-1]
+    for shape in (IMGSZ, IMGSZ), (IMGSZ, 2 * IMGSZ):
+        model(torch.zeros(1, 3, *shape))
+    assert len(ANCHOR_CACHES[head]) >= 2
+    assert 'anchor_cache' not in vars(head)
+    assert deepcopy(head) not in ANCHOR_CACHES  # copies start with an empty cache
+    buffer = io.BytesIO()
+    torch.save({'model': deepcopy(model).half()}, buffer)  # as the trainer saves checkpoints
+    buffer.seek(0)
+    assert ANCHOR_CACHES.get(torch.load(buffer, weights_only=False)['model'].model[-1]) is None
@@ -0,0 +1,71 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Input folding (BaseModel.fuse(fold_input=True)): a model taking raw 0-255 BGR images gives the same outputs as the
+standard model on normalized RGB images, including through the AutoBackend in-memory (nn_module) path.
+"""
+
+from copy import deepcopy
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.autobackend import AutoBackend  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.utils.ops import non_max_suppression  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+RTOL, ATOL = 1E-3, 1E-3
+
+
+@pytest.fixture(scope='module')
+def model():
+    torch.manual_seed(0)
+    return DetectionModel(CFG, nc=1, verbose=False).float().eval()
+
+
+@pytest.fixture(scope='module')
+def images():
+    """The same batch as uint8 BGR 0-255 (folded input space) and float RGB 0-1 (standard input space)."""
+    g = torch.Generator().manual_seed(0)
+    bgr = torch.randint(0, 256, (2, 3, 160, 224), generator=g, dtype=torch.uint8).float()
+    return bgr, bgr.flip(1) / 255
+
+
+def assert_parity(y, y_ref):
+    torch.testing.assert_close(y, y_ref, rtol=RTOL, atol=ATOL)
+    for p, p_ref in zip(non_max_suppression(y, 0.25, 0.7), non_max_suppression(y_ref, 0.25, 0.7)):
+        assert p.shape == p_ref.shape
+        torch.testing.assert_close(p, p_ref, rtol=RTOL, atol=1E-2)
+
+
+@torch.no_grad()
+def test_fold_input_parity(model, images):
+    bgr, rgb = images
+    y_ref = model(rgb)[0]
+    fused = deepcopy(model).fuse()
+    folded = deepcopy(model).fuse(fold_input=True)
+    assert folded.input_folded and not getattr(fused, 'input_folded', False)
+    assert_parity(folded(bgr)[0], y_ref)
+    assert_parity(folded(bgr)[0], fused(rgb)[0])
+
+
+@torch.no_grad()
+def test_fold_input_idempotent(model, images):
+    bgr, rgb = images
+    folded = deepcopy(model).fuse(fold_input=True).fuse(fold_input=True)  # folded once only
+    assert_parity(folded(bgr)[0], model(rgb)[0])
+
+
+@torch.no_grad()
+def test_autobackend_nn_module(model, images):
+    bgr, rgb = images
+    caller = deepcopy(model)
+    weight = caller.model[0].conv.weight.clone()
+    backend = AutoBackend(caller, device=torch.device('cpu'), fold_input=True)
+    assert backend.input_folded
+    assert backend.model is not caller  # folded copy, the caller's model keeps its input space
+    assert not getattr(caller, 'input_folded', False)
+    torch.testing.assert_close(caller.model[0].conv.weight, weight, rtol=0, atol=0)
+    assert_parity(backend(bgr)[0], model(rgb)[0])
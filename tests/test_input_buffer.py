@@ -0,0 +1,48 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Preallocated model inputs (BasePredictor.input_tensor): frames and tiles have their own buffer, so that alternating
+them does not reallocate either, and variable-size batches are views of the largest one.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.v8.detect.predict import DetectionPredictor  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    torch.manual_seed(0)
+    predictor = DetectionPredictor(overrides={'device': 'cpu'})
+    predictor.setup_model(DetectionModel(CFG, nc=1, verbose=False))
+    return predictor
+
+
+def test_frames_and_tiles(predictor):
+    predictor.input_buffers.clear()
+    frame = np.random.default_rng(0).integers(0, 256, (1, 3, 480, 640), dtype=np.uint8)
+    tiles = np.random.default_rng(1).integers(0, 256, (6, 3, 640, 640), dtype=np.uint8)
+    x = predictor.preprocess(frame)
+    buffers = dict(predictor.input_buffers)
+    for _ in range(3):
+        t = predictor.preprocess(tiles, buffer='tiles')
+        x = predictor.preprocess(frame)
+        buffers.setdefault('tiles', predictor.input_buffers['tiles'])
+        assert all(predictor.input_buffers[k] is v for k, v in buffers.items())  # no reallocation on a shape switch
+    torch.testing.assert_close(x, torch.from_numpy(frame).float() / 255)
+    torch.testing.assert_close(t, torch.from_numpy(tiles).float() / 255)  # not overwritten by the frame
+
+
+def test_variable_batch(predictor):
+    predictor.input_buffers.clear()
+    shape = (4, 3, 64, 64)
+    full = predictor.input_tensor(shape, torch.float32)
+    part = predictor.input_tensor((2, *shape[1:]), torch.float32)
+    assert part.shape[0] == 2 and part.data_ptr() == full.data_ptr()  # view of the first slots
+    assert len(predictor.input_buffers['frames']) == 4
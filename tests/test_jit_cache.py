@@ -0,0 +1,84 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Frozen TorchScript cache (AutoBackend.jit_freeze): confidence-first decoding still applies to the frozen trace output,
+and the cache is keyed by the model code, the memory format and the weights (or their checkpoint file).
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.nn.autobackend import AutoBackend  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.utils.ops import non_max_suppression  # noqa: E402
+from ultralytics.yolo.utils.torch_utils import frozen_torchscript  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'
+SHAPE = (1, 3, 160, 160)
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    model = DetectionModel(CFG, nc=1, verbose=False).fuse().eval()
+    for cv in model.model[-1].cv3:
+        cv[-1].bias.data += 3.0  # many anchors above conf
+    return model
+
+
+@torch.no_grad()
+def test_frozen_topk(model, tmp_path):
+    backend = AutoBackend(model, device=torch.device('cpu'))
+    head = backend.model.model[-1]
+    head.topk, head.conf = 10, 0.25
+    im = torch.rand(SHAPE)
+    y_eager = backend(im)[0]
+    backend.frozen = frozen_torchscript(backend.model, im, cache_dir=tmp_path)
+    backend.frozen_shape = SHAPE
+    y_frozen = backend(im)[0]
+    assert y_frozen.shape == y_eager.shape == (1, 4 + head.nc, 10)
+    for p, p_ref in zip(non_max_suppression(y_frozen, 0.25, 0.7), non_max_suppression(y_eager, 0.25, 0.7)):
+        assert p.shape == p_ref.shape
+        torch.testing.assert_close(p, p_ref, atol=1E-3, rtol=1E-3)
+
+
+@torch.no_grad()
+def test_cache_key_model_code(model, tmp_path, monkeypatch):
+    im = torch.zeros(SHAPE)
+    frozen_torchscript(model, im, cache_dir=tmp_path)
+    frozen_torchscript(model, im, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('*.torchscript'))) == 1  # cache hit
+
+    read_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, 'read_bytes', lambda self: read_bytes(self) + b'\n# edited\n')  # modules.py changed
+    frozen_torchscript(model, im, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('*.torchscript'))) == 2  # traced again
+
+
+@torch.no_grad()
+def test_cache_key_memory_format(model, tmp_path):
+    frozen_torchscript(model, torch.zeros(SHAPE), cache_dir=tmp_path)
+    model.to(memory_format=torch.channels_last)
+    im = torch.zeros(SHAPE).contiguous(memory_format=torch.channels_last)
+    frozen_torchscript(model, im, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('*.torchscript'))) == 2  # not the graph frozen for the contiguous layout
+
+
+@torch.no_grad()
+def test_cache_key_weights_file(model, tmp_path):
+    weights, cache = tmp_path / 'model.pt', tmp_path / 'cache'
+    weights.write_bytes(b'checkpoint')
+    im = torch.zeros(SHAPE)
+    frozen_torchscript(model, im, cache_dir=cache, weights=weights)
+    model.model[0].conv.weight.add_(1.0)  # not hashed: the file stands for the weights
+    frozen_torchscript(model, im, cache_dir=cache, weights=weights)
+    assert len(list(cache.glob('*.torchscript'))) == 1
+
+    stat = weights.stat()
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # checkpoint replaced
+    frozen_torchscript(model, im, cache_dir=cache, weights=weights)
+    assert len(list(cache.glob('*.torchscript'))) == 2
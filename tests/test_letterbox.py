@@ -0,0 +1,105 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+LetterBoxCanvas: same pixels and geometry as LetterBox without per-frame allocations, and its ratio_pad carried by the
+loaders through DetectionPredictor.postprocess() into ops.scale_boxes().
+"""
+
+import tracemalloc
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+pytest.importorskip('cv2')
+
+from ultralytics.yolo.data.augment import LetterBox, LetterBoxCanvas  # noqa: E402
+from ultralytics.yolo.data.dataloaders.stream_loaders import LoadPilAndNumpy  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+from ultralytics.yolo.v8.detect.predict import DetectionPredictor  # noqa: E402
+
+SHAPES = [(720, 960), (480, 640), (1080, 1920), (640, 640), (100, 300)]
+
+
+def image(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (*shape, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('auto', [False, True])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_same_pixels(shape, auto):
+    frame = image(shape)
+    out, ratio_pad = LetterBoxCanvas(640, auto=auto, stride=32)(frame)
+    ref = LetterBox(640, auto=auto, stride=32)(image=frame)
+    assert out.shape == ref.shape
+    assert np.array_equal(out, ref)
+
+
+def test_geometry_change_clears_canvas():
+    canvas = LetterBoxCanvas(640)
+    canvas(np.zeros((640, 480, 3), np.uint8))  # tall black image, gray bands on the left and right
+    out, _ = canvas(image((480, 640)))  # wide image: no black pixels left in the new bands
+    assert np.array_equal(out, LetterBox(640, auto=False)(image=image((480, 640))))
+
+
+@pytest.mark.parametrize('shape', SHAPES[:3])
+def test_no_allocation(shape):
+    canvas = LetterBoxCanvas(640)
+    frames = [image(shape, seed) for seed in range(3)]
+    first, _ = canvas(frames[0])
+    buffer = canvas.canvas
+    geometry = canvas.geometry(shape)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for frame in frames[1:]:
+            out, _ = canvas(frame)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    assert canvas.canvas is buffer and np.shares_memory(out, buffer)  # written in place
+    assert canvas.geometry(shape) is geometry  # cached
+    assert peak < out.nbytes / 10, f'{peak} bytes allocated for a {out.nbytes} bytes image'
+
+
+@pytest.mark.parametrize('auto', [False, True])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_ratio_pad_scale_boxes(shape, auto):
+    # A box covering the letterboxed image must map back onto the whole original image
+    canvas = LetterBoxCanvas(640, auto=auto, stride=32)
+    out, ratio_pad = canvas(image(shape))
+    new_unpad, top, left = canvas.geometry(shape)[:3]
+    box = torch.tensor([[left, top, left + new_unpad[0], top + new_unpad[1]]], dtype=torch.float32)
+    box = ops.scale_boxes(out.shape[:2], box, shape, ratio_pad)
+    torch.testing.assert_close(box, torch.tensor([[0, 0, shape[1], shape[0]]], dtype=torch.float32), atol=1, rtol=0)
+
+
+def test_ratio_pad_forwarding(monkeypatch):
+    # Two images with different geometries in one batch: each result is scaled with its own ratio_pad
+    im0 = [image((720, 960)), image((480, 1280), 1)]
+    dataset = LoadPilAndNumpy(im0, imgsz=640, auto=False)
+    _, im, _, _, _ = next(iter(dataset))
+    assert len(dataset.ratio_pad) == 2
+
+    calls = []
+    scale_boxes = ops.scale_boxes
+
+    def record(img1_shape, boxes, img0_shape, ratio_pad=None):
+        calls.append(ratio_pad)
+        return scale_boxes(img1_shape, boxes, img0_shape, ratio_pad)
+
+    monkeypatch.setattr(ops, 'scale_boxes', record)
+    predictor = DetectionPredictor(overrides={'conf': 0.25})
+    predictor.dataset = dataset
+    # One box per image covering its letterboxed region (xywh, one class)
+    preds = torch.zeros(2, 5, 1)
+    for i, im_i in enumerate(im0):
+        new_unpad, top, left = dataset.letterbox.geometry(im_i.shape)[:3]
+        preds[i, :4, 0] = torch.tensor([left + new_unpad[0] / 2, top + new_unpad[1] / 2, *new_unpad])
+        preds[i, 4, 0] = 0.9
+    results = predictor.postprocess(preds, torch.from_numpy(im), im0)
+
+    assert calls == dataset.ratio_pad
+    for r, im_i in zip(results, im0):
+        h, w = im_i.shape[:2]
+        torch.testing.assert_close(r.boxes.xyxy, torch.tensor([[0, 0, w, h]], dtype=torch.float32), atol=1, rtol=0)
@@ -0,0 +1,68 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+LoadImages prefetch: same frames in the same order as synchronous decoding, video captures released once their last
+frame is consumed, and the background thread stopped when an iteration is abandoned without close().
+"""
+
+import gc
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('torch')
+
+from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages  # noqa: E402
+
+
+def make_video(file, n, value, h=96, w=128):
+    writer = cv2.VideoWriter(str(file), cv2.VideoWriter_fourcc(*'mp4v'), 30, (w, h))
+    for _ in range(n):
+        writer.write(np.full((h, w, 3), value, dtype=np.uint8))
+    writer.release()
+
+
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    d = tmp_path_factory.mktemp('load_images')
+    for i in range(6):
+        cv2.imwrite(str(d / f'{i}.jpg'), np.full((96, 128, 3), i * 40, dtype=np.uint8))
+    make_video(d / 'a.mp4', 10, 60)
+    make_video(d / 'b.mp4', 10, 180)
+    return d
+
+
+def prefetch_threads():
+    return [t for t in threading.enumerate() if t.name == 'LoadImages-prefetch']
+
+
+def test_same_frames(source):
+    def frames(prefetch):
+        return [(s.split(')')[0], round(float(im0.mean()))) for _, _, im0, _, s in
+                LoadImages(str(source), imgsz=64, prefetch=prefetch, workers=2)]
+
+    assert frames(4) == frames(0)
+
+
+def test_captures_released(source):
+    dataset = LoadImages(str(source / '*.mp4'), imgsz=64, prefetch=4, workers=2)
+    caps = []
+    for _, _, _, cap, _ in dataset:
+        if not caps or cap is not caps[-1]:
+            assert all(not c.isOpened() for c in caps)  # previous video released at the first frame of the next
+            caps.append(cap)
+        assert cap.isOpened()
+    assert len(caps) == 2 and not any(c.isOpened() for c in caps)
+
+
+def test_abandoned_iteration(source):
+    before = set(prefetch_threads())
+    dataset = LoadImages(str(source), imgsz=64, prefetch=2, workers=1)
+    next(iter(dataset))
+    threads = [t for t in prefetch_threads() if t not in before]
+    assert len(threads) == 1 and threads[0].is_alive()  # waiting on the full queue
+    del dataset
+    gc.collect()
+    threads[0].join(timeout=5)
+    assert not threads[0].is_alive()
@@ -0,0 +1,59 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Memory probe (tello_memory.MemoryProbe): the per-frame allocation budget is checked on the p99 of each window, and a
+short soak of the tracking loop keeps memory bounded. benchmarks/memory_soak.py runs the long soak.
+"""
+
+from itertools import cycle
+
+import pytest
+
+pytest.importorskip('psutil')
+pytest.importorskip('torch')
+
+from tello_memory import MemoryProbe  # noqa: E402
+
+SOAK_FRAMES, INTERVAL = 2000, 500
+MAX_GROWTH_KB, BUDGET_KB = 1.0, 8192  # per frame, a short soak measures growth less precisely than the long one
+
+
+def run_probe(n, alloc_kb, every):
+    """n frames allocating (and freeing) alloc_kb every `every` frames, 1 KB otherwise."""
+    probe = MemoryProbe(interval=n // 4).start()
+    try:
+        for i in range(n):
+            x = bytearray(int((alloc_kb if i % every == 0 else 1) * 1E3))
+            del x
+            probe.step()
+        return probe.growth(), probe.check(MAX_GROWTH_KB, 1000)
+    finally:
+        probe.stop()
+
+
+def test_budget_p99():
+    growth, errors = run_probe(400, 4000, every=10)  # a 4 MB frame in ten: median under budget, p99 over
+    assert growth['alloc_kb_per_frame'] < 1000 < growth['alloc_kb_per_frame_p99'] <= growth['alloc_kb_per_frame_max']
+    assert any('p99' in e for e in errors)
+
+
+def test_budget_ok():
+    growth, errors = run_probe(400, 100, every=10)
+    assert growth['alloc_kb_per_frame_max'] < 1000
+    assert not [e for e in errors if 'allocation' in e]
+
+
+def test_soak(tracker, frames):
+    probe = tracker.enable_memory_probe(INTERVAL)
+    try:
+        for frame in cycle(frames):
+            frame = frame.copy()  # a new frame per read, as the drone stream
+            face_info = tracker.detect_face(frame)
+            velocity = tracker.calculate_control(face_info[:4]) if face_info is not None else (0, 0, 0, 0)
+            tracker.draw_overlay(frame, face_info, velocity)
+            probe.step()
+            if probe.frames >= SOAK_FRAMES:
+                break
+        errors = probe.check(MAX_GROWTH_KB, BUDGET_KB)
+    finally:
+        probe.stop()
+    assert not errors, probe.summary() + '\n' + '\n'.join(errors)
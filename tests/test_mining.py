@@ -0,0 +1,46 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Hard-frame mining export (tello_mining): frames are named after their source path relative to the source root, so
+same-named files of different directories neither overwrite each other nor mismatch scores.csv.
+"""
+
+import csv
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('torch')
+
+import tello_mining  # noqa: E402
+
+
+@pytest.fixture
+def source(tmp_path):
+    for i, d in enumerate(('2024-05-01', '2024-05-02', '2024-05-02/b')):
+        (tmp_path / 'vols' / d).mkdir(parents=True)
+        cv2.imwrite(str(tmp_path / 'vols' / d / 'img.jpg'), np.full((32, 32, 3), 60 * (i + 1), np.uint8))
+    return tmp_path
+
+
+def test_names(source):
+    names = [name for name, _, _, _ in tello_mining.iter_frames(str(source / 'vols' / '**' / '*.jpg'))]
+    assert sorted(names) == ['2024-05-01/img.jpg', '2024-05-02/b/img.jpg', '2024-05-02/img.jpg']
+    assert [name for name, _, _, _ in tello_mining.iter_frames(str(source / 'vols' / '2024-05-01'))] == ['img.jpg']
+
+
+def test_export_same_names(source):
+    top = tello_mining.TopKFrames(10, hash_distance=-1)
+    for name, index, frame, _ in tello_mining.iter_frames(str(source / 'vols' / '**' / '*.jpg')):
+        top.push(1.0, frame, {'source': name, 'frame': index, 'labels': [f'0 0.5 0.5 0.{len(name)} 0.5'],
+                              'confidence': 1.0, 'discontinuity': 0.0, 'flicker': 0.0})
+    data = tello_mining.export_dataset(top.sorted(), str(source / 'out'), ['face'])
+    images = sorted(f.relative_to(data.parent / 'images').as_posix() for f in (data.parent / 'images').rglob('*.jpg'))
+    assert images == ['2024-05-01/img.jpg_000000.jpg', '2024-05-02/b/img.jpg_000000.jpg',
+                      '2024-05-02/img.jpg_000000.jpg']
+    with open(data.parent / 'scores.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r['image'] for r in rows) == images
+    for r in rows:  # each label file is that of its own frame
+        label = (data.parent / 'labels' / r['image']).with_suffix('.txt').read_text()
+        assert label == f"0 0.5 0.5 0.{len(r['source'])} 0.5\n"
@@ -0,0 +1,84 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Motion gate (tello_motion.MotionGate): detections are skipped while the drone hovers over a still scene, and are never
+skipped once the drone is commanded to move, even over a low-contrast scene whose frames barely change.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from tello_motion import MotionGate  # noqa: E402
+
+FACE = (480, 360, 120, 160, 0.9)
+
+
+def low_contrast(n, seed=0, h=720, w=960):
+    """Plain wall with sensor noise: frames almost identical whether the drone moves or not."""
+    rng = np.random.default_rng(seed)
+    return [np.clip(128 + rng.normal(0, 2, (h, w, 3)), 0, 255).astype(np.uint8) for _ in range(n)]
+
+
+def replay(gate, frames, commands=None):
+    """Detected (True) or skipped frame by frame, commands {frame index: [velocity, ...]} sent before their frame."""
+    detected = []
+    for i, frame in enumerate(frames):
+        for velocity in (commands or {}).get(i, []):
+            gate.command(*velocity)
+        detected.append(gate.should_detect(frame))
+        if detected[-1]:
+            gate.update(frame, FACE)
+    return detected
+
+
+def test_hover_skips():
+    gate = MotionGate()
+    detected = replay(gate, low_contrast(60))
+    assert sum(detected) <= 60 // (gate.refresh_interval + 1) + 3  # only the first frames and the periodic refresh
+    assert gate.skip_ratio > 0.8
+
+
+def test_command_forces_detection():
+    gate = MotionGate()
+    moves = {i: [(0, 0, 0, 20)] for i in range(20, 40, 3)}  # a command every rc_command_interval (3) frames
+    detected = replay(gate, low_contrast(60), {**moves, 40: [(0, 0, 0, 0)]})
+    assert not all(detected[10:20])  # hovering: skipped
+    assert all(detected[20:40])  # moving: reaction delay 0, every frame detected while the drone moves
+    assert not any(detected[40:50])  # stopped: skipped again at once
+    assert gate.face_info == FACE
+
+
+def test_no_zero_command():
+    gate = MotionGate()
+    detected = replay(gate, low_contrast(80), {i: [(10, 0, 0, 0)] for i in range(20, 40, 3)})
+    assert all(detected[20:38 + gate.command_hold])  # detected up to command_hold frames after the last command
+    assert not all(detected[50:80]) and gate.total_skipped > 40  # no stop command sent: the gate skips again
+
+
+def test_short_command():
+    gate = MotionGate()
+    detected = replay(gate, low_contrast(30), {20: [(20, 0, 0, 0), (0, 0, 0, 0)]})
+    assert detected[20]  # a non-zero command since the last detection, even if stopped since
+    assert not any(detected[21:30])
+
+
+def test_zero_command():
+    gate = MotionGate()
+    commands = {i: [(0, 0, 0, 0)] for i in range(60)}
+    assert replay(gate, low_contrast(60), commands) == replay(MotionGate(), low_contrast(60))
+
+
+def test_tracker(tracker, monkeypatch):
+    calls = []
+    monkeypatch.setattr(tracker, '_detect', lambda frame: calls.append(frame) or FACE)
+    frames = low_contrast(30)
+    for frame in frames[:20]:
+        assert tracker.detect_face(frame) == FACE
+    hover = len(calls)
+    assert hover < 10
+    tracker.send_rc_control(0, 20, 0, 0)
+    for frame in frames[20:]:
+        tracker.detect_face(frame)
+    assert len(calls) - hover == 10  # moving: no frame skipped within command_hold frames
+    assert tracker.tello.commands == [(0, 20, 0, 0)]
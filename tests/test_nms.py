@@ -0,0 +1,88 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+NMS parity: torchvision, the pure numpy fallback (no torchvision) and the single-class fast path of
+non_max_suppression() must keep the same boxes.
+"""
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ultralytics.yolo.utils import ops  # noqa: E402
+
+
+def make_boxes(n, imgsz=640, seed=0):
+    """n overlapping xyxy boxes grouped around a few centers, and their scores."""
+    g = torch.Generator().manual_seed(seed)
+    centers = torch.rand(8, 2, generator=g) * imgsz
+    xy = centers[torch.randint(0, 8, (n,), generator=g)] + torch.randn(n, 2, generator=g) * 8
+    wh = torch.rand(n, 2, generator=g) * 40 + 10
+    return torch.cat((xy - wh / 2, xy + wh / 2), 1), torch.rand(n, generator=g)
+
+
+def make_prediction(batch, anchors, candidates, imgsz=640, seed=0):
+    """Single-class (batch, 5, anchors) xywh + score prediction with `candidates` anchors above 0.3."""
+    g = torch.Generator().manual_seed(seed)
+    xy = torch.rand(batch, 2, anchors, generator=g) * imgsz
+    wh = torch.rand(batch, 2, anchors, generator=g) * 40 + 10
+    scores = torch.rand(batch, 1, anchors, generator=g) * 0.2  # below conf
+    for b in range(batch):
+        i = torch.randperm(anchors, generator=g)[:candidates]
+        centers = torch.rand(8, 2, generator=g) * imgsz
+        xy[b, :, i] = (centers[torch.randint(0, 8, (candidates,), generator=g)] +
+                       torch.randn(candidates, 2, generator=g) * 4).T
+        scores[b, 0, i] = torch.rand(candidates, generator=g) * 0.7 + 0.3
+    return torch.cat((xy, wh, scores), 1)
+
+
+@pytest.fixture
+def no_torchvision(monkeypatch):
+    monkeypatch.setattr(ops, 'torchvision', None)
+
+
+@pytest.mark.parametrize('n', [1, 50, 1000])
+@pytest.mark.parametrize('iou', [0.45, 0.7])
+def test_nms_numpy(n, iou):
+    boxes, scores = make_boxes(n)
+    keep = ops.nms_numpy(boxes.numpy(), scores.numpy(), iou)
+    assert (scores[keep][1:] <= scores[keep][:-1]).all()  # sorted by decreasing score
+    if ops.torchvision is not None:
+        assert keep.tolist() == ops.torchvision.ops.nms(boxes, scores, iou).tolist()
+
+
+@pytest.mark.parametrize('n', [0, 1, 1000])
+def test_nms_fallback(no_torchvision, n):
+    boxes, scores = make_boxes(n)
+    keep = ops.nms(boxes, scores, 0.7)
+    assert keep.dtype == torch.int64
+    assert keep.tolist() == ops.nms_numpy(boxes.numpy(), scores.numpy(), 0.7).tolist()
+
+
+def _general_path(pred, conf, iou):
+    # An empty second class (zero scores) selects the general path without changing the detections
+    return ops.non_max_suppression(torch.cat((pred, torch.zeros_like(pred[:, :1])), 1), conf, iou)
+
+
+def _assert_same(a, b):
+    assert len(a) == len(b)
+    for x, y in zip(a, b):
+        assert x.shape == y.shape
+        torch.testing.assert_close(x, y, atol=1E-4, rtol=1E-4)
+
+
+@pytest.mark.parametrize('candidates', [0, 50, 500, 5000])
+@pytest.mark.parametrize('batch', [1, 2])
+def test_single_class_parity(candidates, batch):
+    pred = make_prediction(batch, 8400, candidates)
+    y_general = _general_path(pred, 0.25, 0.7)
+    y_fast = ops.non_max_suppression(pred, 0.25, 0.7)
+    _assert_same(y_general, y_fast)
+
+
+@pytest.mark.parametrize('candidates', [0, 50, 500])
+def test_single_class_parity_fallback(candidates, monkeypatch):
+    pred = make_prediction(1, 8400, candidates)
+    y_ref = ops.non_max_suppression(pred, 0.25, 0.7)  # torchvision if installed
+    monkeypatch.setattr(ops, 'torchvision', None)
+    _assert_same(_general_path(pred, 0.25, 0.7), y_ref)
+    _assert_same(ops.non_max_suppression(pred, 0.25, 0.7), y_ref)
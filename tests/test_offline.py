@@ -0,0 +1,63 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Offline mode (YOLO_OFFLINE=True): no socket may be opened while building a model, predicting or plotting.
+"""
+
+import socket
+
+import pytest
+
+pytest.importorskip('torch')
+
+from ultralytics import YOLO  # noqa: E402
+from ultralytics.yolo.utils import ROOT, is_offline  # noqa: E402
+from ultralytics.yolo.utils.checks import check_font, check_online  # noqa: E402
+from ultralytics.yolo.utils.downloads import attempt_download, safe_download  # noqa: E402
+from ultralytics.yolo.utils.plotting import check_pil_font  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8n.yaml'  # random weights, nothing to download
+SOURCE = ROOT / 'assets/bus.jpg'
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """
+    Offline mode with every way of opening a connection patched to fail. Yields the list of attempts, which
+    stays empty unless some code path ignores offline mode (the error raised could be swallowed by that code).
+    """
+    attempts = []
+
+    def refuse(*args, **kwargs):
+        attempts.append(args)
+        raise OSError('network access attempted in offline mode')
+
+    monkeypatch.setenv('YOLO_OFFLINE', 'True')
+    monkeypatch.setattr(socket, 'socket', refuse)
+    monkeypatch.setattr(socket, 'create_connection', refuse)
+    monkeypatch.setattr(socket, 'getaddrinfo', refuse)
+    yield attempts
+
+
+def test_offline_predict(offline):
+    assert is_offline()
+    model = YOLO(CFG)
+    results = model(SOURCE, imgsz=160)
+    results[0].plot()
+    assert not offline
+
+
+def test_offline_checks(offline):
+    assert not check_online()
+    with pytest.raises(ConnectionError):
+        check_font('offline-missing-font.ttf')
+    with pytest.raises(ConnectionError):
+        safe_download('offline-missing.pt', 'https://ultralytics.com/assets/offline-missing.pt')
+    with pytest.raises(FileNotFoundError):
+        attempt_download('offline-missing.pt')
+    assert not offline
+
+
+def test_offline_font_fallback(offline):
+    # Fonts are not shipped: a missing font falls back to PIL's default font instead of being downloaded
+    assert check_pil_font('offline-missing-font.ttf') is not None
+    assert not offline
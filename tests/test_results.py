@@ -0,0 +1,115 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Results, Boxes and Masks: the cached conversions of Boxes match ops after cpu(), numpy() and indexing, and indexing
+Results or Masks keeps one (n, h, w) masks block per result.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+
+from ultralytics.yolo.engine.results import Boxes, Masks, Results  # noqa: E402
+from ultralytics.yolo.utils import ops  # noqa: E402
+
+ORIG_SHAPE = (720, 960)
+GAIN = torch.tensor([960, 720, 960, 720], dtype=torch.float32)
+INDICES = [0, -1, slice(1, 4), [0, 2], 'mask']
+
+
+def make_boxes(n=5, seed=0):
+    g = torch.Generator().manual_seed(seed)
+    xy = torch.rand(n, 2, generator=g) * 600
+    wh = torch.rand(n, 2, generator=g) * 100 + 10
+    return torch.cat((xy, xy + wh, torch.rand(n, 1, generator=g), torch.randint(0, 3, (n, 1), generator=g)), 1)
+
+
+def index(idx, x):
+    return x[:, -2] > 0.5 if idx == 'mask' else idx
+
+
+def expected(data):
+    """Reference xywh, xyxyn and xywhn of a (n, 6) block with ops."""
+    data = torch.as_tensor(data)
+    data = data[None] if data.ndim == 1 else data
+    xywh = ops.xyxy2xywh(data[:, :4])
+    return {'xywh': xywh, 'xyxyn': data[:, :4] / GAIN, 'xywhn': xywh / GAIN}
+
+
+def assert_conversions(boxes, data):
+    for name, ref in expected(data).items():
+        x = getattr(boxes, name)
+        assert type(x) is type(boxes.boxes)  # numpy Boxes give numpy conversions
+        torch.testing.assert_close(torch.as_tensor(x), ref, check_dtype=False)  # numpy divides in float64
+
+
+@pytest.mark.parametrize('convert', ['none', 'cpu', 'numpy'])
+def test_boxes_conversions(convert):
+    data = make_boxes()
+    boxes = Boxes(data, ORIG_SHAPE)
+    boxes.xywhn  # cached on the source block
+    boxes = boxes if convert == 'none' else getattr(boxes, convert)()
+    assert_conversions(boxes, data)
+    assert boxes.xywh is boxes.xywh  # cached
+    if convert == 'cpu':
+        assert boxes.cpu() is boxes  # already on CPU, conversions kept
+
+
+@pytest.mark.parametrize('convert', ['none', 'numpy'])
+@pytest.mark.parametrize('idx', INDICES)
+def test_boxes_indexing(convert, idx):
+    data = make_boxes()
+    boxes = Boxes(data, ORIG_SHAPE)
+    boxes = boxes if convert == 'none' else boxes.numpy()
+    i = index(idx, boxes.boxes)
+    sub = boxes[i]
+    assert_conversions(sub, data[index(idx, data)])
+    assert sub.xyxy.shape[-1] == 4 and sub.xywhn.ndim == 2
+    if convert == 'numpy':
+        assert boxes.numpy() is boxes.numpy()  # converted once
+
+
+def test_boxes_iteration():
+    data = make_boxes()
+    boxes = Boxes(data, ORIG_SHAPE)
+    for i, b in enumerate(boxes.cpu()):
+        assert_conversions(b, data[i])
+    assert 'xywhn' in boxes._cache  # one vectorized conversion of the parent block
+
+
+@pytest.mark.parametrize('idx', INDICES)
+def test_masks_indexing(idx):
+    masks = torch.rand(5, 32, 40) > 0.5
+    m = Masks(masks, ORIG_SHAPE)
+    i = index(idx, make_boxes())
+    sub = m[i]
+    ref = masks[i]
+    ref = ref[None] if ref.ndim == 2 else ref
+    assert sub.shape == ref.shape and sub.shape[1:] == (32, 40)
+    assert torch.equal(sub.data, ref)
+    assert sub.orig_shape == ORIG_SHAPE and len(sub) == len(ref)
+
+
+@pytest.mark.parametrize('idx', INDICES)
+def test_results_indexing(idx):
+    data = make_boxes()
+    masks = torch.rand(5, 32, 40) > 0.5
+    r = Results(boxes=data, masks=masks, orig_shape=ORIG_SHAPE, path='frame.jpg')
+    r.boxes.xywhn
+    i = index(idx, data)
+    sub = r[i].cpu()
+    assert len(sub) == len(sub.boxes) == len(sub.masks)
+    assert sub.path == 'frame.jpg' and sub.orig_shape == ORIG_SHAPE
+    assert_conversions(sub.boxes, data[i])
+    assert sub.masks.shape[0] == sub.boxes.shape[0]
+    assert_conversions(sub.numpy().boxes, data[i])
+
+
+def test_masks_segments():
+    pytest.importorskip('cv2')
+    masks = torch.zeros(3, 32, 40)
+    masks[:, 8:24, 10:30] = 1
+    m = Masks(masks, ORIG_SHAPE)
+    sub = m[1]
+    assert len(sub.segments) == 1
+    np.testing.assert_allclose(sub.segments[0], m.segments[1])
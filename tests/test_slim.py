@@ -0,0 +1,83 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Slim weights (save_slim() and load_slim()): same outputs as the fused model, faster to load than the .pt checkpoint
+and, through AutoBackend with input folding, without copying the memory-mapped weights into process memory.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('resource')
+
+from ultralytics.nn.autobackend import AutoBackend  # noqa: E402
+from ultralytics.nn.tasks import DetectionModel, load_slim, save_slim  # noqa: E402
+from ultralytics.yolo.utils import ROOT  # noqa: E402
+from ultralytics.yolo.utils.checks import check_version  # noqa: E402
+
+CFG = ROOT / 'models/v8/yolov8s.yaml'  # ~45 MB of fp32 weights
+
+# Child process: peak RSS added by the load and its duration, as benchmarks/slim_load.py
+CHILD = '''
+import json, resource, sys, time
+import torch
+from ultralytics.nn.autobackend import AutoBackend
+from ultralytics.nn.tasks import attempt_load_one_weight
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+model = attempt_load_one_weight(sys.argv[1], fuse=True)[0]
+backend = AutoBackend(model, device=torch.device('cpu'), fold_input=True)
+t = time.perf_counter() - t0
+print(json.dumps({'s': t, 'rss': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0) * 1024}))
+'''
+
+
+@pytest.fixture(scope='module')
+def weights(tmp_path_factory):
+    """The same fused model as a .pt checkpoint and as slim weights, and its size in bytes."""
+    torch.manual_seed(0)
+    model = DetectionModel(CFG, nc=1, verbose=False).eval()
+    d = tmp_path_factory.mktemp('slim')
+    torch.save({'model': model, 'train_args': {}}, d / 'model.pt')
+    fused = model.fuse()
+    save_slim(fused, d / 'model.slim')
+    size = sum(p.numel() * p.element_size() for p in fused.parameters())
+    return fused, d / 'model.pt', d / 'model.slim', size
+
+
+def measure(f):
+    out = subprocess.run([sys.executable, '-c', CHILD, str(f)], check=True, capture_output=True, text=True,
+                         cwd=ROOT.parent)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@torch.no_grad()
+def test_slim_parity(weights):
+    fused, _, slim, _ = weights
+    im = torch.rand(1, 3, 160, 160)
+    torch.testing.assert_close(load_slim(slim)(im)[0], fused(im)[0], rtol=0, atol=0)
+
+
+def test_backend_shares_weights(weights):
+    slim = weights[2]
+    model = load_slim(slim)
+    first = model.model[0].conv.weight
+    backend = AutoBackend(model, device=torch.device('cpu'), fold_input=True)
+    assert backend.input_folded and not getattr(model, 'input_folded', False)  # caller's input space unchanged
+    assert backend.model.model[0].conv.weight.data_ptr() != first.data_ptr()  # folded into a new tensor
+    params = dict(model.named_parameters())
+    shared = [k for k, p in backend.model.named_parameters() if p.data_ptr() == params[k].data_ptr()]
+    assert len(shared) == len(params) - 1  # every other weight is still a view of the memory map
+
+
+@pytest.mark.skipif(not check_version(torch.__version__, '2.0.0'), reason='slim module tree on the meta device')
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='ru_maxrss in kilobytes')
+def test_load_time_rss(weights):
+    _, pt, slim, size = weights
+    r_pt, r_slim = measure(pt), measure(slim)
+    assert r_slim['rss'] < size / 4, f"slim load added {r_slim['rss'] / 1E6:.1f} MB RSS for {size / 1E6:.1f} MB weights"
+    assert r_slim['rss'] < r_pt['rss']
+    assert r_slim['s'] < r_pt['s'], f"slim load {r_slim['s']:.3f}s, .pt load {r_pt['s']:.3f}s"
@@ -0,0 +1,34 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+FaceTracker.track_face between detections: once a detection finds no face, the frames up to the next detection give
+no face either, whether the box is propagated by optical flow or the last detection reused.
+"""
+
+import pytest
+
+FACE = (480, 360, 120, 160, 0.9)
+
+
+@pytest.fixture(params=['optical_flow', 'last_detection'])
+def track(request, tracker, frames, monkeypatch):
+    """track_face over n frames, the detections given in turn, then no face (None)."""
+    if request.param == 'last_detection':
+        tracker.box_propagator = None
+
+    def run(detections, n=6):
+        it = iter(detections)
+        monkeypatch.setattr(tracker, 'detect_face', lambda frame: next(it, None))
+        return [tracker.track_face(frame) for frame in frames[:n]]
+
+    return run
+
+
+def test_face_lost(track):
+    faces = track([FACE])  # a detection every frame_skip_interval (2) frames, or as soon as the propagation fails
+    assert faces[1] == FACE
+    assert faces[3:] == [None, None, None]  # two consecutive no-face frames and the frames between them
+
+
+def test_face_found_again(track):
+    faces = track([None, FACE])
+    assert faces[:3] == [None, None, None] and faces[3] == FACE
@@ -5,7 +5,7 @@ import requests
 from ultralytics.hub.auth import Auth
 from ultralytics.hub.session import HubTrainingSession
 from ultralytics.hub.utils import PREFIX, split_key
-from ultralytics.yolo.utils import LOGGER, emojis
+from ultralytics.yolo.utils import LOGGER, OFFLINE_MSG, emojis, is_offline
 from ultralytics.yolo.v8.detect import DetectionTrainer
 
 
@@ -29,6 +29,9 @@ def start(key=''):
         else:
             return model_id
 
+    if is_offline():
+        raise ConnectionError(emojis(f"{PREFIX}Unable to start HUB training, {OFFLINE_MSG} ❌"))
+
     try:
         api_key, model_id = split_key(key)
         auth = Auth(api_key)  # attempts cookie login if no api key is present
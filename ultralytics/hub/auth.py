@@ -3,7 +3,7 @@
 import requests
 
 from ultralytics.hub.utils import HUB_API_ROOT, request_with_credentials
-from ultralytics.yolo.utils import is_colab
+from ultralytics.yolo.utils import is_colab, is_offline
 
 API_KEY_PATH = "https://hub.ultralytics.com/settings?tab=api+keys"
 
@@ -24,6 +24,8 @@ class Auth:
     def authenticate(self) -> bool:
         """Attempt to authenticate with server"""
         try:
+            if is_offline():
+                raise ConnectionError("Offline mode is enabled.")
             header = self.get_auth_header()
             if header:
                 r = requests.post(f"{HUB_API_ROOT}/v1/auth", headers=header)
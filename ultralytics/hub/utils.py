@@ -8,7 +8,8 @@ from random import random
 
 import requests
 
-from ultralytics.yolo.utils import DEFAULT_CFG_DICT, LOGGER, RANK, SETTINGS, TryExcept, colorstr, emojis
+from ultralytics.yolo.utils import (DEFAULT_CFG_DICT, LOGGER, RANK, SETTINGS, TryExcept, colorstr, emojis,
+                                    is_offline)
 
 PREFIX = colorstr('Ultralytics: ')
 HELP_MSG = 'If this issue persists please visit https://github.com/ultralytics/hub/issues for assistance.'
@@ -17,6 +18,8 @@ HUB_API_ROOT = os.environ.get("ULTRALYTICS_HUB_API", "https://api.ultralytics.co
 
 def check_dataset_disk_space(url='https://ultralytics.com/assets/coco128.zip', sf=2.0):
     # Check that url fits on disk with safety factor sf, i.e. require 2GB free if url size is 1GB with sf=2.0
+    if is_offline():
+        return True  # size can not be queried, assume sufficient space
     gib = 1 << 30  # bytes per GiB
     data = int(requests.head(url).headers['Content-Length']) / gib  # dataset size (GB)
     total, used, free = (x / gib for x in shutil.disk_usage("/"))  # bytes
@@ -91,8 +94,11 @@ def smart_request(*args, retry=3, timeout=30, thread=True, code=-1, method="post
         **kwargs: Keyword arguments to be passed to the requests function specified in method.
 
     Returns:
-        requests.Response: The HTTP response object. If the request is executed in a separate thread, returns None.
+        requests.Response: The HTTP response object. If the request is executed in a separate thread or offline mode
+            is enabled, returns None.
     """
+    if is_offline():
+        return None
     retry_codes = (408, 500)  # retry only these codes
 
     def func(*func_args, **func_kwargs):
@@ -141,7 +147,7 @@ def traces(cfg, all_keys=False, traces_sample_rate=0.0):
         all_keys (bool): Sync all items, not just non-default values.
         traces_sample_rate (float): Fraction of traces captured from 0.0 to 1.0
     """
-    if SETTINGS['sync'] and RANK in {-1, 0} and (random() < traces_sample_rate):
+    if SETTINGS['sync'] and RANK in {-1, 0} and not is_offline() and (random() < traces_sample_rate):
         cfg = vars(cfg)  # convert type from IterableSimpleNamespace to dict
         if not all_keys:
             cfg = {k: v for k, v in cfg.items() if v != DEFAULT_CFG_DICT.get(k, None)}  # retain non-default values
@@ -16,11 +16,21 @@ from ultralytics.yolo.utils import LOGGER, ROOT, yaml_load
 from ultralytics.yolo.utils.checks import check_requirements, check_suffix, check_version
 from ultralytics.yolo.utils.downloads import attempt_download, is_url
 from ultralytics.yolo.utils.ops import xywh2xyxy
+from ultralytics.yolo.utils.torch_utils import cpu_supports_bf16, shared_copy
 
 
 class AutoBackend(nn.Module):
 
-    def __init__(self, weights='yolov8n.pt', device=torch.device('cpu'), dnn=False, data=None, fp16=False, fuse=True):
+    def __init__(self,
+                 weights='yolov8n.pt',
+                 device=torch.device('cpu'),
+                 dnn=False,
+                 data=None,
+                 fp16=False,
+                 fuse=True,
+                 fold_input=False,
+                 bf16=False,
+                 channels_last=False):
         """
         MultiBackend class for python inference on various platforms using Ultralytics YOLO.
 
@@ -31,6 +41,13 @@ class AutoBackend(nn.Module):
             data (dict): Additional data, optional
             fp16 (bool): If True, use half precision. Default: False
             fuse (bool): Whether to fuse the model or not. Default: True
+            fold_input (bool): Fold the input normalization and BGR to RGB swap into the first Conv of PyTorch models,
+                which then take uint8 BGR images as is (see BaseModel.fuse()). Check `input_folded`. Default: False
+            bf16 (bool): Run PyTorch models in bfloat16 on CPUs with native bf16 instructions (AVX512-BF16 or AMX),
+                falls back to fp32 elsewhere. Boxes are still decoded in fp32. Check `dtype`. Default: False
+            channels_last (bool): Convert the weights of PyTorch models to the channels-last (NHWC) memory format and
+                feed inputs in that layout, which lets oneDNN on CPU and tensor cores on CUDA skip layout reorders.
+                Default: False
 
         Supported formats and their naming conventions:
             | Format                | Suffix           |
@@ -47,23 +64,31 @@ class AutoBackend(nn.Module):
             | TensorFlow Lite       | *.tflite         |
             | TensorFlow Edge TPU   | *_edgetpu.tflite |
             | PaddlePaddle          | *_paddle_model   |
+            | Slim (fused PyTorch)  | *.slim           |
         """
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
         nn_module = isinstance(weights, torch.nn.Module)
-        pt, jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle, triton = self._model_type(w)
-        fp16 &= pt or jit or onnx or engine or nn_module  # FP16
+        pt, jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle, slim, triton = \
+            self._model_type(w)
+        fp16 &= pt or jit or onnx or engine or nn_module or slim  # FP16
         nhwc = coreml or saved_model or pb or tflite or edgetpu  # BHWC formats (vs torch BCWH)
         stride = 32  # default stride
         model = None  # TODO: resolves ONNX inference, verify effect on other backends
         cuda = torch.cuda.is_available() and device.type != 'cpu'  # use CUDA
+        input_folded = False  # first Conv takes raw 0-255 BGR images
+        frozen, frozen_shape = None, None  # frozen TorchScript trace of the PyTorch model, see jit_freeze()
         if not (pt or triton or nn_module):
             w = attempt_download(w)  # download if not local
 
         # NOTE: special case: in-memory pytorch model
         if nn_module:
             model = weights.to(device)
-            model = model.fuse() if fuse else model
+            if fold_input and hasattr(model, 'fuse'):
+                model = shared_copy(model).fuse(fold_input=True)  # keep the caller's input space, share its weights
+            elif fuse:
+                model = model.fuse()
+            input_folded = getattr(model, 'input_folded', False)
             names = model.module.names if hasattr(model, 'module') else model.names  # get class names
             stride = max(int(model.stride.max()), 32)  # model stride
             model.half() if fp16 else model.float()
@@ -75,10 +100,25 @@ class AutoBackend(nn.Module):
                                          device=device,
                                          inplace=True,
                                          fuse=fuse)
+            if fold_input and hasattr(model, 'fuse'):
+                model.fuse(fold_input=True)
+            input_folded = getattr(model, 'input_folded', False)
             stride = max(int(model.stride.max()), 32)  # model stride
             names = model.module.names if hasattr(model, 'module') else model.names  # get class names
             model.half() if fp16 else model.float()
             self.model = model  # explicitly assign for to(), cpu(), cuda(), half()
+        elif slim:  # PyTorch, fused weights memory-mapped from a slim export
+            from ultralytics.nn.tasks import load_slim
+            LOGGER.info(f'Loading {w} for slim PyTorch inference...')
+            model = load_slim(w, device=device)
+            if fold_input:
+                model.fuse(fold_input=True)
+            input_folded = model.input_folded
+            stride = max(int(model.stride.max()), 32)  # model stride
+            names = model.names
+            model.half() if fp16 else model.float()
+            self.model = model  # explicitly assign for to(), cpu(), cuda(), half()
+            pt = True
         elif jit:  # TorchScript
             LOGGER.info(f'Loading {w} for TorchScript inference...')
             extra_files = {'config.txt': ''}  # model metadata
@@ -224,6 +264,26 @@ class AutoBackend(nn.Module):
         else:
             raise NotImplementedError(f'ERROR: {w} is not a supported format')
 
+        # CPU precision and memory format, converted once here (PyTorch models only)
+        bf16 &= pt and device.type == 'cpu' and not fp16
+        if bf16 and not cpu_supports_bf16():
+            LOGGER.warning('WARNING ⚠️ bf16 requires a CPU with AVX512-BF16 or AMX instructions, using fp32')
+            bf16 = False
+        channels_last &= pt
+        if channels_last and device.type == 'cpu' and not torch.backends.mkldnn.is_available():
+            LOGGER.warning('WARNING ⚠️ channels_last requires PyTorch built with oneDNN on CPU, using contiguous')
+            channels_last = False
+        if (bf16 or channels_last) and model is weights:
+            model = self.model = shared_copy(model)  # do not change the caller's model nor copy its weights
+        if bf16:
+            model.to(torch.bfloat16)
+            head = getattr(model, 'model', [None])[-1]  # Detect() module
+            if hasattr(head, 'dfl'):
+                head.dfl.float()  # DFL and box decoding run in fp32
+        if channels_last:
+            model.to(memory_format=torch.channels_last)
+        dtype = torch.float16 if fp16 else torch.bfloat16 if bf16 else torch.float32  # input dtype
+
         # class names
         if 'names' not in locals():
             names = yaml_load(data)['names'] if data else {i: f'class{i}' for i in range(999)}
@@ -247,10 +307,20 @@ class AutoBackend(nn.Module):
         b, ch, h, w = im.shape  # batch, channel, height, width
         if self.fp16 and im.dtype != torch.float16:
             im = im.half()  # to FP16
+        elif self.bf16 and im.dtype != torch.bfloat16:
+            im = im.bfloat16()  # to BF16
+        if self.channels_last:
+            im = im.contiguous(memory_format=torch.channels_last)  # no-op if preprocessed in this layout
         if self.nhwc:
             im = im.permute(0, 2, 3, 1)  # torch BCHW to numpy BHWC shape(1,320,192,3)
 
-        if self.pt or self.nn_module:  # PyTorch
+        if self.frozen is not None and im.shape == self.frozen_shape and not (augment or visualize):
+            y = self.frozen(im)  # frozen TorchScript trace at its fixed input shape
+            head = self.model.model[-1] if hasattr(self.model, 'model') else None
+            if getattr(head, 'topk', 0):  # confidence-first decoding is kept out of the traced graph
+                y = (head.select_candidates(y[0]), *y[1:]) if isinstance(y, (list, tuple)) else \
+                    head.select_candidates(y)
+        elif self.pt or self.nn_module:  # PyTorch
             y = self.model(im, augment=augment, visualize=visualize) if augment or visualize else self.model(im)
         elif self.jit:  # TorchScript
             y = self.model(im)
@@ -348,10 +418,60 @@ class AutoBackend(nn.Module):
         """
         warmup_types = self.pt, self.jit, self.onnx, self.engine, self.saved_model, self.pb, self.triton, self.nn_module
         if any(warmup_types) and (self.device.type != 'cpu' or self.triton):
-            im = torch.empty(*imgsz, dtype=torch.half if self.fp16 else torch.float, device=self.device)  # input
+            im = torch.empty(*imgsz, dtype=self.dtype, device=self.device)  # input
             for _ in range(2 if self.jit else 1):  #
                 self.forward(im)  # warmup
 
+    def jit_freeze(self, imgsz):
+        """
+        Run inputs of shape imgsz through a frozen TorchScript trace of the PyTorch model, optimized for inference with
+        oneDNN fusions and cached on disk (see torch_utils.frozen_torchscript()). CPU only. Other input shapes keep
+        running the eager model. Only the first call has an effect, failures fall back to the eager model.
+
+        Args:
+            imgsz (tuple): The fixed input shape in the format (batch_size, channels, height, width).
+        """
+        if self.frozen_shape is not None:
+            return
+        self.frozen_shape = tuple(imgsz)
+        if not self.pt or self.device.type != 'cpu':
+            LOGGER.warning('WARNING ⚠️ jit_cache requires a PyTorch model on CPU, using the eager model')
+            return
+        from ultralytics.yolo.utils.torch_utils import frozen_torchscript
+        try:
+            im = torch.empty(*imgsz, dtype=self.dtype, device=self.device)
+            if self.channels_last:
+                im = im.contiguous(memory_format=torch.channels_last)  # traced in the layout forward() runs
+            file = None if self.nn_module or isinstance(self.weights, list) else self.w  # weights keyed by file
+            self.frozen = frozen_torchscript(self.model, im, weights=file)
+        except Exception as e:
+            LOGGER.warning(f'WARNING ⚠️ TorchScript freeze failed, using the eager model: {e}')
+
+    def warmup_shapes(self, shapes, batch=1):
+        """
+        Warm up the model at each of the declared input shapes, on CPU as well, so that the one-time costs of a new shape
+        (anchor generation, kernel selection, allocator growth) are paid at startup rather than mid-stream. The Detect
+        anchor cache is enlarged to hold all of them.
+
+        Args:
+            shapes (List[tuple]): The input shapes, as (height, width) or (batch_size, channels, height, width).
+            batch (int): The batch size for shapes given as (height, width). Default: 1
+
+        Returns:
+            (None): This method runs the forward passes and don't return any value
+        """
+        if not (self.pt or self.jit):
+            LOGGER.warning('WARNING ⚠️ warmup_shapes requires a PyTorch or TorchScript model with dynamic input shapes, '
+                           'skipping')
+            return
+        head = getattr(self.model, 'model', [None])[-1] if self.pt else None  # Detect() module
+        if hasattr(head, 'anchor_cache_size'):
+            head.anchor_cache_size = max(head.anchor_cache_size, len(shapes))
+        for shape in shapes:
+            shape = (batch, 3, *shape) if len(shape) == 2 else shape
+            im = torch.zeros(*shape, dtype=self.dtype, device=self.device)  # input
+            self.forward(im)
+
     @staticmethod
     def _model_type(p='path/to/model.pt'):
         """
@@ -361,7 +481,7 @@ class AutoBackend(nn.Module):
             p: path to the model file. Defaults to path/to/model.pt
         """
         # Return model type from model path, i.e. path='path/to/model.onnx' -> type=onnx
-        # types = [pt, jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle]
+        # types = [pt, jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle, slim]
         from ultralytics.yolo.engine.exporter import export_formats
         sf = list(export_formats().Suffix)  # export suffixes
         if not is_url(p, check=False) and not isinstance(p, str):
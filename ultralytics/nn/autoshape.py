@@ -17,7 +17,7 @@ from torch.cuda import amp
 
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.yolo.data.augment import LetterBox
-from ultralytics.yolo.utils import LOGGER, colorstr
+from ultralytics.yolo.utils import LOGGER, OFFLINE_MSG, colorstr, is_offline
 from ultralytics.yolo.utils.files import increment_path
 from ultralytics.yolo.utils.ops import Profile, make_divisible, non_max_suppression, scale_boxes, xyxy2xywh
 from ultralytics.yolo.utils.plotting import Annotator, colors, save_one_box
@@ -85,6 +85,8 @@ class AutoShape(nn.Module):
             for i, im in enumerate(ims):
                 f = f'image{i}'  # filename
                 if isinstance(im, (str, Path)):  # filename or uri
+                    if str(im).startswith('http') and is_offline():
+                        raise ConnectionError(f'Unable to fetch {im}, {OFFLINE_MSG}')
                     im, f = Image.open(requests.get(im, stream=True).raw if str(im).startswith('http') else im), im
                     im = np.asarray(ImageOps.exif_transpose(im))
                 elif isinstance(im, Image.Image):  # PIL Image
@@ -4,7 +4,10 @@ Common modules
 """
 
 import math
+import threading
 import warnings
+import weakref
+from collections import OrderedDict, defaultdict
 
 import torch
 import torch.nn as nn
@@ -21,6 +24,82 @@ def autopad(k, p=None, d=1):  # kernel, padding, dilation
     return p
 
 
+class ActivationPool:
+    """
+    Free-list of activation buffers for inference, keyed by shape, dtype and device and reused across layers and forward
+    passes. BaseModel._forward_once() activates it around no-grad forward passes; Concat and C2f then write their
+    concatenated outputs into pooled buffers instead of allocating them with torch.cat(). Buffers still lent at the end
+    of a forward pass (e.g. part of the output) are handed over to the caller. Buffers of shapes that have not been used
+    for `max_idle` forward passes are dropped, so alternating input shapes (frame, tiles) do not pin every shape seen.
+
+    Only the thread that acquired the pool (`owner`) uses it: Concat and C2f modules compare it with the calling thread,
+    so concurrent forward passes on the same model fall back to torch.cat() without touching the shared free-list.
+
+    Pools are registered in ACTIVATION_POOLS rather than stored on the modules, so that they are never pickled or copied
+    with the model and checkpoints stay loadable without this class.
+    """
+
+    def __init__(self, max_idle=16):
+        self.free = defaultdict(list)  # key -> buffers ready for reuse
+        self.lent = []  # (buffer, key) handed out during the current forward pass
+        self.last_used = {}  # key -> forward pass that last took a buffer of that key
+        self.passes = 0  # forward passes run with the pool
+        self.max_idle = max_idle  # forward passes after which the buffers of an unused key are dropped
+        self.owner = None  # thread id of the forward pass using the pool, None when inactive
+        self.lock = threading.Lock()  # concurrent forward passes on the same model bypass the pool
+
+    def acquire(self):
+        """Activate the pool for one forward pass of the calling thread, returns False if another thread is using it."""
+        if not self.lock.acquire(blocking=False):
+            return False  # the owner's pass is left untouched
+        self.owner = threading.get_ident()
+        return True
+
+    def release(self):
+        """Deactivate the pool at the end of a forward pass and drop the buffers of keys that went unused."""
+        self.lent.clear()
+        self.passes += 1
+        for key in [k for k, n in self.last_used.items() if self.passes - n > self.max_idle]:
+            del self.last_used[key]
+            self.free.pop(key, None)
+        self.owner = None
+        self.lock.release()
+
+    def take(self, shape, like):
+        """Lend an uninitialized buffer of the given shape, with the dtype, device and memory format of `like`."""
+        inference = torch.is_inference_mode_enabled() if hasattr(torch, 'is_inference_mode_enabled') else False
+        fmt = torch.channels_last if like.dim() == 4 and not like.is_contiguous() and \
+            like.is_contiguous(memory_format=torch.channels_last) else torch.contiguous_format
+        key = (tuple(shape), like.dtype, like.device, fmt, inference)  # inference tensors can not be reused outside
+        free = self.free[key]
+        self.last_used[key] = self.passes
+        x = free.pop() if free else torch.empty(shape, dtype=like.dtype, device=like.device, memory_format=fmt)
+        self.lent.append((x, key))
+        return x
+
+    def give(self, x):
+        """Return a lent buffer once its last consumer has run. Tensors not lent by the pool are ignored."""
+        for i, (t, key) in enumerate(self.lent):
+            if t is x:
+                del self.lent[i]
+                self.free[key].append(x)
+                return
+
+    def cat(self, tensors, dim=1):
+        """torch.cat() into a pooled buffer."""
+        shape = list(tensors[0].shape)
+        shape[dim] = sum(t.shape[dim] for t in tensors)
+        out, i = self.take(shape, tensors[0]), 0
+        for t in tensors:
+            out.narrow(dim, i, t.shape[dim]).copy_(t)
+            i += t.shape[dim]
+        return out
+
+
+ACTIVATION_POOLS = weakref.WeakKeyDictionary()  # model and its Concat/C2f modules -> ActivationPool
+ANCHOR_CACHES = weakref.WeakKeyDictionary()  # Detect head -> LRU of anchors and strides, see Detect.cached_anchors()
+
+
 class Conv(nn.Module):
     # Standard convolution with args(ch_in, ch_out, kernel, stride, padding, groups, dilation, activation)
     default_act = nn.SiLU()  # default activation
@@ -186,10 +265,26 @@ class C2f(nn.Module):
         self.m = nn.ModuleList(Bottleneck(self.c, self.c, shortcut, g, k=((3, 3), (3, 3)), e=1.0) for _ in range(n))
 
     def forward(self, x):
+        pool = ACTIVATION_POOLS.get(self)
+        if pool is not None and pool.owner == threading.get_ident():
+            return self.forward_pool(x, pool)
         y = list(self.cv1(x).split((self.c, self.c), 1))
         y.extend(m(y[-1]) for m in self.m)
         return self.cv2(torch.cat(y, 1))
 
+    def forward_pool(self, x, pool):
+        # Inference: bottleneck outputs are written into slices of a single pooled buffer, returned after cv2
+        a = self.cv1(x)
+        buf = pool.take((a.shape[0], (2 + len(self.m)) * self.c, *a.shape[2:]), a)
+        buf[:, :2 * self.c] = a
+        y = a[:, self.c:]
+        for i, m in enumerate(self.m):
+            y = m(y)
+            buf[:, (2 + i) * self.c:(3 + i) * self.c] = y
+        x = self.cv2(buf)
+        pool.give(buf)
+        return x
+
 
 class ChannelAttention(nn.Module):
     # Channel-attention module https://github.com/open-mmlab/mmdetection/tree/v3.0.0rc1/configs/rtmdet
@@ -345,6 +440,9 @@ class Concat(nn.Module):
         self.d = dimension
 
     def forward(self, x):
+        pool = ACTIVATION_POOLS.get(self)
+        if pool is not None and pool.owner == threading.get_ident():
+            return pool.cat(x, self.d)  # returned to the pool by BaseModel._forward_once() after its last use
         return torch.cat(x, self.d)
 
 
@@ -382,6 +480,9 @@ class Detect(nn.Module):
     shape = None
     anchors = torch.empty(0)  # init
     strides = torch.empty(0)  # init
+    topk = 0  # confidence-first decoding of the top-k anchors above conf (inference only), 0 to decode all anchors
+    conf = 0.0  # confidence threshold for confidence-first decoding
+    anchor_cache_size = 8  # number of feature-map shapes kept in the anchor cache
 
     def __init__(self, nc=80, ch=()):  # detection layer
         super().__init__()
@@ -403,15 +504,70 @@ class Detect(nn.Module):
             x[i] = torch.cat((self.cv2[i](x[i]), self.cv3[i](x[i])), 1)
         if self.training:
             return x
-        elif self.dynamic or self.shape != shape:
-            self.anchors, self.strides = (x.transpose(0, 1) for x in make_anchors(x, self.stride, 0.5))
+        if x[0].dtype == torch.bfloat16:
+            x = [xi.float() for xi in x]  # bf16 CPU inference: anchors, DFL and box decoding in fp32
+        if self.dynamic or self.shape != shape:
+            self.anchors, self.strides = self.cached_anchors(x)
             self.shape = shape
 
-        box, cls = torch.cat([xi.view(shape[0], self.no, -1) for xi in x], 2).split((self.reg_max * 4, self.nc), 1)
+        # reshape: head outputs are not contiguous when running channels-last
+        box, cls = torch.cat([xi.reshape(shape[0], self.no, -1) for xi in x], 2).split((self.reg_max * 4, self.nc), 1)
+        if self.topk and not self.export:
+            return self.decode_candidates(box, cls), x
         dbox = dist2bbox(self.dfl(box), self.anchors.unsqueeze(0), xywh=True, dim=1) * self.strides
         y = torch.cat((dbox, cls.sigmoid()), 1)
         return y if self.export else (y, x)
 
+    def cached_anchors(self, x):
+        """
+        Anchors and strides for the feature maps x, from an LRU cache keyed by the feature-map shapes, device and dtype,
+        so that alternating input shapes (full frame, ROI, tiles) do not rebuild them on every switch. The batch size is
+        not part of the key. Dynamic mode always rebuilds them, for export. The cache is registered in ANCHOR_CACHES
+        rather than stored on the head, so that it is never pickled into checkpoints nor copied with the model.
+        """
+        if self.dynamic:
+            return tuple(a.transpose(0, 1) for a in make_anchors(x, self.stride, 0.5))
+        cache = ANCHOR_CACHES.get(self)
+        if cache is None:
+            cache = ANCHOR_CACHES[self] = OrderedDict()
+        key = (tuple(tuple(xi.shape[2:]) for xi in x), x[0].device, x[0].dtype)
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = tuple(a.transpose(0, 1) for a in make_anchors(x, self.stride, 0.5))
+            while len(cache) > self.anchor_cache_size:
+                cache.popitem(last=False)  # least recently used
+        return cache[key]
+
+    def decode_candidates(self, box, cls):
+        """
+        Confidence-first decoding: class scores are computed first and DFL plus box decoding only run on the anchors
+        above self.conf, capped at self.topk per image. The output keeps the (b, 4 + nc, n) layout expected by
+        non_max_suppression(), with n the largest candidate count in the batch (at least 1).
+        """
+        scores = cls.sigmoid()
+        i = self.candidate_indices(scores.amax(1))  # (b, k) candidate anchor indices
+        box = box.gather(2, i.unsqueeze(1).expand(-1, box.shape[1], -1))
+        scores = scores.gather(2, i.unsqueeze(1).expand(-1, scores.shape[1], -1))
+        anchors = self.anchors[:, i].transpose(0, 1)  # (b, 2, k)
+        strides = self.strides[0, i].unsqueeze(1)  # (b, 1, k)
+        dbox = dist2bbox(self.dfl(box), anchors, xywh=True, dim=1) * strides
+        return torch.cat((dbox, scores), 1)
+
+    def candidate_indices(self, conf):
+        """Indices (b, k) of the anchors above self.conf in the best class scores conf (b, a), capped at self.topk."""
+        k = int((conf > self.conf).sum(1).max())
+        k = max(min(k, self.topk, conf.shape[1]), 1)
+        return conf.topk(k, 1, sorted=False)[1]
+
+    def select_candidates(self, y):
+        """
+        Top-k selection on a fully decoded output y (b, 4 + nc, a), i.e. from a frozen trace without top-k in its graph:
+        the same anchors and values as decode_candidates(), only DFL and box decoding ran on all anchors.
+        """
+        i = self.candidate_indices(y[:, 4:4 + self.nc].amax(1))
+        return y.gather(2, i.unsqueeze(1).expand(-1, y.shape[1], -1))
+
     def bias_init(self):
         # Initialize Detect() biases, WARNING: requires stride availability
         m = self  # self.model[-1]  # Detect() module
@@ -438,7 +594,9 @@ class Segment(Detect):
         p = self.proto(x[0])  # mask protos
         bs = p.shape[0]  # batch size
 
-        mc = torch.cat([self.cv4[i](x[i]).view(bs, self.nm, -1) for i in range(self.nl)], 2)  # mask coefficients
+        mc = torch.cat([self.cv4[i](x[i]).reshape(bs, self.nm, -1) for i in range(self.nl)], 2)  # mask coefficients
+        if p.dtype == torch.bfloat16 and not self.training:
+            p, mc = p.float(), mc.float()  # bf16 CPU inference: masks in fp32
         x = self.detect(self, x)
         if self.training:
             return x, mc, p
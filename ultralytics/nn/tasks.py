@@ -1,19 +1,26 @@
 # Ultralytics YOLO 🚀, GPL-3.0 license
 
 import contextlib
+import json
+import struct
 from copy import deepcopy
 
+import numpy as np
 import thop
 import torch
 import torch.nn as nn
 
-from ultralytics.nn.modules import (C1, C2, C3, C3TR, SPP, SPPF, Bottleneck, BottleneckCSP, C2f, C3Ghost, C3x, Classify,
-                                    Concat, Conv, ConvTranspose, Detect, DWConv, DWConvTranspose2d, Ensemble, Focus,
-                                    GhostBottleneck, GhostConv, Segment)
+from ultralytics.nn.modules import (ACTIVATION_POOLS, C1, C2, C3, C3TR, SPP, SPPF, ActivationPool, Bottleneck,
+                                    BottleneckCSP, C2f, C3Ghost, C3x, Classify, Concat, Conv, ConvTranspose, Detect,
+                                    DWConv, DWConvTranspose2d, Ensemble, Focus, GhostBottleneck, GhostConv, Segment)
 from ultralytics.yolo.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER, colorstr, yaml_load
-from ultralytics.yolo.utils.checks import check_requirements, check_yaml
-from ultralytics.yolo.utils.torch_utils import (fuse_conv_and_bn, initialize_weights, intersect_dicts, make_divisible,
-                                                model_info, scale_img, time_sync)
+from ultralytics.yolo.utils.checks import check_requirements, check_version, check_yaml
+from ultralytics.yolo.utils.torch_utils import (fuse_conv_and_bn, guess_task_from_head, initialize_weights,
+                                                intersect_dicts, make_divisible, model_info, scale_img, time_sync)
+
+SLIM_MAGIC = b'YOLOSLIM'  # slim inference weights, see save_slim()
+SLIM_VERSION = 1
+SLIM_ALIGN = 64  # byte alignment of every tensor in the file
 
 
 class BaseModel(nn.Module):
@@ -21,6 +28,9 @@ class BaseModel(nn.Module):
     The BaseModel class serves as a base class for all the models in the Ultralytics YOLO family.
     """
 
+    input_folded = False  # True once the 1/255 scale and BGR to RGB swap are folded into the first Conv, see fuse()
+    memory_planner = True  # release saved outputs after their last use and reuse Concat/C2f buffers in inference
+
     def forward(self, x, profile=False, visualize=False):
         """
         Forward pass of the model on a single scale.
@@ -49,18 +59,51 @@ class BaseModel(nn.Module):
             (torch.Tensor): The last output of the model.
         """
         y, dt = [], []  # outputs
-        for m in self.model:
-            if m.f != -1:  # if not from previous layer
-                x = y[m.f] if isinstance(m.f, int) else [x if j == -1 else y[j] for j in m.f]  # from earlier layers
-            if profile:
-                self._profile_one_layer(m, x, dt)
-            x = m(x)  # run
-            y.append(x if m.i in self.save else None)  # save output
-            if visualize:
-                LOGGER.info('visualize feature not yet supported')
-                # TODO: feature_visualization(x, m.type, m.i, save_dir=visualize)
+        pool = self._memory_plan() if self.memory_planner else None
+        if pool is not None and (torch.is_grad_enabled() or torch.jit.is_tracing() or not pool.acquire()):
+            pool = None  # buffers are only reused in no-grad inference
+        try:
+            for m in self.model:
+                prev = x  # output of the previous layer
+                if m.f != -1:  # if not from previous layer
+                    x = y[m.f] if isinstance(m.f, int) else [x if j == -1 else y[j] for j in m.f]  # from earlier layers
+                if profile:
+                    self._profile_one_layer(m, x, dt)
+                x = m(x)  # run
+                y.append(x if m.i in self.save else None)  # save output
+                if self.memory_planner:
+                    for j in getattr(m, 'release', ()):  # saved outputs whose last consumer was this layer
+                        if pool is not None and y[j] is not x:
+                            pool.give(y[j])
+                        y[j] = None
+                    if pool is not None and m.i and m.i - 1 not in self.save and prev is not x:
+                        pool.give(prev)  # unsaved output of the previous layer, only consumed by this layer
+                if visualize:
+                    LOGGER.info('visualize feature not yet supported')
+                    # TODO: feature_visualization(x, m.type, m.i, save_dir=visualize)
+        finally:
+            if pool is not None:
+                pool.release()
         return x
 
+    def _memory_plan(self):
+        """
+        Set up the memory planner on first use, also for models loaded from checkpoints saved without it: the last-use
+        plan of the saved outputs (see release_plan()) and the activation pool shared by the Concat and C2f modules.
+
+        Returns:
+            (ActivationPool): The activation pool of the model.
+        """
+        pool = ACTIVATION_POOLS.get(self)
+        if pool is None:
+            if not all(hasattr(m, 'release') for m in self.model):
+                release_plan(self.model)
+            pool = ACTIVATION_POOLS[self] = ActivationPool()
+            for m in self.model.modules():
+                if isinstance(m, (Concat, C2f)):
+                    ACTIVATION_POOLS[m] = pool
+        return pool
+
     def _profile_one_layer(self, m, x, dt):
         """
         Profile the computation time and FLOPs of a single layer of the model on a given input.
@@ -86,11 +129,15 @@ class BaseModel(nn.Module):
         if c:
             LOGGER.info(f"{sum(dt):10.2f} {'-':>10s} {'-':>10s}  Total")
 
-    def fuse(self):
+    def fuse(self, fold_input=False):
         """
         Fuse the `Conv2d()` and `BatchNorm2d()` layers of the model into a single layer, in order to improve the
         computation efficiency.
 
+        Args:
+            fold_input (bool): Also fold the input normalization (1/255) and the BGR to RGB channel swap into the first
+                Conv, so the model takes raw 0-255 BGR images directly. Default is False.
+
         Returns:
             (nn.Module): The fused model is returned.
         """
@@ -101,9 +148,25 @@ class BaseModel(nn.Module):
                     delattr(m, 'bn')  # remove batchnorm
                     m.forward = m.forward_fuse  # update forward
             self.info()
+        if fold_input and not self.input_folded:
+            self._fold_input()
 
         return self
 
+    def _fold_input(self):
+        """
+        Fold the 1/255 input scale and the BGR to RGB channel swap into the weights of the first Conv. With x the RGB
+        0-1 input and x' the BGR 0-255 input, conv(x) = W * x + b = (W.flip(1) / 255) * x' + b. Zero padding is the same
+        in both input spaces, so the folded model is numerically equivalent to the original.
+        """
+        m = self.model[0]
+        conv = getattr(m, 'conv', None)
+        if not isinstance(m, Conv) or not isinstance(conv, nn.Conv2d) or conv.in_channels != 3 or conv.groups != 1:
+            LOGGER.warning(f'WARNING ⚠️ input folding requires a 3-channel Conv first layer, not {m.type}, skipping')
+            return
+        conv.weight.data = conv.weight.data.flip(1) / 255
+        self.input_folded = True
+
     def is_fused(self, thresh=10):
         """
         Check if the model has less than a certain threshold of BatchNorm layers.
@@ -358,6 +421,8 @@ def attempt_load_one_weight(weight, device=None, inplace=True, fuse=False):
     from ultralytics.yolo.utils.downloads import attempt_download
 
     weight = attempt_download(weight)
+    if str(weight).endswith('.slim'):  # fused inference weights, no training checkpoint
+        return load_slim(weight, device, inplace), None
     try:
         ckpt = torch.load(weight, map_location='cpu')  # load
     except ModuleNotFoundError:
@@ -390,6 +455,106 @@ def attempt_load_one_weight(weight, device=None, inplace=True, fuse=False):
     return model, ckpt
 
 
+def save_slim(model, file):
+    """
+    Save a fused model for inference only in the flat `slim` format: an 8-byte magic, the header length, a JSON header
+    (model yaml, task, stride, names, args and the dtype, shape and offset of every tensor) and the raw tensor data, each
+    tensor aligned to SLIM_ALIGN bytes. Nothing is pickled, see load_slim().
+
+    Args:
+        model (BaseModel): The fused detection, segmentation or classification model, built from a yaml.
+        file (str | Path): The output file, by convention *.slim.
+    """
+    assert hasattr(model, 'yaml'), 'slim export requires a model built from a yaml'
+    state = {k: v.detach().cpu().contiguous() for k, v in model.state_dict().items()}
+    tensors, offset = {}, 0
+    for k, v in state.items():
+        tensors[k] = {'dtype': str(v.dtype).replace('torch.', ''), 'shape': list(v.shape), 'offset': offset}
+        offset += -(-v.numel() * v.element_size() // SLIM_ALIGN) * SLIM_ALIGN  # aligned size
+    header = {
+        'version': SLIM_VERSION,
+        'task': guess_task_from_head(model.yaml['head'][-1][-2]),
+        'yaml': model.yaml,
+        'stride': getattr(model, 'stride', torch.tensor([32.])).tolist(),
+        'names': model.names,
+        'args': getattr(model, 'args', {}),
+        'input_folded': model.input_folded,
+        'tensors': tensors}
+    header = json.dumps(header, default=str).encode()
+    header += b' ' * (-(len(header) + 16) % SLIM_ALIGN)  # tensor data starts aligned
+    with open(file, 'wb') as f:
+        f.write(SLIM_MAGIC + struct.pack('<Q', len(header)) + header)
+        for k, v in state.items():
+            b = v.numpy().tobytes()
+            f.write(b + bytes(-len(b) % SLIM_ALIGN))
+
+
+def load_slim(weight, device=None, inplace=True):
+    """
+    Load a model saved by save_slim(). The module tree is rebuilt from the yaml in its fused form, on the meta device
+    where supported so no weights are initialized, and every parameter is a zero-copy view of the memory-mapped file
+    (copy-on-write): no unpickling, no float conversion and no Conv+BN fusion at startup.
+
+    Args:
+        weight (str | Path): The *.slim file.
+        device (torch.device, optional): The device to move the model to. Views are kept on CPU.
+        inplace (bool): Inplace ops of the Detect and Segment heads. Default: True
+
+    Returns:
+        (BaseModel): The fused model in eval mode, with `args`, `names`, `stride` and `pt_path` attached.
+    """
+    with open(weight, 'rb') as f:
+        magic, n = f.read(8), struct.unpack('<Q', f.read(8))[0]
+        assert magic == SLIM_MAGIC, f'{weight} is not a slim model file'
+        header = json.loads(f.read(n))
+    assert header['version'] <= SLIM_VERSION, f"{weight} slim version {header['version']} requires a newer ultralytics"
+    data = np.memmap(weight, dtype=np.uint8, mode='c', offset=16 + n)
+
+    # Fused module tree, without weight initialization nor the stride forward pass of the model constructors
+    cls = {'detect': DetectionModel, 'segment': SegmentationModel, 'classify': ClassificationModel}[header['task']]
+    model = cls.__new__(cls)
+    BaseModel.__init__(model)
+    model.yaml = header['yaml']
+    meta = torch.device('meta') if check_version(torch.__version__, '2.0.0') else contextlib.nullcontext()
+    with meta:
+        model.model, model.save = parse_model(deepcopy(model.yaml), ch=[model.yaml.get('ch', 3)], verbose=False)
+        for m in model.model.modules():
+            if isinstance(m, (Conv, DWConv)) and hasattr(m, 'bn'):
+                m.conv.bias = nn.Parameter(torch.empty(m.conv.out_channels), requires_grad=False)  # set below
+                delattr(m, 'bn')  # remove batchnorm
+                m.forward = m.forward_fuse  # update forward
+
+    # Weights
+    missing = set(model.state_dict()) - set(header['tensors'])
+    assert not missing, f'{weight} is missing tensors {sorted(missing)}'
+    for k, t in header['tensors'].items():
+        dtype = np.dtype(t['dtype'])
+        x = data[t['offset']:t['offset'] + int(np.prod(t['shape'])) * dtype.itemsize].view(dtype).reshape(t['shape'])
+        module, _, name = k.rpartition('.')
+        m = model.get_submodule(module)
+        if name in m._parameters:
+            m._parameters[name] = nn.Parameter(torch.from_numpy(x), requires_grad=False)
+        else:
+            m._buffers[name] = torch.from_numpy(x)
+
+    model.stride = torch.tensor(header['stride'])
+    model.names = {int(k): v for k, v in header['names'].items()}
+    model.inplace = model.yaml.get('inplace', True)
+    model.args = {**DEFAULT_CFG_DICT, **header['args'], 'task': header['task']}
+    model.args = {k: v for k, v in model.args.items() if k in DEFAULT_CFG_KEYS}
+    model.pt_path = str(weight)
+    if header['input_folded']:
+        model.input_folded = True
+    head = model.model[-1]
+    if isinstance(head, (Detect, Segment)):
+        head.stride = model.stride
+        head.inplace = inplace
+    for m in model.modules():
+        if type(m) in (nn.Hardswish, nn.LeakyReLU, nn.ReLU, nn.ReLU6, nn.SiLU):
+            m.inplace = inplace
+    return model.to(device).eval() if device is not None else model.eval()
+
+
 def parse_model(d, ch, verbose=True):  # model_dict, input_channels(3)
     # Parse a YOLO model.yaml dictionary
     if verbose:
@@ -441,4 +606,23 @@ def parse_model(d, ch, verbose=True):  # model_dict, input_channels(3)
         if i == 0:
             ch = []
         ch.append(c2)
+    release_plan(layers)
     return nn.Sequential(*layers), sorted(save)
+
+
+def release_plan(layers):
+    """
+    Last-use analysis of the saved layer outputs. Sets `release` on each layer to the indices of the earlier outputs
+    whose last consumer it is, so that BaseModel._forward_once() can drop them as soon as the layer has run.
+
+    Args:
+        layers (Iterable[nn.Module]): The model layers, with the `i` and `f` attributes set by parse_model().
+    """
+    layers = list(layers)
+    last = {}  # output index -> index of its last consumer
+    for m in layers:
+        for j in ([m.f] if isinstance(m.f, int) else m.f):
+            if j != -1:
+                last[j % m.i] = m.i
+    for m in layers:
+        m.release = sorted(j for j, i in last.items() if i == m.i)
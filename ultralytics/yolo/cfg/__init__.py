@@ -20,7 +20,7 @@ CLI_HELP_MSG = \
         yolo TASK MODE ARGS
 
         Where   TASK (optional) is one of [detect, segment, classify]
-                MODE (required) is one of [train, val, predict, export]
+                MODE (required) is one of [train, val, predict, export, benchmark]
                 ARGS (optional) are any number of custom 'arg=value' pairs like 'imgsz=320' that override defaults.
                     See all ARGS at https://docs.ultralytics.com/cfg or with 'yolo cfg'
 
@@ -36,7 +36,10 @@ CLI_HELP_MSG = \
     4. Export a YOLOv8n classification model to ONNX format at image size 224 by 128 (no TASK required)
         yolo export model=yolov8n-cls.pt format=onnx imgsz=224,128
 
-    5. Run special commands:
+    5. Benchmark the export formats of a detection model for speed and mAP at image sizes 320 and 640 on CPU
+        yolo benchmark model=yolov8n.pt data=coco128.yaml bench_imgsz=[320,640] bench_batch=[1,4] device=cpu
+
+    6. Run special commands:
         yolo help
         yolo checks
         yolo version
@@ -164,7 +167,7 @@ def entrypoint(debug=False):
         return
 
     tasks = 'detect', 'segment', 'classify'
-    modes = 'train', 'val', 'predict', 'export'
+    modes = 'train', 'val', 'predict', 'export', 'benchmark'
     special = {
         'help': lambda: LOGGER.info(CLI_HELP_MSG),
         'checks': check_yolo,
@@ -226,11 +229,13 @@ def entrypoint(debug=False):
         raise SyntaxError(f"yolo task={cfg.task} is invalid. Valid tasks are: {', '.join(tasks)}\n{CLI_HELP_MSG}")
 
     # Mapping from mode to function
+    from ultralytics.yolo.utils import benchmarks
     func = {
         "train": module.train,
         "val": module.val,
         "predict": module.predict,
-        "export": yolo.engine.exporter.export}.get(cfg.mode)
+        "export": yolo.engine.exporter.export,
+        "benchmark": benchmarks.run}.get(cfg.mode)
     if not func:
         raise SyntaxError(f"yolo mode={cfg.mode} is invalid. Valid modes are: {', '.join(modes)}\n{CLI_HELP_MSG}")
 
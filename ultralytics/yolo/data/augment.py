@@ -492,6 +492,106 @@ class LetterBox:
         return labels
 
 
+class LetterBoxCanvas:
+    """
+    LetterBox for inference on streams whose input shape does not change between frames. The resize geometry is cached
+    per (input_shape, auto) and images are resized directly into a reused, gray-filled (b, h, w, 3) canvas instead of
+    allocating a resized image and a bordered copy for every frame.
+
+    The returned batch is a view of the canvas and is overwritten by the next call, copy it to keep it.
+    """
+
+    def __init__(self, new_shape=(640, 640), auto=False, scaleup=True, stride=32, maxsize=16):
+        """
+        Args:
+            new_shape (int | tuple): Target shape (height, width).
+            auto (bool): Pad to the minimum rectangle that is a multiple of stride. Can be overridden per call.
+            scaleup (bool): Allow upscaling of images smaller than new_shape.
+            stride (int): The model stride, for auto padding.
+            maxsize (int): The maximum number of cached geometries.
+        """
+        self.new_shape = (new_shape, new_shape) if isinstance(new_shape, int) else tuple(new_shape)
+        self.auto = auto
+        self.scaleup = scaleup
+        self.stride = int(stride)
+        self.maxsize = maxsize
+        self.geometries = {}  # (input_shape, auto) -> (new_unpad, top, left, output_shape, ratio_pad)
+        self.canvas = None  # (b, h, w, 3) uint8
+        self.regions = []  # image region (top, left, new_unpad) currently drawn in each canvas slot
+
+    def geometry(self, shape, auto=None):
+        """
+        Cached resize geometry for an input shape, computed like LetterBox.
+
+        Args:
+            shape (tuple): The input image shape (height, width).
+            auto (bool, optional): Override of self.auto.
+
+        Returns:
+            (tuple): new_unpad (w, h), top and left padding, the output shape (h, w) and ratio_pad ((r, r), (dw, dh)) as
+                expected by ops.scale_boxes().
+        """
+        auto = self.auto if auto is None else auto
+        key = (tuple(shape[:2]), auto)
+        if key not in self.geometries:
+            if len(self.geometries) >= self.maxsize:
+                self.geometries.clear()
+            r = min(self.new_shape[0] / shape[0], self.new_shape[1] / shape[1])
+            if not self.scaleup:  # only scale down, do not scale up (for better val mAP)
+                r = min(r, 1.0)
+            new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+            dw, dh = self.new_shape[1] - new_unpad[0], self.new_shape[0] - new_unpad[1]  # wh padding
+            if auto:  # minimum rectangle
+                dw, dh = dw % self.stride, dh % self.stride
+            top, left = int(round(dh / 2 - 0.1)), int(round(dw / 2 - 0.1))
+            output_shape = new_unpad[1] + dh, new_unpad[0] + dw
+            self.geometries[key] = new_unpad, top, left, output_shape, ((r, r), (dw / 2, dh / 2))
+        return self.geometries[key]
+
+    def __call__(self, image, auto=None):
+        """
+        Letterbox a single image.
+
+        Returns:
+            (tuple): The (h, w, 3) letterboxed image (a view of the canvas) and its ratio_pad.
+        """
+        im, ratio_pad = self.batch([image], auto)
+        return im[0], ratio_pad[0]
+
+    def batch(self, images, auto=None):
+        """
+        Letterbox a batch of images into the canvas. Images must produce the same output shape, which is always the case
+        with auto=False or with equal input shapes. The canvas keeps the largest batch size seen, smaller batches are a
+        view of its first slots.
+
+        Args:
+            images (List[np.ndarray]): BGR images of shape (h, w, 3).
+            auto (bool, optional): Override of self.auto.
+
+        Returns:
+            (tuple): The (b, h, w, 3) letterboxed batch (a view of the canvas) and the list of ratio_pad per image.
+        """
+        geometries = [self.geometry(im.shape, auto) for im in images]
+        b, shape = len(images), (*geometries[0][3], 3)
+        assert all(g[3] == shape[:2] for g in geometries), 'LetterBoxCanvas batch images must share an output shape'
+        if self.canvas is None or self.canvas.shape[1:] != shape or len(self.canvas) < b:
+            self.canvas = np.full((b, *shape), 114, dtype=np.uint8)
+            self.regions = [None] * b
+
+        for i, (im, (new_unpad, top, left, _, _)) in enumerate(zip(images, geometries)):
+            if self.regions[i] != (top, left, new_unpad):  # geometry changed, clear the previous image
+                self.canvas[i] = 114
+                self.regions[i] = top, left, new_unpad
+            dst = self.canvas[i, top:top + new_unpad[1], left:left + new_unpad[0]]
+            if im.shape[1::-1] == new_unpad:
+                dst[:] = im
+            else:
+                out = cv2.resize(im, new_unpad, dst=dst, interpolation=cv2.INTER_LINEAR)
+                if not np.may_share_memory(out, dst):  # OpenCV could not write in place
+                    dst[:] = out
+        return self.canvas[:b], [g[4] for g in geometries]
+
+
 class CopyPaste:
 
     def __init__(self, p=0.5) -> None:
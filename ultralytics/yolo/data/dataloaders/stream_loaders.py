@@ -3,9 +3,11 @@
 import glob
 import math
 import os
-import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from threading import Thread
+from queue import Full, Queue
+from threading import Condition, Event, Thread
 from urllib.parse import urlparse
 
 import cv2
@@ -13,7 +15,7 @@ import numpy as np
 import torch
 from PIL import Image
 
-from ultralytics.yolo.data.augment import LetterBox
+from ultralytics.yolo.data.augment import LetterBox, LetterBoxCanvas
 from ultralytics.yolo.data.utils import IMG_FORMATS, VID_FORMATS
 from ultralytics.yolo.utils import LOGGER, ROOT, is_colab, is_kaggle, ops
 from ultralytics.yolo.utils.checks import check_requirements
@@ -21,16 +23,30 @@ from ultralytics.yolo.utils.checks import check_requirements
 
 class LoadStreams:
     # YOLOv8 streamloader, i.e. `python detect.py --source 'rtsp://example.com/media.mp4'  # RTSP, RTMP, HTTP streams`
-    def __init__(self, sources='file.streams', imgsz=640, stride=32, auto=True, transforms=None, vid_stride=1):
+    # Each iteration waits for at least one stream with a frame not returned yet and batches only those streams, their
+    # indices are in `self.indices`. Frames are numbered per stream in `self.seq`.
+    def __init__(self,
+                 sources='file.streams',
+                 imgsz=640,
+                 stride=32,
+                 auto=True,
+                 transforms=None,
+                 vid_stride=1,
+                 hwc=False,
+                 letterbox=None):
         torch.backends.cudnn.benchmark = True  # faster for fixed-size inference
         self.mode = 'stream'
         self.imgsz = imgsz
         self.stride = stride
         self.vid_stride = vid_stride  # video frame-rate stride
+        self.hwc = hwc  # keep letterboxed images as BGR HWC (input normalization folded into the model)
         sources = Path(sources).read_text().rsplit() if os.path.isfile(sources) else [sources]
         n = len(sources)
         self.sources = [ops.clean_str(x) for x in sources]  # clean source names for later
         self.imgs, self.fps, self.frames, self.threads = [None] * n, [0] * n, [0] * n, [None] * n
+        self.seq, self.consumed = [1] * n, [0] * n  # per stream: number of the latest frame and of the last one batched
+        self.indices = []  # streams in the last batch
+        self.new_frame = Condition()  # notified by the reader threads
         for i, s in enumerate(sources):  # index, source
             # Start thread to read frames from video stream
             st = f'{i + 1}/{n}: {s}... '
@@ -58,28 +74,33 @@ class LoadStreams:
         LOGGER.info('')  # newline
 
         # check for common shapes
-        s = np.stack([LetterBox(imgsz, auto, stride=stride)(image=x).shape for x in self.imgs])
-        self.rect = np.unique(s, axis=0).shape[0] == 1  # rect inference if all shapes equal
+        self.letterbox = letterbox or LetterBoxCanvas(imgsz, auto, stride=stride)  # reused canvas
+        s = {self.letterbox.geometry(x.shape, auto)[3] for x in self.imgs}  # letterboxed shapes
+        self.rect = len(s) == 1  # rect inference if all shapes equal
         self.auto = auto and self.rect
         self.transforms = transforms  # optional
+        self.ratio_pad = None  # per-stream (ratio, pad) of the last batch, for ops.scale_boxes()
         if not self.rect:
             LOGGER.warning('WARNING ⚠️ Stream shapes differ. For optimal performance supply similarly-shaped streams.')
 
     def update(self, i, cap, stream):
-        # Read stream `i` frames in daemon thread
+        # Read stream `i` frames in daemon thread, grab() blocks until the next frame
         n, f = 0, self.frames[i]  # frame number, frame array
         while cap.isOpened() and n < f:
             n += 1
             cap.grab()  # .read() = .grab() followed by .retrieve()
             if n % self.vid_stride == 0:
                 success, im = cap.retrieve()
-                if success:
-                    self.imgs[i] = im
-                else:
+                if not success:
                     LOGGER.warning('WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.')
-                    self.imgs[i] = np.zeros_like(self.imgs[i])
+                    im = np.zeros_like(self.imgs[i])
                     cap.open(stream)  # re-open stream if signal was lost
-            time.sleep(0.0)  # wait time
+                with self.new_frame:
+                    self.imgs[i] = im
+                    self.seq[i] += 1
+                    self.new_frame.notify_all()
+        with self.new_frame:
+            self.new_frame.notify_all()  # stream ended
 
     def __iter__(self):
         self.count = -1
@@ -87,19 +108,29 @@ class LoadStreams:
 
     def __next__(self):
         self.count += 1
+        with self.new_frame:  # wait for at least one stream with a new frame
+            fresh = []
+            while not fresh and all(x.is_alive() for x in self.threads):
+                fresh = [i for i, (s, c) in enumerate(zip(self.seq, self.consumed)) if s > c]
+                if not fresh:
+                    self.new_frame.wait(0.1)  # timeout to check the threads
+            im0 = [self.imgs[i] for i in fresh]
+            for i in fresh:
+                self.consumed[i] = self.seq[i]
         if not all(x.is_alive() for x in self.threads) or cv2.waitKey(1) == ord('q'):  # q to quit
             cv2.destroyAllWindows()
             raise StopIteration
 
-        im0 = self.imgs.copy()
+        self.indices = fresh
         if self.transforms:
             im = np.stack([self.transforms(x) for x in im0])  # transforms
         else:
-            im = np.stack([LetterBox(self.imgsz, self.auto, stride=self.stride)(image=x) for x in im0])
-            im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW
-            im = np.ascontiguousarray(im)  # contiguous
+            im, self.ratio_pad = self.letterbox.batch(im0, self.auto)
+            if not self.hwc:
+                im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW
+                im = np.ascontiguousarray(im)  # contiguous
 
-        return self.sources, im, im0, None, ''
+        return [self.sources[i] for i in fresh], im, im0, None, ''
 
     def __len__(self):
         return len(self.sources)  # 1E12 frames = 32 streams at 30 FPS for 30 years
@@ -107,7 +138,7 @@ class LoadStreams:
 
 class LoadScreenshots:
     # YOLOv8 screenshot dataloader, i.e. `python detect.py --source "screen 0 100 100 512 256"`
-    def __init__(self, source, imgsz=640, stride=32, auto=True, transforms=None):
+    def __init__(self, source, imgsz=640, stride=32, auto=True, transforms=None, hwc=False):
         # source = [screen_number left top width height] (pixels)
         check_requirements('mss')
         import mss  # noqa
@@ -124,6 +155,7 @@ class LoadScreenshots:
         self.stride = stride
         self.transforms = transforms
         self.auto = auto
+        self.hwc = hwc  # keep letterboxed images as BGR HWC (input normalization folded into the model)
         self.mode = 'stream'
         self.frame = 0
         self.sct = mss.mss()
@@ -148,15 +180,31 @@ class LoadScreenshots:
             im = self.transforms(im0)  # transforms
         else:
             im = LetterBox(self.imgsz, self.auto, stride=self.stride)(image=im0)
-            im = im.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
-            im = np.ascontiguousarray(im)  # contiguous
+            if not self.hwc:
+                im = im.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
+                im = np.ascontiguousarray(im)  # contiguous
         self.frame += 1
         return str(self.screen), im, im0, None, s  # screen, img, original img, im0s, s
 
 
 class LoadImages:
     # YOLOv8 image/video dataloader, i.e. `python detect.py --source image.jpg/vid.mp4`
-    def __init__(self, path, imgsz=640, stride=32, auto=True, transforms=None, vid_stride=1):
+    # With prefetch > 0, video frames are read on a background thread, images are decoded and letterboxed by a pool of
+    # `workers` threads, ahead of inference into a queue of at most `prefetch` frames kept in order. With reduce=True,
+    # JPEGs much larger than imgsz are decoded at 1/2, 1/4 or 1/8 resolution (IMREAD_REDUCED_*), im0 and the results
+    # are then in the coordinates of the reduced image. The background thread only holds a weak reference to the
+    # loader, so that an iteration abandoned without close() is stopped when the loader is garbage collected.
+    def __init__(self,
+                 path,
+                 imgsz=640,
+                 stride=32,
+                 auto=True,
+                 transforms=None,
+                 vid_stride=1,
+                 hwc=False,
+                 prefetch=0,
+                 workers=1,
+                 reduce=False):
         if isinstance(path, str) and Path(path).suffix == ".txt":  # *.txt file with img/vid/dir on each line
             path = Path(path).read_text().rsplit()
         files = []
@@ -184,64 +232,148 @@ class LoadImages:
         self.auto = auto
         self.transforms = transforms  # optional
         self.vid_stride = vid_stride  # video frame-rate stride
-        if any(videos):
-            self._new_video(videos[0])  # new video
-        else:
-            self.cap = None
+        self.hwc = hwc  # keep letterboxed images as BGR HWC (input normalization folded into the model)
+        self.letterbox = LetterBox(imgsz, auto, stride=stride)  # stateless, shared by the prefetch workers
+        self.prefetch = prefetch  # number of frames decoded ahead, 0 to decode in __next__
+        self.workers = max(min(workers, prefetch), 1)  # decode and letterbox threads
+        self.reduce = reduce  # reduced-resolution JPEG decoding
+        self.frame, self.frames, self.cap = 0, 0, None
+        self.reader, self.queue, self.stop, self.pool = None, None, None, None
         assert self.nf > 0, f'No images or videos found in {p}. ' \
                             f'Supported formats are:\nimages: {IMG_FORMATS}\nvideos: {VID_FORMATS}'
 
     def __iter__(self):
-        self.count = 0
+        self.close()
+        if self.prefetch:
+            self.queue, self.stop = Queue(maxsize=self.prefetch), Event()
+            self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix='LoadImages')
+            Thread(target=self._prefetch,
+                   args=(weakref.proxy(self), self.queue, self.stop, self.pool),
+                   name='LoadImages-prefetch',
+                   daemon=True).start()
+        else:
+            self.reader = self._read()
         return self
 
     def __next__(self):
-        if self.count == self.nf:
-            raise StopIteration
-        path = self.files[self.count]
-
-        if self.video_flag[self.count]:
-            # Read video
-            self.mode = 'video'
-            for _ in range(self.vid_stride):
-                self.cap.grab()
-            ret_val, im0 = self.cap.retrieve()
-            while not ret_val:
-                self.count += 1
-                self.cap.release()
-                if self.count == self.nf:  # last video
-                    raise StopIteration
-                path = self.files[self.count]
-                self._new_video(path)
-                ret_val, im0 = self.cap.read()
-
-            self.frame += 1
-            # im0 = self._cv2_rotate(im0)  # for use if cv2 autorotation is False
-            s = f'video {self.count + 1}/{self.nf} ({self.frame}/{self.frames}) {path}: '
-
+        if self.queue is None:
+            if self.reader is None:
+                iter(self)
+            path, im, im0, cap, self.mode, self.frame, s = self._load(next(self.reader))
         else:
-            # Read image
-            self.count += 1
-            im0 = cv2.imread(path)  # BGR
+            f = self.queue.get()
+            if f is None:  # end of the files
+                self.queue.put(None)  # keep raising StopIteration on later calls
+                self.pool.shutdown(wait=False)
+                self._release(None)
+                raise StopIteration
+            path, im, im0, cap, self.mode, self.frame, s = f.result()  # re-raises decode errors in order
+            self._release(cap)
+        self.cap = cap
+        return path, im, im0, cap, s
+
+    def _read(self):
+        # Yield (path, im0, cap, mode, frame, s) for every image and video frame in order, images are read in _load()
+        for i, (path, video) in enumerate(zip(self.files, self.video_flag)):
+            if not video:
+                yield path, None, None, 'image', 0, f'image {i + 1}/{self.nf} {path}: '
+                continue
+            cap, n = self._new_video(path), 0
+            while True:
+                for _ in range(self.vid_stride):
+                    cap.grab()
+                ret_val, im0 = cap.retrieve()
+                if not ret_val:
+                    break
+                n += 1
+                # im0 = self._cv2_rotate(im0)  # for use if cv2 autorotation is False
+                yield path, im0, cap, 'video', n, f'video {i + 1}/{self.nf} ({n}/{self.frames}) {path}: '
+            if not self.prefetch:  # prefetched frames are still queued, released by __next__ after the last one
+                cap.release()
+
+    def _load(self, item):
+        # Read an image if needed and letterbox it, runs in the prefetch workers
+        path, im0, cap, mode, frame, s = item
+        if im0 is None:
+            im0 = self._imread(path)  # BGR
             assert im0 is not None, f'Image Not Found {path}'
-            s = f'image {self.count}/{self.nf} {path}: '
 
         if self.transforms:
             im = self.transforms(im0)  # transforms
         else:
-            im = LetterBox(self.imgsz, self.auto, stride=self.stride)(image=im0)
-            im = im.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
-            im = np.ascontiguousarray(im)  # contiguous
+            im = self.letterbox(image=im0)
+            if not self.hwc:
+                im = im.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
+                im = np.ascontiguousarray(im)  # contiguous
+        return path, im, im0, cap, mode, frame, s
+
+    def _imread(self, path):
+        # cv2.imread, JPEGs are decoded by libjpeg at the smallest 1/2, 1/4 or 1/8 scale still larger than imgsz
+        flags = cv2.IMREAD_COLOR
+        if self.reduce and path.split('.')[-1].lower() in ('jpg', 'jpeg'):
+            try:
+                w, h = Image.open(path).size  # header only
+            except OSError:
+                return cv2.imread(path, flags)
+            th, tw = (self.imgsz, self.imgsz) if isinstance(self.imgsz, int) else self.imgsz
+            r = max(min(th / h, tw / w), min(th / w, tw / h))  # letterbox ratio, either EXIF orientation
+            for f, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                            (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if f * r <= 1:
+                    flags = flag
+                    break
+        return cv2.imread(path, flags)
 
-        return path, im, im0, self.cap, s
+    @staticmethod
+    def _prefetch(loader, queue, stop, pool):
+        # Background reader: video frames are decoded here in order, images and letterboxing are submitted to the pool.
+        # The queue holds the futures in frame order, its size bounds the number of frames in flight. loader is a weak
+        # proxy, ReferenceError once the loader is garbage collected
+        try:
+            for item in loader._read():
+                if not LoadImages._put(queue, stop, pool.submit(loader._load, item)):
+                    return
+        except Exception as e:  # raised by the consumer at this position
+            f = Future()
+            f.set_exception(e)
+            LoadImages._put(queue, stop, f)
+        LoadImages._put(queue, stop, None)
+
+    @staticmethod
+    def _put(queue, stop, x):
+        # Blocking put that gives up when the iteration is closed
+        while not stop.is_set():
+            try:
+                queue.put(x, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _release(self, cap):
+        # Release the previous video capture once a frame of another file (or the end) is consumed: frames are in
+        # order, so all its frames were consumed
+        if self.cap is not None and self.cap is not cap:
+            self.cap.release()
+
+    def close(self):
+        # Stop the prefetch thread and workers of a previous iteration
+        if self.stop is not None:
+            self.stop.set()
+            self.pool.shutdown(wait=False)
+        self.reader, self.queue, self.stop, self.pool = None, None, None, None
+
+    def __del__(self):
+        if getattr(self, 'stop', None) is not None:  # iteration abandoned without close()
+            self.close()
 
     def _new_video(self, path):
-        # Create a new video capture object
-        self.frame = 0
-        self.cap = cv2.VideoCapture(path)
-        self.frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) / self.vid_stride)
-        self.orientation = int(self.cap.get(cv2.CAP_PROP_ORIENTATION_META))  # rotation degrees
-        # self.cap.set(cv2.CAP_PROP_ORIENTATION_AUTO, 0)  # disable https://github.com/ultralytics/yolov5/issues/8493
+        # Create a new video capture object, frame and cap are set by __next__ as the reader may run ahead
+        cap = cv2.VideoCapture(path)
+        self.frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) / self.vid_stride)
+        self.orientation = int(cap.get(cv2.CAP_PROP_ORIENTATION_META))  # rotation degrees
+        # cap.set(cv2.CAP_PROP_ORIENTATION_AUTO, 0)  # disable https://github.com/ultralytics/yolov5/issues/8493
+        return cap
 
     def _cv2_rotate(self, im):
         # Rotate a cv2 video manually
@@ -259,7 +391,7 @@ class LoadImages:
 
 class LoadPilAndNumpy:
 
-    def __init__(self, im0, imgsz=640, stride=32, auto=True, transforms=None):
+    def __init__(self, im0, imgsz=640, stride=32, auto=True, transforms=None, hwc=False, letterbox=None):
         if not isinstance(im0, list):
             im0 = [im0]
         self.im0 = [self._single_check(im) for im in im0]
@@ -267,6 +399,9 @@ class LoadPilAndNumpy:
         self.stride = stride
         self.auto = auto
         self.transforms = transforms
+        self.hwc = hwc  # keep letterboxed images as BGR HWC (input normalization folded into the model)
+        self.letterbox = letterbox or LetterBoxCanvas(imgsz, auto, stride=stride)  # pass one to reuse it across calls
+        self.ratio_pad = None  # per-image (ratio, pad) of the batch, for ops.scale_boxes()
         self.mode = 'image'
         # generate fake paths
         self.paths = [f"image{i}.jpg" for i in range(len(self.im0))]
@@ -279,15 +414,6 @@ class LoadPilAndNumpy:
             im = np.ascontiguousarray(im)  # contiguous
         return im
 
-    def _single_preprocess(self, im, auto):
-        if self.transforms:
-            im = self.transforms(im)  # transforms
-        else:
-            im = LetterBox(self.imgsz, auto=auto, stride=self.stride)(image=im)
-            im = im.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
-            im = np.ascontiguousarray(im)  # contiguous
-        return im
-
     def __len__(self):
         return len(self.im0)
 
@@ -295,8 +421,14 @@ class LoadPilAndNumpy:
         if self.count == 1:  # loop only once as it's batch inference
             raise StopIteration
         auto = all(x.shape == self.im0[0].shape for x in self.im0) and self.auto
-        im = [self._single_preprocess(im, auto) for im in self.im0]
-        im = np.stack(im, 0) if len(im) > 1 else im[0][None]
+        if self.transforms:
+            im = [self.transforms(x) for x in self.im0]  # transforms
+            im = np.stack(im, 0) if len(im) > 1 else im[0][None]
+        else:
+            im, self.ratio_pad = self.letterbox.batch(self.im0, auto)  # letterboxed in place, no per-frame allocation
+            if not self.hwc:
+                im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW
+                im = np.ascontiguousarray(im)  # contiguous
         self.count += 1
         return self.paths, im, self.im0, None, ''
 
@@ -16,6 +16,7 @@ TensorFlow Lite         | `tflite`                  | yolov8n.tflite
 TensorFlow Edge TPU     | `edgetpu`                 | yolov8n_edgetpu.tflite
 TensorFlow.js           | `tfjs`                    | yolov8n_web_model/
 PaddlePaddle            | `paddle`                  | yolov8n_paddle_model/
+Slim (fused, mmap)      | `slim`                    | yolov8n.slim
 
 Requirements:
     $ pip install -r requirements.txt coremltools onnx onnx-simplifier onnxruntime openvino-dev tensorflow-cpu  # CPU
@@ -41,6 +42,7 @@ Inference:
                                  yolov8n.tflite             # TensorFlow Lite
                                  yolov8n_edgetpu.tflite     # TensorFlow Edge TPU
                                  yolov8n_paddle_model       # PaddlePaddle
+                                 yolov8n.slim               # PyTorch, fused weights memory-mapped without pickle
 
 TensorFlow.js:
     $ cd .. && git clone https://github.com/zldrobit/tfjs-yolov5-example.git && cd tfjs-yolov5-example
@@ -66,7 +68,7 @@ import torch
 
 import ultralytics
 from ultralytics.nn.modules import Detect, Segment
-from ultralytics.nn.tasks import ClassificationModel, DetectionModel, SegmentationModel
+from ultralytics.nn.tasks import ClassificationModel, DetectionModel, SegmentationModel, save_slim
 from ultralytics.yolo.cfg import get_cfg
 from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages
 from ultralytics.yolo.data.utils import check_dataset
@@ -93,7 +95,8 @@ def export_formats():
         ['TensorFlow Lite', 'tflite', '.tflite', True, False],
         ['TensorFlow Edge TPU', 'edgetpu', '_edgetpu.tflite', False, False],
         ['TensorFlow.js', 'tfjs', '_web_model', False, False],
-        ['PaddlePaddle', 'paddle', '_paddle_model', True, True],]
+        ['PaddlePaddle', 'paddle', '_paddle_model', True, True],
+        ['Slim', 'slim', '.slim', True, True],]
     return pd.DataFrame(x, columns=['Format', 'Argument', 'Suffix', 'CPU', 'GPU'])
 
 
@@ -146,7 +149,7 @@ class Exporter:
         fmts = tuple(export_formats()['Argument'][1:])  # available export formats
         flags = [x == format for x in fmts]
         assert sum(flags), f'ERROR: Invalid format={format}, valid formats are {fmts}'
-        jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle = flags  # export booleans
+        jit, onnx, xml, engine, coreml, saved_model, pb, tflite, edgetpu, tfjs, paddle, slim = flags  # export booleans
 
         # Load PyTorch model
         self.device = select_device('cpu' if self.args.device is None else self.args.device)
@@ -237,6 +240,8 @@ class Exporter:
                 f[9], _ = self._export_tfjs()
         if paddle:  # PaddlePaddle
             f[10], _ = self._export_paddle()
+        if slim:  # Slim
+            f[11], _ = self._export_slim()
 
         # Finish
         f = [str(x) for x in f if x]  # filter out '' and None
@@ -269,6 +274,14 @@ class Exporter:
             ts.save(str(f), _extra_files=extra_files)
         return f, None
 
+    @try_export
+    def _export_slim(self, prefix=colorstr('Slim:')):
+        # YOLOv8 slim export: fused inference-only weights and architecture, memory-mapped at load without pickle
+        LOGGER.info(f'\n{prefix} starting export with torch {torch.__version__}...')
+        f = self.file.with_suffix('.slim')
+        save_slim(self.model, f)
+        return f, None
+
     @try_export
     def _export_onnx(self, prefix=colorstr('ONNX:')):
         # YOLOv8 ONNX export
@@ -53,7 +53,7 @@ class YOLO:
         self.overrides = {}  # overrides for trainer object
 
         # Load or create new YOLO model
-        {'.pt': self._load, '.yaml': self._new}[Path(model).suffix](model)
+        {'.pt': self._load, '.slim': self._load, '.yaml': self._new}[Path(model).suffix](model)
 
     def __call__(self, source=None, stream=False, verbose=False, **kwargs):
         return self.predict(source, stream, verbose, **kwargs)
@@ -147,6 +147,9 @@ class YOLO:
         Args:
             data (str): The dataset to validate on. Accepts all formats accepted by yolo
             **kwargs : Any other args accepted by the validators. To see all args check 'configuration' section in docs
+
+        Returns:
+            (dict): The validation metrics.
         """
         overrides = self.overrides.copy()
         overrides.update(kwargs)
@@ -156,7 +159,7 @@ class YOLO:
         args.task = self.task
 
         validator = self.ValidatorClass(args=args)
-        validator(model=self.model)
+        return validator(model=self.model)
 
     @smart_inference_mode()
     def export(self, **kwargs):
@@ -165,6 +168,9 @@ class YOLO:
 
         Args:
             **kwargs : Any other args accepted by the predictors. To see all args check 'configuration' section in docs
+
+        Returns:
+            (List[str]): The exported files/dirs.
         """
 
         overrides = self.overrides.copy()
@@ -173,7 +179,21 @@ class YOLO:
         args.task = self.task
 
         exporter = Exporter(overrides=args)
-        exporter(model=self.model)
+        return exporter(model=self.model)
+
+    def benchmark(self, **kwargs):
+        """
+        Benchmarks the model across the export formats, see ultralytics.yolo.utils.benchmarks.benchmark().
+
+        Args:
+            **kwargs : Arguments of benchmark(), i.e. data, imgsz, batch, runs, device or formats.
+
+        Returns:
+            (pd.DataFrame): The speed and accuracy of each format, input size and batch size.
+        """
+        from ultralytics.yolo.utils.benchmarks import benchmark
+        assert self.ckpt_path, 'benchmark() requires a model loaded from *.pt weights'
+        return benchmark(model=self.ckpt_path, **kwargs)
 
     def train(self, **kwargs):
         """
@@ -239,6 +259,8 @@ class YOLO:
         args.pop("cache", None)
         args.pop("save_json", None)
         args.pop("half", None)
+        args.pop("bf16", None)
+        args.pop("channels_last", None)
         args.pop("v5loader", None)
 
         # set device to '' to prevent from auto DDP usage
@@ -24,15 +24,23 @@ Usage - formats:
                                     yolov8n.tflite             # TensorFlow Lite
                                     yolov8n_edgetpu.tflite     # TensorFlow Edge TPU
                                     yolov8n_paddle_model       # PaddlePaddle
+                                    yolov8n.slim               # PyTorch, fused weights memory-mapped
     """
+import contextlib
+import multiprocessing
+import os
 import platform
+import time
 from collections import defaultdict
 from pathlib import Path
 
 import cv2
+import numpy as np
+import torch
 
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.yolo.cfg import get_cfg
+from ultralytics.yolo.data.augment import LetterBoxCanvas
 from ultralytics.yolo.data.dataloaders.stream_loaders import LoadImages, LoadPilAndNumpy, LoadScreenshots, LoadStreams
 from ultralytics.yolo.data.utils import IMG_FORMATS, VID_FORMATS
 from ultralytics.yolo.utils import DEFAULT_CFG_PATH, LOGGER, SETTINGS, callbacks, colorstr, ops
@@ -86,6 +94,9 @@ class BasePredictor:
         self.classes = self.args.classes
         self.dataset = None
         self.vid_path, self.vid_writer = None, None
+        self.letterbox = None  # LetterBoxCanvas reused across calls, see setup_source()
+        self.input_buffers = {}  # preallocated model inputs per use, i.e. 'frames' and 'tiles', see input_tensor()
+        self.profiler = None  # stage and layer timings while a utils.profiler.Profiler is attached
         self.annotator = None
         self.data_path = None
         self.callbacks = defaultdict(list, {k: [v] for k, v in callbacks.default_callbacks.items()})  # add callbacks
@@ -94,6 +105,44 @@ class BasePredictor:
     def preprocess(self, img):
         pass
 
+    def input_tensor(self, shape, dtype, memory_format=torch.contiguous_format, buffer='frames'):
+        """
+        Model input of the given shape written into a buffer kept across batches. The buffer keeps the largest batch
+        size seen, so that variable-size batches (i.e. only the streams with a new frame) are a view of its first slots.
+        Each use has its own buffer, so that alternating frames and tiles do not reallocate it on every switch. The
+        returned tensor is overwritten by the next batch of the same use.
+
+        Args:
+            shape (tuple): The input shape (batch_size, channels, height, width).
+            dtype (torch.dtype): The input dtype.
+            memory_format (torch.memory_format): The input memory format.
+            buffer (str): The use of the buffer, i.e. 'frames' or 'tiles'. Default: 'frames'
+
+        Returns:
+            (torch.Tensor): A view of the buffer of the given shape.
+        """
+        buf = self.input_buffers.get(buffer)
+        if buf is None or buf.shape[1:] != shape[1:] or len(buf) < shape[0] or buf.dtype != dtype or \
+                buf.device != self.model.device or not buf.is_contiguous(memory_format=memory_format):
+            n = max(shape[0], len(buf) if buf is not None and buf.shape[1:] == shape[1:] else 0)
+            buf = self.input_buffers[buffer] = torch.empty((n, *shape[1:]),
+                                                           dtype=dtype,
+                                                           device=self.model.device,
+                                                           memory_format=memory_format)
+        return buf[:shape[0]]
+
+    def stage(self, name):
+        """
+        Times a stage of the pipeline (i.e. 'preprocess', 'inference', 'nms', 'results') when a Profiler is attached.
+
+        Args:
+            name (str): The stage name.
+
+        Returns:
+            A context manager, a no-op without profiler.
+        """
+        return self.profiler.stage(name) if self.profiler else contextlib.nullcontext()
+
     def get_annotator(self, img):
         raise NotImplementedError("get_annotator function needs to be implemented")
 
@@ -111,6 +160,8 @@ class BasePredictor:
         # model
         stride, pt = self.model.stride, self.model.pt
         imgsz = check_imgsz(self.args.imgsz, stride=stride, min_dim=2)  # check image size
+        if self.letterbox is None or self.letterbox.new_shape != tuple(imgsz) or self.letterbox.stride != int(stride):
+            self.letterbox = LetterBoxCanvas(imgsz, auto=pt, stride=stride)  # canvas and geometry kept across calls
 
         # Dataloader
         bs = 1  # batch_size
@@ -121,27 +172,36 @@ class BasePredictor:
                                        stride=stride,
                                        auto=pt,
                                        transforms=getattr(self.model.model, 'transforms', None),
-                                       vid_stride=self.args.vid_stride)
+                                       vid_stride=self.args.vid_stride,
+                                       hwc=self.model.input_folded,
+                                       letterbox=self.letterbox)
             bs = len(self.dataset)
         elif screenshot:
             self.dataset = LoadScreenshots(source,
                                            imgsz=imgsz,
                                            stride=stride,
                                            auto=pt,
-                                           transforms=getattr(self.model.model, 'transforms', None))
+                                           transforms=getattr(self.model.model, 'transforms', None),
+                                           hwc=self.model.input_folded)
         elif from_img:
             self.dataset = LoadPilAndNumpy(source,
                                            imgsz=imgsz,
                                            stride=stride,
                                            auto=pt,
-                                           transforms=getattr(self.model.model, 'transforms', None))
+                                           transforms=getattr(self.model.model, 'transforms', None),
+                                           hwc=self.model.input_folded,
+                                           letterbox=self.letterbox)
         else:
             self.dataset = LoadImages(source,
                                       imgsz=imgsz,
                                       stride=stride,
                                       auto=pt,
                                       transforms=getattr(self.model.model, 'transforms', None),
-                                      vid_stride=self.args.vid_stride)
+                                      vid_stride=self.args.vid_stride,
+                                      hwc=self.model.input_folded,
+                                      prefetch=self.args.prefetch,
+                                      workers=self.args.workers,
+                                      reduce=self.args.reduce_decode)
         self.vid_path, self.vid_writer = [None] * bs, [None] * bs
 
         self.webcam = webcam
@@ -159,10 +219,98 @@ class BasePredictor:
 
     def predict_cli(self):
         # Method used for CLI prediction. It uses always generator as outputs as not required by CLI mode
+        if self.args.processes:
+            return self.predict_batch()
         gen = self.stream_inference(verbose=True)
         for _ in gen:  # running CLI inference without accumulating any outputs (do not modify)
             pass
 
+    def predict_batch(self):
+        """
+        Offline batch prediction over a list or glob of videos/images, sharded one file per task across a pool of
+        `args.processes` processes. Each process loads its own model, runs with `args.threads` torch threads (default
+        cores / processes) and is pinned to its own cores when possible.
+
+        Detections of each file are saved to `save_dir/detections/<file path>.npz` (see save_detections) instead of
+        labels/*.txt, and written atomically when the file is complete. The file path is relative to the deepest
+        directory containing all the files (i.e. the glob root), so that same-named files of different directories do
+        not collide. save_dir is not incremented so that running the same command again resumes an interrupted run,
+        skipping the files already saved.
+        """
+        project = self.args.project or Path(SETTINGS['runs_dir']) / self.args.task
+        self.save_dir = Path(project) / (self.args.name or self.args.mode)  # fixed, to resume
+        out = self.save_dir / 'detections'
+        out.mkdir(parents=True, exist_ok=True)
+        files = LoadImages(self.args.source).files
+        todo = [(f, npz) for f, npz in self.detections_files(files, out) if not npz.exists()]
+        if not todo:
+            LOGGER.info(f'All {len(files)} files already done in {out}')
+            return
+        n = min(self.args.processes, len(todo)) or 1
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count()))
+        threads = self.args.threads or max(len(cores) // n, 1)
+        LOGGER.info(f'{len(files) - len(todo)}/{len(files)} files already done in {out}, '
+                    f'{len(todo)} to process on {n} processes x {threads} threads')
+
+        overrides = {**vars(self.args), 'processes': 0, 'threads': threads, 'save': False, 'save_txt': False,
+                     'show': False, 'project': str(self.save_dir.parent), 'name': self.save_dir.name, 'exist_ok': True}
+        ctx = multiprocessing.get_context('spawn')  # fork is unsafe once torch thread pools exist
+        slots = ctx.Queue()
+        for i in range(n):
+            slots.put(cores[i * len(cores) // n:(i + 1) * len(cores) // n] if len(cores) >= n else [])
+        t0 = time.perf_counter()
+        with ctx.Pool(n, initializer=_init_batch_worker, initargs=(type(self), overrides, slots)) as pool:
+            for i, (f, nf, nd, dt, err) in enumerate(pool.imap_unordered(_predict_file, todo)):
+                if err:
+                    LOGGER.warning(f'WARNING ⚠️ {f} failed, it will be retried on the next run: {err}')
+                else:
+                    LOGGER.info(f'{i + 1}/{len(todo)} {f}: {nf} frames, {nd} detections, {nf / max(dt, 1E-9):.1f} FPS')
+        LOGGER.info(f"Done in {time.perf_counter() - t0:.1f}s, detections saved to {colorstr('bold', out)}")
+
+    @staticmethod
+    def detections_files(files, out):
+        """
+        The .npz detections file of each source file, at its path relative to the deepest directory containing all the
+        files, i.e. `out/a/vol.mp4.npz` and `out/b/vol.mp4.npz` for `a/vol.mp4` and `b/vol.mp4`.
+
+        Args:
+            files (List[str]): The absolute source file paths, as LoadImages.files.
+            out (Path): The detections directory.
+
+        Returns:
+            (List[tuple]): The (source file, .npz file) pairs.
+        """
+        root = os.path.commonpath([os.path.dirname(f) for f in files])
+        return [(f, out / f'{os.path.relpath(f, root)}.npz') for f in files]
+
+    @staticmethod
+    def save_detections(file, frames, results, vid_stride=1):
+        """
+        Save the detections of one file in columnar form, one row per detection: `frame` (0-based frame index in the
+        video, vid_stride applied), `boxes` (xyxy pixels), `conf` and `cls`, plus `shape` (orig_shape) and `frames` (the
+        number of frames processed). Written to a temporary file then renamed, so a saved file is always complete.
+
+        Args:
+            file (Path): The .npz output file.
+            frames (List[int]): Frame number of each result, as LoadImages.frame (1-based, 0 for images).
+            results (List[Results]): The results of the file.
+            vid_stride (int): The video frame-rate stride.
+        """
+        data = [r.boxes.data.cpu().numpy() if r.boxes is not None else np.zeros((0, 6), np.float32) for r in results]
+        det = np.concatenate(data) if data else np.zeros((0, 6), np.float32)
+        idx = np.repeat([max(n * vid_stride - 1, 0) for n in frames], [len(x) for x in data]).astype(np.int32)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f,
+                     frame=idx,
+                     boxes=det[:, :4].astype(np.float32),
+                     conf=det[:, 4].astype(np.float32),
+                     cls=det[:, 5].astype(np.int16),
+                     shape=np.array(results[0].orig_shape if results else (0, 0), dtype=np.int32),
+                     frames=np.int32(len(results)))
+        os.replace(tmp, file)
+
     def stream_inference(self, source=None, model=None, verbose=False):
         self.run_callbacks("on_predict_start")
 
@@ -177,28 +325,40 @@ class BasePredictor:
         # warmup model
         if not self.done_warmup:
             self.model.warmup(imgsz=(1 if self.model.pt or self.model.triton else self.bs, 3, *self.imgsz))
+            if self.args.warmup_shapes:
+                batch = 1 if self.model.pt else self.bs  # unless given, i.e. [6, 640, 640] for a batch of 6 tiles
+                shapes = [(s[0] if len(s) == 3 else batch, 3, *check_imgsz(s[-2:], stride=self.model.stride, min_dim=2))
+                          for s in self.args.warmup_shapes]
+                self.model.warmup_shapes(shapes)
             self.done_warmup = True
 
         self.seen, self.windows, self.dt = 0, [], (ops.Profile(), ops.Profile(), ops.Profile())
-        for batch in self.dataset:
+        for batch in self.profiler.iterate(self.dataset) if self.profiler else self.dataset:
             self.run_callbacks("on_predict_batch_start")
             path, im, im0s, vid_cap, s = batch
             visualize = increment_path(self.save_dir / Path(path).stem, mkdir=True) if self.args.visualize else False
-            with self.dt[0]:
+            with self.dt[0], self.stage('preprocess'):
                 im = self.preprocess(im)
                 if len(im.shape) == 3:
                     im = im[None]  # expand for batch dim
-
-            # Inference
-            with self.dt[1]:
-                preds = self.model(im, augment=self.args.augment, visualize=visualize)
-
-            # postprocess
-            with self.dt[2]:
-                results = self.postprocess(preds, im, im0s, self.classes)
+            if self.args.jit_cache and self.model.frozen_shape is None:
+                self.model.jit_freeze(im.shape)  # frozen trace at the shape of the first batch
+
+            if self.args.tile and hasattr(self, 'predict_tiles'):  # tiled inference on full-resolution images
+                with self.dt[1]:
+                    preds = results = [self.predict_tiles(x) for x in (im0s if self.webcam or self.from_img else [im0s])]
+            else:
+                # Inference
+                with self.dt[1], self.stage('inference'):
+                    preds = self.model(im, augment=self.args.augment, visualize=visualize)
+
+                # postprocess
+                with self.dt[2]:
+                    results = self.postprocess(preds, im, im0s, self.classes)
             for i in range(len(im)):
                 p, im0 = (path[i], im0s[i]) if self.webcam or self.from_img else (path, im0s)
                 p = Path(p)
+                results[i].path = str(p)  # route results back to their source, batches of streams vary in size
 
                 if verbose or self.args.save or self.args.save_txt or self.args.show:
                     s += self.write_results(i, results, (p, im, im0))
@@ -207,7 +367,8 @@ class BasePredictor:
                     self.show(p)
 
                 if self.args.save:
-                    self.save_preds(vid_cap, i, str(self.save_dir / p.name))
+                    j = self.dataset.indices[i] if self.webcam else i  # stream index, one video writer per stream
+                    self.save_preds(vid_cap, j, str(self.save_dir / p.name))
 
             yield from results
 
@@ -233,7 +394,13 @@ class BasePredictor:
         device = select_device(self.args.device)
         model = model or self.args.model
         self.args.half &= device.type != 'cpu'  # half precision only supported on CUDA
-        self.model = AutoBackend(model, device=device, dnn=self.args.dnn, fp16=self.args.half)
+        self.model = AutoBackend(model,
+                                 device=device,
+                                 dnn=self.args.dnn,
+                                 fp16=self.args.half,
+                                 fold_input=self.args.fold_input,
+                                 bf16=self.args.bf16,
+                                 channels_last=self.args.channels_last)
         self.device = device
         self.model.eval()
 
@@ -284,3 +451,34 @@ class BasePredictor:
     def run_callbacks(self, event: str):
         for callback in self.callbacks.get(event, []):
             callback(self)
+
+
+_batch_predictor = None  # predictor of a predict_batch() worker process
+
+
+def _init_batch_worker(cls, overrides, slots):
+    # Pool initializer: thread budget, core pinning and model of a predict_batch() worker
+    global _batch_predictor
+    cores = slots.get()
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(overrides['threads'])
+    cv2.setNumThreads(1)  # letterbox resizes are short, the OpenCV pool would compete with torch threads
+    _batch_predictor = cls(overrides=overrides)
+    _batch_predictor.setup_model(None)
+
+
+@smart_inference_mode()
+def _predict_file(task):
+    # Predict one file in a predict_batch() worker and save its detections to npz, errors are reported to the parent
+    (file, npz), p, t0 = task, _batch_predictor, time.perf_counter()
+    try:
+        frames, results = [], []
+        for r in p.stream_inference(file):
+            frames.append(getattr(p.dataset, 'frame', 0) if p.dataset.mode == 'video' else 0)
+            results.append(r.cpu())
+        p.save_detections(npz, frames, results, p.args.vid_stride)
+        return file, len(results), sum(len(r.boxes) for r in results if r.boxes is not None), \
+            time.perf_counter() - t0, None
+    except Exception as e:
+        return file, 0, 0, time.perf_counter() - t0, repr(e)
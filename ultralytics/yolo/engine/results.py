@@ -1,5 +1,3 @@
-from functools import lru_cache
-
 import numpy as np
 import torch
 
@@ -15,66 +13,55 @@ class Results:
             masks (Masks, optional): A Masks object containing the detection masks.
             probs (torch.Tensor, optional): A tensor containing the detection class probabilities.
             orig_shape (tuple, optional): Original image size.
+            path (str, optional): The image, video or stream the results come from.
 
         Attributes:
             boxes (Boxes, optional): A Boxes object containing the detection bounding boxes.
             masks (Masks, optional): A Masks object containing the detection masks.
             probs (torch.Tensor, optional): A tensor containing the detection class probabilities.
             orig_shape (tuple, optional): Original image size.
+            path (str, optional): The image, video or stream the results come from.
             data (torch.Tensor): The raw masks tensor
 
         """
 
-    def __init__(self, boxes=None, masks=None, probs=None, orig_shape=None) -> None:
+    __slots__ = 'boxes', 'masks', 'probs', 'orig_shape', 'path'
+    comp = 'boxes', 'masks', 'probs'
+
+    def __init__(self, boxes=None, masks=None, probs=None, orig_shape=None, path=None) -> None:
         self.boxes = Boxes(boxes, orig_shape) if boxes is not None else None  # native size boxes
         self.masks = Masks(masks, orig_shape) if masks is not None else None  # native size or imgsz masks
         self.probs = probs.softmax(0) if probs is not None else None
         self.orig_shape = orig_shape
-        self.comp = ["boxes", "masks", "probs"]
+        self.path = path
 
     def pandas(self):
         pass
         # TODO masks.pandas + boxes.pandas + cls.pandas
 
-    def __getitem__(self, idx):
-        r = Results(orig_shape=self.orig_shape)
+    def _apply(self, fn):
+        # New Results with fn applied to each of its non-empty components
+        r = Results(orig_shape=self.orig_shape, path=self.path)
         for item in self.comp:
-            if getattr(self, item) is None:
-                continue
-            setattr(r, item, getattr(self, item)[idx])
+            x = getattr(self, item)
+            if x is not None:
+                setattr(r, item, fn(x))
         return r
 
+    def __getitem__(self, idx):
+        return self._apply(lambda x: x[idx])
+
     def cpu(self):
-        r = Results(orig_shape=self.orig_shape)
-        for item in self.comp:
-            if getattr(self, item) is None:
-                continue
-            setattr(r, item, getattr(self, item).cpu())
-        return r
+        return self._apply(lambda x: x.cpu())
 
     def numpy(self):
-        r = Results(orig_shape=self.orig_shape)
-        for item in self.comp:
-            if getattr(self, item) is None:
-                continue
-            setattr(r, item, getattr(self, item).numpy())
-        return r
+        return self._apply(lambda x: x.numpy())
 
     def cuda(self):
-        r = Results(orig_shape=self.orig_shape)
-        for item in self.comp:
-            if getattr(self, item) is None:
-                continue
-            setattr(r, item, getattr(self, item).cuda())
-        return r
+        return self._apply(lambda x: x.cuda())
 
     def to(self, *args, **kwargs):
-        r = Results(orig_shape=self.orig_shape)
-        for item in self.comp:
-            if getattr(self, item) is None:
-                continue
-            setattr(r, item, getattr(self, item).to(*args, **kwargs))
-        return r
+        return self._apply(lambda x: x.to(*args, **kwargs))
 
     def __len__(self):
         for item in self.comp:
@@ -108,6 +95,7 @@ class Results:
                 masks (Masks, optional): A Masks object containing the detection masks.
                 probs (torch.Tensor, optional): A tensor containing the detection class probabilities.
                 orig_shape (tuple, optional): Original image size.
+                path (str, optional): The image, video or stream the results come from.
             """)
 
 
@@ -119,6 +107,7 @@ class Boxes:
         boxes (torch.Tensor) or (numpy.ndarray): A tensor or numpy array containing the detection boxes,
             with shape (num_boxes, 6). The last two columns should contain confidence and class values.
         orig_shape (tuple): Original image size, in the format (height, width).
+        parent (tuple, optional): The (Boxes, index) these boxes were indexed from, whose conversions are reused.
 
     Attributes:
         boxes (torch.Tensor) or (numpy.ndarray): A tensor or numpy array containing the detection boxes,
@@ -133,15 +122,41 @@ class Boxes:
         xyxyn (torch.Tensor) or (numpy.ndarray): The boxes in xyxy format normalized by original image size.
         xywhn (torch.Tensor) or (numpy.ndarray): The boxes in xywh format normalized by original image size.
         data (torch.Tensor): The raw bboxes tensor
+
+    The xywh, xyxyn and xywhn conversions are computed on first access and cached. Indexing and iterating share the
+    conversions of the whole block, and cpu(), numpy() and cuda() convert the block once.
     """
 
-    def __init__(self, boxes, orig_shape) -> None:
+    __slots__ = 'boxes', '_shape', '_cache', '_parent'
+
+    def __init__(self, boxes, orig_shape, parent=None) -> None:
         if boxes.ndim == 1:
             boxes = boxes[None, :]
         assert boxes.shape[-1] == 6  # xyxy, conf, cls
-        self.boxes = boxes
-        self.orig_shape = torch.as_tensor(orig_shape, device=boxes.device) if isinstance(boxes, torch.Tensor) \
-            else np.asarray(orig_shape)
+        self.boxes = boxes  # one (n, 6) block per image, columns are views into it
+        self._shape = orig_shape
+        self._cache = {}  # conversions computed on first access
+        self._parent = parent  # (Boxes, index), conversions are sliced from the parent's
+
+    def _cached(self, name, fn):
+        # Conversion computed once per block: indexed Boxes slice the conversion of the whole parent block, so that
+        # iterating over boxes runs a single vectorized conversion
+        cache = self._cache
+        if name not in cache:
+            if self._parent is not None:
+                parent, idx = self._parent
+                x = getattr(parent, name)[idx]
+                cache[name] = x[None] if x.ndim == 1 else x
+            else:
+                cache[name] = fn()
+        return cache[name]
+
+    @property
+    def orig_shape(self):
+        if 'orig_shape' not in self._cache:
+            self._cache['orig_shape'] = torch.as_tensor(self._shape, device=self.boxes.device) \
+                if isinstance(self.boxes, torch.Tensor) else np.asarray(self._shape)
+        return self._cache['orig_shape']
 
     @property
     def xyxy(self):
@@ -156,35 +171,37 @@ class Boxes:
         return self.boxes[:, -1]
 
     @property
-    @lru_cache(maxsize=2)  # maxsize 1 should suffice
     def xywh(self):
-        return ops.xyxy2xywh(self.xyxy)
+        return self._cached('xywh', lambda: ops.xyxy2xywh(self.xyxy))
 
     @property
-    @lru_cache(maxsize=2)
     def xyxyn(self):
-        return self.xyxy / self.orig_shape[[1, 0, 1, 0]]
+        return self._cached('xyxyn', lambda: self.xyxy / self.orig_shape[[1, 0, 1, 0]])
 
     @property
-    @lru_cache(maxsize=2)
     def xywhn(self):
-        return self.xywh / self.orig_shape[[1, 0, 1, 0]]
+        return self._cached('xywhn', lambda: self.xywh / self.orig_shape[[1, 0, 1, 0]])
+
+    def _convert(self, name, fn):
+        # Converted copy of the whole block, made once and reused by later calls
+        if name not in self._cache:
+            self._cache[name] = Boxes(fn(self.boxes), self._shape)
+        return self._cache[name]
 
     def cpu(self):
-        boxes = self.boxes.cpu()
-        return Boxes(boxes, self.orig_shape)
+        if isinstance(self.boxes, torch.Tensor) and self.boxes.device.type == 'cpu':
+            return self
+        return self._convert('cpu', lambda x: x.cpu())
 
     def numpy(self):
-        boxes = self.boxes.numpy()
-        return Boxes(boxes, self.orig_shape)
+        return self._convert('numpy', lambda x: x.numpy())
 
     def cuda(self):
-        boxes = self.boxes.cuda()
-        return Boxes(boxes, self.orig_shape)
+        return self._convert('cuda', lambda x: x.cuda())
 
     def to(self, *args, **kwargs):
         boxes = self.boxes.to(*args, **kwargs)
-        return Boxes(boxes, self.orig_shape)
+        return Boxes(boxes, self._shape)
 
     def pandas(self):
         LOGGER.info('results.pandas() method not yet implemented')
@@ -217,8 +234,10 @@ class Boxes:
                 f"shape: {self.boxes.shape}\n" + f"dtype: {self.boxes.dtype}\n + {self.boxes.__repr__()}")
 
     def __getitem__(self, idx):
-        boxes = self.boxes[idx]
-        return Boxes(boxes, self.orig_shape)
+        return Boxes(self.boxes[idx], self._shape, (self, idx))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
 
     def __getattr__(self, attr):
         name = self.__class__.__name__
@@ -256,16 +275,20 @@ class Masks:
         segments (list): A list of segments which includes x,y,w,h,label,confidence, and mask of each detection masks.
     """
 
+    __slots__ = 'masks', 'orig_shape', '_segments'
+
     def __init__(self, masks, orig_shape) -> None:
         self.masks = masks  # N, h, w
         self.orig_shape = orig_shape
+        self._segments = None  # computed on first access
 
     @property
-    @lru_cache(maxsize=1)
     def segments(self):
-        return [
-            ops.scale_segments(self.masks.shape[1:], x, self.orig_shape, normalize=True)
-            for x in ops.masks2segments(self.masks)]
+        if self._segments is None:
+            self._segments = [
+                ops.scale_segments(self.masks.shape[1:], x, self.orig_shape, normalize=True)
+                for x in ops.masks2segments(self.masks)]
+        return self._segments
 
     @property
     def shape(self):
@@ -303,7 +326,7 @@ class Masks:
 
     def __getitem__(self, idx):
         masks = self.masks[idx]
-        return Masks(masks, self.im_shape, self.orig_shape)
+        return Masks(masks[None] if masks.ndim == 2 else masks, self.orig_shape)  # (n, h, w), as Boxes
 
     def __getattr__(self, attr):
         name = self.__class__.__name__
@@ -29,6 +29,7 @@ NUM_THREADS = min(8, max(1, os.cpu_count() - 1))  # number of YOLOv5 multiproces
 AUTOINSTALL = str(os.getenv('YOLO_AUTOINSTALL', True)).lower() == 'true'  # global auto-install mode
 FONT = 'Arial.ttf'  # https://ultralytics.com/assets/Arial.ttf
 VERBOSE = str(os.getenv('YOLO_VERBOSE', True)).lower() == 'true'  # global verbose mode
+OFFLINE_MSG = "offline mode is enabled (YOLO_OFFLINE=True), network access is disabled"
 TQDM_BAR_FORMAT = '{l_bar}{bar:10}{r_bar}'  # tqdm bar format
 LOGGING_NAME = 'ultralytics'
 HELP_MSG = \
@@ -229,6 +230,27 @@ def is_github_actions_ci() -> bool:
     return 'GITHUB_ACTIONS' in os.environ and 'RUNNER_OS' in os.environ and 'RUNNER_TOOL_CACHE' in os.environ
 
 
+def is_offline() -> bool:
+    """
+    Determine if the global offline mode is enabled, i.e. 'YOLO_OFFLINE=True'. In offline mode all network probes,
+    downloads, auto-installs and analytics are skipped. Read on every call so it can be toggled at runtime.
+
+    Returns:
+        (bool): True if offline mode is enabled, False otherwise.
+    """
+    return str(os.getenv('YOLO_OFFLINE', False)).lower() == 'true'
+
+
+def set_offline(offline=True):
+    """
+    Enable or disable the global offline mode for this process (and its subprocesses).
+
+    Args:
+        offline (bool): Whether network access should be disabled. Default is True.
+    """
+    os.environ['YOLO_OFFLINE'] = str(bool(offline))
+
+
 def is_git_dir():
     """
     Determines whether the current file is part of a git repository.
@@ -446,6 +468,8 @@ def set_sentry():
     """
 
     def before_send(event, hint):
+        if is_offline():
+            return None  # drop events if offline mode was enabled after init
         oss = 'colab' if is_colab() else 'kaggle' if is_kaggle() else 'jupyter' if is_jupyter() else \
             'docker' if is_docker() else platform.system()
         event['tags'] = {
@@ -456,6 +480,7 @@ def set_sentry():
         return event
 
     if SETTINGS['sync'] and \
+            not is_offline() and \
             not is_pytest_running() and \
             not is_github_actions_ci() and \
             (is_pip_package() or get_git_origin_url() == "https://github.com/ultralytics/ultralytics.git"):
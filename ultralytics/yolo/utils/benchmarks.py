@@ -0,0 +1,168 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Benchmark a YOLO model across export formats for speed and accuracy
+
+Usage:
+    $ yolo benchmark model=yolov8n.pt data=coco128.yaml bench_imgsz=[320,640] bench_batch=[1,4] device=cpu
+
+Format                  | `format=argument`         | Model
+---                     | ---                       | ---
+PyTorch                 | -                         | yolov8n.pt
+TorchScript             | `torchscript`             | yolov8n.torchscript
+ONNX                    | `onnx`                    | yolov8n.onnx
+OpenVINO                | `openvino`                | yolov8n_openvino_model/
+PaddlePaddle            | `paddle`                  | yolov8n_paddle_model/
+Slim                    | `slim`                    | yolov8n.slim
+... and the other CPU formats of export_formats(), skipped when their export or runtime is not installed.
+"""
+
+import json
+import platform
+import shutil
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from ultralytics.yolo.cfg import get_cfg
+from ultralytics.yolo.engine.exporter import export_formats
+from ultralytics.yolo.utils import DEFAULT_CFG, LOGGER, ROOT, SETTINGS, colorstr
+from ultralytics.yolo.utils.files import file_size, increment_path
+from ultralytics.yolo.utils.torch_utils import select_device
+
+
+def benchmark(model='yolov8n.pt',
+              data=None,
+              imgsz=(640,),
+              batch=(1,),
+              runs=20,
+              device='cpu',
+              formats=None,
+              save_dir=None):
+    """
+    Export a model to each CPU-capable format of export_formats() and measure, for each input size and batch size, the
+    pre-process, inference and post-process latency of the predictor (its ops.Profile timers), then the mAP50-95 of a
+    quick val at batch size 1. Formats whose export, runtime or a given batch size fail are reported and skipped.
+
+    Args:
+        model (str | Path): Path to the *.pt weights. They are copied to save_dir so that the exports land there.
+        data (str, optional): Dataset *.yaml for the val, no val if None.
+        imgsz (int | tuple): Square input sizes to measure.
+        batch (int | tuple): Batch sizes to measure. Exports use dynamic axes where supported to allow them.
+        runs (int): Timed predictions per format, input size and batch size, after one warmup prediction.
+        device (str): Device to run on, i.e. 'cpu' or '0'.
+        formats (tuple, optional): Export format arguments to measure, i.e. ('-', 'onnx'). Defaults to all CPU formats.
+        save_dir (Path, optional): Directory of the exports, benchmarks.txt and benchmarks.json.
+
+    Returns:
+        (pd.DataFrame): One row per format, input size and batch size.
+    """
+    from ultralytics import YOLO
+
+    imgsz = (imgsz,) if isinstance(imgsz, int) else tuple(imgsz)
+    batch = (batch,) if isinstance(batch, int) else tuple(batch)
+    device = str(device)
+    cpu = select_device(device).type == 'cpu'
+    save_dir = Path(save_dir or increment_path(Path(SETTINGS['runs_dir']) / 'benchmark'))
+    save_dir.mkdir(parents=True, exist_ok=True)
+    weights = Path(shutil.copy(model, save_dir))
+    yolo = YOLO(weights)
+    task, predictor_class, validator_class = yolo.task, yolo.PredictorClass, yolo.ValidatorClass
+
+    fmts = export_formats()
+    fmts = fmts[fmts['CPU'] if cpu else fmts['GPU']]
+    if formats:
+        fmts = fmts[fmts['Argument'].isin(formats)]
+    im = cv2.imread(str(ROOT / 'assets/bus.jpg'))
+
+    rows = []
+    for name, fmt, _, _, _ in fmts.itertuples(index=False):
+        for s in imgsz:
+            row = {'Format': name, 'imgsz': s}
+            try:
+                # Export
+                t = time.time()
+                if fmt == '-':
+                    f = weights
+                else:
+                    dynamic = max(batch) > 1 and fmt in ('torchscript', 'onnx', 'openvino')
+                    f = (YOLO(weights).export(format=fmt, imgsz=s, dynamic=dynamic, device=device) or [None])[-1]
+                    assert f, 'export failed'
+                size, export_s = file_size(f), time.time() - t
+            except Exception as e:  # export or its requirements not available
+                LOGGER.warning(f'WARNING ⚠️ Benchmark {name} at imgsz={s} skipped, {type(e).__name__}: {e}')
+                rows.extend({**row, 'batch': b, 'Status': f'❌ export: {e}'[:60]} for b in batch)
+                continue
+
+            # Speed
+            map5095 = None
+            for b in batch:
+                r = {**row, 'batch': b, 'Size (MB)': round(size, 1), 'Export (s)': round(export_s, 1)}
+                try:
+                    r.update(_speed(predictor_class, f, im, s, b, runs, device))
+                    r['Status'] = '✅'
+                except Exception as e:  # runtime not installed or static batch size
+                    LOGGER.warning(f'WARNING ⚠️ Benchmark {name} at imgsz={s} batch={b} failed, '
+                                   f'{type(e).__name__}: {e}')
+                    r['Status'] = f'❌ predict: {e}'[:60]
+                rows.append(r)
+
+            # Accuracy
+            if data and any(r.get('Status') == '✅' for r in rows[-len(batch):]):
+                try:
+                    map5095 = _accuracy(validator_class, task, f, data, s, device, save_dir / 'val')
+                except Exception as e:
+                    LOGGER.warning(f'WARNING ⚠️ Benchmark {name} val at imgsz={s} failed, {type(e).__name__}: {e}')
+                for r in rows[-len(batch):]:
+                    r['mAP50-95'] = map5095
+
+    df = pd.DataFrame(rows, columns=['Format', 'imgsz', 'batch', 'Status', 'Size (MB)', 'Export (s)', 'Pre (ms)',
+                                     'Inference (ms)', 'Post (ms)', 'FPS', 'mAP50-95'])
+    env = f'{platform.platform()}, {platform.processor() or platform.machine()}, device={device}'
+    table = df.fillna('-').to_string(index=False)
+    LOGGER.info(f'\n{colorstr("Benchmarks")} {weights.name} on {env}, per image, {runs} runs\n{table}\n')
+    (save_dir / 'benchmarks.txt').write_text(f'{weights.name} on {env}\n{table}\n')
+    with open(save_dir / 'benchmarks.json', 'w') as f:
+        json.dump({'model': str(model), 'data': data, 'environment': env, 'runs': runs,
+                   'results': json.loads(df.to_json(orient='records'))}, f, indent=2)
+    LOGGER.info(f"Results saved to {colorstr('bold', save_dir)}")
+    return df
+
+
+def _speed(predictor_class, weights, im, imgsz, batch, runs, device):
+    # Per-image pre-process, inference and post-process latency (ms) of the task predictor on a batch of images
+    predictor = predictor_class(overrides={'model': str(weights), 'imgsz': imgsz, 'device': device, 'mode': 'predict',
+                                           'save': False})
+    ims = [im] * batch
+    predictor(source=ims)  # warmup, model setup
+    t = np.zeros(3)
+    for _ in range(runs):
+        predictor(source=ims)
+        t += [dt.t for dt in predictor.dt]
+    pre, inf, post = t / (runs * batch) * 1E3
+    return {'Pre (ms)': round(pre, 2), 'Inference (ms)': round(inf, 2), 'Post (ms)': round(post, 2),
+            'FPS': round(1E3 / (pre + inf + post), 1)}
+
+
+def _accuracy(validator_class, task, weights, data, imgsz, device, save_dir):
+    # mAP50-95 of a val at batch size 1, or top-1 accuracy for classification
+    args = get_cfg(DEFAULT_CFG, {'model': str(weights), 'data': data, 'imgsz': imgsz, 'batch': 1, 'device': device,
+                                 'task': task, 'mode': 'val', 'plots': False})
+    stats = validator_class(save_dir=save_dir, args=args)(model=str(weights))
+    key = {'detect': 'metrics/mAP50-95(B)', 'segment': 'metrics/mAP50-95(M)'}.get(task, 'metrics/accuracy_top1')
+    return round(float(stats[key]), 4)
+
+
+def run(cfg=DEFAULT_CFG):
+    # CLI entry, i.e. yolo benchmark model=yolov8n.pt data=coco128.yaml bench_imgsz=[320,640] bench_batch=[1,4]
+    benchmark(model=cfg.model or 'yolov8n.pt',
+              data=cfg.data,
+              imgsz=cfg.bench_imgsz or cfg.imgsz,
+              batch=cfg.bench_batch or 1,
+              runs=cfg.bench_runs,
+              device=cfg.device or 'cpu',
+              formats=cfg.bench_formats,
+              save_dir=increment_path(Path(cfg.project or SETTINGS['runs_dir']) / (cfg.name or 'benchmark'),
+                                      exist_ok=cfg.exist_ok))
@@ -144,6 +144,9 @@ def add_integration_callbacks(instance):
     from .hub import callbacks as hub_callbacks
     from .tensorboard import callbacks as tb_callbacks
 
-    for x in clearml_callbacks, comet_callbacks, hub_callbacks, tb_callbacks:
+    from ultralytics.yolo.utils import is_offline
+
+    remote = () if is_offline() else (clearml_callbacks, comet_callbacks, hub_callbacks)  # network integrations
+    for x in *remote, tb_callbacks:
         for k, v in x.items():
             instance.callbacks[k].append(v)  # callback[name].append(func)
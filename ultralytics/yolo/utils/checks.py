@@ -18,8 +18,8 @@ import psutil
 import torch
 from IPython import display
 
-from ultralytics.yolo.utils import (AUTOINSTALL, FONT, LOGGER, ROOT, USER_CONFIG_DIR, TryExcept, colorstr, emojis,
-                                    is_colab, is_docker, is_jupyter)
+from ultralytics.yolo.utils import (AUTOINSTALL, FONT, LOGGER, OFFLINE_MSG, ROOT, USER_CONFIG_DIR, TryExcept, colorstr,
+                                    emojis, is_colab, is_docker, is_jupyter, is_offline)
 
 
 def is_ascii(s) -> bool:
@@ -107,6 +107,7 @@ def check_version(current: str = "0.0.0",
 def check_font(font: str = FONT, progress: bool = False) -> None:
     """
     Download font file to the user's configuration directory if it does not already exist.
+    Fonts bundled in ROOT/assets are used as-is and never downloaded.
 
     Args:
         font (str): Path to font file.
@@ -114,20 +115,40 @@ def check_font(font: str = FONT, progress: bool = False) -> None:
 
     Returns:
         None
+
+    Raises:
+        ConnectionError: If the font is not available locally and offline mode is enabled.
     """
     font = Path(font)
 
     # Destination path for the font file
     file = USER_CONFIG_DIR / font.name
 
-    # Check if font file exists at the source or destination path
-    if not font.exists() and not file.exists():
+    # Check if font file exists at the source, destination or bundled assets path
+    if not font.exists() and not file.exists() and not (ROOT / 'assets' / font.name).exists():
         # Download font file
         url = f'https://ultralytics.com/assets/{font.name}'
+        check_offline(url, file)
         LOGGER.info(f'Downloading {url} to {file}...')
         torch.hub.download_url_to_file(url, str(file), progress=progress)
 
 
+def check_offline(url='', file=''):
+    """
+    Raise a clear error instead of attempting a download when offline mode is enabled.
+
+    Args:
+        url (str): URL that would have been downloaded.
+        file (str): Local destination the file is expected at.
+
+    Raises:
+        ConnectionError: If offline mode is enabled.
+    """
+    if is_offline():
+        where = f", place it at '{file}' manually" if file else ''
+        raise ConnectionError(emojis(f'Download of {url} refused, {OFFLINE_MSG}{where} ❌'))
+
+
 def check_online() -> bool:
     """
     Check internet connectivity by attempting to connect to a known online host.
@@ -135,6 +156,9 @@ def check_online() -> bool:
     Returns:
         bool: True if connection is successful, False otherwise.
     """
+    if is_offline():
+        return False  # skip DNS and socket timeouts entirely
+
     import socket
     try:
         # Check host accessibility by attempting to establish a connection
@@ -179,7 +203,7 @@ def check_requirements(requirements=ROOT.parent / 'requirements.txt', exclude=()
             s += f'"{r}" '
             n += 1
 
-    if s and install and AUTOINSTALL:  # check environment variable
+    if s and install and AUTOINSTALL and not is_offline():  # check environment variables
         LOGGER.info(f"{prefix} YOLOv8 requirement{'s' * (n > 1)} {s}not found, attempting AutoUpdate...")
         try:
             assert check_online(), "AutoUpdate skipped (offline)"
@@ -215,6 +239,7 @@ def check_file(file, suffix=''):
         if Path(file).is_file():
             LOGGER.info(f'Found {url} locally at {file}')  # file already exists
         else:
+            check_offline(url, file)
             LOGGER.info(f'Downloading {url} to {file}...')
             torch.hub.download_url_to_file(url, file)
             assert Path(file).exists() and Path(file).stat().st_size > 0, f'File download failed: {url}'  # check
@@ -12,12 +12,14 @@ from zipfile import ZipFile
 import requests
 import torch
 
-from ultralytics.yolo.utils import LOGGER, SETTINGS
+from ultralytics.yolo.utils import LOGGER, OFFLINE_MSG, SETTINGS, is_offline
 
 
 def safe_download(file, url, url2=None, min_bytes=1E0, error_msg=''):
     # Attempts to download file from url or url2, checks and removes incomplete downloads < min_bytes
     file = Path(file)
+    if is_offline():
+        raise ConnectionError(f"Download of {url} refused, {OFFLINE_MSG}. {error_msg or f'Place {file} manually.'}")
     assert_msg = f"Downloaded file '{file}' does not exist or size is < min_bytes={min_bytes}"
     try:  # url1
         LOGGER.info(f'Downloading {url} to {file}...')
@@ -42,6 +44,8 @@ def is_url(url, check=True):
         url = str(url)
         result = urllib.parse.urlparse(url)
         assert all([result.scheme, result.netloc])  # check if is url
+        if check and is_offline():
+            return False  # existence can not be verified without network access
         return (urllib.request.urlopen(url).getcode() == 200) if check else True  # check if exists online
     except (AssertionError, urllib.request.HTTPError):
         return False
@@ -75,6 +79,9 @@ def attempt_download(file, repo='ultralytics/assets', release='v0.0.0'):
                 safe_download(file=file, url=url, min_bytes=1E5)
             return file
 
+        if is_offline():  # never query the GitHub API or release assets
+            raise FileNotFoundError(f"'{file}' not found locally or in {SETTINGS['weights_dir']}, {OFFLINE_MSG}")
+
         # GitHub assets
         assets = [f'yolov5{size}{suffix}.pt' for size in 'nsmlx' for suffix in ('', '6', '-cls', '-seg')]  # default
         assets = [f'yolov8{size}{suffix}.pt' for size in 'nsmlx' for suffix in ('', '6', '-cls', '-seg')]  # default
@@ -110,6 +117,8 @@ def download(url, dir=Path.cwd(), unzip=True, delete=True, curl=False, threads=1
             f = Path(url)  # filename
         else:  # does not exist
             f = dir / Path(url).name
+            if is_offline():
+                raise ConnectionError(f'Download of {url} refused, {OFFLINE_MSG}')
             LOGGER.info(f'Downloading {url} to {f}...')
             for i in range(retry + 1):
                 if curl:
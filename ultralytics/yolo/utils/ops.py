@@ -7,7 +7,11 @@ import cv2
 import numpy as np
 import torch
 import torch.nn.functional as F
-import torchvision
+
+try:
+    import torchvision
+except ImportError:  # frozen inference bundles may ship without torchvision, see nms_numpy()
+    torchvision = None
 
 from ultralytics.yolo.utils import LOGGER
 
@@ -129,6 +133,80 @@ def make_divisible(x, divisor):
     return math.ceil(x / divisor) * divisor
 
 
+def nms_numpy(boxes, scores, iou_thres):
+    """
+    Greedy NMS in pure numpy, used when torchvision is not available.
+
+    Args:
+        boxes (np.ndarray): Boxes of shape (n, 4) in the format of (x1, y1, x2, y2).
+        scores (np.ndarray): Scores of shape (n,).
+        iou_thres (float): The IoU threshold above which overlapping boxes are suppressed.
+
+    Returns:
+        (np.ndarray): Indices of the kept boxes, sorted by decreasing score.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_thres]
+    return np.array(keep, dtype=np.int64)
+
+
+def nms(boxes, scores, iou_thres):
+    """
+    NMS on torch tensors with torchvision.ops.nms(), or the pure numpy fallback if torchvision is not installed.
+
+    Args:
+        boxes (torch.Tensor): Boxes of shape (n, 4) in the format of (x1, y1, x2, y2).
+        scores (torch.Tensor): Scores of shape (n,).
+        iou_thres (float): The IoU threshold above which overlapping boxes are suppressed.
+
+    Returns:
+        (torch.Tensor): Indices of the kept boxes, sorted by decreasing score.
+    """
+    if torchvision is not None:
+        return torchvision.ops.nms(boxes, scores, iou_thres)
+    i = nms_numpy(boxes.detach().float().cpu().numpy(), scores.detach().float().cpu().numpy(), iou_thres)
+    return torch.from_numpy(i).to(boxes.device)
+
+
+def non_max_suppression_single_class(prediction, conf_thres=0.25, iou_thres=0.45, max_det=300, max_nms=30000):
+    """
+    Fast NMS path for single-class models without masks (nc == 1, nm == 0), selected automatically by
+    non_max_suppression(). Scores are thresholded on a strided view of the prediction, candidates are capped with
+    top-k before any sort and NMS runs on minimal (n, 4) and (n,) tensors.
+
+    Args:
+        prediction (torch.Tensor): A tensor of shape (batch_size, 5, num_boxes) with xywh boxes and the class score.
+        conf_thres (float): The confidence threshold below which boxes will be filtered out.
+        iou_thres (float): The IoU threshold for NMS.
+        max_det (int): The maximum number of boxes to keep after NMS.
+        max_nms (int): The maximum number of boxes into NMS.
+
+    Returns:
+        (List[torch.Tensor]): A list of length batch_size of tensors of shape (num_boxes, 6) with columns
+            (x1, y1, x2, y2, confidence, class), identical to non_max_suppression() for single-class models.
+    """
+    output = []
+    for x in prediction:  # (5, num_boxes)
+        scores = x[4]  # strided view, no transpose of the whole prediction
+        i = (scores > conf_thres).nonzero().view(-1)
+        if i.shape[0] > max_nms:  # top-k pre-filter instead of a full sort
+            i = i[scores[i].topk(max_nms)[1]]
+        boxes, scores = xywh2xyxy(x[:4, i].T), scores[i]
+        k = nms(boxes, scores, iou_thres)[:max_det]
+        output.append(torch.cat((boxes[k], scores[k, None], torch.zeros_like(scores[k, None])), 1))
+    return output
+
+
 def non_max_suppression(
         prediction,
         conf_thres=0.25,
@@ -179,6 +257,9 @@ def non_max_suppression(
         prediction = prediction.cpu()
     bs = prediction.shape[0]  # batch size
     nc = prediction.shape[1] - nm - 4  # number of classes
+    if nc == 1 and nm == 0 and not labels and (classes is None or 0 in classes):  # single-class fast path
+        output = non_max_suppression_single_class(prediction, conf_thres, iou_thres, max_det)
+        return [x.to(device) for x in output] if mps else output
     mi = 4 + nc  # mask start index
     xc = prediction[:, 4:mi].amax(1) > conf_thres  # candidates
 
@@ -237,7 +318,7 @@ def non_max_suppression(
         # Batched NMS
         c = x[:, 5:6] * (0 if agnostic else max_wh)  # classes
         boxes, scores = x[:, :4] + c, x[:, 4]  # boxes (offset by class), scores
-        i = torchvision.ops.nms(boxes, scores, iou_thres)  # NMS
+        i = nms(boxes, scores, iou_thres)  # NMS
         i = i[:max_det]  # limit detections
         if merge and (1 < n < 3E3):  # Merge NMS (boxes merged using weighted mean)
             # update boxes as boxes(i,4) = weights(i,n) * boxes(n,4)
@@ -257,6 +338,59 @@ def non_max_suppression(
     return output
 
 
+def make_tiles(shape, tile=640, overlap=0.2):
+    """
+    Computes overlapping tile windows covering an image. Tiles on the right and bottom edges are shifted back inside the
+    image so that every tile has the full tile size (unless the image itself is smaller than a tile).
+
+    Args:
+        shape (tuple): The shape of the image, in the format of (height, width).
+        tile (int): The tile size in pixels.
+        overlap (float): The fractional overlap between adjacent tiles, between 0.0 and 1.0.
+
+    Returns:
+        (np.ndarray): An array of shape (n, 4) of tile windows in the format of (x1, y1, x2, y2).
+    """
+    assert 0 <= overlap < 1, f'Invalid tile overlap {overlap}, valid values are between 0.0 and 1.0'
+    step = max(int(tile * (1 - overlap)), 1)
+
+    def starts(size):
+        if size <= tile:
+            return [0]
+        s = list(range(0, size - tile, step))
+        return s + [size - tile]  # last tile aligned with the image edge
+
+    h, w = shape[:2]
+    return np.array([(x, y, min(x + tile, w), min(y + tile, h)) for y in starts(h) for x in starts(w)])
+
+
+def merge_tile_predictions(preds, windows, iou_thres=0.45, agnostic=False, max_det=300):
+    """
+    Merges per-tile detections into full-image detections with cross-tile NMS, removing the duplicates produced by
+    objects that lie in the overlap between tiles.
+
+    Args:
+        preds (List[torch.Tensor]): Per-tile detections as output by non_max_suppression(), each of shape
+            (num_boxes, 6 + num_masks) with boxes in tile coordinates.
+        windows (np.ndarray): Tile windows (x1, y1, x2, y2) in image coordinates, as output by make_tiles().
+        iou_thres (float): The IoU threshold for cross-tile NMS.
+        agnostic (bool): If True, boxes of all classes are suppressed together.
+        max_det (int): The maximum number of boxes to keep.
+
+    Returns:
+        (torch.Tensor): The merged detections of shape (num_boxes, 6 + num_masks) in image coordinates.
+    """
+    x = torch.cat(preds, 0)
+    if not x.shape[0]:
+        return x
+    offsets = torch.cat([torch.tensor(w[:2], device=x.device, dtype=x.dtype).repeat(2).expand(len(p), 4)
+                         for p, w in zip(preds, windows)], 0)
+    x[:, :4] += offsets  # tile to image coordinates
+    c = x[:, 5:6] * (0 if agnostic else 7680)  # classes offset, as in non_max_suppression()
+    i = nms(x[:, :4] + c, x[:, 4], iou_thres)[:max_det]
+    return x[i]
+
+
 def clip_boxes(boxes, shape):
     """
     It takes a list of bounding boxes and a shape (height, width) and clips the bounding boxes to the
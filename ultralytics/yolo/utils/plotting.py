@@ -12,7 +12,7 @@ import pandas as pd
 import torch
 from PIL import Image, ImageDraw, ImageFont
 
-from ultralytics.yolo.utils import FONT, USER_CONFIG_DIR, threaded
+from ultralytics.yolo.utils import FONT, ROOT, USER_CONFIG_DIR, threaded
 
 from .checks import check_font, check_requirements, is_ascii
 from .files import increment_path
@@ -140,9 +140,15 @@ class Annotator:
 
 
 def check_pil_font(font=FONT, size=10):
-    # Return a PIL TrueType Font, downloading to CONFIG_DIR if necessary
+    # Return a PIL TrueType Font, downloading to CONFIG_DIR if necessary. Fonts are not shipped in ROOT/assets: when
+    # they are neither there nor in CONFIG_DIR and can't be downloaded (offline mode), PIL's default font is used
     font = Path(font)
-    font = font if font.exists() else (USER_CONFIG_DIR / font.name)
+    for f in font, ROOT / 'assets' / font.name, USER_CONFIG_DIR / font.name:  # source, bundled, config dir
+        if f.exists():
+            font = f
+            break
+    else:
+        font = USER_CONFIG_DIR / font.name
     try:
         return ImageFont.truetype(str(font) if font.exists() else font.name, size)
     except Exception:  # download if missing
@@ -151,7 +157,7 @@ def check_pil_font(font=FONT, size=10):
             return ImageFont.truetype(str(font), size)
         except TypeError:
             check_requirements('Pillow>=8.4.0')  # known issue https://github.com/ultralytics/yolov5/issues/5374
-        except URLError:  # not online
+        except (URLError, ConnectionError):  # not online or offline mode
             return ImageFont.load_default()
 
 
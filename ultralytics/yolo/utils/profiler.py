@@ -0,0 +1,206 @@
+# Ultralytics YOLO 🚀, GPL-3.0 license
+"""
+Per-layer and per-stage profiler of the predict pipeline, exported as a Chrome trace and a text table
+
+Usage:
+    from ultralytics import YOLO
+    from ultralytics.yolo.utils.profiler import Profiler
+
+    model = YOLO('yolov8n.pt')
+    model(im)  # builds the predictor
+    profiler = Profiler().attach(model.predictor)
+    for _ in range(100):
+        model(im)
+        profiler.step()  # one frame
+    profiler.detach()
+    print(profiler.table())
+    profiler.export('runs/profile')  # trace.json (chrome://tracing or https://ui.perfetto.dev) and profile.txt
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import torch
+
+from ultralytics.yolo.utils import LOGGER
+
+
+class Profiler:
+    """
+    Records the wall time of each model layer (forward hooks on the PyTorch layers, no thop) and of the predictor
+    stages (loader, preprocess, inference, nms, results), aggregated over the frames marked with step().
+
+    Attributes:
+        stats (dict): (category, name) -> [calls, total seconds, max seconds].
+        events (list): Chrome trace 'complete' events, up to max_events.
+        frames (int): Frames marked with step().
+        predictor (BasePredictor): The predictor the profiler is attached to, if any.
+    """
+
+    def __init__(self, max_events=500000):
+        """
+        Args:
+            max_events (int): Maximum number of trace events kept. Aggregated stats are unbounded.
+        """
+        self.stats = defaultdict(lambda: [0, 0.0, 0.0])
+        self.events = []
+        self.max_events = max_events
+        self.frames = 0
+        self.predictor = None
+        self._handles = []
+        self._starts = {}
+        self._frozen = None
+        self._cuda = torch.cuda.is_available()
+        self._pid = os.getpid()
+        self._t0 = self._frame_start = time.perf_counter()
+
+    def time(self):
+        # Current time, after pending CUDA kernels so that they are charged to the layer or stage that queued them
+        if self._cuda and torch.cuda.is_initialized():
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    def record(self, name, cat, start, end):
+        """
+        Adds one timed call to the stats and, while there is room, to the trace.
+
+        Args:
+            name (str): Layer or stage name.
+            cat (str): Category, i.e. 'stage', 'layer' or 'frame'.
+            start (float): Start time (time.perf_counter seconds).
+            end (float): End time.
+        """
+        s = self.stats[(cat, name)]
+        s[0] += 1
+        s[1] += end - start
+        s[2] = max(s[2], end - start)
+        if len(self.events) < self.max_events:
+            self.events.append({
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': (start - self._t0) * 1E6,
+                'dur': (end - start) * 1E6,
+                'pid': self._pid,
+                'tid': threading.get_ident()})
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Context manager timing a stage of the pipeline.
+        """
+        start = self.time()
+        try:
+            yield
+        finally:
+            self.record(name, 'stage', start, self.time())
+
+    def iterate(self, iterable, name='loader'):
+        """
+        Yields the items of iterable, timing each next() call as a stage, i.e. the source loader of a predictor.
+        """
+        it = iter(iterable)
+        while True:
+            start = self.time()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.record(name, 'stage', start, self.time())
+            yield item
+
+    def step(self):
+        """
+        Marks the end of a frame: the time since the previous step() is recorded as a 'frame' event.
+        """
+        now = self.time()
+        self.record('frame', 'frame', self._frame_start, now)
+        self._frame_start = now
+        self.frames += 1
+
+    def attach(self, predictor):
+        """
+        Starts profiling a predictor: its stages report to this profiler and each layer of a PyTorch model is hooked.
+        The frozen TorchScript trace of the model (jit_cache) is set aside until detach(), its layers can't be hooked.
+
+        Args:
+            predictor (BasePredictor): A predictor whose model is set up, i.e. after a first prediction.
+
+        Returns:
+            (Profiler): self.
+        """
+        self.detach()
+        self.predictor = predictor
+        predictor.profiler = self
+        backend = predictor.model
+        if backend is not None and (backend.pt or backend.nn_module):
+            self._frozen, backend.frozen = backend.frozen, None
+            layers = getattr(backend.model, 'model', [])
+            for m in layers:
+                name = f"{m.i:>3} {m.type.split('.')[-1]}" if hasattr(m, 'i') else type(m).__name__
+                self._handles.append(m.register_forward_pre_hook(self._layer_start))
+                self._handles.append(m.register_forward_hook(lambda m, x, y, name=name: self._layer_end(m, name)))
+        else:
+            LOGGER.warning('WARNING ⚠️ Profiler: per-layer times need a PyTorch model, only stages are recorded')
+        self._frame_start = self.time()
+        return self
+
+    def detach(self):
+        """
+        Stops profiling: removes the hooks and restores the frozen trace. Recorded stats and events are kept.
+        """
+        for h in self._handles:
+            h.remove()
+        self._handles, self._starts = [], {}
+        if self.predictor is not None:
+            if self._frozen is not None:
+                self.predictor.model.frozen = self._frozen
+            if getattr(self.predictor, 'profiler', None) is self:
+                self.predictor.profiler = None
+        self.predictor, self._frozen = None, None
+
+    def _layer_start(self, m, x):
+        self._starts[m] = self.time()
+
+    def _layer_end(self, m, name):
+        start = self._starts.pop(m, None)
+        if start is not None:
+            self.record(name, 'layer', start, self.time())
+
+    def table(self):
+        """
+        Returns the aggregated times as a text table, sorted by total time, one row per stage and layer.
+        """
+        frame_time = self.stats[('frame', 'frame')][1] if ('frame', 'frame') in self.stats else 0.0
+        total = frame_time or sum(s[1] for (cat, _), s in self.stats.items() if cat == 'stage') or 1E-9
+        n = max(self.frames, 1)
+        rows = sorted(((cat, name, *s) for (cat, name), s in self.stats.items() if cat != 'frame'),
+                      key=lambda r: -r[3])
+        lines = [f'{self.frames} frames, {frame_time / n * 1E3:.2f} ms/frame',
+                 f"{'category':<8} {'name':<28} {'calls':>8} {'total (ms)':>11} {'ms/frame':>9} {'mean (ms)':>10} "
+                 f"{'max (ms)':>9} {'%':>6}"]
+        lines += [f'{cat:<8} {name:<28} {calls:>8} {t * 1E3:>11.1f} {t / n * 1E3:>9.3f} {t / calls * 1E3:>10.3f} '
+                  f'{tmax * 1E3:>9.3f} {t / total * 100:>6.1f}' for cat, name, calls, t, tmax in rows]
+        return '\n'.join(lines)
+
+    def export(self, save_dir):
+        """
+        Writes the Chrome trace (trace.json) and the text table (profile.txt) to save_dir.
+
+        Returns:
+            (tuple): Paths of the trace and of the table.
+        """
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        trace, txt = save_dir / 'trace.json', save_dir / 'profile.txt'
+        if len(self.events) >= self.max_events:
+            LOGGER.warning(f'WARNING ⚠️ Profiler: trace truncated to its first {self.max_events} events')
+        with open(trace, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+        txt.write_text(self.table() + '\n')
+        return trace, txt
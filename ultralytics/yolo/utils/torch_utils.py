@@ -1,12 +1,15 @@
 # Ultralytics YOLO 🚀, GPL-3.0 license
 
+import hashlib
+import inspect
 import math
 import os
 import platform
 import random
 import time
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
@@ -18,7 +21,7 @@ import torch.nn.functional as F
 from torch.nn.parallel import DistributedDataParallel as DDP
 
 import ultralytics
-from ultralytics.yolo.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER
+from ultralytics.yolo.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER, USER_CONFIG_DIR
 from ultralytics.yolo.utils.checks import git_describe
 
 from .checks import check_version
@@ -96,6 +99,21 @@ def select_device(device='', batch_size=0, newline=False):
     return torch.device(arg)
 
 
+@lru_cache(maxsize=None)
+def cpu_supports_bf16():
+    """
+    Whether the CPU has native bfloat16 instructions (AVX512-BF16 or AMX) and PyTorch is built with oneDNN, so that bf16
+    inference is faster than fp32. Without them bf16 is emulated and slower. Reads /proc/cpuinfo, False elsewhere.
+    """
+    if not torch.backends.mkldnn.is_available():
+        return False
+    try:
+        flags = set(Path('/proc/cpuinfo').read_text().split())
+    except OSError:
+        return False
+    return bool(flags & {'avx512_bf16', 'amx_bf16'})
+
+
 def time_sync():
     # PyTorch-accurate time
     if torch.cuda.is_available():
@@ -127,6 +145,78 @@ def fuse_conv_and_bn(conv, bn):
     return fusedconv
 
 
+def shared_copy(model):
+    """
+    Copy of the module tree of a model whose parameters and buffers share the storage of the original: the copy can be
+    folded or converted (half(), bf16, channels_last), which replaces the tensors of its own parameters, without
+    changing the original nor duplicating its weights, i.e. the copy-on-write memory map of a slim model.
+    """
+    memo = {id(p): nn.Parameter(p.data, requires_grad=p.requires_grad) for p in model.parameters()}
+    memo.update({id(b): b for b in model.buffers()})
+    return deepcopy(model, memo)
+
+
+def frozen_torchscript(model, im, cache_dir=USER_CONFIG_DIR / 'torchscript', weights=None):
+    """
+    Trace a fused model at a fixed input shape, freeze it with torch.jit.freeze() and apply
+    torch.jit.optimize_for_inference() (oneDNN convolution fusions on CPU). The frozen trace is cached on disk, keyed by
+    the weights, the input shape, dtype and memory format, the layout of every weight (dtype, shape and strides, i.e.
+    bf16 or channels_last), the torch version and the source of the ultralytics modules in the model (i.e.
+    nn/modules.py), so that only the first run pays for tracing and code or format changes are traced again.
+    optimize_for_inference() is applied again after loading since its prepacked oneDNN weights can not be serialized.
+
+    Args:
+        model (nn.Module): The fused model in eval mode. Detect heads are traced in dynamic mode without top-k decoding.
+        im (torch.Tensor): An input of the fixed inference shape and memory format.
+        cache_dir (Path): The cache directory, defaults to 'torchscript' in the USER_CONFIG_DIR.
+        weights (str | Path, optional): The checkpoint file the model was loaded from. Its path, size and modification
+            time stand for the weight values in the key, rather than hashing every weight on each start.
+
+    Returns:
+        (torch.jit.ScriptModule): The frozen and optimized model.
+    """
+    h = hashlib.sha256(f'{torch.__version__} {tuple(im.shape)} {im.stride()} {im.dtype} {im.device.type}'.encode())
+    root = Path(ultralytics.__file__).resolve().parent
+    for src in sorted({inspect.getsourcefile(type(m)) or '' for m in model.modules()}):
+        if Path(src).is_file() and root in Path(src).resolve().parents:
+            h.update(Path(src).read_bytes())  # model and head code, i.e. Detect.forward()
+    file = Path(weights) if weights and Path(weights).is_file() else None
+    if file:
+        stat = file.stat()
+        h.update(f'{file.resolve()} {stat.st_size} {stat.st_mtime_ns}'.encode())
+    for k, v in model.state_dict().items():
+        h.update(f'{k} {v.dtype} {tuple(v.shape)} {v.stride()}'.encode())
+        if file is None:
+            h.update(v.detach().cpu().float().numpy().tobytes())
+    f = Path(cache_dir) / f'{h.hexdigest()[:16]}.torchscript'
+
+    ts = None
+    if f.exists():
+        try:
+            ts = torch.jit.load(str(f), map_location=im.device)
+        except Exception as e:
+            LOGGER.warning(f'WARNING ⚠️ TorchScript cache {f} is not readable, tracing again: {e}')
+    if ts is None:
+        head = model.model[-1] if hasattr(model, 'model') else None
+        attrs = {k: getattr(head, k) for k in ('dynamic', 'topk') if hasattr(head, k)}
+        for k in attrs:
+            setattr(head, k, k == 'dynamic')  # anchors from traced shapes, no data-dependent top-k in the graph
+        try:
+            mode = torch.inference_mode(False) if hasattr(torch, 'inference_mode') else nullcontext()
+            with mode, torch.no_grad():  # no inference tensors baked into the trace
+                x = torch.empty_strided(im.shape, im.stride(), dtype=im.dtype, device=im.device).zero_()  # same layout
+                ts = torch.jit.freeze(torch.jit.trace(model, x, strict=False).eval())
+        finally:
+            for k, v in attrs.items():
+                setattr(head, k, v)
+        f.parent.mkdir(parents=True, exist_ok=True)
+        ts.save(str(f))
+        LOGGER.info(f'TorchScript: frozen {tuple(im.shape)} trace cached as {f}')
+    if hasattr(torch.jit, 'optimize_for_inference'):  # torch>=1.10
+        ts = torch.jit.optimize_for_inference(ts)
+    return ts
+
+
 def model_info(model, verbose=False, imgsz=640):
     # Model information. imgsz may be int or list, i.e. imgsz=640 or imgsz=[640, 320]
     n_p = get_num_params(model)
@@ -13,16 +13,21 @@ class ClassificationPredictor(BasePredictor):
     def get_annotator(self, img):
         return Annotator(img, example=str(self.model.names), pil=True)
 
+    def setup_model(self, model):
+        self.args.fold_input = False  # classify transforms already normalize the input
+        super().setup_model(model)
+
     def preprocess(self, img):
         img = (img if isinstance(img, torch.Tensor) else torch.Tensor(img)).to(self.model.device)
-        img = img.half() if self.model.fp16 else img.float()  # uint8 to fp16/32
+        img = img.to(self.model.dtype)  # uint8 to fp16/bf16/32
         return img
 
     def postprocess(self, preds, img, orig_img, classes=None):
         results = []
-        for i, pred in enumerate(preds):
-            shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
-            results.append(Results(probs=pred.softmax(0), orig_shape=shape[:2]))
+        with self.stage('results'):
+            for i, pred in enumerate(preds):
+                shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
+                results.append(Results(probs=pred.softmax(0), orig_shape=shape[:2]))
         return results
 
     def write_results(self, idx, results, batch):
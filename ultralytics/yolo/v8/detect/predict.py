@@ -1,11 +1,15 @@
 # Ultralytics YOLO 🚀, GPL-3.0 license
 
+import numpy as np
 import torch
 
+from ultralytics.nn.modules import Detect
+from ultralytics.yolo.data.augment import LetterBoxCanvas
 from ultralytics.yolo.engine.predictor import BasePredictor
 from ultralytics.yolo.engine.results import Results
 from ultralytics.yolo.utils import DEFAULT_CFG, ROOT, ops
 from ultralytics.yolo.utils.plotting import Annotator, colors, save_one_box
+from ultralytics.yolo.utils.torch_utils import smart_inference_mode
 
 
 class DetectionPredictor(BasePredictor):
@@ -13,27 +17,100 @@ class DetectionPredictor(BasePredictor):
     def get_annotator(self, img):
         return Annotator(img, line_width=self.args.line_thickness, example=str(self.model.names))
 
-    def preprocess(self, img):
+    def setup_source(self, source=None):
+        super().setup_source(source)
+        self.setup_head()  # args may change between calls
+
+    def setup_head(self):
+        """
+        Configures confidence-first decoding in the Detect head of PyTorch models from args.head_topk and args.conf.
+        Segment heads are left untouched since mask coefficients are decoded for all anchors.
+        """
+        head = self.model.model.model[-1] if self.model.pt else None
+        if type(head) is Detect:
+            head.topk = self.args.head_topk or 0
+            head.conf = self.args.conf
+
+    def preprocess(self, img, buffer='frames'):
         img = torch.from_numpy(img).to(self.model.device)
-        img = img.half() if self.model.fp16 else img.float()  # uint8 to fp16/32
-        img /= 255  # 0 - 255 to 0.0 - 1.0
-        return img
+        img = img[None] if img.dim() == 3 else img  # expand for batch dim, memory formats are defined for 4D tensors
+        fmt = torch.channels_last if self.model.channels_last else torch.contiguous_format
+        if self.model.input_folded:  # uint8 BGR HWC, normalization and channel swap are done by the first Conv
+            img = img.movedim(-1, -3)  # HWC to CHW view, already channels-last in memory
+            return self.input_tensor(img.shape, self.model.dtype, fmt, buffer).copy_(img)  # uint8 to fp16/bf16/32
+        x = self.input_tensor(img.shape, self.model.dtype, fmt, buffer).copy_(img)  # uint8 to fp16/bf16/32
+        x /= 255  # 0 - 255 to 0.0 - 1.0
+        return x
 
     def postprocess(self, preds, img, orig_img, classes=None):
-        preds = ops.non_max_suppression(preds,
-                                        self.args.conf,
-                                        self.args.iou,
-                                        agnostic=self.args.agnostic_nms,
-                                        max_det=self.args.max_det,
-                                        classes=self.args.classes)
-
+        with self.stage('nms'):
+            preds = ops.non_max_suppression(preds,
+                                            self.args.conf,
+                                            self.args.iou,
+                                            agnostic=self.args.agnostic_nms,
+                                            max_det=self.args.max_det,
+                                            classes=self.args.classes)
+
+        ratio_pad = getattr(self.dataset, 'ratio_pad', None)  # cached letterbox geometry, if any
         results = []
-        for i, pred in enumerate(preds):
-            shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
-            pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape).round()
-            results.append(Results(boxes=pred, orig_shape=shape[:2]))
+        with self.stage('results'):
+            for i, pred in enumerate(preds):
+                shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
+                rp = ratio_pad[i] if ratio_pad else None
+                pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape, rp).round()
+                results.append(Results(boxes=pred, orig_shape=shape[:2]))
         return results
 
+    @smart_inference_mode()
+    def predict_tiles(self, im0, tile=None, overlap=None, conf=None):
+        """
+        Tiled inference on a full-resolution image, for objects too small to be detected once the image is resized to
+        imgsz. The image is cut into overlapping tiles that are letterboxed to imgsz (upscaled when tile < imgsz) and run
+        through the model as a single batch, and the per-tile detections are merged with cross-tile NMS.
+
+        Args:
+            im0 (np.ndarray): The full-resolution BGR image of shape (h, w, 3).
+            tile (int, optional): Tile size in pixels. Defaults to args.tile, or imgsz if unset.
+            overlap (float, optional): Fractional overlap between adjacent tiles. Defaults to args.tile_overlap.
+            conf (float, optional): Confidence threshold. Defaults to args.conf.
+
+        Returns:
+            (Results): The merged detections in im0 coordinates.
+        """
+        tile = tile or self.args.tile or max(self.imgsz or (self.args.imgsz,) * 2)
+        overlap = self.args.tile_overlap if overlap is None else overlap
+        windows = ops.make_tiles(im0.shape[:2], tile, overlap)
+
+        new_shape = tuple(self.imgsz or (tile, tile))
+        if getattr(self, 'tile_letterbox', None) is None or self.tile_letterbox.new_shape != new_shape:
+            self.tile_letterbox = LetterBoxCanvas(new_shape, auto=False, stride=self.model.stride)
+        with self.stage('tile preprocess'):
+            crops = [im0[y1:y2, x1:x2] for x1, y1, x2, y2 in windows]
+            im, ratio_pad = self.tile_letterbox.batch(crops)
+            if not self.model.input_folded:
+                im = np.ascontiguousarray(im[..., ::-1].transpose((0, 3, 1, 2)))  # BGR to RGB, BHWC to BCHW
+            im = self.preprocess(im, buffer='tiles')  # own input buffer, the frames one keeps its shape
+
+        with self.stage('tile inference'):
+            preds = self.model(im, augment=False)
+        with self.stage('tile nms'):
+            preds = ops.non_max_suppression(preds,
+                                            self.args.conf if conf is None else conf,
+                                            self.args.iou,
+                                            agnostic=self.args.agnostic_nms,
+                                            max_det=self.args.max_det,
+                                            classes=self.args.classes)
+            for pred, crop, rp in zip(preds, crops, ratio_pad):
+                pred[:, :4] = ops.scale_boxes(im.shape[2:], pred[:, :4], crop.shape, rp)  # letterbox to crop coords
+
+            pred = ops.merge_tile_predictions(preds,
+                                              windows,
+                                              self.args.iou,
+                                              agnostic=self.args.agnostic_nms,
+                                              max_det=self.args.max_det)
+            pred[:, :4] = pred[:, :4].round()
+        return Results(boxes=pred, orig_shape=im0.shape[:2])
+
     def write_results(self, idx, results, batch):
         p, im, im0 = batch
         log_string = ""
@@ -12,27 +12,31 @@ class SegmentationPredictor(DetectionPredictor):
 
     def postprocess(self, preds, img, orig_img, classes=None):
         # TODO: filter by classes
-        p = ops.non_max_suppression(preds[0],
-                                    self.args.conf,
-                                    self.args.iou,
-                                    agnostic=self.args.agnostic_nms,
-                                    max_det=self.args.max_det,
-                                    nm=32,
-                                    classes=self.args.classes)
+        with self.stage('nms'):
+            p = ops.non_max_suppression(preds[0],
+                                        self.args.conf,
+                                        self.args.iou,
+                                        agnostic=self.args.agnostic_nms,
+                                        max_det=self.args.max_det,
+                                        nm=32,
+                                        classes=self.args.classes)
+        ratio_pad = getattr(self.dataset, 'ratio_pad', None)  # cached letterbox geometry, if any
         results = []
         proto = preds[1][-1]
-        for i, pred in enumerate(p):
-            shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
-            if not len(pred):
-                results.append(Results(boxes=pred[:, :6], orig_shape=shape[:2]))  # save empty boxes
-                continue
-            if self.args.retina_masks:
-                pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape).round()
-                masks = ops.process_mask_native(proto[i], pred[:, 6:], pred[:, :4], shape[:2])  # HWC
-            else:
-                masks = ops.process_mask(proto[i], pred[:, 6:], pred[:, :4], img.shape[2:], upsample=True)  # HWC
-                pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape).round()
-            results.append(Results(boxes=pred[:, :6], masks=masks, orig_shape=shape[:2]))
+        with self.stage('results'):
+            for i, pred in enumerate(p):
+                shape = orig_img[i].shape if isinstance(orig_img, list) else orig_img.shape
+                rp = ratio_pad[i] if ratio_pad else None
+                if not len(pred):
+                    results.append(Results(boxes=pred[:, :6], orig_shape=shape[:2]))  # save empty boxes
+                    continue
+                if self.args.retina_masks:
+                    pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape, rp).round()
+                    masks = ops.process_mask_native(proto[i], pred[:, 6:], pred[:, :4], shape[:2])  # HWC
+                else:
+                    masks = ops.process_mask(proto[i], pred[:, 6:], pred[:, :4], img.shape[2:], upsample=True)  # HWC
+                    pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], shape, rp).round()
+                results.append(Results(boxes=pred[:, :6], masks=masks, orig_shape=shape[:2]))
         return results
 
     def write_results(self, idx, results, batch):